@@ -33,7 +33,15 @@ class DataImporter {
     try {
       onProgress?.call(ImportProgress(current: 0, total: 114, message: 'Starting import...'));
 
-      await rootBundle.loadString('assets/quran/manifest_multi.json');
+      final manifest = jsonDecode(
+        await rootBundle.loadString('assets/quran/manifest_multi.json'),
+      ) as Map<String, dynamic>;
+      // tool/generate_quran_json.py already applied TranslationCleaner rules.
+      final translationsCleaned = manifest['translationsCleaned'] == true;
+      String? tr(String? raw) {
+        if (raw == null || translationsCleaned) return raw;
+        return TranslationCleaner.clean(raw);
+      }
 
       const int batchSize = 5;
       final totalSurahs = 114;
@@ -66,18 +74,10 @@ class DataImporter {
                   page: metadata?.page ?? 0,
                   juz: metadata?.juz ?? 0,
                   arabic: verse.arabic,
-                  trEn: Value(verse.translations?['en'] != null 
-                      ? TranslationCleaner.clean(verse.translations!['en']) 
-                      : null),
-                  trId: Value(verse.translations?['id'] != null 
-                      ? TranslationCleaner.clean(verse.translations!['id']) 
-                      : null),
-                  trZh: Value(verse.translations?['zh'] != null 
-                      ? TranslationCleaner.clean(verse.translations!['zh']) 
-                      : null),
-                  trJa: Value(verse.translations?['ja'] != null 
-                      ? TranslationCleaner.clean(verse.translations!['ja']) 
-                      : null),
+                  trEn: Value(tr(verse.translations?['en'])),
+                  trId: Value(tr(verse.translations?['id'])),
+                  trZh: Value(tr(verse.translations?['zh'])),
+                  trJa: Value(tr(verse.translations?['ja'])),
                 ),
                 mode: InsertMode.replace,
               );
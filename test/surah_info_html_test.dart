@@ -1,6 +1,19 @@
+import 'dart:convert';
+import 'dart:io';
+
 import 'package:flutter_test/flutter_test.dart';
+import 'package:quran_offline/core/models/surah_qul_info.dart';
 import 'package:quran_offline/core/surah_info/surah_info_html.dart';
 
+Map<String, Object?> _entryJson(SurahQulInfoEntry entry) => {
+      'short': entry.short,
+      'sections': [
+        for (final s in entry.sections) {'title': s.title, 'body': s.body},
+      ],
+      if (entry.supplementaryBody.isNotEmpty)
+        'supplementaryBody': entry.supplementaryBody,
+    };
+
 void main() {
   test('parses h2 sections from English surah info HTML', () {
     const html = '''
@@ -149,4 +162,22 @@ void main() {
     expect(entry.sections, isEmpty);
     expect(entry.supplementaryBody, isEmpty);
   });
+
+  test('matches the build-time segment parity fixture', () {
+    // Same cases as tool/test_html_segments.py (pre-parsed surah info).
+    final file = File('tool/fixtures/html_segments_cases.json');
+    final cases = (jsonDecode(file.readAsStringSync()) as List<dynamic>)
+        .cast<Map<String, dynamic>>()
+        .where((c) => c['kind'] == 'surah_info')
+        .toList();
+    expect(cases, isNotEmpty);
+    for (final c in cases) {
+      final entry = SurahInfoHtml.parse(
+        html: c['html'] as String?,
+        shortText: c['shortText'] as String?,
+        language: c['language'] as String,
+      );
+      expect(_entryJson(entry), c['expected'], reason: c['name'] as String);
+    }
+  });
 }
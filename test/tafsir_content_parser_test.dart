@@ -1,6 +1,25 @@
+import 'dart:convert';
+import 'dart:io';
+
 import 'package:flutter_test/flutter_test.dart';
+import 'package:quran_offline/core/models/tafsir_content.dart';
 import 'package:quran_offline/core/tafsir/tafsir_content_parser.dart';
 
+Map<String, Object?> _contentJson(TafsirContent content) => {
+      'sections': [
+        for (final s in content.sections)
+          {
+            if (s.title != null) 'title': s.title,
+            'paragraphs': [
+              for (final p in s.paragraphs)
+                {if (p.label != null) 'label': p.label, 'text': p.text},
+            ],
+          },
+      ],
+      if (content.revelationType != null)
+        'revelationType': content.revelationType,
+    };
+
 void main() {
   test('Indonesian parser skips translation quote and keeps id/ms commentary', () {
     const html = '''
@@ -48,4 +67,21 @@ void main() {
     final content = TafsirContentParser.parse(html, 'ja');
     expect(content.sections.first.paragraphs.first.text, contains('慈悲'));
   });
+
+  test('matches the build-time segment parity fixture', () {
+    // Same cases as tool/test_html_segments.py (pre-parsed tafsir).
+    final file = File('tool/fixtures/html_segments_cases.json');
+    final cases = (jsonDecode(file.readAsStringSync()) as List<dynamic>)
+        .cast<Map<String, dynamic>>()
+        .where((c) => c['kind'] == 'tafsir')
+        .toList();
+    expect(cases, isNotEmpty);
+    for (final c in cases) {
+      final content = TafsirContentParser.parse(
+        c['html'] as String?,
+        c['language'] as String,
+      );
+      expect(_contentJson(content), c['expected'], reason: c['name'] as String);
+    }
+  });
 }
@@ -1,3 +1,6 @@
+import 'dart:convert';
+import 'dart:io';
+
 import 'package:flutter_test/flutter_test.dart';
 import 'package:quran_offline/core/utils/translation_cleaner.dart';
 
@@ -32,4 +35,19 @@ void main() {
 
     expect(TranslationCleaner.clean(dirty), 'Lord of the worlds');
   });
+
+  test('matches the build-time cleaner parity fixture', () {
+    // Same cases as tool/test_translation_clean.py (generator cleaning stage).
+    final file = File('tool/fixtures/translation_cleaner_cases.json');
+    final cases = jsonDecode(file.readAsStringSync()) as List<dynamic>;
+    expect(cases, isNotEmpty);
+    for (final raw in cases) {
+      final c = raw as Map<String, dynamic>;
+      expect(
+        TranslationCleaner.clean(c['input'] as String),
+        c['output'] as String,
+        reason: jsonEncode(c['input']),
+      );
+    }
+  });
 }
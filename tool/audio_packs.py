@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""Offline recitation packs: every ayah MP3 of an EveryAyah reciter.
+
+A pack is `<out-dir>/<reciterId>/` holding the files the app's player
+asks for (AudioPaths.fileName: SSSAAA.mp3 for all 6236 ayahs plus the
+standalone Bismillah SSS000.mp3 of surahs 2-8 and 10-114) and
+manifest.json with each file's SHA-256, size, frame count and duration.
+
+Files download in parallel through a bounded pool with http_download,
+which resumes a dropped transfer from its .part file with an HTTP Range
+request. Every body is walked frame by frame (mp3_frames) before it is
+accepted. Reruns are incremental: files already in the manifest are
+re-hashed and kept when they still match, files on disk without an
+entry are checked and adopted, and missing, truncated or corrupt files
+are fetched again.
+
+Usage:
+  python tool/audio_packs.py Alafasy_128kbps
+  python tool/audio_packs.py --all --out-dir build/audio --jobs 16
+  python tool/audio_packs.py Husary_128kbps --surahs 1,36,67
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections.abc import Iterable, Mapping, Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import NamedTuple
+
+from http_download import DownloadError, download, sha256_file
+from mp3_frames import audio_info
+from quran_corpus import EXPECTED_AYAHS, SURAH_COUNT
+
+DEFAULT_OUT = "build/audio"
+MANIFEST = "manifest.json"
+DEFAULT_JOBS = 8
+BISMILLAH_AYAH = 0
+
+# Mirrors ReciterCatalog in lib/core/models/reciter.dart.
+RECITERS = {
+    "Alafasy_128kbps": "https://everyayah.com/data/Alafasy_128kbps",
+    "Abdul_Basit_Murattal_192kbps": "https://everyayah.com/data/Abdul_Basit_Murattal_192kbps",
+    "Abdurrahmaan_As-Sudais_192kbps": "https://everyayah.com/data/Abdurrahmaan_As-Sudais_192kbps",
+    "Husary_128kbps": "https://everyayah.com/data/Husary_128kbps",
+    "Minshawy_Murattal_128kbps": "https://everyayah.com/data/Minshawy_Murattal_128kbps",
+    "Saood_ash-Shuraym_128kbps": "https://everyayah.com/data/Saood_ash-Shuraym_128kbps",
+}
+
+
+def has_bismillah_audio(surah: int) -> bool:
+    """Bismillah.hasBismillahAudio: every surah but 1 and 9."""
+    return surah not in (1, 9)
+
+
+def file_name(surah: int, ayah: int) -> str:
+    return f"{surah:03d}{ayah:03d}.mp3"
+
+
+def pack_files(surahs: Iterable[int] | None = None) -> list[str]:
+    """File names of a pack, in playlist order."""
+    names: list[str] = []
+    for surah in surahs or range(1, SURAH_COUNT + 1):
+        if has_bismillah_audio(surah):
+            names.append(file_name(surah, BISMILLAH_AYAH))
+        names.extend(file_name(surah, a) for a in range(1, EXPECTED_AYAHS[surah - 1] + 1))
+    return names
+
+
+class Fetched(NamedTuple):
+    name: str
+    # kept | adopted | downloaded | failed
+    status: str
+    entry: dict | None
+    detail: str = ""
+
+
+def describe(path: str, sha256: str | None = None) -> dict:
+    """Manifest entry for an MP3 on disk; ValueError when it is not clean."""
+    with open(path, "rb") as f:
+        data = f.read()
+    frames, seconds = audio_info(data)
+    if sha256 is None:
+        sha256 = sha256_file(path)
+    return {"sha256": sha256, "size": len(data), "frames": frames, "seconds": round(seconds, 3)}
+
+
+def _check(path: str, entry: Mapping | None) -> dict | None:
+    """The file's entry when it is present and intact, else None."""
+    if not os.path.isfile(path):
+        return None
+    if entry is not None:
+        if os.path.getsize(path) != entry.get("size") or sha256_file(path) != entry.get("sha256"):
+            return None
+        return dict(entry)
+    try:
+        return describe(path)
+    except ValueError:
+        return None
+
+
+def fetch(base_url: str, folder: str, name: str, entry: Mapping | None, attempts: int) -> Fetched:
+    path = os.path.join(folder, name)
+    kept = _check(path, entry)
+    if kept is not None:
+        return Fetched(name, "kept" if entry is not None else "adopted", kept)
+    if os.path.exists(path):
+        os.remove(path)
+    try:
+        digest = download(f"{base_url}/{name}", path, attempts=attempts, quiet=True)
+        return Fetched(name, "downloaded", describe(path, digest))
+    except ValueError as err:
+        os.remove(path)
+        return Fetched(name, "failed", None, f"not a clean MP3: {err}")
+    except (DownloadError, OSError) as err:
+        return Fetched(name, "failed", None, str(err))
+
+
+def load_manifest(folder: str) -> dict:
+    path = os.path.join(folder, MANIFEST)
+    if not os.path.isfile(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def write_manifest(folder: str, manifest: dict) -> None:
+    path = os.path.join(folder, MANIFEST)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+        f.write("\n")
+    os.replace(path + ".tmp", path)
+
+
+def build_pack(
+    reciter: str,
+    base_url: str,
+    out_dir: str,
+    names: Sequence[str],
+    jobs: int = DEFAULT_JOBS,
+    attempts: int = 4,
+    progress: bool = False,
+) -> list[Fetched]:
+    folder = os.path.join(out_dir, reciter)
+    os.makedirs(folder, exist_ok=True)
+    previous = load_manifest(folder).get("files", {})
+    results: dict[str, Fetched] = {}
+    pool = ThreadPoolExecutor(max_workers=jobs)
+    futures = [
+        pool.submit(fetch, base_url, folder, name, previous.get(name), attempts)
+        for name in names
+    ]
+    try:
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            results[result.name] = result
+            if progress and (done % 500 == 0 or done == len(names)):
+                print(f"  {reciter}: {done}/{len(names)}", file=sys.stderr)
+    except BaseException:
+        # Ctrl-C or an error: drop the queued downloads rather than letting
+        # shutdown fetch them all, and keep what the running ones finish.
+        pool.shutdown(wait=True, cancel_futures=True)
+        for future in futures:
+            if future.done() and not future.cancelled() and future.exception() is None:
+                result = future.result()
+                results[result.name] = result
+        raise
+    finally:
+        pool.shutdown()
+        # Written even when interrupted, so the next run keeps what finished.
+        files = {n: results[n].entry for n in names if n in results and results[n].entry}
+        files.update({n: e for n, e in previous.items() if n not in results and n in names})
+        write_manifest(
+            folder,
+            {
+                "reciter": reciter,
+                "baseUrl": base_url,
+                "complete": len(files) == len(names),
+                "totalBytes": sum(e["size"] for e in files.values()),
+                "totalSeconds": round(sum(e["seconds"] for e in files.values()), 3),
+                "files": {n: files[n] for n in names if n in files},
+            },
+        )
+    return [results[n] for n in names]
+
+
+def summarize(reciter: str, results: Sequence[Fetched], seconds: float) -> list[str]:
+    counts: dict[str, int] = {}
+    for result in results:
+        counts[result.status] = counts.get(result.status, 0) + 1
+    parts = ", ".join(f"{counts[s]} {s}" for s in ("kept", "adopted", "downloaded", "failed") if s in counts)
+    lines = [f"{reciter}: {len(results)} files ({parts}) in {seconds:.1f}s"]
+    lines.extend(f"  failed {r.name}: {r.detail}" for r in results if r.status == "failed")
+    return lines
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("reciters", nargs="*", help="reciter ids from ReciterCatalog")
+    parser.add_argument("--all", action="store_true", help="every reciter in the catalog")
+    parser.add_argument("--out-dir", default=DEFAULT_OUT)
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="parallel downloads")
+    parser.add_argument("--surahs", help="comma-separated surah numbers (default: all)")
+    parser.add_argument("--base-url", help="override the reciter's base URL (mirrors, tests)")
+    args = parser.parse_args()
+
+    reciters = list(RECITERS) if args.all else args.reciters
+    if not reciters:
+        parser.error("name at least one reciter or pass --all")
+    unknown = [r for r in reciters if r not in RECITERS and not args.base_url]
+    if unknown:
+        parser.error(f"unknown reciter(s) {', '.join(unknown)}; known: {', '.join(RECITERS)}")
+    surahs = [int(s) for s in args.surahs.split(",")] if args.surahs else None
+    if surahs and not all(1 <= s <= SURAH_COUNT for s in surahs):
+        parser.error(f"surahs must be 1..{SURAH_COUNT}")
+    names = pack_files(surahs)
+
+    failed = 0
+    for reciter in reciters:
+        t0 = time.perf_counter()
+        base_url = (args.base_url or RECITERS[reciter]).rstrip("/")
+        results = build_pack(reciter, base_url, args.out_dir, names, args.jobs, progress=True)
+        print("\n".join(summarize(reciter, results, time.perf_counter() - t0)))
+        failed += sum(r.status == "failed" for r in results)
+    if failed:
+        print(f"{failed} files failed; rerun to fetch them again", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
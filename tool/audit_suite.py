@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Run every corpus audit over assets/quran in a single pass.
+
+Shards are loaded and decoded once (quran_corpus.Corpus); each analyzer
+prints its own section. The Tanzil diff runs only when the local Tanzil
+file exists (see verify_ar_vs_tanzil.py), so the suite stays offline.
+
+Usage:
+  python tool/audit_suite.py
+  python tool/audit_suite.py --tanzil data/tanzil/quran-uthmani.txt
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import sys
+
+from audit_tj_ar import TajweedAudit
+from codepoint_stats import CodepointHistogram
+from corpus_rules import RuleCheck
+from quran_corpus import DEFAULT_DIR, Analyzer, Corpus, scan
+from verify_ar_vs_tanzil import DEFAULT_TANZIL_PATH, TanzilDiff, load_tanzil
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", default=DEFAULT_DIR)
+    parser.add_argument("--tanzil", default=DEFAULT_TANZIL_PATH)
+    args = parser.parse_args()
+    sys.stdout.reconfigure(encoding="utf-8")
+
+    analyzers: list[Analyzer] = [RuleCheck(), TajweedAudit(), CodepointHistogram()]
+    if os.path.isfile(args.tanzil):
+        analyzers.append(TanzilDiff(load_tanzil(args.tanzil), args.tanzil))
+    else:
+        print(f"(skip Tanzil diff: {args.tanzil} not found)")
+
+    corpus = Corpus(args.dir)
+    print(f"corpus: {len(corpus.paths)} files, {corpus.verse_count()} verses, one pass")
+    scan(corpus, analyzers)
+    for analyzer in analyzers:
+        print(f"\n== {analyzer.title} ==")
+        print("\n".join(analyzer.report()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -2,30 +2,138 @@
 
 Each sNNN.json is a JSON array of verse objects (not {"verses": [...]}).
 This script reports mismatches only; it does not rewrite data.
+
+Tags and tatweel are stripped in one tokenizer pass (TajweedText), which
+keeps a map from plain-text positions back to raw `tj` so a mismatch can
+name the tag element it sits in.
+
+--trace PATH (or QURAN_TRACE=PATH) writes a Chrome trace-event file of the
+load, diff and report stages (see trace_spans.py).
+
+Usage:
+  python tool/audit_tj_ar.py
+  python tool/audit_tj_ar.py --bench --scale 10
+  python tool/audit_tj_ar.py --trace build/trace.json
 """
 
 from __future__ import annotations
 
-import glob
-import json
+import argparse
+import bisect
+import random
 import re
 import sys
+import time
 import unicodedata
 from collections import Counter
 
+import trace_spans
+from quran_corpus import Analyzer, Corpus, scan
+from trace_spans import span
+from verse_store import VerseStore
+
 TAGS = re.compile(r"<[^>]+>")
+# One scan for both tags and tatweel; split() keeps tags, tatweel yields None.
+TOKENS = re.compile(r"(<[^>]+>)|\u0640")
+VERSE_DIGITS = "\u0660\u0661\u0662\u0663\u0664\u0665\u0666\u0667\u0668\u0669"
+
+
+class TajweedText:
+    """`tj` with tags and tatweel stripped, mappable back to raw positions."""
+
+    __slots__ = ("raw", "plain", "_parts", "_map")
+
+    def __init__(self, raw: str) -> None:
+        self.raw = raw
+        self._parts = TOKENS.split(raw)
+        self.plain = "".join(self._parts[::2])
+        self._map: tuple[list[int], list[int], list[tuple[int, int] | None]] | None = None
+
+    @property
+    def body(self) -> str:
+        """plain minus the trailing Arabic-Indic verse number, rstripped."""
+        plain = self.plain
+        end = len(plain.rstrip())
+        k = end
+        while k and plain[k - 1] in VERSE_DIGITS:
+            k -= 1
+        return plain[:k].rstrip() if k < end else plain[:end]
+
+    def _build_map(self) -> tuple[list[int], list[int], list[tuple[int, int] | None]]:
+        # Piecewise map: run i covers plain[starts[i]:] at raw[raws[i]:],
+        # inside the element spans[i] (raw start/end of open..close tag).
+        starts: list[int] = []
+        raws: list[int] = []
+        spans: list[tuple[int, int] | None] = []
+        open_tags: list[list[int]] = []
+        elements: list[list[int]] = []
+        run_element: list[int] = []
+        plain_pos = 0
+        raw_pos = 0
+        parts = self._parts
+        for i in range(0, len(parts), 2):
+            text = parts[i]
+            if text:
+                starts.append(plain_pos)
+                raws.append(raw_pos)
+                run_element.append(open_tags[-1][2] if open_tags else -1)
+                plain_pos += len(text)
+                raw_pos += len(text)
+            if i + 1 == len(parts):
+                break
+            tag = parts[i + 1]
+            if tag is None:
+                raw_pos += 1
+                continue
+            if tag.startswith("</"):
+                if open_tags:
+                    open_tags.pop()[1] = raw_pos + len(tag)
+            elif not tag.endswith("/>"):
+                element = [raw_pos, -1, len(elements)]
+                elements.append(element)
+                open_tags.append(element)
+            raw_pos += len(tag)
+        for e in run_element:
+            if e < 0:
+                spans.append(None)
+            else:
+                start, end, _ = elements[e]
+                spans.append((start, end if end >= 0 else len(self.raw)))
+        self._map = (starts, raws, spans)
+        return self._map
+
+    def _run(self, index: int) -> int:
+        starts = (self._map or self._build_map())[0]
+        return max(bisect.bisect_right(starts, index) - 1, 0)
+
+    def raw_index(self, index: int) -> int:
+        """Position in raw `tj` of plain[index]."""
+        starts, raws, _ = self._map or self._build_map()
+        if not starts:
+            return 0
+        run = self._run(index)
+        return raws[run] + index - starts[run]
 
+    def tag_span(self, index: int) -> tuple[int, int] | None:
+        """Raw span of the innermost tag element around plain[index], if any."""
+        spans = (self._map or self._build_map())[2]
+        if not spans:
+            return None
+        return spans[self._run(index)]
 
-def load_verses(path: str) -> list:
-    with open(path, encoding="utf-8") as f:
-        data = json.load(f)
-    if isinstance(data, list):
-        return data
-    if isinstance(data, dict):
-        verses = data.get("verses")
-        if isinstance(verses, list):
-            return verses
-    raise SystemExit(f"unexpected JSON shape in {path}: {type(data).__name__}")
+
+def common_prefix_len(a: str, b: str) -> int:
+    lo, hi = 0, min(len(a), len(b))
+    if a[:hi] == b[:hi]:
+        return hi
+    # Invariant: a[:lo] == b[:lo] and a[:hi] != b[:hi]; slices compare in C.
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if a[lo:mid] == b[lo:mid]:
+            lo = mid
+        else:
+            hi = mid
+    return lo
 
 
 def snippet_around(text: str, index: int, radius: int = 6) -> str:
@@ -33,14 +141,14 @@ def snippet_around(text: str, index: int, radius: int = 6) -> str:
     return text[start : index + radius + 1]
 
 
-def first_mismatch_snippet(plain: str, ar: str) -> tuple[str, str]:
-    body_plain = re.sub(r"[\u0660-\u0669]+\s*$", "", plain).rstrip()
-    n = min(len(body_plain), len(ar))
-    i = 0
-    while i < n and body_plain[i] == ar[i]:
-        i += 1
-    return snippet_around(body_plain, min(i, len(body_plain) - 1)), snippet_around(
-        ar, min(i, len(ar) - 1)
+def first_mismatch(text: TajweedText, ar: str) -> tuple[int, str, str]:
+    """Index in body of the first mismatch, plus tj/ar snippets around it."""
+    body = text.body
+    i = common_prefix_len(body, ar)
+    return (
+        i,
+        snippet_around(body, min(i, len(body) - 1)),
+        snippet_around(ar, min(i, len(ar) - 1)),
     )
 
 
@@ -52,91 +160,194 @@ def wavy_vs_ar_snippet(plain: str, ar: str) -> tuple[str, str]:
     )
 
 
-def main() -> None:
-    sys.stdout.reconfigure(encoding="utf-8")
+class TajweedAudit(Analyzer):
+    title = "tajweed audit (tj vs ar)"
 
-    files = sorted(glob.glob("assets/quran/s[0-9][0-9][0-9].json"))
-    if not files:
-        raise SystemExit("no assets/quran/s*.json files found")
-
-    sample = load_verses(files[0])
-    print(f"shape: {files[0]} is a JSON array of {len(sample)} verse objects")
-    print(f"files: {len(files)}")
-
-    total = 0
-    with_tj = 0
-    bad: list[tuple[object, object]] = []
-    extra: Counter[str] = Counter()
-    missing: Counter[str] = Counter()
-    per_surah: Counter[int] = Counter()
-    per_surah_body: Counter[int] = Counter()
-    examples: dict[int, tuple[object, object, str, str]] = {}
-    wavy_example: tuple[object, object, str, str] | None = None
-    body_bad = 0
-
-    for path in files:
-        verses = load_verses(path)
-        for v in verses:
-            total += 1
-            tj = v.get("tj")
-            ar = v.get("ar", "")
-            if not tj:
-                continue
-            with_tj += 1
-            plain = TAGS.sub("", tj).replace("\u0640", "")
-            if plain != ar:
-                s = v.get("s")
-                a = v.get("a")
-                bad.append((s, a))
-                body_plain = re.sub(r"[\u0660-\u0669]+\s*$", "", plain).rstrip()
-                body_differs = body_plain != ar
-                if body_differs:
-                    body_bad += 1
-                if isinstance(s, int):
-                    per_surah[s] += 1
-                    if body_differs:
-                        per_surah_body[s] += 1
-                    if s not in examples and body_differs:
-                        examples[s] = (s, a, *first_mismatch_snippet(plain, ar))
-                    if wavy_example is None and "\u0672" in plain:
-                        wavy_example = (s, a, *wavy_vs_ar_snippet(plain, ar))
-                for c in set(plain) - set(ar):
-                    extra[c] += 1
-                for c in set(ar) - set(plain):
-                    missing[c] += 1
-
-    print(f"total {total} | ada tj {with_tj} | melanggar {len(bad)}")
+    def begin(self, corpus: Corpus) -> None:
+        self.total = 0
+        self.with_tj = 0
+        self.bad: list[tuple[object, object]] = []
+        self.extra: Counter[str] = Counter()
+        self.missing: Counter[str] = Counter()
+        self.per_surah: Counter[int] = Counter()
+        self.per_surah_body: Counter[int] = Counter()
+        self.examples: dict[int, tuple[object, object, str, str, str]] = {}
+        self.wavy_example: tuple[object, object, str, str] | None = None
+        self.body_bad = 0
+
+    def visit(self, path: str, v: dict) -> None:
+        self.total += 1
+        tj = v.get("tj")
+        ar = v.get("ar", "")
+        if not tj:
+            return
+        self.with_tj += 1
+        text = TajweedText(tj)
+        plain = text.plain
+        if plain == ar:
+            return
+        s = v.get("s")
+        a = v.get("a")
+        self.bad.append((s, a))
+        body_differs = text.body != ar
+        if body_differs:
+            self.body_bad += 1
+        if isinstance(s, int):
+            self.per_surah[s] += 1
+            if body_differs:
+                self.per_surah_body[s] += 1
+            if s not in self.examples and body_differs:
+                i, tj_snip, ar_snip = first_mismatch(text, ar)
+                tag_range = text.tag_span(min(i, max(len(plain) - 1, 0)))
+                tag = tj[tag_range[0] : tag_range[1]] if tag_range else ""
+                self.examples[s] = (s, a, tj_snip, ar_snip, tag)
+            if self.wavy_example is None and "\u0672" in plain:
+                self.wavy_example = (s, a, *wavy_vs_ar_snippet(plain, ar))
+        for c in set(plain) - set(ar):
+            self.extra[c] += 1
+        for c in set(ar) - set(plain):
+            self.missing[c] += 1
+
+    def report(self) -> list[str]:
+        out = [
+            f"total {self.total} | ada tj {self.with_tj} | melanggar {len(self.bad)}",
+            f"(info) masih beda setelah buang nomor ayat di ujung tj: {self.body_bad}",
+            f"contoh: {self.bad[:20]}",
+        ]
+
+        out.append("\n-- ada di tj, tidak ada di ar --")
+        for c, n in self.extra.most_common(15):
+            out.append(f"  U+{ord(c):04X} {unicodedata.name(c, '?')} x{n}")
+
+        out.append("\n-- ada di ar, tidak ada di tj --")
+        for c, n in self.missing.most_common(15):
+            out.append(f"  U+{ord(c):04X} {unicodedata.name(c, '?')} x{n}")
+
+        out.append("\n-- 3 surah terburuk (jumlah ayat yang masih beda di tubuh teks) --")
+        for sid, count in self.per_surah_body.most_common(3):
+            s, a, tj_word, ar_word, tag = self.examples[sid]
+            out.append(
+                f"  surah {sid}: {count} ayat (semua {self.per_surah[sid]} ayat beda "
+                "jika termasuk nomor ayat tj)"
+            )
+            out.append(f"    contoh {s}:{a}")
+            out.append(f"    tj snippet: {tj_word}")
+            out.append(f"    ar snippet: {ar_word}")
+            out.append(f"    tj cps: {[hex(ord(c)) for c in tj_word]}")
+            out.append(f"    ar cps: {[hex(ord(c)) for c in ar_word]}")
+            if tag:
+                out.append(f"    tj tag span: {tag}")
+
+        if self.wavy_example is not None:
+            s, a, tj_word, ar_word = self.wavy_example
+            out.append("\n-- contoh pertama yang memuat U+0672 di tj --")
+            out.append(f"  {s}:{a}")
+            out.append(f"    tj snippet: {tj_word}")
+            out.append(f"    ar snippet: {ar_word}")
+            out.append(f"    tj cps: {[hex(ord(c)) for c in tj_word]}")
+            out.append(f"    ar cps: {[hex(ord(c)) for c in ar_word]}")
+        return out
+
+
+def synthetic_tajweed(verses: int, seed: int = 11) -> list[dict]:
+    """Verses with tajweed-style tags, tatweel and end-of-ayah numbers."""
+    from codepoint_stats import synthetic_pair
+
+    rng = random.Random(seed)
+    ours, _ = synthetic_pair(verses, seed)
+    classes = ("ham_wasl", "laam_shamsiyah", "madda_normal", "ghunnah", "idgham_ghunnah")
+    out: list[dict] = []
+    for k, ar in enumerate(ours):
+        words = []
+        for w in ar.split(" "):
+            if rng.random() < 0.35:
+                cls = rng.choice(classes)
+                w = f"<tajweed class={cls}>{w[:2]}</tajweed>{w[2:]}"
+            if rng.random() < 0.05:
+                w = w.replace("\u064e", "\u0640\u064e", 1)
+            words.append(w)
+        tj = " ".join(words) + f' <span class=end>{k % 286 + 1}</span>'.translate(
+            str.maketrans("0123456789", VERSE_DIGITS)
+        )
+        if rng.random() < 0.02:
+            tj = tj.replace("\u0670", "\u0672", 1)
+        out.append({"s": k // 60 + 1, "a": k % 60 + 1, "ar": ar, "tj": tj})
+    return out
+
+
+def _legacy_visit(v: dict) -> tuple[bool, bool, tuple[str, str] | None]:
+    tj, ar = v["tj"], v["ar"]
+    plain = TAGS.sub("", tj).replace("\u0640", "")
+    if plain == ar:
+        return False, False, None
+    body_plain = re.sub(r"[\u0660-\u0669]+\s*$", "", plain).rstrip()
+    if body_plain == ar:
+        return True, False, None
+    n = min(len(body_plain), len(ar))
+    i = 0
+    while i < n and body_plain[i] == ar[i]:
+        i += 1
+    return True, True, (
+        snippet_around(body_plain, min(i, len(body_plain) - 1)),
+        snippet_around(ar, min(i, len(ar) - 1)),
+    )
+
+
+def _tokenized_visit(v: dict) -> tuple[bool, bool, tuple[str, str] | None]:
+    text = TajweedText(v["tj"])
+    ar = v["ar"]
+    if text.plain == ar:
+        return False, False, None
+    if text.body == ar:
+        return True, False, None
+    _, tj_snip, ar_snip = first_mismatch(text, ar)
+    return True, True, (tj_snip, ar_snip)
+
+
+def bench(scale: int) -> None:
+    verses = synthetic_tajweed(6236 * scale)
+    size = sum(len(v["tj"]) for v in verses)
+    print(f"synthetic tajweed corpus: {len(verses)} verses, {size} tj chars (x{scale})")
+    t0 = time.perf_counter()
+    with span("diff", how="legacy"):
+        legacy = [_legacy_visit(v) for v in verses]
+    t1 = time.perf_counter()
+    with span("diff", how="tokenized"):
+        tokenized = [_tokenized_visit(v) for v in verses]
+    t2 = time.perf_counter()
+    if legacy != tokenized:
+        raise SystemExit("tokenizer results differ from TAGS.sub + regex + char scan")
+    mismatches = sum(1 for r in legacy if r[1])
+    print(f"  sub + replace + regex + char scan: {t1 - t0:8.3f}s")
+    print(f"  single-pass tokenizer:             {t2 - t1:8.3f}s")
     print(
-        f"(info) masih beda setelah buang nomor ayat di ujung tj: {body_bad}"
+        f"  speedup {(t1 - t0) / (t2 - t1):.2f}x, {mismatches} body mismatches, "
+        "results identical"
     )
-    print("contoh:", bad[:20])
-
-    print("\n-- ada di tj, tidak ada di ar --")
-    for c, n in extra.most_common(15):
-        print(f"  U+{ord(c):04X} {unicodedata.name(c, '?')} x{n}")
-
-    print("\n-- ada di ar, tidak ada di tj --")
-    for c, n in missing.most_common(15):
-        print(f"  U+{ord(c):04X} {unicodedata.name(c, '?')} x{n}")
-
-    print("\n-- 3 surah terburuk (jumlah ayat yang masih beda di tubuh teks) --")
-    for sid, count in per_surah_body.most_common(3):
-        s, a, tj_word, ar_word = examples[sid]
-        print(f"  surah {sid}: {count} ayat (semua {per_surah[sid]} ayat beda jika termasuk nomor ayat tj)")
-        print(f"    contoh {s}:{a}")
-        print(f"    tj snippet: {tj_word}")
-        print(f"    ar snippet: {ar_word}")
-        print(f"    tj cps: {[hex(ord(c)) for c in tj_word]}")
-        print(f"    ar cps: {[hex(ord(c)) for c in ar_word]}")
-
-    if wavy_example is not None:
-        s, a, tj_word, ar_word = wavy_example
-        print("\n-- contoh pertama yang memuat U+0672 di tj --")
-        print(f"  {s}:{a}")
-        print(f"    tj snippet: {tj_word}")
-        print(f"    ar snippet: {ar_word}")
-        print(f"    tj cps: {[hex(ord(c)) for c in tj_word]}")
-        print(f"    ar cps: {[hex(ord(c)) for c in ar_word]}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--scale", type=int, default=10)
+    trace_spans.add_argument(parser)
+    args = parser.parse_args()
+    trace_spans.start(args.trace)
+    sys.stdout.reconfigure(encoding="utf-8")
+    if args.bench:
+        bench(args.scale)
+        return
+
+    with span("load"):
+        store = VerseStore.from_shards()
+    print(f"shape: {store.paths[0]} is a JSON array of {store.shard_length(0)} verse objects")
+    print(f"files: {len(store.paths)}")
+
+    audit = TajweedAudit()
+    with span("diff"):
+        scan(store, [audit])
+    with span("report"):
+        print("\n".join(audit.report()))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,491 @@
+#!/usr/bin/env python3
+"""Make-like incremental build of the bundled datasets.
+
+Every artifact is a Step with declared inputs and outputs (paths or glob
+patterns relative to the repository root). A step that reads another
+step's output depends on it; independent steps run in parallel. Steps
+without a command are hand-provided sources (QUL SQLite, fonts, curated
+catalogs): they are only checked for presence and hashed, so whatever
+reads them reruns when they change. When a source is missing, the steps
+that need it are skipped ("source missing") and the build still succeeds,
+unless one of them was named as a target.
+
+The verse shards are a source too unless --fetch is given; then the
+verses step runs generate_quran_json.py, which downloads from the
+Quran.com API. Nothing else touches the network.
+
+A step is skipped when the SHA-256 of its command and every input matches
+the last successful run and its outputs are still the files it produced.
+File hashes are cached by (size, mtime), so a rebuild with no changes only
+stats files. State, logs and the timing summary live in .dataset_build/.
+
+Usage:
+  python tool/build_datasets.py
+  python tool/build_datasets.py --list
+  python tool/build_datasets.py verse-rules --jobs 4
+  python tool/build_datasets.py --fetch
+  python tool/build_datasets.py --fetch --force verses
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from collections.abc import Iterable, Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from fnmatch import fnmatchcase
+from typing import NamedTuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE_DIR = ".dataset_build"
+PYTHON = "{python}"
+
+
+class Step(NamedTuple):
+    name: str
+    outputs: tuple[str, ...] = ()
+    inputs: tuple[str, ...] = ()
+    # argv run from the repository root; None for hand-provided sources.
+    command: tuple[str, ...] | None = None
+
+
+def _tool(script: str, *args: str) -> tuple[str, ...]:
+    return (PYTHON, f"tool/{script}", *args)
+
+
+VERSE_SHARDS = "assets/quran/s[0-9][0-9][0-9].json"
+VERSE_INDEXES = (
+    "assets/quran/index_juz.json",
+    "assets/quran/index_pages.json",
+    "assets/quran/manifest_multi.json",
+)
+CORPUS_TOOLS = ("tool/quran_corpus.py", "tool/corpus_rules.py")
+
+# The verse shards come from the Quran.com API. The default build treats
+# them as a hand-provided source; --fetch swaps in this step instead.
+FETCH_VERSES = Step(
+    "verses",
+    outputs=(VERSE_SHARDS, *VERSE_INDEXES),
+    inputs=(
+        "tool/dart_regex.py",
+        "tool/generate_quran_json.py",
+        "tool/translation_clean.py",
+        "tool/page_shards.py",
+        "tool/reading_tables.py",
+        "tool/trace_spans.py",
+        "tool/verse_shards.py",
+        "tool/verify_dataset.py",
+        "tool/word_index.py",
+        *CORPUS_TOOLS,
+    ),
+    command=_tool("generate_quran_json.py"),
+)
+
+STEPS: tuple[Step, ...] = (
+    Step("verses", outputs=FETCH_VERSES.outputs),
+    Step(
+        "verse-rules",
+        inputs=(VERSE_SHARDS, *CORPUS_TOOLS),
+        command=_tool("corpus_rules.py", "--dir", "assets/quran"),
+    ),
+    Step(
+        "verse-fingerprint",
+        inputs=(VERSE_SHARDS, *VERSE_INDEXES, "tool/verify_dataset.py", "tool/quran_corpus.py"),
+        command=_tool("verify_dataset.py", "--dir", "assets/quran"),
+    ),
+    Step(
+        "word-index",
+        outputs=("build/word_index.bin",),
+        inputs=(
+            VERSE_SHARDS,
+            "tool/dart_regex.py",
+            "tool/word_index.py",
+            "tool/quran_corpus.py",
+        ),
+        command=_tool("word_index.py", "--dir", "assets/quran"),
+    ),
+    Step("surah-meanings", outputs=("assets/quran/surah_meanings.json",)),
+    Step("surah-names", outputs=("assets/quran/surah_names/manifest.json",)),
+    Step(
+        "surah-info",
+        outputs=(
+            "assets/quran/surah_info/en_surah_info.sqlite",
+            "assets/quran/surah_info/id_surah_info.sqlite",
+        ),
+    ),
+    Step(
+        "transliteration",
+        outputs=("assets/quran/transliteration/transliteration-tajweed.db",),
+    ),
+    Step(
+        "tafsir",
+        outputs=(
+            "assets/tafsir/en_ibn_kathir.sqlite",
+            "assets/tafsir/id_as_saadi.sqlite",
+            "assets/tafsir/zh_mokhtasar.sqlite",
+            "assets/tafsir/ja_mokhtasar.sqlite",
+        ),
+    ),
+    Step(
+        "mushaf-layout",
+        outputs=(
+            "assets/mushaf/layout/qpc_v2_15_lines.sqlite",
+            "assets/mushaf/script/qpc_v2_words.sqlite",
+        ),
+    ),
+    Step(
+        "mushaf-pages",
+        outputs=("assets/mushaf/layout/qpc_v2_pages.bin",),
+        inputs=(
+            "assets/mushaf/layout/qpc_v2_15_lines.sqlite",
+            "assets/mushaf/script/qpc_v2_words.sqlite",
+            "tool/mushaf_pages.py",
+            "tool/quran_corpus.py",
+        ),
+        command=_tool("mushaf_pages.py"),
+    ),
+    Step("qpc-fonts", outputs=("assets/fonts/qpc_v2/p*.ttf",)),
+    Step(
+        "sqlite-plans",
+        inputs=(
+            "assets/quran/surah_info/*.sqlite",
+            "assets/quran/transliteration/*.db",
+            "assets/tafsir/*.sqlite",
+            "assets/mushaf/layout/qpc_v2_15_lines.sqlite",
+            "assets/mushaf/script/qpc_v2_words.sqlite",
+            "tool/sqlite_query_audit.py",
+            "tool/optimize_tafsir.py",
+            "tool/quran_corpus.py",
+        ),
+        command=_tool("sqlite_query_audit.py"),
+    ),
+    Step(
+        "bundle-join",
+        inputs=(
+            VERSE_SHARDS,
+            "assets/quran/ar/s[0-9][0-9][0-9].json",
+            "assets/quran/index_pages.json",
+            "assets/quran/transliteration/*.db",
+            "assets/tafsir/*.sqlite",
+            "assets/mushaf/layout/qpc_v2_15_lines.sqlite",
+            "assets/mushaf/script/qpc_v2_words.sqlite",
+            "tool/bundle_join.py",
+            "tool/quran_corpus.py",
+            "tool/verse_shards.py",
+        ),
+        command=_tool("bundle_join.py"),
+    ),
+    Step(
+        "html-segments",
+        outputs=("build/html_segments/*.segments.sqlite",),
+        inputs=(
+            "assets/quran/surah_info/*.sqlite",
+            "assets/tafsir/*.sqlite",
+            "tool/dart_regex.py",
+            "tool/html_segments.py",
+            "tool/optimize_tafsir.py",
+        ),
+        command=_tool("html_segments.py"),
+    ),
+    Step(
+        "explore-catalogs",
+        outputs=(
+            "assets/duas/duas_catalog.json",
+            "assets/science/science_catalog.json",
+            "assets/themes/life_themes_catalog.json",
+            "assets/reflection/calendar_lenses_catalog.json",
+            "assets/reflection/weekly_rotation_catalog.json",
+            "assets/asma/asmaul_husna_catalog.json",
+        ),
+    ),
+    Step(
+        "explore-bundle",
+        outputs=("build/explore_bundle.bin",),
+        inputs=(
+            "assets/duas/duas_catalog.json",
+            "assets/science/science_catalog.json",
+            "assets/themes/life_themes_catalog.json",
+            "assets/reflection/calendar_lenses_catalog.json",
+            "assets/reflection/weekly_rotation_catalog.json",
+            "assets/asma/asmaul_husna_catalog.json",
+            VERSE_SHARDS,
+            "tool/explore_catalogs.py",
+            "tool/quran_corpus.py",
+        ),
+        command=_tool("explore_catalogs.py"),
+    ),
+)
+
+
+def steps_for(fetch: bool = False) -> tuple[Step, ...]:
+    """STEPS, with the verses fetched from the API when `fetch` is set."""
+    if not fetch:
+        return STEPS
+    return tuple(FETCH_VERSES if s.name == FETCH_VERSES.name else s for s in STEPS)
+
+
+class Result(NamedTuple):
+    name: str
+    # ran | skipped | source | missing | failed | blocked; a step skipped
+    # because a source it needs is missing has detail "source missing: ...".
+    status: str
+    seconds: float
+    detail: str = ""
+
+
+def _overlaps(a: str, b: str) -> bool:
+    return a == b or fnmatchcase(a, b) or fnmatchcase(b, a)
+
+
+def dependencies(steps: Sequence[Step]) -> dict[str, list[str]]:
+    """Step name -> names of the steps whose outputs it reads."""
+    deps: dict[str, list[str]] = {}
+    for step in steps:
+        deps[step.name] = [
+            other.name
+            for other in steps
+            if other is not step
+            and any(_overlaps(i, o) for i in step.inputs for o in other.outputs)
+        ]
+    return deps
+
+
+def _closure(targets: Iterable[str], deps: dict[str, list[str]]) -> set[str]:
+    wanted: set[str] = set()
+    stack = list(targets)
+    while stack:
+        name = stack.pop()
+        if name not in deps:
+            raise SystemExit(f"unknown step {name!r}; see --list")
+        if name not in wanted:
+            wanted.add(name)
+            stack.extend(deps[name])
+    return wanted
+
+
+class FileHashes:
+    """SHA-256 of files, cached by (size, mtime_ns) across runs."""
+
+    def __init__(self, root: str, cache: dict[str, list]) -> None:
+        self.root = root
+        self.cache = cache
+        self.lock = threading.Lock()
+
+    def expand(self, patterns: Iterable[str]) -> list[str]:
+        paths: set[str] = set()
+        for pattern in patterns:
+            if glob.has_magic(pattern):
+                paths.update(glob.glob(pattern, root_dir=self.root))
+            elif os.path.isfile(os.path.join(self.root, pattern)):
+                paths.add(pattern)
+        return sorted(p.replace(os.sep, "/") for p in paths)
+
+    def digest(self, relpath: str) -> str:
+        st = os.stat(os.path.join(self.root, relpath))
+        with self.lock:
+            hit = self.cache.get(relpath)
+        if hit and hit[0] == st.st_size and hit[1] == st.st_mtime_ns:
+            return hit[2]
+        h = hashlib.sha256()
+        with open(os.path.join(self.root, relpath), "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                h.update(block)
+        value = h.hexdigest()
+        with self.lock:
+            self.cache[relpath] = [st.st_size, st.st_mtime_ns, value]
+        return value
+
+    def snapshot(self, patterns: Iterable[str]) -> dict[str, str]:
+        return {p: self.digest(p) for p in self.expand(patterns)}
+
+
+def _step_key(step: Step, inputs: dict[str, str]) -> str:
+    h = hashlib.sha256(json.dumps(step.command).encode("utf-8"))
+    for path, digest in inputs.items():
+        h.update(f"\0{path}\0{digest}".encode("utf-8"))
+    return h.hexdigest()
+
+
+class Builder:
+    def __init__(
+        self,
+        steps: Sequence[Step] = STEPS,
+        root: str = ROOT,
+        state_dir: str | None = None,
+        jobs: int | None = None,
+        quiet: bool = False,
+    ) -> None:
+        self.steps = {s.name: s for s in steps}
+        self.deps = dependencies(steps)
+        self.root = root
+        self.state_dir = state_dir or os.path.join(root, STATE_DIR)
+        self.jobs = jobs or os.cpu_count() or 1
+        self.quiet = quiet
+        self.state_path = os.path.join(self.state_dir, "state.json")
+        state: dict = {}
+        if os.path.isfile(self.state_path):
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+        self.done: dict[str, dict] = state.get("steps", {})
+        self.files = FileHashes(root, state.get("files", {}))
+
+    def _log(self, message: str) -> None:
+        if not self.quiet:
+            print(message, flush=True)
+
+    def _up_to_date(self, step: Step, key: str) -> bool:
+        record = self.done.get(step.name)
+        if not record or record.get("key") != key:
+            return False
+        try:
+            return self.files.snapshot(step.outputs) == record.get("outputs", {})
+        except OSError:
+            return False
+
+    def _run(self, step: Step, force: bool) -> Result:
+        t0 = time.perf_counter()
+        if step.command is None:
+            outputs = self.files.snapshot(step.outputs)
+            missing = [p for p in step.outputs if not any(fnmatchcase(f, p) for f in outputs)]
+            if missing:
+                return Result(step.name, "missing", time.perf_counter() - t0, ", ".join(missing))
+            return Result(step.name, "source", time.perf_counter() - t0)
+
+        key = _step_key(step, self.files.snapshot(step.inputs))
+        if not force and self._up_to_date(step, key):
+            return Result(step.name, "skipped", time.perf_counter() - t0)
+
+        argv = [sys.executable if arg == PYTHON else arg for arg in step.command]
+        log_path = os.path.join(self.state_dir, "logs", f"{step.name}.log")
+        os.makedirs(os.path.dirname(log_path), exist_ok=True)
+        self._log(f"run  {step.name}: {' '.join(step.command)}")
+        with open(log_path, "wb") as log:
+            code = subprocess.call(argv, cwd=self.root, stdout=log, stderr=subprocess.STDOUT)
+        seconds = time.perf_counter() - t0
+        self.done.pop(step.name, None)
+        if code != 0:
+            return Result(step.name, "failed", seconds, f"exit {code}, log {log_path}")
+        outputs = self.files.snapshot(step.outputs)
+        if step.outputs and not outputs:
+            return Result(step.name, "failed", seconds, "produced none of its outputs")
+        self.done[step.name] = {"key": key, "outputs": outputs}
+        return Result(step.name, "ran", seconds)
+
+    def build(self, targets: Sequence[str] = (), force: Iterable[str] = ()) -> list[Result]:
+        wanted = _closure(targets or self.steps, self.deps)
+        force = set(force)
+        order = [name for name in self.steps if name in wanted]
+        results: dict[str, Result] = {}
+        running: dict[Future, str] = {}
+        # Missing sources and every step downstream of one.
+        unavailable: set[str] = set()
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            while len(results) < len(order):
+                settled = len(results)
+                for name in order:
+                    if name in results or name in running.values():
+                        continue
+                    deps = self.deps[name]
+                    if any(d not in results for d in deps):
+                        continue
+                    bad = [d for d in deps if results[d].status in ("failed", "blocked")]
+                    if bad:
+                        results[name] = Result(name, "blocked", 0.0, f"needs {', '.join(bad)}")
+                        continue
+                    absent = [d for d in deps if d in unavailable]
+                    if absent:
+                        results[name] = Result(name, "skipped", 0.0, f"source missing: {', '.join(absent)}")
+                        unavailable.add(name)
+                        continue
+                    running[pool.submit(self._run, self.steps[name], name in force)] = name
+                if not running:
+                    if len(results) == settled:
+                        raise SystemExit(f"dependency cycle among {sorted(set(order) - set(results))}")
+                    continue
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    result = future.result()
+                    results[result.name] = result
+                    del running[future]
+                    if result.status == "missing":
+                        unavailable.add(result.name)
+                    if result.status in ("ran", "failed"):
+                        self._log(f"{result.status:<5} {result.name} {result.detail}".rstrip())
+        self._save(time.perf_counter() - t0, [results[n] for n in order])
+        return [results[n] for n in order]
+
+    def _save(self, total: float, results: list[Result]) -> None:
+        os.makedirs(self.state_dir, exist_ok=True)
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"steps": self.done, "files": self.files.cache}, f, indent=1)
+        os.replace(tmp, self.state_path)
+        summary = {
+            "totalSeconds": round(total, 3),
+            "steps": [
+                {"name": r.name, "status": r.status, "seconds": round(r.seconds, 3), "detail": r.detail}
+                for r in results
+            ],
+        }
+        with open(os.path.join(self.state_dir, "timings.json"), "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
+            f.write("\n")
+
+
+def format_summary(results: Sequence[Result]) -> list[str]:
+    out = [f"{'step':<20} {'status':<8} {'seconds':>8}"]
+    for r in results:
+        line = f"{r.name:<20} {r.status:<8} {r.seconds:8.2f}"
+        out.append(f"{line}  {r.detail}" if r.detail else line)
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("targets", nargs="*", help="steps to build (default: all)")
+    parser.add_argument("--force", action="append", default=[], metavar="STEP")
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument("--list", action="store_true", help="print steps and dependencies")
+    parser.add_argument(
+        "--fetch",
+        action="store_true",
+        help="regenerate the verse shards from the Quran.com API (network)",
+    )
+    args = parser.parse_args()
+    steps = steps_for(args.fetch)
+
+    if args.list:
+        deps = dependencies(steps)
+        for step in steps:
+            kind = "source" if step.command is None else "build"
+            after = f" <- {', '.join(deps[step.name])}" if deps[step.name] else ""
+            print(f"{step.name:<20} {kind}{after}")
+        return 0
+
+    t0 = time.perf_counter()
+    results = Builder(steps, jobs=args.jobs).build(args.targets, args.force)
+    print("\n".join(format_summary(results)))
+    print(f"total {time.perf_counter() - t0:.2f}s, summary in {STATE_DIR}/timings.json")
+    if any(r.name == FETCH_VERSES.name and r.status == "missing" for r in results):
+        print("verse shards missing: rerun with --fetch to download them")
+    if any(r.status in ("failed", "blocked") for r in results):
+        return 1
+    # Steps without their sources are fine in a full build, not when asked for.
+    unbuilt = [
+        r.name
+        for r in results
+        if r.name in args.targets and (r.status == "missing" or r.detail.startswith("source missing"))
+    ]
+    return 1 if unbuilt else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
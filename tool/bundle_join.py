@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""Cross-bundle consistency check as one k-way sort-merge join.
+
+Every source is read as a stream of ayah ordinals (quran_corpus.ayah_ordinal)
+in reading order, and heapq.merge joins them with the 6236-ayah spine:
+
+  verses            assets/quran/sNNN.json, or ar/sNNN.json of a split
+                    layout (verse_shards.py), one shard at a time; m.page
+  index_pages       assets/quran/index_pages.json ranges; page
+  transliteration   transliterations (sura, ayah, ayah_key), ORDER BY sura, ayah
+  tafsir:<name>     each assets/tafsir/*.sqlite (original or optimized
+                    layout), ORDER BY the numeric ayah_key
+  qpc               QPC V2 ayah lines joined to their word rows, page order;
+                    the first and last page each ayah's words are on
+
+For every ordinal the join reports sources missing the ayah; each source
+reports keys that are not in the Quran, repeated or out of order. Page
+boundaries must agree: the shard page equals index_pages, and both fall
+within the pages QPC lays the ayah out on. Tafsir rows must have
+group_ayah_key, from_ayah, to_ayah and ayah_keys naming real ayahs, with
+the ayah inside from..to and the group head present in the bundle.
+
+Only the current ordinal of each stream is held (plus one byte per ayah
+per tafsir bundle for group heads), so memory does not grow with the
+bundles. The verse shards and index_pages.json are required: without them
+the check fails. Other missing assets are reported and skipped. Exit
+status is 1 when anything disagrees.
+
+Usage:
+  python tool/bundle_join.py
+  python tool/bundle_join.py --root . --limit 50
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import heapq
+import json
+import os
+import sqlite3
+from collections import Counter
+from collections.abc import Iterator, Sequence
+from typing import NamedTuple
+
+from quran_corpus import AYAH_TOTAL, SURAH_COUNT, ayah_at, ayah_ordinal, load_verses, shard_paths
+from verse_shards import MANIFEST
+
+VERSE_DIR = "assets/quran"
+INDEX_PAGES = "assets/quran/index_pages.json"
+TRANSLITERATION = "assets/quran/transliteration/transliteration-tajweed.db"
+TAFSIR = "assets/tafsir/*.sqlite"
+LAYOUT_DB = "assets/mushaf/layout/qpc_v2_15_lines.sqlite"
+WORDS_DB = "assets/mushaf/script/qpc_v2_words.sqlite"
+
+# Sort by the numbers in an "s:a" key rather than by its text.
+_KEY_ORDER = (
+    "CAST(ayah_key AS INTEGER), "
+    "CAST(substr(ayah_key, instr(ayah_key, ':') + 1) AS INTEGER)"
+)
+
+
+class Report:
+    """Problem counts per kind, keeping only the first `limit` messages."""
+
+    def __init__(self, limit: int = 20) -> None:
+        self.limit = limit
+        self.counts: Counter[str] = Counter()
+        self.lines: list[str] = []
+
+    def __call__(self, kind: str, message: str) -> None:
+        self.counts[kind] += 1
+        if len(self.lines) < self.limit:
+            self.lines.append(message)
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+
+class Source(NamedTuple):
+    name: str
+    # key: presence only; page: one page number; pages: (first, last) page
+    kind: str
+    rows: Iterator[tuple[int, object]]
+
+
+def _key(text: object) -> tuple[int, int] | None:
+    try:
+        s, a = str(text).split(":")
+        return int(s), int(a)
+    except ValueError:
+        return None
+
+
+def _ordinal(s: object, a: object) -> int | None:
+    try:
+        return ayah_ordinal(int(s), int(a))
+    except (TypeError, ValueError):
+        return None
+
+
+def _label(ordinal: int) -> str:
+    return "%d:%d" % ayah_at(ordinal)
+
+
+def _connect_ro(path: str) -> sqlite3.Connection:
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+
+def verse_paths(root: str) -> list[str]:
+    """Verse shards in reading order: sNNN.json, else the split layout's Arabic set."""
+    combined = shard_paths(root)
+    if combined:
+        return combined
+    manifest = os.path.join(root, MANIFEST)
+    if not os.path.isfile(manifest):
+        return []
+    with open(manifest, encoding="utf-8") as f:
+        shards = json.load(f).get("shards")
+    if not isinstance(shards, dict) or shards.get("layout") != "split":
+        return []
+    paths = (os.path.join(root, shards["arabic"].format(surah=s)) for s in range(1, SURAH_COUNT + 1))
+    return [p for p in paths if os.path.isfile(p)]
+
+
+def verse_rows(paths: Sequence[str], report: Report) -> Iterator[tuple[int, object]]:
+    for path in paths:
+        for verse in load_verses(path):
+            ordinal = _ordinal(verse.get("s"), verse.get("a"))
+            if ordinal is None:
+                report("extra", f"verses: {verse.get('s')}:{verse.get('a')} in {path} is not an ayah")
+                continue
+            page = (verse.get("m") or {}).get("page")
+            if not isinstance(page, int):
+                report("page", f"verses: {_label(ordinal)} in {path} has page {page!r}")
+                page = None
+            yield ordinal, page
+
+
+def index_page_rows(path: str, report: Report) -> Iterator[tuple[int, object]]:
+    with open(path, encoding="utf-8") as f:
+        pages = json.load(f)
+    ranges = []
+    for page, items in pages.items():
+        if not page.isdigit():
+            report("page", f"index_pages: page {page!r} is not a page number")
+            continue
+        for r in items:
+            first, last = _ordinal(r.get("s"), r.get("a1")), _ordinal(r.get("s"), r.get("a2"))
+            if first is None or last is None or last < first:
+                report("extra", f"index_pages: page {page} range {r} is not an ayah range")
+                continue
+            ranges.append((first, last, int(page)))
+    ranges.sort()
+    for first, last, page in ranges:
+        for ordinal in range(first, last + 1):
+            yield ordinal, page
+
+
+def transliteration_rows(path: str, report: Report) -> Iterator[tuple[int, object]]:
+    db = _connect_ro(path)
+    try:
+        rows = db.execute("SELECT sura, ayah, ayah_key FROM transliterations ORDER BY sura, ayah")
+        for sura, ayah, key in rows:
+            ordinal = _ordinal(sura, ayah)
+            if ordinal is None:
+                report("extra", f"transliteration: {sura}:{ayah} is not an ayah")
+                continue
+            if key != f"{sura}:{ayah}":
+                report("key", f"transliteration: {sura}:{ayah} has ayah_key {key!r}")
+            yield ordinal, None
+    finally:
+        db.close()
+
+
+def tafsir_rows(path: str, report: Report) -> Iterator[tuple[int, object]]:
+    name = "tafsir:" + os.path.splitext(os.path.basename(path))[0]
+    db = _connect_ro(path)
+    tables = {r[0] for r in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    table = "tafsir_rows" if "tafsir_rows" in tables else "tafsir"
+    # One byte per ayah: 1 = row seen, 2 = named as a group head.
+    state = bytearray(AYAH_TOTAL)
+    try:
+        rows = db.execute(
+            f"SELECT ayah_key, group_ayah_key, from_ayah, to_ayah, ayah_keys FROM {table} "
+            f"ORDER BY {_KEY_ORDER}"
+        )
+        for key, group, first, last, keys in rows:
+            parsed = _key(key)
+            ordinal = _ordinal(*parsed) if parsed else None
+            if ordinal is None:
+                report("extra", f"{name}: ayah_key {key!r} is not an ayah")
+                continue
+            state[ordinal] |= 1
+            refs = {"group_ayah_key": group, "from_ayah": first, "to_ayah": last}
+            resolved = {}
+            for column, value in refs.items():
+                if value in (None, ""):
+                    continue
+                ref = _key(value)
+                resolved[column] = _ordinal(*ref) if ref else None
+                if resolved[column] is None:
+                    report("group", f"{name}: {key} {column} {value!r} is not an ayah")
+            for part in (keys or "").split(","):
+                ref = _key(part.strip())
+                if part.strip() and (ref is None or _ordinal(*ref) is None):
+                    report("group", f"{name}: {key} ayah_keys names {part.strip()!r}, not an ayah")
+            lo, hi = resolved.get("from_ayah"), resolved.get("to_ayah")
+            if lo is not None and hi is not None and not lo <= ordinal <= hi:
+                report("group", f"{name}: {key} is outside its range {first}..{last}")
+            head = resolved.get("group_ayah_key")
+            if head is not None:
+                state[head] |= 2
+            yield ordinal, None
+    finally:
+        db.close()
+    for ordinal, flags in enumerate(state):
+        if flags == 2:
+            report("group", f"{name}: group head {_label(ordinal)} has no row")
+
+
+def qpc_rows(layout_path: str, words_path: str, report: Report) -> Iterator[tuple[int, object]]:
+    layout = _connect_ro(layout_path)
+    words = _connect_ro(words_path)
+    current: int | None = None
+    first_page = last_page = 0
+    try:
+        lines = layout.execute(
+            "SELECT page_number, first_word_id, last_word_id FROM pages "
+            "WHERE line_type = 'ayah' ORDER BY page_number, line_number"
+        )
+        for page, first, last in lines:
+            if first in (None, "") or last in (None, ""):
+                continue
+            for surah, ayah in words.execute(
+                "SELECT surah, ayah FROM words WHERE id >= ? AND id <= ? ORDER BY id",
+                (int(first), int(last)),
+            ):
+                ordinal = _ordinal(surah, ayah)
+                if ordinal is None:
+                    report("extra", f"qpc: word of {surah}:{ayah} on page {page} is not an ayah")
+                    continue
+                if ordinal == current:
+                    last_page = page
+                    continue
+                if current is not None:
+                    yield current, (first_page, last_page)
+                current, first_page, last_page = ordinal, page, page
+        if current is not None:
+            yield current, (first_page, last_page)
+    finally:
+        layout.close()
+        words.close()
+
+
+def _in_order(index: int, source: Source, report: Report) -> Iterator[tuple[int, int, object]]:
+    previous = -1
+    for ordinal, value in source.rows:
+        if ordinal == previous:
+            report("repeat", f"{source.name}: {_label(ordinal)} appears more than once")
+            continue
+        if ordinal < previous:
+            report("order", f"{source.name}: {_label(ordinal)} comes after {_label(previous)}")
+            continue
+        previous = ordinal
+        yield ordinal, index, value
+
+
+def join(sources: Sequence[Source], report: Report) -> int:
+    """Merge every source with the 6236-ayah spine; returns ordinals checked."""
+    spine = Source("quran", "key", ((k, None) for k in range(AYAH_TOTAL)))
+    streams = [_in_order(i, s, report) for i, s in enumerate([spine, *sources])]
+    checked = 0
+    group: dict[int, object] = {}
+    current = -1
+    for ordinal, index, value in heapq.merge(*streams):
+        if ordinal != current:
+            if group:
+                _check(current, group, sources, report)
+                checked += 1
+            current, group = ordinal, {}
+        group[index] = value
+    if group:
+        _check(current, group, sources, report)
+        checked += 1
+    return checked
+
+
+def _check(ordinal: int, group: dict[int, object], sources: Sequence[Source], report: Report) -> None:
+    key = _label(ordinal)
+    missing = [s.name for i, s in enumerate(sources, 1) if i not in group]
+    if missing:
+        report("missing", f"{key}: missing from {', '.join(missing)}")
+    # A None page was already reported by its source; it still counts as present.
+    pages = {
+        sources[i - 1].name: v
+        for i, v in group.items()
+        if i and sources[i - 1].kind == "page" and v is not None
+    }
+    spans = {sources[i - 1].name: v for i, v in group.items() if i and sources[i - 1].kind == "pages"}
+    disagree = len(set(pages.values())) > 1 or any(
+        not lo <= page <= hi for lo, hi in spans.values() for page in pages.values()
+    )
+    if disagree:
+        found = [f"{name} {page}" for name, page in pages.items()]
+        found += [f"{name} {lo}" if lo == hi else f"{name} {lo}-{hi}" for name, (lo, hi) in spans.items()]
+        report("page", f"{key}: page disagrees: {', '.join(found)}")
+
+
+def sources(root: str, report: Report) -> tuple[list[Source], list[str]]:
+    """Every source present under root, and notes for optional ones skipped.
+
+    Missing verse shards or index_pages.json are problems in `report`.
+    """
+    found: list[Source] = []
+    skipped: list[str] = []
+
+    def path(rel: str) -> str:
+        return os.path.join(root, rel)
+
+    verses = verse_paths(path(VERSE_DIR))
+    if verses:
+        found.append(Source("verses", "page", verse_rows(verses, report)))
+    else:
+        report("source", f"verses: no sNNN.json or split-layout ar/sNNN.json in {path(VERSE_DIR)}")
+    if os.path.isfile(path(INDEX_PAGES)):
+        found.append(Source("index_pages", "page", index_page_rows(path(INDEX_PAGES), report)))
+    else:
+        report("source", f"index_pages: no {path(INDEX_PAGES)}")
+    if os.path.isfile(path(TRANSLITERATION)):
+        found.append(Source("transliteration", "key", transliteration_rows(path(TRANSLITERATION), report)))
+    else:
+        skipped.append(f"transliteration: no {path(TRANSLITERATION)}")
+    tafsirs = sorted(glob.glob(path(TAFSIR)))
+    for bundle in tafsirs:
+        name = "tafsir:" + os.path.splitext(os.path.basename(bundle))[0]
+        found.append(Source(name, "key", tafsir_rows(bundle, report)))
+    if not tafsirs:
+        skipped.append(f"tafsir: no {path(TAFSIR)}")
+    if os.path.isfile(path(LAYOUT_DB)) and os.path.isfile(path(WORDS_DB)):
+        found.append(Source("qpc", "pages", qpc_rows(path(LAYOUT_DB), path(WORDS_DB), report)))
+    else:
+        skipped.append(f"qpc: no {path(LAYOUT_DB)} or {path(WORDS_DB)}")
+    return found, skipped
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--root", default=".", help="directory holding assets/")
+    parser.add_argument("--limit", type=int, default=20, help="problems to print")
+    args = parser.parse_args()
+
+    report = Report(args.limit)
+    found, skipped = sources(args.root, report)
+    for note in skipped:
+        print(f"skipped {note}")
+    checked = join(found, report) if found else 0
+    print(f"joined {len(found)} sources over {checked} ayahs: {', '.join(s.name for s in found)}")
+    if not report.total:
+        print("ok: every bundle agrees on the ayah keys and page boundaries")
+        return 0
+    for line in report.lines:
+        print(f"  {line}")
+    if report.total > len(report.lines):
+        print(f"  ... and {report.total - len(report.lines)} more")
+    counts = ", ".join(f"{kind} {n}" for kind, n in sorted(report.counts.items()))
+    print(f"{report.total} problems ({counts})")
+    return 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
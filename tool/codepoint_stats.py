@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""Corpus-wide codepoint statistics for verse text.
+
+Encodes a whole corpus once into a symbol stream (one byte per codepoint,
+through a shared corpus alphabet) plus per-verse offsets, and a second
+stream with a separator byte between verses. Histograms, combining-mark
+masks, stripped lengths and per-verse set differences then run as bytes
+operations over whole streams (translate, split, count, Counter) instead
+of one Python call per character or per verse. Raw codepoints are kept
+as array('I') for callers that need them.
+
+Stdlib only; the app tooling does not depend on NumPy.
+
+Usage:
+  python tool/codepoint_stats.py
+  python tool/codepoint_stats.py --bench
+  python tool/codepoint_stats.py --bench --scale 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import codecs
+import random
+import sys
+import time
+import unicodedata
+from array import array
+from collections import Counter
+from collections.abc import Iterable, Sequence
+from itertools import accumulate, compress, repeat
+from operator import contains
+
+from quran_corpus import Analyzer, Corpus, scan
+
+TATWEEL = "\u0640"
+PAUSE_OR_SIGN = "\u06d6\u06d7\u06d8\u06d9\u06da\u06db\u06dc\u06de\u06e9"
+MAX_SYMBOLS = 256
+# The last symbol id separates verses in CodepointCorpus.separated.
+SEPARATOR = MAX_SYMBOLS - 1
+_SEPARATOR_CHAR = "\uffff"
+
+
+def shared_alphabet(*corpora: Iterable[str]) -> str:
+    """Sorted distinct codepoints across every text of every corpus."""
+    seen: set[int] = set()
+    for texts in corpora:
+        seen.update(_codepoint_view("".join(texts)))
+    return "".join(map(chr, sorted(seen)))
+
+
+def _codepoint_view(text: str) -> memoryview:
+    return memoryview(text.encode("utf-32-le")).cast("I")
+
+
+class CodepointCorpus:
+    """Verse texts encoded as one symbol stream with per-verse offsets."""
+
+    def __init__(self, texts: Sequence[str], alphabet: str | None = None) -> None:
+        if alphabet is None:
+            alphabet = shared_alphabet(texts)
+        if len(alphabet) > SEPARATOR:
+            raise ValueError(
+                f"alphabet has {len(alphabet)} codepoints, max {SEPARATOR}"
+            )
+        if _SEPARATOR_CHAR in alphabet:
+            raise ValueError("U+FFFF is reserved for the verse separator")
+        self.alphabet = alphabet
+        # charmap codec tables: the same C lookup the cp125x codecs use.
+        self._decoding = (
+            alphabet + "\ufffe" * (SEPARATOR - len(alphabet)) + _SEPARATOR_CHAR
+        )
+        self._encoding = codecs.charmap_build(self._decoding)
+        self.offsets = array("I", accumulate(map(len, texts), initial=0))
+        joined = "".join(texts)
+        try:
+            self.separated, _ = codecs.charmap_encode(
+                _SEPARATOR_CHAR.join(texts), "strict", self._encoding
+            )
+        except UnicodeEncodeError as err:
+            raise ValueError(
+                f"U+{ord(err.object[err.start]):04X} is outside the alphabet"
+            ) from None
+        self.symbols = self.separated.translate(None, bytes([SEPARATOR]))
+        self._verses: list[bytes] | None = None
+        self.codepoints = array("I")
+        self.codepoints.frombytes(joined.encode("utf-32-le"))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def verse(self, i: int) -> bytes:
+        return self.symbols[self.offsets[i] : self.offsets[i + 1]]
+
+    def verses(self) -> list[bytes]:
+        """Every verse's symbols, split out of the separated stream once."""
+        if self._verses is None:
+            self._verses = self.separated.split(bytes([SEPARATOR])) if len(self) else []
+        return self._verses
+
+    def decode(self, symbols: bytes) -> str:
+        return codecs.charmap_decode(symbols, "strict", self._decoding)[0]
+
+    def symbol_ids(self, chars: Iterable[str]) -> bytes:
+        """Symbol ids for the given characters that occur in the alphabet."""
+        return bytes(
+            sorted({self.alphabet.index(c) for c in chars if c in self.alphabet})
+        )
+
+    def combining_ids(self) -> bytes:
+        return bytes(
+            i for i, ch in enumerate(self.alphabet) if unicodedata.combining(ch)
+        )
+
+    def mask_table(self, ids: bytes) -> bytes:
+        """256-entry lookup table mapping the given symbol ids to 1, others to 0."""
+        table = bytearray(MAX_SYMBOLS)
+        for i in ids:
+            table[i] = 1
+        return bytes(table)
+
+    def mask(self, ids: bytes, i: int | None = None) -> bytes:
+        """0/1 mask over one verse (or the whole stream) for the given ids."""
+        data = self.symbols if i is None else self.verse(i)
+        return data.translate(self.mask_table(ids))
+
+    def histogram(self, i: int | None = None) -> Counter[str]:
+        data = self.symbols if i is None else self.verse(i)
+        counts = Counter(data)
+        return Counter({self.alphabet[b]: n for b, n in counts.items()})
+
+    def verse_histograms(self) -> list[Counter[str]]:
+        return [self.histogram(i) for i in range(len(self))]
+
+    def stripped_lengths(self, delete: bytes) -> array:
+        """Per-verse length after deleting the given symbol ids."""
+        if not len(self):
+            return array("I")
+        kept = self.separated.translate(None, delete)
+        return array("I", map(len, kept.split(bytes([SEPARATOR]))))
+
+    def difference_counts(
+        self, other: CodepointCorpus, rows: Iterable[tuple[int, int]]
+    ) -> Counter[str]:
+        """Sum of `text.count(c)` over c in set(self[i]) - set(other[j]).
+
+        The per-row sets and differences are C-level `map`s over the split
+        verses; each differing symbol is then counted once, over the joined
+        verses of the rows it is missing from.
+        """
+        if other.alphabet != self.alphabet:
+            raise ValueError("corpora must share one alphabet")
+        pairs = list(rows)
+        if not pairs:
+            return Counter()
+        mine, theirs = zip(*pairs)
+        ours = list(map(self.verses().__getitem__, mine))
+        others = map(other.verses().__getitem__, theirs)
+        diffs = list(map(set.difference, map(set, ours), others))
+        ours = list(compress(ours, diffs))
+        diffs = list(filter(None, diffs))
+        counts: Counter[str] = Counter()
+        for b in sorted(set().union(*diffs)):
+            rows_missing = compress(ours, map(contains, diffs, repeat(b)))
+            counts[self.alphabet[b]] = b"".join(rows_missing).count(b)
+        return counts
+
+
+class CodepointHistogram(Analyzer):
+    title = "ar codepoint histogram"
+
+    def begin(self, corpus: Corpus) -> None:
+        self.texts: list[str] = []
+
+    def visit(self, path: str, verse: dict) -> None:
+        self.texts.append(verse["ar"])
+
+    def finish(self) -> None:
+        self.corpus = CodepointCorpus(self.texts)
+
+    def report(self) -> list[str]:
+        corpus = self.corpus
+        out = [
+            f"verses: {len(corpus)}, codepoints: {len(corpus.symbols)}",
+            f"alphabet: {len(corpus.alphabet)}, combining: {len(corpus.combining_ids())}",
+        ]
+        for c, n in corpus.histogram().most_common():
+            out.append(f"  U+{ord(c):04X} {unicodedata.name(c, '?')} x{n}")
+        return out
+
+
+def synthetic_pair(verses: int, seed: int = 7) -> tuple[list[str], list[str]]:
+    """Arabic-like verse pairs with marks, tatweel and pause signs."""
+    rng = random.Random(seed)
+    letters = [chr(c) for c in range(0x0621, 0x064B)]
+    marks = [chr(c) for c in range(0x064B, 0x0653)] + ["\u0670"]
+    signs = list(PAUSE_OR_SIGN) + [TATWEEL, "\u06df", "\u06e0"]
+    ours: list[str] = []
+    theirs: list[str] = []
+    for _ in range(verses):
+        words = []
+        for _ in range(rng.randint(3, 40)):
+            w = []
+            for _ in range(rng.randint(2, 7)):
+                w.append(rng.choice(letters))
+                if rng.random() < 0.8:
+                    w.append(rng.choice(marks))
+            words.append("".join(w))
+        text = " ".join(words)
+        if rng.random() < 0.3:
+            text += " " + rng.choice(signs)
+        ours.append(text)
+        if rng.random() < 0.5:
+            chars = list(text)
+            k = rng.randrange(len(chars))
+            chars[k] = rng.choice(marks + signs)
+            theirs.append("".join(chars))
+        else:
+            theirs.append(text)
+    return ours, theirs
+
+
+def _naive_stats(ours: list[str], theirs: list[str]) -> tuple[Counter, Counter, int, int]:
+    from verify_ar_vs_tanzil import strip_combining, strip_layout_signs
+
+    extra_a: Counter[str] = Counter()
+    extra_b: Counter[str] = Counter()
+    letters = 0
+    core = 0
+    for ar, tz in zip(ours, theirs):
+        if ar == tz:
+            continue
+        for c in set(ar) - set(tz):
+            extra_a[c] += ar.count(c)
+        for c in set(tz) - set(ar):
+            extra_b[c] += tz.count(c)
+        if len(strip_combining(ar)) != len(strip_combining(tz)):
+            letters += 1
+        if len(strip_combining(strip_layout_signs(ar))) != len(
+            strip_combining(strip_layout_signs(tz))
+        ):
+            core += 1
+    return extra_a, extra_b, letters, core
+
+
+def _encode_pair(
+    ours: list[str], theirs: list[str]
+) -> tuple[CodepointCorpus, CodepointCorpus]:
+    alphabet = shared_alphabet(ours, theirs)
+    return CodepointCorpus(ours, alphabet), CodepointCorpus(theirs, alphabet)
+
+
+def _engine_stats(
+    a: CodepointCorpus, b: CodepointCorpus, rows: list[tuple[int, int]]
+) -> tuple[Counter, Counter, int, int]:
+    extra_a = a.difference_counts(b, rows)
+    extra_b = b.difference_counts(a, ((j, i) for i, j in rows))
+    combining = a.combining_ids()
+    core_delete = bytes(
+        sorted(set(combining) | set(a.symbol_ids(PAUSE_OR_SIGN + TATWEEL)))
+    )
+    la, lb = a.stripped_lengths(combining), b.stripped_lengths(combining)
+    ca, cb = a.stripped_lengths(core_delete), b.stripped_lengths(core_delete)
+    letters = sum(1 for i, j in rows if la[i] != lb[j])
+    core = sum(1 for i, j in rows if ca[i] != cb[j])
+    return extra_a, extra_b, letters, core
+
+
+def bench(scale: int) -> None:
+    ours, theirs = synthetic_pair(6236 * scale)
+    chars = sum(map(len, ours))
+    print(f"synthetic corpus: {len(ours)} verses, {chars} codepoints (x{scale})")
+    t0 = time.perf_counter()
+    naive = _naive_stats(ours, theirs)
+    t1 = time.perf_counter()
+    a, b = _encode_pair(ours, theirs)
+    t2 = time.perf_counter()
+    rows = [(i, i) for i in range(len(ours)) if ours[i] != theirs[i]]
+    engine = _engine_stats(a, b, rows)
+    t3 = time.perf_counter()
+    if naive != engine:
+        raise SystemExit("engine results differ from per-character loops")
+    print(f"  per-character loops: {t1 - t0:8.3f}s")
+    print(f"  engine encode:       {t2 - t1:8.3f}s  (once per corpus)")
+    print(f"  engine analyses:     {t3 - t2:8.3f}s")
+    print(
+        f"  speedup: {(t1 - t0) / (t3 - t1):.1f}x incl. encode, "
+        f"{(t1 - t0) / (t3 - t2):.1f}x analyses only; results identical"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--scale", type=int, default=1)
+    args = parser.parse_args()
+    sys.stdout.reconfigure(encoding="utf-8")
+    if args.bench:
+        bench(args.scale)
+        return 0
+
+    histogram = CodepointHistogram()
+    scan(Corpus(), [histogram])
+    print("\n".join(histogram.report()))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
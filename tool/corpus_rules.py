@@ -0,0 +1,331 @@
+#!/usr/bin/env python3
+"""Declarative invariants for the bundled verse corpus, checked in one scan.
+
+Rules are declared once in default_rules() and compiled by Validator into
+a single pass: forbidden codepoints per field become one character-class
+regex, required codepoints and coverage become counters settled at the
+end. Every violation is collected; nothing stops at the first one.
+
+Used as the build gate in generate_quran_json.py, as an analyzer in
+audit_suite.py, and standalone on existing assets. The Dart side
+(test/quran_text_integrity_test.dart) checks the same codepoint rules.
+
+Usage:
+  python tool/corpus_rules.py
+  python tool/corpus_rules.py --dir data/bundled/quran
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import sys
+from collections import Counter
+from collections.abc import Iterable, Mapping, Sequence
+from typing import NamedTuple, Union
+
+from quran_corpus import (
+    AYAH_TOTAL,
+    DEFAULT_DIR,
+    EXPECTED_AYAHS,
+    JUZ_COUNT,
+    PAGE_COUNT,
+    Analyzer,
+    Corpus,
+    scan,
+)
+
+VERSE_KEYS = ("s", "a", "ar", "tr", "m")
+META_KEYS = ("juz", "page", "hizb", "ruku")
+TRANSLATION_CODES = ("en", "id", "zh", "ja")
+
+
+class ForbidCodepoints(NamedTuple):
+    """No verse may contain any of `chars` in `field`."""
+
+    name: str
+    field: str
+    chars: str
+
+
+class RequireCodepoints(NamedTuple):
+    """Each of `chars` must occur somewhere in `field` across the corpus."""
+
+    name: str
+    field: str
+    chars: str
+
+
+class VerseContains(NamedTuple):
+    """Verse (surah, ayah) must contain every one of `chars` in `field`."""
+
+    name: str
+    verse: tuple[int, int]
+    field: str
+    chars: str
+
+
+class KeySet(NamedTuple):
+    """Object at `path` ("" for the verse itself) has exactly `keys`."""
+
+    name: str
+    path: str
+    keys: tuple[str, ...]
+    forbidden: tuple[str, ...] = ()
+
+
+class AyahCounts(NamedTuple):
+    """Surah n has expected[n - 1] verses numbered 1..N in order."""
+
+    name: str
+    expected: tuple[int, ...]
+    total: int
+
+
+class Coverage(NamedTuple):
+    """Meta field values cover exactly 1..count."""
+
+    name: str
+    field: str
+    count: int
+
+
+Rule = Union[
+    ForbidCodepoints, RequireCodepoints, VerseContains, KeySet, AyahCounts, Coverage
+]
+
+
+class Violation(NamedTuple):
+    rule: str
+    where: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"[{self.rule}] {self.where}: {self.message}"
+
+
+def default_rules(translations: Sequence[str] = TRANSLATION_CODES) -> list[Rule]:
+    return [
+        KeySet("verse-keys", "", VERSE_KEYS, forbidden=("tj", "tl", "tl_tj")),
+        KeySet("translation-keys", "tr", tuple(translations)),
+        KeySet("meta-keys", "m", META_KEYS),
+        ForbidCodepoints("no-wavy-hamza-alef", "ar", "\u0672"),
+        ForbidCodepoints("no-dotted-circle", "ar", "\u25cc"),
+        RequireCodepoints("uthmani-marks", "ar", "\u0670\u0640\u06d6\u06da"),
+        VerseContains("dagger-alef-1:6", (1, 6), "ar", "\u0670"),
+        VerseContains("dagger-alef-6:44", (6, 44), "ar", "\u0670"),
+        AyahCounts("ayah-counts", EXPECTED_AYAHS, AYAH_TOTAL),
+        Coverage("juz-coverage", "juz", JUZ_COUNT),
+        Coverage("page-coverage", "page", PAGE_COUNT),
+    ]
+
+
+def _where(verse: dict, source: str) -> str:
+    key = f"{verse.get('s')}:{verse.get('a')}"
+    return f"{source} {key}" if source else key
+
+
+class Validator:
+    """Rules compiled into per-verse checks for one pass over the corpus."""
+
+    def __init__(self, rules: Iterable[Rule]) -> None:
+        self.rules = list(rules)
+        forbid: dict[str, list[ForbidCodepoints]] = {}
+        self._require: list[RequireCodepoints] = []
+        self._verse_rules: dict[tuple[int, int], list[VerseContains]] = {}
+        self._keysets: list[tuple[KeySet, frozenset[str]]] = []
+        self._counts: list[AyahCounts] = []
+        self._coverage: list[Coverage] = []
+        for rule in self.rules:
+            if isinstance(rule, ForbidCodepoints):
+                forbid.setdefault(rule.field, []).append(rule)
+            elif isinstance(rule, RequireCodepoints):
+                self._require.append(rule)
+            elif isinstance(rule, VerseContains):
+                self._verse_rules.setdefault(rule.verse, []).append(rule)
+            elif isinstance(rule, KeySet):
+                self._keysets.append((rule, frozenset(rule.keys)))
+            elif isinstance(rule, AyahCounts):
+                self._counts.append(rule)
+            elif isinstance(rule, Coverage):
+                self._coverage.append(rule)
+            else:
+                raise TypeError(f"unknown rule {rule!r}")
+        # field -> (one regex over every forbidden char, char -> rule name)
+        self._forbid: dict[str, tuple[re.Pattern[str], dict[str, str]]] = {}
+        for field, rules in forbid.items():
+            owner = {c: r.name for r in rules for c in r.chars}
+            pattern = re.compile("[" + re.escape("".join(owner)) + "]")
+            self._forbid[field] = (pattern, owner)
+        self.reset()
+
+    def reset(self) -> None:
+        self.violations: list[Violation] = []
+        self.verses = 0
+        self._missing = {r.name: set(r.chars) for r in self._require}
+        self._seen_verses: set[tuple[int, int]] = set()
+        self._per_surah: Counter[int] = Counter()
+        self._last_ayah: dict[int, int] = {}
+        self._seen_meta: dict[str, set[int]] = {r.field: set() for r in self._coverage}
+
+    def _fail(self, rule: str, where: str, message: str) -> None:
+        self.violations.append(Violation(rule, where, message))
+
+    def visit(self, verse: dict, source: str = "") -> None:
+        self.verses += 1
+        for rule, keys in self._keysets:
+            obj = verse.get(rule.path) if rule.path else verse
+            if not isinstance(obj, Mapping):
+                self._fail(rule.name, _where(verse, source), f"{rule.path!r} is not an object")
+                continue
+            present = obj.keys()
+            if present == keys:
+                continue
+            bad = [k for k in rule.forbidden if k in present]
+            if bad:
+                self._fail(rule.name, _where(verse, source), f"forbidden keys present: {bad}")
+            rest = present - set(bad)
+            if rest != keys:
+                self._fail(
+                    rule.name,
+                    _where(verse, source),
+                    f"keys {sorted(rest)}, expected {sorted(keys)}",
+                )
+
+        for field, (pattern, owner) in self._forbid.items():
+            text = verse.get(field)
+            if not isinstance(text, str) or not pattern.search(text):
+                continue
+            for c in sorted(set(pattern.findall(text))):
+                self._fail(owner[c], _where(verse, source), f"{field} contains U+{ord(c):04X}")
+
+        for rule in self._require:
+            missing = self._missing[rule.name]
+            if missing:
+                text = verse.get(rule.field)
+                if isinstance(text, str):
+                    missing.difference_update([c for c in missing if c in text])
+
+        s, a = verse.get("s"), verse.get("a")
+        if not isinstance(s, int) or not isinstance(a, int):
+            self._fail("verse-keys", _where(verse, source), "s and a must be integers")
+            return
+        key = (s, a)
+        for rule in self._verse_rules.get(key, ()):
+            text = verse.get(rule.field)
+            absent = [c for c in rule.chars if not isinstance(text, str) or c not in text]
+            if absent:
+                cps = ", ".join(f"U+{ord(c):04X}" for c in absent)
+                self._fail(rule.name, _where(verse, source), f"{rule.field} missing {cps}")
+        self._seen_verses.add(key)
+
+        if self._counts:
+            self._per_surah[s] += 1
+            prev = self._last_ayah.get(s, 0)
+            if a != prev + 1:
+                for rule in self._counts:
+                    self._fail(rule.name, _where(verse, source), f"ayah {a} follows {prev}")
+            self._last_ayah[s] = a
+
+        meta = verse.get("m")
+        if isinstance(meta, dict):
+            for field, seen in self._seen_meta.items():
+                value = meta.get(field)
+                if isinstance(value, int):
+                    seen.add(value)
+
+    def finish(self) -> list[Violation]:
+        for rule in self._require:
+            for c in sorted(self._missing[rule.name]):
+                self._fail(rule.name, "corpus", f"{rule.field} never contains U+{ord(c):04X}")
+        for rule in self._verse_rules.values():
+            for r in rule:
+                if r.verse not in self._seen_verses:
+                    self._fail(r.name, f"{r.verse[0]}:{r.verse[1]}", "verse not found")
+        for rule in self._counts:
+            for n, expected in enumerate(rule.expected, 1):
+                got = self._per_surah.get(n, 0)
+                if got != expected:
+                    self._fail(rule.name, f"surah {n}", f"expected {expected} verses, got {got}")
+            extra = sorted(set(self._per_surah) - set(range(1, len(rule.expected) + 1)))
+            for n in extra:
+                self._fail(rule.name, f"surah {n}", "unexpected surah")
+            if self.verses != rule.total:
+                self._fail(rule.name, "corpus", f"expected {rule.total} verses, got {self.verses}")
+        for rule in self._coverage:
+            seen = self._seen_meta[rule.field]
+            expected = set(range(1, rule.count + 1))
+            missing = sorted(expected - seen)
+            extra = sorted(seen - expected)
+            if missing:
+                self._fail(rule.name, "corpus", f"{rule.field} values missing: {_ranges(missing)}")
+            if extra:
+                self._fail(rule.name, "corpus", f"{rule.field} values out of range: {_ranges(extra)}")
+        return self.violations
+
+    def check(self, verses: Iterable[tuple[str, dict]]) -> list[Violation]:
+        self.reset()
+        for source, verse in verses:
+            self.visit(verse, source)
+        return self.finish()
+
+
+def _ranges(values: list[int]) -> str:
+    out: list[str] = []
+    start = prev = values[0]
+    for v in values[1:]:
+        if v == prev + 1:
+            prev = v
+            continue
+        out.append(f"{start}-{prev}" if start != prev else str(start))
+        start = prev = v
+    out.append(f"{start}-{prev}" if start != prev else str(start))
+    return ", ".join(out)
+
+
+def format_violations(violations: Sequence[Violation], limit: int = 200) -> list[str]:
+    out = [str(v) for v in violations[:limit]]
+    if len(violations) > limit:
+        out.append(f"... +{len(violations) - limit} more")
+    return out
+
+
+class RuleCheck(Analyzer):
+    title = "corpus rules"
+
+    def __init__(self, rules: Iterable[Rule] | None = None) -> None:
+        self.validator = Validator(default_rules() if rules is None else rules)
+
+    def begin(self, corpus: Corpus) -> None:
+        self.validator.reset()
+
+    def visit(self, path: str, verse: dict) -> None:
+        self.validator.visit(verse, os.path.basename(path))
+
+    def finish(self) -> None:
+        self.violations = self.validator.finish()
+
+    def report(self) -> list[str]:
+        out = [
+            f"rules: {len(self.validator.rules)}, verses checked: {self.validator.verses}",
+            f"violations: {len(self.violations)}",
+        ]
+        out.extend(f"  {line}" for line in format_violations(self.violations))
+        return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", default=DEFAULT_DIR)
+    args = parser.parse_args()
+    sys.stdout.reconfigure(encoding="utf-8")
+
+    check = RuleCheck()
+    scan(Corpus(args.dir), [check])
+    print("\n".join(check.report()))
+    return 1 if check.violations else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
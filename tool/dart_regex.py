@@ -0,0 +1,22 @@
+"""Character sets that make Python `re` patterns follow Dart/JS semantics.
+
+The build-time ports of the app's Dart text code (translation_clean.py,
+html_segments.py, word_index.py) spell these out instead of using Python's
+\\s, `.` and str.strip(), whose sets differ from the Dart ones.
+"""
+
+from __future__ import annotations
+
+# JavaScript (and so Dart RegExp) \s: WhiteSpace + LineTerminator, escaped
+# for use inside a character class.
+JS_SPACE = (
+    "\\t\\n\\v\\f\\r \\u00a0\\u1680\\u2000-\\u200a\\u2028\\u2029"
+    "\\u202f\\u205f\\u3000\\ufeff"
+)
+# JS `.` without dotAll: anything but a line terminator.
+JS_DOT = "[^\\n\\r\\u2028\\u2029]"
+# Dart String.trim: Unicode White_Space plus BOM.
+DART_TRIM = (
+    "\t\n\v\f\r \x85\xa0\u1680\u2000\u2001\u2002\u2003\u2004\u2005"
+    "\u2006\u2007\u2008\u2009\u200a\u2028\u2029\u202f\u205f\u3000\ufeff"
+)
@@ -0,0 +1,396 @@
+#!/usr/bin/env python3
+"""Validate the six Explore catalogs and compile them into one bundle.
+
+SCHEMAS mirrors what each entry's fromJson and the catalog providers
+require (lib/core/models/*_entry.dart, reflection_lens.dart,
+lib/core/providers/*_catalog_provider.dart): field types, LocalizedText
+with non-empty id/en/zh/ja, non-empty ayahRefs, unique ids, unique ayah
+ranges for duas and science, 99 distinct asma numbers, a theme on every
+daily dua, and valid reflection triggers. Every ayah reference is checked
+against the verse corpus and resolved to global 0-based ordinals
+(quran_corpus.ayah_ordinal).
+
+The bundle is one binary file, not JSON as a whole: a single-line JSON
+header, a newline, then the minified segments it points to.
+
+  {"version": 1, "segments": {"duas": {"offset", "length", "entries",
+   "version"}, ..., "search": {...}}}
+
+Offsets count bytes from the first byte after the header line. A catalog
+segment is the catalog as the app reads it today, minified, with each
+ayahRef also carrying "o": [first ordinal, last ordinal]. The search
+segment holds one prebuilt key per entry of each catalog the Explore
+search covers: the lowercased fields searchExploreContent matches,
+joined by newlines (category and prophet labels depend on the UI
+language and stay in the app). The layout lets the app parse only the
+header at startup and a segment when its screen or a search needs it;
+the app does not load this bundle yet, so it is written to build/ rather
+than assets/.
+
+Usage:
+  python tool/explore_catalogs.py
+  python tool/explore_catalogs.py --check
+  python tool/explore_catalogs.py --dir assets/quran --out build/explore_bundle.bin
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from collections.abc import Callable, Container, Mapping
+from typing import NamedTuple
+
+from quran_corpus import DEFAULT_DIR, ayah_ordinal
+
+DEFAULT_OUT = os.path.join("build", "explore_bundle.bin")
+BUNDLE_VERSION = 1
+LANGUAGES = ("id", "en", "zh", "ja")
+TRIGGER_TYPES = {
+    "weekday": ("weekday",),
+    "hijri_month": ("month",),
+    "hijri_day": ("month", "day"),
+    "time_of_day": ("period",),
+}
+
+
+class Field(NamedTuple):
+    name: str
+    # str | int | text | refs | trigger
+    kind: str
+    required: bool = True
+
+
+class Schema(NamedTuple):
+    name: str
+    path: str
+    fields: tuple[Field, ...]
+    # Catalog fields searchExploreContent matches, in its order; empty for
+    # catalogs it does not search
+    search: tuple[str, ...] = ("title", "summary")
+    unique_ranges: bool = False
+    check: Callable[[list[dict]], list[str]] | None = None
+
+
+def _daily_theme(entries: list[dict]) -> list[str]:
+    return [
+        f"{e.get('id')}: daily dua without a theme"
+        for e in entries
+        if e.get("category") == "daily" and not e.get("theme")
+    ]
+
+
+def _asma_numbers(entries: list[dict]) -> list[str]:
+    errors: list[str] = []
+    seen: set[int] = set()
+    for e in entries:
+        number = e.get("number")
+        if isinstance(number, int):
+            if number in seen:
+                errors.append(f"{e.get('id')}: duplicate number {number}")
+            if not 1 <= number <= 99:
+                errors.append(f"{e.get('id')}: number {number} outside 1..99")
+            seen.add(number)
+    if len(entries) != 99:
+        errors.append(f"expected 99 entries, got {len(entries)}")
+    return errors
+
+
+_TEXTS = (Field("title", "text"), Field("summary", "text"))
+_REFLECTION = (
+    Field("id", "str"),
+    Field("sort", "int", False),
+    Field("priority", "int", False),
+    Field("badgeKey", "str", False),
+    *_TEXTS,
+    Field("reflection", "text"),
+    Field("ayahRefs", "refs"),
+    Field("trigger", "trigger", False),
+)
+
+SCHEMAS: tuple[Schema, ...] = (
+    Schema(
+        "duas",
+        "assets/duas/duas_catalog.json",
+        (
+            Field("id", "str"),
+            Field("category", "str"),
+            Field("prophet", "str", False),
+            Field("theme", "str", False),
+            Field("sort", "int", False),
+            *_TEXTS,
+            Field("ayahRefs", "refs"),
+        ),
+        unique_ranges=True,
+        check=_daily_theme,
+    ),
+    Schema(
+        "science",
+        "assets/science/science_catalog.json",
+        (
+            Field("id", "str"),
+            Field("category", "str"),
+            Field("sort", "int", False),
+            *_TEXTS,
+            Field("scienceNote", "text"),
+            Field("ayahRefs", "refs"),
+        ),
+        search=("title", "summary", "scienceNote"),
+        unique_ranges=True,
+    ),
+    Schema(
+        "themes",
+        "assets/themes/life_themes_catalog.json",
+        (
+            Field("id", "str"),
+            Field("category", "str"),
+            Field("sort", "int", False),
+            *_TEXTS,
+            Field("reflection", "text"),
+            Field("ayahRefs", "refs"),
+        ),
+        search=("title", "summary", "reflection"),
+    ),
+    Schema("calendar_lenses", "assets/reflection/calendar_lenses_catalog.json", _REFLECTION, search=()),
+    Schema("weekly_rotation", "assets/reflection/weekly_rotation_catalog.json", _REFLECTION, search=()),
+    Schema(
+        "asma",
+        "assets/asma/asmaul_husna_catalog.json",
+        (
+            Field("id", "str"),
+            Field("number", "int"),
+            Field("sort", "int", False),
+            Field("arabic", "str"),
+            Field("transliteration", "str"),
+            *_TEXTS,
+            Field("reflection", "text"),
+            Field("ayahRefs", "refs"),
+        ),
+        search=("title", "summary", "reflection", "transliteration", "arabic", "number"),
+        check=_asma_numbers,
+    ),
+)
+
+
+def _check_field(field: Field, value: object, keys: Container[tuple[int, int]]) -> list[str]:
+    kind = field.kind
+    if kind == "str":
+        return [] if isinstance(value, str) and value else [f"{field.name} must be a non-empty string"]
+    if kind == "int":
+        ok = isinstance(value, int) and not isinstance(value, bool)
+        return [] if ok else [f"{field.name} must be an integer"]
+    if kind == "text":
+        if not isinstance(value, dict):
+            return [f"{field.name} must be an object"]
+        return [
+            f"{field.name}.{lang} must be a non-empty string"
+            for lang in LANGUAGES
+            if not (isinstance(value.get(lang), str) and value[lang])
+        ]
+    if kind == "refs":
+        if not isinstance(value, list) or not value:
+            return [f"{field.name} must be a non-empty list"]
+        errors: list[str] = []
+        for ref in value:
+            errors.extend(f"{field.name}: {e}" for e in _check_ref(ref, keys))
+        return errors
+    if kind == "trigger":
+        if not isinstance(value, dict) or value.get("type") not in TRIGGER_TYPES:
+            return [f"trigger.type must be one of {', '.join(TRIGGER_TYPES)}"]
+        needs = TRIGGER_TYPES[value["type"]]
+        return [f"trigger {value['type']} needs {name}" for name in needs if value.get(name) is None]
+    raise ValueError(f"unknown field kind {kind!r}")
+
+
+def _check_ref(ref: object, keys: Container[tuple[int, int]]) -> list[str]:
+    if not isinstance(ref, dict):
+        return ["ayahRef must be an object"]
+    surah, first = ref.get("surah"), ref.get("from")
+    last = ref.get("to", first)
+    if not all(isinstance(v, int) for v in (surah, first, last)):
+        return [f"ayahRef {ref} needs integer surah/from/to"]
+    if last < first:
+        return [f"{surah}:{first}-{last} ends before it starts"]
+    missing = [a for a in (first, last) if (surah, a) not in keys]
+    if missing:
+        return [f"{surah}:{missing[0]} is not in the verse corpus"]
+    return []
+
+
+def range_key(refs: list[dict]) -> str:
+    """ScienceEntry/DuaEntry.rangeKey()."""
+    return "|".join(f"{r['surah']}:{r['from']}:{r.get('to', r['from'])}" for r in refs)
+
+
+def validate(schema: Schema, catalog: object, keys: Container[tuple[int, int]]) -> list[str]:
+    """Schema errors for one catalog, each prefixed with its entry id."""
+    if not isinstance(catalog, dict) or not isinstance(catalog.get("entries"), list):
+        return [f"{schema.name}: top level must be an object with an entries list"]
+    if "version" in catalog and not isinstance(catalog["version"], int):
+        return [f"{schema.name}: version must be an integer"]
+    errors: list[str] = []
+    ids: set[str] = set()
+    ranges: dict[str, str] = {}
+    entries = catalog["entries"]
+    for k, entry in enumerate(entries):
+        if not isinstance(entry, dict):
+            errors.append(f"{schema.name}[{k}]: entry must be an object")
+            continue
+        label = f"{schema.name}/{entry.get('id', k)}"
+        for field in schema.fields:
+            if field.name not in entry or entry[field.name] is None:
+                if field.required:
+                    errors.append(f"{label}: missing {field.name}")
+                continue
+            errors.extend(f"{label}: {e}" for e in _check_field(field, entry[field.name], keys))
+        entry_id = entry.get("id")
+        if isinstance(entry_id, str):
+            if entry_id in ids:
+                errors.append(f"{label}: duplicate id")
+            ids.add(entry_id)
+        if schema.unique_ranges and isinstance(entry.get("ayahRefs"), list) and entry["ayahRefs"]:
+            try:
+                key = range_key(entry["ayahRefs"])
+            except (KeyError, TypeError):
+                continue
+            if key in ranges:
+                errors.append(f"{label}: duplicate ayah range {key} ({ranges[key]})")
+            ranges[key] = str(entry_id)
+    if schema.check and not errors:
+        errors.extend(f"{schema.name}: {e}" for e in schema.check(entries))
+    return errors
+
+
+def resolve(catalog: dict) -> dict:
+    """The catalog with "o": [first, last] ordinals on every ayahRef."""
+    entries = []
+    for entry in catalog["entries"]:
+        refs = [
+            {**ref, "o": [ayah_ordinal(ref["surah"], ref["from"]), ayah_ordinal(ref["surah"], ref.get("to", ref["from"]))]}
+            for ref in entry["ayahRefs"]
+        ]
+        entries.append({**entry, "ayahRefs": refs})
+    return {**catalog, "entries": entries}
+
+
+def search_key(entry: Mapping, fields: tuple[str, ...]) -> str:
+    """Lowercased text of the searched fields, one value per line."""
+    parts: list[str] = []
+    for field in fields:
+        value = entry[field]
+        if isinstance(value, dict):
+            parts.extend(value[lang].lower() for lang in LANGUAGES)
+        else:
+            parts.append(str(value).lower())
+    return "\n".join(parts)
+
+
+def _minify(data: object) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def compile_bundle(catalogs: Mapping[str, dict]) -> bytes:
+    segments: dict[str, dict] = {}
+    body = bytearray()
+    search: dict[str, list[str]] = {}
+    for schema in SCHEMAS:
+        catalog = catalogs[schema.name]
+        raw = _minify(resolve(catalog))
+        segments[schema.name] = {
+            "offset": len(body),
+            "length": len(raw),
+            "entries": len(catalog["entries"]),
+            "version": catalog.get("version", 1),
+        }
+        body += raw
+        if schema.search:
+            search[schema.name] = [search_key(e, schema.search) for e in catalog["entries"]]
+    raw = _minify(search)
+    segments["search"] = {"offset": len(body), "length": len(raw)}
+    body += raw
+    header = _minify({"version": BUNDLE_VERSION, "segments": segments})
+    return header + b"\n" + bytes(body)
+
+
+def read_segment(bundle: bytes, name: str) -> object:
+    """Parse the header line and then only the named segment."""
+    end = bundle.index(b"\n")
+    header = json.loads(bundle[:end])
+    seg = header["segments"][name]
+    start = end + 1 + seg["offset"]
+    return json.loads(bundle[start : start + seg["length"]])
+
+
+def corpus_keys(root: str) -> set[tuple[int, int]]:
+    from verse_store import VerseStore
+
+    store = VerseStore.from_shards(root)
+    return set(zip(store.ints["s"], store.ints["a"]))
+
+
+def load_catalogs(root: str = ".") -> tuple[dict[str, dict], dict[str, int], list[str]]:
+    catalogs: dict[str, dict] = {}
+    sizes: dict[str, int] = {}
+    errors: list[str] = []
+    for schema in SCHEMAS:
+        path = os.path.join(root, schema.path)
+        try:
+            with open(path, "rb") as f:
+                raw = f.read()
+            catalogs[schema.name] = json.loads(raw)
+            sizes[schema.name] = len(raw)
+        except FileNotFoundError:
+            errors.append(f"{schema.name}: missing {schema.path}")
+        except json.JSONDecodeError as err:
+            errors.append(f"{schema.name}: {schema.path} is not JSON: {err}")
+    return catalogs, sizes, errors
+
+
+def report(sizes: Mapping[str, int], bundle: bytes) -> list[str]:
+    header = bundle.index(b"\n") + 1
+    before = sum(sizes.values())
+    segments = json.loads(bundle[: header - 1])["segments"]
+    lines = [f"{'catalog':<16} {'source':>9} {'segment':>9}"]
+    for schema in SCHEMAS:
+        lines.append(f"{schema.name:<16} {sizes[schema.name]:>9,} {segments[schema.name]['length']:>9,}")
+    lines.append(f"{'search keys':<16} {'':>9} {segments['search']['length']:>9,}")
+    lines.append(f"bundle {len(bundle):,} bytes for {before:,} bytes of catalogs")
+    lines.append(
+        f"parsed at startup once the app reads the bundle: {before:,} -> {header:,} bytes (header only)"
+    )
+    return lines
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", default=DEFAULT_DIR, help="verse shards for reference checks")
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    parser.add_argument("--check", action="store_true", help="validate only")
+    args = parser.parse_args()
+
+    catalogs, sizes, errors = load_catalogs()
+    if not errors:
+        keys = corpus_keys(args.dir)
+        for schema in SCHEMAS:
+            errors.extend(validate(schema, catalogs[schema.name], keys))
+    for error in errors:
+        print(error)
+    if errors:
+        print(f"{len(errors)} catalog errors", file=sys.stderr)
+        return 1
+    entries = sum(len(c["entries"]) for c in catalogs.values())
+    if args.check:
+        print(f"ok: {len(catalogs)} catalogs, {entries} entries")
+        return 0
+    bundle = compile_bundle(catalogs)
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "wb") as f:
+        f.write(bundle)
+    print("\n".join(report(sizes, bundle)))
+    print(f"Wrote {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -7,23 +7,83 @@ index_pages.json, and manifest_multi.json.
 Schema: JSON array of {s, a, ar, tr, m}. ar is text_uthmani only.
 Omits tj, tl, and tl_tj. Does not request text_uthmani_tajweed or words.
 
+Translations are cleaned at build time with the app's TranslationCleaner
+rules (translation_clean.py) and the manifest sets translationsCleaned, so
+the importer stores them as-is. --footnotes keeps the removed footnote
+markers in footnotes.json; --raw-translations writes the API text.
+
+--layout split writes ar/sNNN.json (Arabic + metadata) and one
+tr/<code>/sNNN.json set per translation instead, listed under "shards" in
+the manifest; see verse_shards.py for the format and loader.
+--page-shards / --juz-shards also write pages/pNNN.json and juz/jNN.json
+(see page_shards.py), checked against index_pages.json / index_juz.json.
+--reading-tables adds reading_tables.json: cumulative word, letter and
+translation-character counts per ayah for progress and reading-time
+lookups (see reading_tables.py). --word-index adds word_index.bin: UTF-16
+and UTF-8 offsets of every word of `ar` plus normalized-word postings for
+exact-word search (see word_index.py).
+
+--variants FILE builds several app flavors from one fetch. The file is
+{"variants": [...]}; each variant has a name, an out_dir, optional
+translations (codes from TRANSLATION_META or {"code", "id", "name",
+"language"} objects; all four by default) and optional overrides of
+layout, raw_translations, footnotes, page_shards, juz_shards,
+reading_tables, word_index and also_bundled. The chapters are fetched once
+with the union of every variant's translation ids, the variants are built
+--jobs at a time in worker processes and then written by as many threads,
+and a file whose bytes match one already written for another variant is
+hardlinked to it. A variant's manifest records its name under "variant"
+and, under "query", the request for its own translations. Two variants
+may not share an out_dir.
+
+--trace PATH (or QURAN_TRACE=PATH) writes a Chrome trace-event file of the
+fetch, decode, map, validate, clean, index, encode and write stages (see
+trace_spans.py).
+
+The manifest's "fingerprint" holds the SHA-256 and size of every file
+written plus a Merkle root over them; verify_dataset.py checks a directory
+against it.
+
 Usage:
   python tool/generate_quran_json.py
   python tool/generate_quran_json.py --out-dir assets/quran
+  python tool/generate_quran_json.py --footnotes
+  python tool/generate_quran_json.py --layout split
+  python tool/generate_quran_json.py --page-shards --juz-shards
+  python tool/generate_quran_json.py --reading-tables
+  python tool/generate_quran_json.py --word-index
+  python tool/generate_quran_json.py --trace build/trace.json
+  python tool/generate_quran_json.py --variants build/variants.json --jobs 4
 """
 
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
+import os
 import sys
+import threading
 import time
 import urllib.error
 import urllib.parse
 import urllib.request
-from collections import defaultdict
+from collections.abc import Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import NamedTuple
+
+import trace_spans
+from corpus_rules import Validator, default_rules, format_violations
+from page_shards import JUZ_PATTERN, PAGE_PATTERN, check_shards, shard_outputs
+from quran_corpus import AYAH_TOTAL, EXPECTED_AYAHS, SURAH_COUNT, build_indexes
+from reading_tables import FILE_NAME as READING_TABLES_FILE, ReadingTables
+from trace_spans import span
+from translation_clean import clean, clean_with_footnotes
+from verify_dataset import encode_json, file_entry, fingerprint
+from verse_shards import shard_manifest, split_outputs
+from word_index import FILE_NAME as WORD_INDEX_FILE, build_index
 
 BASE_URL = "https://api.quran.com/api/v4/verses/by_chapter/{chapter}"
 FIELDS = (
@@ -47,21 +107,14 @@ TRANSLATION_META = {
     "zh": {"id": 109, "name": "Muhammad Makin", "language": "chinese"},
     "ja": {"id": 35, "name": "Ryoichi Mita", "language": "japanese"},
 }
+VERSION = "v10-uthmani+EN(SI)+ID(KEMENAG)+ZH(MaJian)+JA(Mita)-no-tajweed-in-json-no-tl"
 PER_PAGE = 50
-EXPECTED_AYAHS = (
-    7, 286, 200, 176, 120, 165, 206, 75, 129, 109, 123, 111, 43, 52, 99,
-    128, 111, 110, 98, 135, 112, 78, 118, 64, 77, 227, 93, 88, 69, 60, 34,
-    30, 73, 54, 45, 83, 182, 88, 75, 85, 54, 53, 89, 59, 37, 35, 38, 29,
-    18, 45, 60, 49, 62, 55, 78, 96, 29, 22, 24, 13, 14, 11, 11, 18, 12,
-    12, 30, 52, 52, 44, 28, 28, 20, 56, 40, 31, 50, 40, 46, 42, 29, 19,
-    36, 25, 22, 17, 19, 26, 30, 20, 15, 21, 11, 8, 8, 19, 5, 8, 8, 11, 11,
-    8, 3, 9, 5, 4, 7, 3, 6, 3, 5, 4, 5, 6,
-)
+FOOTNOTES_FILE = "footnotes.json"
 USER_AGENT = "quran-offline-mobile-generate-quran-json/1.0"
 MAX_RETRIES = 8
 
 
-def map_verse(api_verse: dict) -> dict:
+def map_verse(api_verse: dict, codes: Mapping[int, str] = TR_CODE_BY_RESOURCE_ID) -> dict:
     key = api_verse.get("verse_key") or ""
     parts = str(key).split(":")
     if len(parts) != 2:
@@ -77,11 +130,11 @@ def map_verse(api_verse: dict) -> dict:
     tr: dict[str, str] = {}
     for item in api_verse.get("translations") or []:
         rid = item.get("resource_id")
-        code = TR_CODE_BY_RESOURCE_ID.get(rid)
+        code = codes.get(rid)
         text = item.get("text")
         if code and isinstance(text, str):
             tr[code] = text
-    missing = [c for c in ("en", "id", "zh", "ja") if c not in tr]
+    missing = [c for c in codes.values() if c not in tr]
     if missing:
         raise ValueError(f"missing translations {missing} for {key}")
 
@@ -89,12 +142,7 @@ def map_verse(api_verse: dict) -> dict:
         "s": surah,
         "a": ayah,
         "ar": ar,
-        "tr": {
-            "en": tr["en"],
-            "id": tr["id"],
-            "zh": tr["zh"],
-            "ja": tr["ja"],
-        },
+        "tr": {c: tr[c] for c in codes.values()},
         "m": {
             "juz": int(api_verse["juz_number"]),
             "page": int(api_verse["page_number"]),
@@ -104,33 +152,6 @@ def map_verse(api_verse: dict) -> dict:
     }
 
 
-def build_indexes(all_verses: list[dict]) -> tuple[dict, dict]:
-    juz_map: dict[int, list[tuple[int, int]]] = defaultdict(list)
-    page_map: dict[int, list[tuple[int, int]]] = defaultdict(list)
-    for v in all_verses:
-        meta = v["m"]
-        juz_map[meta["juz"]].append((v["s"], v["a"]))
-        page_map[meta["page"]].append((v["s"], v["a"]))
-
-    def ranges(groups: dict[int, list[tuple[int, int]]]) -> dict[str, list]:
-        out: dict[str, list] = {}
-        for num in sorted(groups):
-            items = groups[num]
-            packed: list[dict] = []
-            cur_s, start, prev = items[0][0], items[0][1], items[0][1]
-            for s, a in items[1:]:
-                if s == cur_s and a == prev + 1:
-                    prev = a
-                    continue
-                packed.append({"s": cur_s, "a1": start, "a2": prev})
-                cur_s, start, prev = s, a, a
-            packed.append({"s": cur_s, "a1": start, "a2": prev})
-            out[str(num)] = packed
-        return out
-
-    return ranges(juz_map), ranges(page_map)
-
-
 def fetch_json(url: str) -> dict:
     req = urllib.request.Request(
         url,
@@ -143,8 +164,11 @@ def fetch_json(url: str) -> dict:
     delay = 1.0
     for attempt in range(1, MAX_RETRIES + 1):
         try:
-            with urllib.request.urlopen(req, timeout=90) as resp:
-                return json.load(resp)
+            with span("fetch", url=url, attempt=attempt):
+                with urllib.request.urlopen(req, timeout=90) as resp:
+                    body = resp.read()
+            with span("decode", bytes=len(body)):
+                return json.loads(body)
         except urllib.error.HTTPError as err:
             last_err = err
             if err.code in (429, 500, 502, 503, 504) and attempt < MAX_RETRIES:
@@ -172,20 +196,21 @@ def fetch_json(url: str) -> dict:
     raise RuntimeError(f"fetch failed: {last_err}")
 
 
-def fetch_chapter(chapter: int) -> list[dict]:
+def fetch_query(resource_ids: Sequence[int]) -> dict:
+    return {
+        "language": "en",
+        "words": "false",
+        "translations": ",".join(str(i) for i in resource_ids),
+        "fields": FIELDS,
+        "per_page": PER_PAGE,
+    }
+
+
+def fetch_chapter(chapter: int, resource_ids: Sequence[int] = TRANSLATION_IDS) -> list[dict]:
     verses: list[dict] = []
     page = 1
     while True:
-        params = urllib.parse.urlencode(
-            {
-                "language": "en",
-                "words": "false",
-                "translations": ",".join(str(i) for i in TRANSLATION_IDS),
-                "fields": FIELDS,
-                "per_page": PER_PAGE,
-                "page": page,
-            }
-        )
+        params = urllib.parse.urlencode({**fetch_query(resource_ids), "page": page})
         url = f"{BASE_URL.format(chapter=chapter)}?{params}"
         payload = fetch_json(url)
         batch = payload.get("verses") or []
@@ -199,91 +224,201 @@ def fetch_chapter(chapter: int) -> list[dict]:
     return verses
 
 
-def assert_schema(verse: dict) -> None:
-    forbidden = {"tj", "tl", "tl_tj"}
-    extra = forbidden.intersection(verse)
-    if extra:
-        raise ValueError(f"forbidden keys present: {extra}")
-    if set(verse) != {"s", "a", "ar", "tr", "m"}:
-        raise ValueError(f"unexpected verse keys: {sorted(verse)}")
-    if "\u0672" in verse["ar"]:
-        raise ValueError(f"{verse['s']}:{verse['a']} ar contains U+0672")
+def validate_corpus(
+    by_surah: dict[int, list[dict]], codes: Sequence[str] = tuple(TRANSLATION_META)
+) -> None:
+    """Build gate: every corpus_rules violation, or nothing is written."""
+    violations = Validator(default_rules(codes)).check(
+        (f"s{chapter:03d}.json", v)
+        for chapter, verses in sorted(by_surah.items())
+        for v in verses
+    )
+    if violations:
+        for line in format_violations(violations):
+            print(f"  {line}", file=sys.stderr)
+        raise SystemExit(f"{len(violations)} corpus rule violations; nothing written")
+
+
+def clean_translations(
+    by_surah: dict[int, list[dict]], footnotes: bool = False
+) -> dict[str, dict[str, list[dict]]]:
+    """Apply TranslationCleaner rules in place; return footnote markers by verse."""
+    sidecar: dict[str, dict[str, list[dict]]] = {}
+    for verses in by_surah.values():
+        for v in verses:
+            tr = v["tr"]
+            for code, text in tr.items():
+                if not footnotes:
+                    tr[code] = clean(text)
+                    continue
+                tr[code], notes = clean_with_footnotes(text)
+                if notes:
+                    key = f"{v['s']}:{v['a']}"
+                    sidecar.setdefault(key, {})[code] = [n._asdict() for n in notes]
+    return sidecar
+
+
+class Variant(NamedTuple):
+    """One app flavor: its translation set, output options and directory."""
+
+    name: str
+    out_dir: str
+    translations: dict[str, dict]
+    layout: str = "combined"
+    raw_translations: bool = False
+    footnotes: bool = False
+    page_shards: bool = False
+    juz_shards: bool = False
+    reading_tables: bool = False
+    word_index: bool = False
+    also_bundled: str | None = None
+
+    @property
+    def codes(self) -> dict[int, str]:
+        """Translation code by API resource id."""
+        return {meta["id"]: code for code, meta in self.translations.items()}
+
+
+_OPTIONS = (
+    "layout", "raw_translations", "footnotes", "page_shards", "juz_shards",
+    "reading_tables", "word_index",
+)
 
 
-def write_json(path: Path, data: object) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    text = json.dumps(data, ensure_ascii=False, indent=2)
-    path.write_text(text + "\n", encoding="utf-8")
+def default_variant(args: argparse.Namespace) -> Variant:
+    return Variant(
+        name="default",
+        out_dir=args.out_dir,
+        translations=TRANSLATION_META,
+        also_bundled=args.also_bundled,
+        **{key: getattr(args, key) for key in _OPTIONS},
+    )
 
 
-def main() -> int:
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--out-dir", default="assets/quran")
-    parser.add_argument(
-        "--also-bundled",
-        default="data/bundled/quran",
-        help="also write here if the directory exists",
-    )
-    args = parser.parse_args()
-    out_dir = Path(args.out_dir)
-    out_dir.mkdir(parents=True, exist_ok=True)
+def load_variants(path: str, args: argparse.Namespace) -> list[Variant]:
+    """Variants from a --variants file; options left out fall back to the flags."""
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+    variants: list[Variant] = []
+    for entry in config.get("variants") or []:
+        name = entry.get("name")
+        if not name or "out_dir" not in entry:
+            raise SystemExit(f"{path}: every variant needs a name and an out_dir")
+        translations: dict[str, dict] = {}
+        for item in entry.get("translations") or TRANSLATION_META:
+            if isinstance(item, str):
+                if item not in TRANSLATION_META:
+                    raise SystemExit(f"{path}: {name}: unknown translation {item!r}")
+                translations[item] = TRANSLATION_META[item]
+            else:
+                meta = {k: item[k] for k in ("id", "name", "language") if k in item}
+                if "code" not in item or not isinstance(meta.get("id"), int):
+                    raise SystemExit(f"{path}: {name}: translation needs a code and an integer id")
+                translations[item["code"]] = meta
+        variant = Variant(
+            name=name,
+            out_dir=entry["out_dir"],
+            translations=translations,
+            also_bundled=entry.get("also_bundled"),
+            **{key: entry.get(key, getattr(args, key)) for key in _OPTIONS},
+        )
+        if variant.layout not in ("combined", "split"):
+            raise SystemExit(f"{path}: {name}: unknown layout {variant.layout!r}")
+        if len(variant.codes) != len(translations):
+            raise SystemExit(f"{path}: {name}: two translations share a resource id")
+        variants.append(variant)
+    names = [v.name for v in variants]
+    if not variants or len(set(names)) != len(names):
+        raise SystemExit(f"{path}: expected variants with distinct names, got {names}")
+    owners: dict[str, str] = {}
+    for variant in variants:
+        out_dir = os.path.normcase(os.path.abspath(variant.out_dir))
+        if out_dir in owners:
+            raise SystemExit(
+                f"{path}: {owners[out_dir]} and {variant.name} both write to {variant.out_dir}"
+            )
+        owners[out_dir] = variant.name
+    return variants
 
-    query = {
-        "language": "en",
-        "words": "false",
-        "translations": ",".join(str(i) for i in TRANSLATION_IDS),
-        "fields": FIELDS,
-        "per_page": PER_PAGE,
-    }
-    fetched_at = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    mapped: list[dict] = []
-    by_surah: dict[int, list[dict]] = {}
 
+def resource_ids(variants: Sequence[Variant]) -> tuple[int, ...]:
+    """Every translation resource id any variant needs, in first-use order."""
+    return tuple(dict.fromkeys(rid for v in variants for rid in v.codes))
+
+
+def fetch_corpus(ids: Sequence[int]) -> dict[int, list[dict]]:
+    """Raw API verses by chapter, with every translation in `ids`."""
+    raw_by_surah: dict[int, list[dict]] = {}
     for chapter in range(1, 115):
         print(f"Fetching surah {chapter:03d} ...", flush=True)
-        raw = fetch_chapter(chapter)
+        with span("fetch_chapter", chapter=chapter):
+            raw = fetch_chapter(chapter, ids)
         expected = EXPECTED_AYAHS[chapter - 1]
         if len(raw) != expected:
             raise SystemExit(
                 f"surah {chapter}: expected {expected} verses, got {len(raw)}"
             )
-        chapter_verses = [map_verse(v) for v in raw]
-        for v in chapter_verses:
-            assert_schema(v)
-        by_surah[chapter] = chapter_verses
-        mapped.extend(chapter_verses)
+        raw_by_surah[chapter] = raw
         time.sleep(0.15)
+    return raw_by_surah
+
 
-    if len(mapped) != 6236:
-        raise SystemExit(f"expected 6236 verses, got {len(mapped)}")
-
-    samples = {(1, 1), (1, 6), (6, 44)}
-    for v in mapped:
-        if (v["s"], v["a"]) in samples:
-            if "\u0670" not in v["ar"] and (v["s"], v["a"]) != (1, 1):
-                # 1:1 also has dagger alif in Al-Rahman; still check 1:6 and 6:44
-                pass
-    for s, a in ((1, 6), (6, 44)):
-        verse = next(v for v in mapped if v["s"] == s and v["a"] == a)
-        if "\u0670" not in verse["ar"]:
-            raise SystemExit(f"{s}:{a} missing U+0670 in ar")
-        if "\u0672" in verse["ar"]:
-            raise SystemExit(f"{s}:{a} has U+0672 in ar")
-
-    for chapter, verses in by_surah.items():
-        write_json(out_dir / f"s{chapter:03d}.json", verses)
-
-    index_juz, index_pages = build_indexes(mapped)
-    if len(index_juz) != 30:
-        raise SystemExit(f"expected 30 juz, got {len(index_juz)}")
-    if len(index_pages) != 604:
-        raise SystemExit(f"expected 604 pages, got {len(index_pages)}")
+def build_variant(
+    variant: Variant, raw_by_surah: dict[int, list[dict]], fetched_at: str
+) -> tuple[dict[str, bytes], dict]:
+    """Every file of one variant, encoded, and its manifest (also in the files).
 
+    The manifest's query names only this variant's translations, the
+    request that would fetch it alone, not the shared union fetch.
+    """
+    codes = variant.codes
+    languages = tuple(variant.translations)
+    mapped: list[dict] = []
+    by_surah: dict[int, list[dict]] = {}
+    for chapter, raw in raw_by_surah.items():
+        with span("map", chapter=chapter, variant=variant.name):
+            chapter_verses = [map_verse(v, codes) for v in raw]
+        by_surah[chapter] = chapter_verses
+        mapped.extend(chapter_verses)
+
+    with span("validate", variant=variant.name):
+        validate_corpus(by_surah, languages)
+    footnotes: dict[str, dict[str, list[dict]]] | None = None
+    if not variant.raw_translations:
+        with span("clean", variant=variant.name):
+            footnotes = clean_translations(by_surah, variant.footnotes)
+
+    if variant.layout == "split":
+        outputs = split_outputs(by_surah, languages)
+    else:
+        outputs = {
+            f"s{chapter:03d}.json": verses for chapter, verses in by_surah.items()
+        }
+
+    with span("index", variant=variant.name):
+        index_juz, index_pages = build_indexes(mapped)
+    if variant.page_shards or variant.juz_shards:
+        with span("index", what="shards", variant=variant.name):
+            shards = shard_outputs(mapped, variant.page_shards, variant.juz_shards)
+            problems = check_shards(mapped, shards, index_juz, index_pages)
+        if problems:
+            for line in problems:
+                print(f"  {line}", file=sys.stderr)
+            raise SystemExit(f"{len(problems)} page/juz shard problems; nothing written")
+        outputs.update(shards)
+
+    if variant.translations == TRANSLATION_META:
+        version = VERSION
+    else:
+        labels = "+".join(
+            f"{code.upper()}({meta['id']})" for code, meta in variant.translations.items()
+        )
+        version = f"v10-uthmani+{labels}-no-tajweed-in-json-no-tl"
     manifest = {
-        "version": "v10-uthmani+EN(SI)+ID(KEMENAG)+ZH(MaJian)+JA(Mita)-no-tajweed-in-json-no-tl",
+        "version": version,
         "source": "Quran Foundation / Quran.com API v4",
         "endpoint": "https://api.quran.com/api/v4/verses/by_chapter/{n}",
-        "query": query,
+        "query": fetch_query(tuple(codes)),
         "script": "text_uthmani",
         "arabicField": "text_uthmani",
         "omittedJsonFields": ["tj", "tl", "tl_tj"],
@@ -291,27 +426,247 @@ def main() -> int:
         "hasTransliteration": False,
         "transliterationNote": "On-screen transliteration is QUL transliteration-tajweed.db, not JSON tl",
         "fetchedAtUtc": fetched_at,
-        "translations": TRANSLATION_META,
-        "translationIds": list(TRANSLATION_IDS),
-        "surahCount": 114,
-        "ayahTotal": 6236,
-        "files": 114,
+        "translations": variant.translations,
+        "translationIds": list(codes),
+        "surahCount": SURAH_COUNT,
+        "ayahTotal": AYAH_TOTAL,
+        "files": SURAH_COUNT,
+        "layout": variant.layout,
+        "translationsCleaned": not variant.raw_translations,
     }
-    write_json(out_dir / "index_juz.json", index_juz)
-    write_json(out_dir / "index_pages.json", index_pages)
-    write_json(out_dir / "manifest_multi.json", manifest)
-
-    bundled = Path(args.also_bundled)
-    if bundled.is_dir():
-        print(f"Also writing {bundled}", flush=True)
-        for chapter in range(1, 115):
-            write_json(bundled / f"s{chapter:03d}.json", by_surah[chapter])
-        write_json(bundled / "index_juz.json", index_juz)
-        write_json(bundled / "index_pages.json", index_pages)
-        write_json(bundled / "manifest_multi.json", manifest)
-
-    print(f"Wrote 114 files, {len(mapped)} verses to {out_dir}")
+    if variant.name != "default":
+        manifest["variant"] = variant.name
+    if variant.layout == "split":
+        manifest["files"] = SURAH_COUNT * (1 + len(languages))
+        manifest["shards"] = shard_manifest(languages)
+    if variant.page_shards:
+        manifest["pageShards"] = PAGE_PATTERN
+    if variant.juz_shards:
+        manifest["juzShards"] = JUZ_PATTERN
+    if variant.reading_tables:
+        with span("index", what="reading_tables", variant=variant.name):
+            outputs[READING_TABLES_FILE] = ReadingTables.from_verses(mapped).to_json()
+        manifest["readingTables"] = READING_TABLES_FILE
+    if footnotes is not None and variant.footnotes:
+        outputs[FOOTNOTES_FILE] = footnotes
+        manifest["footnotesFile"] = FOOTNOTES_FILE
+    outputs["index_juz.json"] = index_juz
+    outputs["index_pages.json"] = index_pages
+
+    with span("encode", files=len(outputs), variant=variant.name):
+        encoded = {name: encode_json(data) for name, data in outputs.items()}
+    if variant.word_index:
+        with span("index", what="word_index", variant=variant.name):
+            encoded[WORD_INDEX_FILE] = build_index(mapped)
+        manifest["wordIndex"] = WORD_INDEX_FILE
+    manifest["fingerprint"] = fingerprint(
+        {name: file_entry(raw) for name, raw in encoded.items()}, manifest
+    )
+    encoded["manifest_multi.json"] = encode_json(manifest)
+    return encoded, manifest
+
+
+_worker_corpus: tuple[dict[int, list[dict]], str] | None = None
+
+
+def _init_build_worker(
+    raw_by_surah: dict[int, list[dict]], fetched_at: str, trace_origin: int | None
+) -> None:
+    global _worker_corpus
+    _worker_corpus = raw_by_surah, fetched_at
+    trace_spans.start_worker(trace_origin)
+
+
+def _build_in_worker(variant: Variant) -> tuple[tuple[dict[str, bytes], dict], list[dict]]:
+    raw_by_surah, fetched_at = _worker_corpus
+    return build_variant(variant, raw_by_surah, fetched_at), trace_spans.take_events()
+
+
+def build_in_processes(
+    variants: Sequence[Variant], raw_by_surah: dict[int, list[dict]], fetched_at: str, jobs: int
+) -> list[tuple[dict[str, bytes], dict]]:
+    """build_variant for each variant in a process pool.
+
+    Mapping, cleaning and encoding are pure Python, so threads would take
+    turns on the GIL. Each worker receives the fetched corpus once, through
+    the pool initializer, and sends back encoded bytes and its spans.
+    """
+    with ProcessPoolExecutor(
+        max_workers=jobs,
+        initializer=_init_build_worker,
+        initargs=(raw_by_surah, fetched_at, trace_spans.origin()),
+    ) as pool:
+        results = list(pool.map(_build_in_worker, variants))
+    for _, events in results:
+        trace_spans.add_events(events)
+    return [built for built, _ in results]
+
+
+def write_file(path: Path, raw: bytes) -> None:
+    # Replace rather than rewrite in place: the old file may be a hardlink
+    # shared with another variant.
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(raw)
+    os.replace(tmp, path)
+
+
+class Writer:
+    """Writes files; with `link`, identical bytes are written once and hardlinked."""
+
+    def __init__(self, link: bool = False) -> None:
+        self.link = link
+        self.lock = threading.Lock()
+        self.first: dict[bytes, tuple[Path, threading.Event]] = {}
+        self.written = 0
+        self.linked = 0
+        self.linked_bytes = 0
+
+    def write(self, path: Path, raw: bytes) -> None:
+        if not self.link:
+            write_file(path, raw)
+            return
+        key = hashlib.sha256(raw).digest()
+        with self.lock:
+            first = self.first.get(key)
+            if first is None:
+                done = threading.Event()
+                self.first[key] = (path, done)
+        if first is None:
+            try:
+                write_file(path, raw)
+            finally:
+                done.set()
+            with self.lock:
+                self.written += 1
+            return
+        source, done = first
+        done.wait()
+        if source == path:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(path.name + ".tmp")
+            tmp.unlink(missing_ok=True)
+            os.link(source, tmp)
+            os.replace(tmp, path)
+        except OSError:
+            write_file(path, raw)
+            with self.lock:
+                self.written += 1
+            return
+        with self.lock:
+            self.linked += 1
+            self.linked_bytes += len(raw)
+
+    def write_all(self, root: Path, encoded: dict[str, bytes]) -> None:
+        with span("write", dir=str(root), files=len(encoded)):
+            for name, raw in encoded.items():
+                self.write(root / name, raw)
+
+
+def emit_variant(
+    variant: Variant, encoded: dict[str, bytes], manifest: dict, writer: Writer
+) -> list[str]:
+    out_dir = Path(variant.out_dir)
+    writer.write_all(out_dir, encoded)
+    lines = []
+    bundled = Path(variant.also_bundled) if variant.also_bundled else None
+    if bundled is not None and bundled.is_dir():
+        lines.append(f"Also writing {bundled}")
+        writer.write_all(bundled, encoded)
+    lines.append(f"Wrote {manifest['files']} files, {manifest['ayahTotal']} verses to {out_dir}")
+    lines.append(f"Dataset root: {manifest['fingerprint']['root']}")
+    return lines
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--out-dir", default="assets/quran")
+    parser.add_argument(
+        "--also-bundled",
+        default="data/bundled/quran",
+        help="also write here if the directory exists",
+    )
+    parser.add_argument(
+        "--raw-translations",
+        action="store_true",
+        help="keep API translation text as-is (app cleans at import)",
+    )
+    parser.add_argument(
+        "--footnotes",
+        action="store_true",
+        help=f"write removed footnote markers to {FOOTNOTES_FILE}",
+    )
+    parser.add_argument(
+        "--layout",
+        choices=("combined", "split"),
+        default="combined",
+        help="split: Arabic and each translation in separate shard sets",
+    )
+    parser.add_argument(
+        "--page-shards",
+        action="store_true",
+        help="also write one file per mushaf page (pages/pNNN.json)",
+    )
+    parser.add_argument(
+        "--juz-shards",
+        action="store_true",
+        help="also write one file per juz (juz/jNN.json)",
+    )
+    parser.add_argument(
+        "--reading-tables",
+        action="store_true",
+        help=f"also write cumulative reading lengths ({READING_TABLES_FILE})",
+    )
+    parser.add_argument(
+        "--word-index",
+        action="store_true",
+        help=f"also write word offsets and exact-word postings ({WORD_INDEX_FILE})",
+    )
+    parser.add_argument(
+        "--variants",
+        metavar="JSON",
+        help="build every app flavor in this file from one fetch (see module docs)",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=4,
+        help="variants built and written at once with --variants",
+    )
+    trace_spans.add_argument(parser)
+    args = parser.parse_args()
+    trace_spans.start(args.trace)
+    if args.variants:
+        variants = load_variants(args.variants, args)
+    else:
+        variants = [default_variant(args)]
+
+    ids = resource_ids(variants)
+    fetched_at = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+    raw_by_surah = fetch_corpus(ids)
+
+    # Build every variant before writing any, so one failing the corpus
+    # rules leaves all output directories untouched.
+    jobs = max(1, min(args.jobs, len(variants)))
+    if jobs == 1:
+        built = [build_variant(v, raw_by_surah, fetched_at) for v in variants]
+    else:
+        built = build_in_processes(variants, raw_by_surah, fetched_at, jobs)
+    writer = Writer(link=args.variants is not None)
+    with ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="variant") as pool:
+        reports = list(
+            pool.map(lambda vb: emit_variant(vb[0], *vb[1], writer), zip(variants, built))
+        )
+
+    for variant, lines in zip(variants, reports):
+        if len(variants) > 1:
+            print(f"[{variant.name}]")
+        print("\n".join(lines))
     print(f"Fetched UTC date: {fetched_at}")
+    if writer.linked:
+        print(f"Hardlinked {writer.linked} identical files ({writer.linked_bytes} bytes)")
     return 0
 
 
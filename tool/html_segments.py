@@ -0,0 +1,698 @@
+#!/usr/bin/env python3
+"""Pre-parse the QUL surah info and tafsir HTML into the app's segments.
+
+The reader parses HTML every time a panel opens: SurahInfoHtml.parse for
+surah info (surah_infos.text/short_text) and TafsirContentParser.parse
+for tafsir. This module ports both, with TafsirHtml.toPlainText and
+polishPlainText, rule for rule, and writes their results as JSON next to
+the bundles. The rendering rules flatten inline markup (**bold** markers
+and tags are stripped), so segments hold exactly what the panels show:
+
+  surah info  {"short", "sections": [{"title", "body"}], "supplementaryBody"?}
+              (the SurahQulInfoEntry.fromJson shape)
+  tafsir      {"sections": [{"title"?, "paragraphs": [{"label"?, "text"}]}],
+               "revelationType"?}
+
+A tafsir segment is parsed from the HTML TafsirRepository would use for
+that ayah (its own text, or its group's when empty) with the bundle's
+language, read from the file name prefix (en_ibn_kathir.sqlite -> en).
+
+Each bundle gets `<out-dir>/<name>.segments.sqlite`:
+
+  segments(key TEXT PRIMARY KEY, segment_id) WITHOUT ROWID
+                         surah_number or ayah_key -> segment
+  segment_texts(id INTEGER PRIMARY KEY, json)   each distinct segment once
+  segments_meta(key TEXT PRIMARY KEY, value)    kind, language, version
+
+--check re-parses the bundles and compares against existing sidecars;
+--bench compares per-entry HTML parse time with reading the segment
+back (synthetic bundles unless bundles are given).
+
+Usage:
+  python tool/html_segments.py
+  python tool/html_segments.py assets/tafsir/en_ibn_kathir.sqlite --out-dir build/html_segments
+  python tool/html_segments.py --check
+  python tool/html_segments.py --bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import json
+import os
+import random
+import re
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Iterator, Sequence
+
+from dart_regex import DART_TRIM, JS_DOT, JS_SPACE
+from optimize_tafsir import TafsirBundle
+
+DEFAULT_OUT = "build/html_segments"
+DEFAULT_BUNDLES = ("assets/quran/surah_info/*.sqlite", "assets/tafsir/*.sqlite")
+SEGMENTS_VERSION = 1
+SURAH_INFO_LANGUAGES = ("en", "id")
+TAFSIR_LANGUAGES = ("id", "en", "zh", "ja")
+
+# ASCII: Dart's \d, \w and \b are ASCII-only, as is its case folding here.
+_A = re.ASCII
+_I = re.ASCII | re.IGNORECASE
+_IS = re.ASCII | re.IGNORECASE | re.DOTALL
+
+
+def _trim(text: str) -> str:
+    return text.strip(DART_TRIM)
+
+
+# TafsirHtml
+
+_BR = re.compile(rf"<br[{JS_SPACE}]*/?>", _I)
+_P_END = re.compile(r"</p>", _I)
+_H_END = re.compile(r"</h[1-6]>", _I)
+_LI_END = re.compile(r"</li>", _I)
+_TAG = re.compile(r"<[^>]+>")
+_ENTITY = re.compile(r"&(#x[0-9a-fA-F]+|#\d+|\w+);", _A)
+_SPACE_BEFORE_NL = re.compile(r"[ \t]+\n")
+_NL3 = re.compile(r"\n{3,}")
+_HYPHEN_BREAK = re.compile(rf"-[{JS_SPACE}]*\n[{JS_SPACE}]*")
+_LONE_NL = re.compile(r"(?<!\n)\n(?!\n)")
+_SPACES2 = re.compile(r"[ \t]{2,}")
+_SPACE_BEFORE_PUNCT = re.compile(rf"[{JS_SPACE}]+([,.;:!?])")
+_NAMED_ENTITIES = {"amp": "&", "lt": "<", "gt": ">", "quot": '"', "apos": "'", "nbsp": " "}
+
+
+def _entity(match: re.Match) -> str:
+    token = match.group(1)
+    if token.startswith("#"):
+        code = int(token[2:], 16) if token.startswith("#x") else int(token[1:])
+        return chr(code) if code <= 0x10FFFF else match.group(0)
+    return _NAMED_ENTITIES.get(token, match.group(0))
+
+
+def to_plain_text(html: str | None) -> str:
+    """TafsirHtml.toPlainText."""
+    if html is None or not _trim(html):
+        return ""
+    text = _BR.sub("\n", html)
+    text = _P_END.sub("\n\n", text)
+    text = _H_END.sub("\n\n", text)
+    text = _LI_END.sub("\n", text)
+    text = _TAG.sub("", text)
+    text = _ENTITY.sub(_entity, text)
+    text = text.replace("\r", "")
+    text = _SPACE_BEFORE_NL.sub("\n", text)
+    text = _NL3.sub("\n\n", text)
+    return _trim(text)
+
+
+def polish_plain_text(text: str) -> str:
+    """TafsirHtml.polishPlainText."""
+    if not text:
+        return text
+    text = _HYPHEN_BREAK.sub("", text)
+    text = text.replace("\r", "")
+    text = _SPACE_BEFORE_NL.sub("\n", text)
+    text = _LONE_NL.sub(" ", text)
+    text = _SPACES2.sub(" ", text)
+    text = _SPACE_BEFORE_PUNCT.sub(r"\1", text)
+    text = _NL3.sub("\n\n", text)
+    return _trim(text)
+
+
+# SurahInfoHtml
+
+_H2 = re.compile(r"<h2[^>]*>(.*?)</h2>", _IS)
+_PARAGRAPH = re.compile(r"<p[^>]*>(.*?)</p>", _IS)
+_POKOK_MARKER = re.compile(rf"<h[1-3][^>]*>[{JS_SPACE}]*Pokok", _IS)
+_POKOK_LABELS = re.compile(
+    rf"^(Keimanan|Hukum-hukum|Hukum|Kisah-kisah|Kisah|Lain-lain)[{JS_SPACE}]*:?[{JS_SPACE}]*\Z", _I
+)
+_BOLD_HEADER = re.compile(rf"^[{JS_SPACE}]*\*{{2}}({JS_DOT}+?)\*{{2}}:?[{JS_SPACE}]*\Z", _A)
+_POKOK_HEADER = re.compile(rf"pokok[-{JS_SPACE}]*pokok[{JS_SPACE}]*isi", _I)
+_HUBUNGAN_HEADER = re.compile(rf"hubungan[{JS_SPACE}]+surat\b", _I)
+_H3_HUBUNGAN = re.compile(rf"<h3[^>]*>[{JS_SPACE}]*(Hubungan[^<]*)</h3>", _IS)
+_NUMBERED_LABEL = re.compile(rf"^(\d+)\.[{JS_SPACE}]*({JS_DOT}+?)[{JS_SPACE}]*:?[{JS_SPACE}]*\Z", _A)
+_TRAILING_COLON = re.compile(rf":[{JS_SPACE}]*\Z", _A)
+_STARS = re.compile(r"\*+")
+
+
+def _clean_text(text: str | None) -> str:
+    if text is None:
+        return ""
+    text = text.replace("\t", " ")
+    text = _STARS.sub("", text)
+    text = _SPACES2.sub(" ", text)
+    text = _NL3.sub("\n\n", text)
+    return _trim(text)
+
+
+def _join_body(existing: str, following: str) -> str:
+    return f"{existing}\n\n{following}" if existing else following
+
+
+def _hubungan_heading(header: str) -> str:
+    header = _trim(header)
+    return header if header.endswith(":") else f"{header}:"
+
+
+def _pokok_label(text: str) -> tuple[str, str] | None:
+    match = _NUMBERED_LABEL.search(_trim(text.replace("*", "")))
+    if match is None:
+        return None
+    label = _trim(match.group(2))
+    if not _POKOK_LABELS.search(label):
+        return None
+    return match.group(1), _trim(_TRAILING_COLON.sub("", label))
+
+
+def _is_pokok_marker(paragraph: str) -> bool:
+    return _POKOK_HEADER.search(_trim(paragraph.replace("*", ""))) is not None
+
+
+def _paragraphs(html: str) -> list[str]:
+    found = (_trim(to_plain_text(m.group(1))) for m in _PARAGRAPH.finditer(html))
+    return [p for p in found if p]
+
+
+def _h2_labels(html: str) -> list[tuple[re.Match, tuple[str, str] | None]]:
+    return [(m, _pokok_label(_trim(to_plain_text(m.group(1))))) for m in _H2.finditer(html)]
+
+
+def _pokok_from_h2(html: str, h2s: list[tuple[re.Match, tuple[str, str] | None]]) -> list[dict]:
+    sections: list[dict] = []
+    for i, (match, pokok) in enumerate(h2s):
+        if pokok is None:
+            continue
+        end = h2s[i + 1][0].start() if i + 1 < len(h2s) else len(html)
+        fragment = html[match.end() : end]
+        body = _clean_text(to_plain_text(fragment))
+        h3 = _H3_HUBUNGAN.search(fragment)
+        if h3 is not None:
+            heading = _hubungan_heading(_clean_text(to_plain_text(h3.group(1))))
+            if heading not in body:
+                body = _join_body(heading, body)
+        sections.append({"title": f"{pokok[0]}. {pokok[1]}:", "body": body})
+
+    if not sections or _HUBUNGAN_HEADER.search(sections[-1]["body"]):
+        return sections
+    h3 = _H3_HUBUNGAN.search(html)
+    if h3 is None:
+        return sections
+    last_end = None
+    for match, pokok in h2s:
+        if pokok is not None:
+            last_end = match.end()
+    if last_end is None or h3.start() < last_end:
+        return sections
+    hubungan = _clean_text(to_plain_text(html[h3.start() :]))
+    if hubungan and hubungan not in sections[-1]["body"]:
+        sections[-1] = {"title": sections[-1]["title"], "body": _join_body(sections[-1]["body"], hubungan)}
+    return sections
+
+
+def _pokok_from_paragraphs(html: str) -> list[dict]:
+    sections: list[dict] = []
+    current: dict | None = None
+    inside_hubungan = False
+    found_pokok = False
+    for paragraph in _paragraphs(html):
+        if _is_pokok_marker(paragraph):
+            found_pokok = True
+            continue
+        if not inside_hubungan:
+            pokok = _pokok_label(paragraph)
+            if pokok is not None:
+                found_pokok = True
+                if current is not None and (current["title"] or current["body"]):
+                    sections.append(current)
+                current = {"title": f"{pokok[0]}. {pokok[1]}:", "body": ""}
+                continue
+        bold = _BOLD_HEADER.search(paragraph)
+        if bold is not None:
+            header = _clean_text(bold.group(1))
+            if _POKOK_HEADER.search(header):
+                found_pokok = True
+                continue
+            if _HUBUNGAN_HEADER.search(header):
+                inside_hubungan = True
+                text = _hubungan_heading(header)
+                if current is not None:
+                    current = {"title": current["title"], "body": _join_body(current["body"], text)}
+                elif sections:
+                    last = sections.pop()
+                    sections.append({"title": last["title"], "body": _join_body(last["body"], text)})
+                continue
+        if not found_pokok or _is_pokok_marker(paragraph) or _pokok_label(paragraph) is not None:
+            continue
+        if current is not None:
+            current = {"title": current["title"], "body": _join_body(current["body"], _clean_text(paragraph))}
+    if current is not None and (current["title"] or current["body"]):
+        sections.append(current)
+    return sections
+
+
+def _supplementary_body(html: str) -> str:
+    parts: list[str] = []
+    after_marker = False
+    for paragraph in _paragraphs(html):
+        if _is_pokok_marker(paragraph):
+            after_marker = True
+            continue
+        if not after_marker or _pokok_label(paragraph) is not None:
+            continue
+        bold = _BOLD_HEADER.search(paragraph)
+        if bold is not None:
+            header = _clean_text(bold.group(1))
+            if _POKOK_HEADER.search(header):
+                continue
+            if _HUBUNGAN_HEADER.search(header):
+                parts.append(_hubungan_heading(header))
+                continue
+        parts.append(_clean_text(paragraph))
+    return _trim("\n\n".join(parts))
+
+
+def _intro(html: str) -> str:
+    marker = _POKOK_MARKER.search(html)
+    if marker is not None and marker.start() > 0:
+        return _clean_text(to_plain_text(html[: marker.start()]))
+    for match in _H2.finditer(html):
+        if _pokok_label(_trim(to_plain_text(match.group(1)))) is not None and match.start() > 0:
+            return _clean_text(to_plain_text(html[: match.start()]))
+    intro: list[str] = []
+    for paragraph in _paragraphs(html):
+        if _is_pokok_marker(paragraph) or _pokok_label(paragraph) is not None:
+            break
+        if _BOLD_HEADER.search(paragraph):
+            break
+        intro.append(_clean_text(paragraph))
+    return "\n\n".join(intro)
+
+
+def parse_surah_info(html: str | None, short_text: str | None, language: str) -> dict:
+    """SurahInfoHtml.parse as SurahQulInfoEntry JSON."""
+    raw = _trim(html or "")
+    short = _trim(short_text or "")
+    if short:
+        short = _clean_text(to_plain_text(short))
+    elif language == "id" and raw:
+        short = _intro(raw)
+
+    if language != "id":
+        sections = []
+        if raw:
+            h2s = list(_H2.finditer(raw))
+            for i, match in enumerate(h2s):
+                end = h2s[i + 1].start() if i + 1 < len(h2s) else len(raw)
+                title = _clean_text(to_plain_text(match.group(1)))
+                body = _clean_text(to_plain_text(raw[match.end() : end]))
+                if title or body:
+                    sections.append({"title": _trim(title), "body": _trim(body)})
+        return {"short": short, "sections": sections}
+
+    h2s = _h2_labels(raw)
+    if any(pokok is not None for _, pokok in h2s):
+        sections = _pokok_from_h2(raw, h2s)
+    else:
+        sections = _pokok_from_paragraphs(raw)
+    if sections:
+        return {"short": short, "sections": sections}
+    supplementary = _supplementary_body(raw)
+    if supplementary:
+        return {"short": short, "sections": [], "supplementaryBody": supplementary}
+    if raw:
+        body = _clean_text(to_plain_text(raw))
+        if body:
+            return {"short": short or body, "sections": []}
+    return {"short": short, "sections": []}
+
+
+# TafsirContentParser
+
+_BLOCK = re.compile(r"<(p|div)([^>]*)>(.*?)</\1>", _IS)
+_LANG = re.compile(r"""lang=["']([^"']+)["']""", _I)
+_CLASS = re.compile(r"""class=["']([^"']+)["']""", _I)
+_LABEL = re.compile(rf"^\((\d+)\)[{JS_SPACE}]*", _A)
+_METADATA = re.compile(
+    rf"^(makkiyah|madaniyah|madaniyyah|mad\u0131niyah)[{JS_SPACE}]*\.?\Z", _I
+)
+_PREFERRED = {"id": ("id", "ms"), "en": ("en",), "zh": ("zh", "zh-cn", "zh-hans"), "ja": ("ja",)}
+_EXCLUDED = {
+    "id": {"jv", "hi-latn", "ar", "en", "gd"},
+    "en": {"jv", "ar", "ms", "id", "gd"},
+    "zh": {"jv", "en", "ar", "ms", "id", "gd"},
+    "ja": {"jv", "en", "ar", "ms", "id", "gd"},
+}
+
+
+def _include_block(lang: str | None, language: str) -> bool:
+    if lang is not None and lang in _EXCLUDED.get(language, ()):
+        return False
+    if lang is not None:
+        return lang in _PREFERRED.get(language, (language,))
+    return language in ("zh", "ja")
+
+
+def _split_by_headings(html: str) -> list[tuple[str | None, str]]:
+    matches = list(_H2.finditer(html))
+    if not matches:
+        return [(None, html)]
+    segments: list[tuple[str | None, str]] = []
+    cursor = 0
+    for i, match in enumerate(matches):
+        if match.start() > cursor:
+            before = html[cursor : match.start()]
+            if _trim(before):
+                segments.append((None, before))
+        title = polish_plain_text(to_plain_text(match.group(1)))
+        following = matches[i + 1].start() if i + 1 < len(matches) else len(html)
+        segments.append((title or None, html[match.end() : following]))
+        cursor = following
+    return segments
+
+
+def parse_tafsir(html: str | None, language: str) -> dict:
+    """TafsirContentParser.parse as JSON; null fields are left out."""
+    raw = _trim(html or "")
+    if not raw:
+        return {"sections": []}
+    sections: list[dict] = []
+    revelation: str | None = None
+    for title, segment in _split_by_headings(raw):
+        paragraphs: list[dict] = []
+        for block in _BLOCK.finditer(segment):
+            attrs = block.group(2)
+            lang = _LANG.search(attrs)
+            classes = _CLASS.search(attrs)
+            classes = classes.group(1) if classes else ""
+            if "translation" in classes or "qpc-hafs" in classes:
+                continue
+            plain = polish_plain_text(to_plain_text(block.group(3)))
+            if not plain:
+                continue
+            if _METADATA.search(plain):
+                if revelation is None:
+                    revelation = "Madaniyah" if _trim(plain).lower().startswith("mad") else "Makkiyah"
+                continue
+            if not _include_block(lang.group(1).lower() if lang else None, language):
+                continue
+            label = _LABEL.search(plain)
+            if label is not None:
+                paragraphs.append({"label": f"({label.group(1)})", "text": _trim(plain[label.end() :])})
+            else:
+                paragraphs.append({"text": plain})
+        if paragraphs or title is not None:
+            section: dict = {"title": title} if title is not None else {}
+            section["paragraphs"] = paragraphs
+            sections.append(section)
+    if not sections:
+        fallback = polish_plain_text(to_plain_text(raw))
+        if fallback:
+            sections.append({"paragraphs": [{"text": fallback}]})
+    content: dict = {"sections": sections}
+    if revelation is not None:
+        content["revelationType"] = revelation
+    return content
+
+
+# Bundles and sidecars
+
+
+def bundle_kind(path: str) -> str:
+    db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        tables = {r[0] for r in db.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'view')")}
+    finally:
+        db.close()
+    if "surah_infos" in tables:
+        return "surah_info"
+    if "tafsir" in tables or "tafsir_rows" in tables:
+        return "tafsir"
+    raise SystemExit(f"{path}: neither a surah info nor a tafsir bundle")
+
+
+def bundle_language(path: str, kind: str) -> str:
+    """Language from the asset name (en_surah_info.sqlite -> en)."""
+    prefix = os.path.basename(path).split("_", 1)[0]
+    known = SURAH_INFO_LANGUAGES if kind == "surah_info" else TAFSIR_LANGUAGES
+    if prefix not in known:
+        raise SystemExit(f"{path}: cannot tell the language; pass --language ({', '.join(known)})")
+    return prefix
+
+
+def parse_bundle(path: str, kind: str, language: str) -> Iterator[tuple[str, str, dict]]:
+    """(key, source HTML, segments) for every entry the app can look up."""
+    if kind == "surah_info":
+        db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            rows = db.execute("SELECT surah_number, text, short_text FROM surah_infos ORDER BY surah_number")
+            for surah, html, short in rows.fetchall():
+                yield str(surah), (html or "") + (short or ""), parse_surah_info(html, short, language)
+        finally:
+            db.close()
+        return
+    bundle = TafsirBundle(path)
+    try:
+        for key in bundle.keys():
+            html = bundle.text(key)
+            yield key, html, parse_tafsir(html, language)
+    finally:
+        bundle.close()
+
+
+def _minify(segments: dict) -> str:
+    return json.dumps(segments, ensure_ascii=False, separators=(",", ":"))
+
+
+def sidecar_path(out_dir: str, src: str) -> str:
+    return os.path.join(out_dir, os.path.splitext(os.path.basename(src))[0] + ".segments.sqlite")
+
+
+def write_sidecar(dest: str, kind: str, language: str, entries: Sequence[tuple[str, dict]]) -> dict[str, int]:
+    # Build beside dest and swap it in, so a failed run keeps the old sidecar.
+    tmp = dest + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    db = sqlite3.connect(tmp)
+    try:
+        db.execute("PRAGMA journal_mode = OFF")
+        db.execute("CREATE TABLE segment_texts (id INTEGER PRIMARY KEY, json TEXT NOT NULL)")
+        db.execute("CREATE TABLE segments (key TEXT PRIMARY KEY, segment_id INTEGER NOT NULL) WITHOUT ROWID")
+        db.execute("CREATE TABLE segments_meta (key TEXT PRIMARY KEY, value)")
+        db.executemany(
+            "INSERT INTO segments_meta VALUES (?, ?)",
+            [("kind", kind), ("language", language), ("version", SEGMENTS_VERSION)],
+        )
+        ids: dict[str, int] = {}
+        for key, segments in entries:
+            text = _minify(segments)
+            segment_id = ids.get(text)
+            if segment_id is None:
+                segment_id = ids[text] = len(ids) + 1
+                db.execute("INSERT INTO segment_texts VALUES (?, ?)", (segment_id, text))
+            db.execute("INSERT INTO segments VALUES (?, ?)", (key, segment_id))
+        db.commit()
+        db.execute("VACUUM")
+    except BaseException:
+        db.close()
+        os.remove(tmp)
+        raise
+    db.close()
+    os.replace(tmp, dest)
+    return {"entries": len(entries), "distinct": len(ids), "json_bytes": sum(len(t.encode()) for t in ids)}
+
+
+class SegmentStore:
+    """Reads a sidecar: get(key) -> segments, or None when the key is absent."""
+
+    def __init__(self, path: str) -> None:
+        self.db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        self.meta = dict(self.db.execute("SELECT key, value FROM segments_meta"))
+        if self.meta.get("version") != SEGMENTS_VERSION:
+            raise ValueError(f"{path}: not a version {SEGMENTS_VERSION} segment sidecar")
+
+    def get(self, key: str) -> dict | None:
+        row = self.db.execute(
+            "SELECT t.json FROM segments s JOIN segment_texts t ON t.id = s.segment_id WHERE s.key = ?",
+            (key,),
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def keys(self) -> list[str]:
+        return [r[0] for r in self.db.execute("SELECT key FROM segments")]
+
+    def close(self) -> None:
+        self.db.close()
+
+
+def build(src: str, out_dir: str, language: str | None = None) -> dict[str, int | str]:
+    kind = bundle_kind(src)
+    language = language or bundle_language(src, kind)
+    entries = [(key, segments) for key, _, segments in parse_bundle(src, kind, language)]
+    os.makedirs(out_dir, exist_ok=True)
+    stats = write_sidecar(sidecar_path(out_dir, src), kind, language, entries)
+    return dict(stats, kind=kind, language=language)
+
+
+def check(src: str, sidecar: str) -> list[str]:
+    """Keys whose stored segments differ from parsing the bundle now."""
+    store = SegmentStore(sidecar)
+    try:
+        kind, language = store.meta["kind"], store.meta["language"]
+        expected = {key: segments for key, _, segments in parse_bundle(src, kind, language)}
+        problems = [key for key in sorted(set(store.keys()) - set(expected))]
+        problems += [key for key, segments in expected.items() if store.get(key) != segments]
+        return problems
+    finally:
+        store.close()
+
+
+def bench(src: str, sidecar: str, count: int = 500, seed: int = 5) -> list[str]:
+    """Per-entry time to parse the HTML versus reading its segments."""
+    store = SegmentStore(sidecar)
+    kind, language = store.meta["kind"], store.meta["language"]
+    html = {key: source for key, source, _ in parse_bundle(src, kind, language)}
+    rng = random.Random(seed)
+    keys = [rng.choice(list(html)) for _ in range(count)]
+    if kind == "surah_info":
+        db = sqlite3.connect(f"file:{src}?mode=ro", uri=True)
+        query = "SELECT text, short_text FROM surah_infos WHERE surah_number = ? LIMIT 1"
+
+        def parse(key: str) -> dict:
+            text, short = db.execute(query, (int(key),)).fetchone()
+            return parse_surah_info(text, short, language)
+    else:
+        bundle = TafsirBundle(src)
+
+        def parse(key: str) -> dict:
+            return parse_tafsir(bundle.text(key), language)
+
+    def timed(fn) -> list[float]:
+        times = []
+        for key in keys:
+            t0 = time.perf_counter()
+            fn(key)
+            times.append(time.perf_counter() - t0)
+        return times
+
+    parsed, read = timed(parse), timed(store.get)
+    store.close()
+    if kind == "surah_info":
+        db.close()
+    else:
+        bundle.close()
+    html_bytes = sum(len(h.encode()) for h in html.values()) / len(html)
+
+    def line(label: str, times: list[float]) -> str:
+        q = statistics.quantiles(times, n=100)
+        return f"  {label:<12} p50 {q[49] * 1e6:8.1f}us  p95 {q[94] * 1e6:8.1f}us  p99 {q[98] * 1e6:8.1f}us"
+
+    return [
+        f"{os.path.basename(src)}: {len(html)} entries, {html_bytes:,.0f} B of HTML each",
+        line("parse HTML", parsed),
+        line("read segs", read),
+    ]
+
+
+def synthetic_sources(folder: str, seed: int = 9) -> list[str]:
+    """QUL-shaped id surah info and en tafsir bundles for --bench."""
+    rng = random.Random(seed)
+    words = "the of and Allah said those who believe verse narrated mercy Lord - &amp;".split()
+
+    def sentence(n: int) -> str:
+        return " ".join(rng.choice(words) for _ in range(n)) + "."
+
+    info = os.path.join(folder, "id_surah_info.sqlite")
+    db = sqlite3.connect(info)
+    db.execute("CREATE TABLE surah_infos (surah_number INTEGER, text TEXT, short_text TEXT)")
+    labels = ("Keimanan", "Hukum-hukum", "Kisah-kisah", "Lain-lain")
+    for surah in range(1, 115):
+        parts = [f"<p>{sentence(40)}</p>" for _ in range(3)]
+        parts.append("<p>**Pokok-Pokok isi:**</p>")
+        for k, label in enumerate(labels, 1):
+            parts.append(f"<p>{k}. **{label}:**</p>")
+            parts.extend(f"<p>{sentence(30)}</p>" for _ in range(rng.randint(1, 4)))
+        parts.append(f"<p>**Hubungan Surat {surah} Dengan Surat {surah + 1}:**</p>")
+        parts.extend(f"<p>{k}. {sentence(20)}</p>" for k in range(1, 4))
+        db.execute("INSERT INTO surah_infos VALUES (?, ?, '')", (surah, "\n".join(parts)))
+    db.commit()
+    db.close()
+
+    tafsir = os.path.join(folder, "en_ibn_kathir.sqlite")
+    db = sqlite3.connect(tafsir)
+    db.execute(
+        "CREATE TABLE tafsir (ayah_key TEXT, group_ayah_key TEXT, from_ayah TEXT, "
+        "to_ayah TEXT, ayah_keys TEXT, text TEXT)"
+    )
+    for ayah in range(1, 801):
+        key = f"2:{ayah}"
+        parts = ['<p class="en translation" lang="en">"' + sentence(15) + '"</p>']
+        for _ in range(rng.randint(1, 4)):
+            parts.append(f'<div lang="jv" class="jv "><h2>{sentence(5)}</h2></div>')
+            parts.extend(
+                f'<p lang="en" class="en ">({k}) {sentence(rng.randint(20, 120))}<br/>{sentence(10)}</p>'
+                for k in range(1, rng.randint(2, 6))
+            )
+        db.execute("INSERT INTO tafsir VALUES (?, ?, ?, ?, ?, ?)", (key, key, key, key, key, "".join(parts)))
+    db.commit()
+    db.close()
+    return [info, tafsir]
+
+
+def _default_bundles() -> list[str]:
+    return sorted(p for pattern in DEFAULT_BUNDLES for p in glob.glob(pattern))
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("bundles", nargs="*", help="surah info or tafsir SQLite (default: all bundled)")
+    parser.add_argument("--out-dir", default=DEFAULT_OUT)
+    parser.add_argument("--language", help="override the language read from the file name")
+    parser.add_argument("--check", action="store_true", help="compare existing sidecars with a fresh parse")
+    parser.add_argument("--bench", action="store_true", help="time HTML parsing against segment reads")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bundles = args.bundles or _default_bundles()
+        out_dir = args.out_dir
+        if args.bench and not args.bundles:
+            bundles = synthetic_sources(tmp)
+            out_dir = os.path.join(tmp, "out")
+        if not bundles:
+            raise SystemExit("no surah info or tafsir bundles found; see DATA_SOURCES.md")
+        failed = 0
+        for src in bundles:
+            sidecar = sidecar_path(out_dir, src)
+            if args.check:
+                if not os.path.isfile(sidecar):
+                    print(f"{src}: no sidecar at {sidecar}")
+                    failed += 1
+                    continue
+                diffs = check(src, sidecar)
+                if diffs:
+                    failed += 1
+                    print(f"{src}: {len(diffs)} entries differ, first {diffs[0]}")
+                else:
+                    print(f"ok: {sidecar}")
+                continue
+            stats = build(src, out_dir, args.language)
+            print(
+                f"{os.path.basename(src)}: {stats['kind']} ({stats['language']}), "
+                f"{stats['entries']} entries, {stats['distinct']} distinct, "
+                f"{stats['json_bytes']:,} B of segments -> {sidecar}"
+            )
+            if args.bench:
+                print("\n".join(bench(src, sidecar)))
+    if failed:
+        print(f"{failed} bundles need their segments rebuilt", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,145 @@
+"""Streaming, resumable, checksummed HTTP downloads for the data tools.
+
+download() streams the body in chunks to `<dest>.part`, resumes a partial
+file with an HTTP Range request after a dropped connection (or on the next
+run), hashes as it writes, checks the SHA-256 against a pinned digest when
+one is given, and only then renames the file into place. A failed or
+mismatched download never leaves a file at `dest`.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+from http.client import HTTPException
+
+CHUNK_SIZE = 1 << 16
+DEFAULT_TIMEOUT = 60.0
+MAX_ATTEMPTS = 8
+USER_AGENT = "quran-offline-mobile-tools/1.0"
+
+
+class DownloadError(RuntimeError):
+    pass
+
+
+def sha256_file(path: str, chunk_size: int = CHUNK_SIZE) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(chunk_size)
+            if not block:
+                break
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _total_from_headers(status: int, headers, offset: int) -> int | None:
+    if status == 206:
+        content_range = headers.get("Content-Range") or ""
+        # "bytes start-end/total"
+        total = content_range.rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+    length = headers.get("Content-Length")
+    return int(length) if length and length.isdigit() else None
+
+
+def _hash_prefix(path: str, digest) -> int:
+    size = 0
+    with open(path, "rb") as f:
+        while True:
+            block = f.read(CHUNK_SIZE)
+            if not block:
+                break
+            digest.update(block)
+            size += len(block)
+    return size
+
+
+def download(
+    url: str,
+    dest: str,
+    *,
+    sha256: str | None = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    chunk_size: int = CHUNK_SIZE,
+    attempts: int = MAX_ATTEMPTS,
+    user_agent: str = USER_AGENT,
+    backoff: float = 1.0,
+    quiet: bool = False,
+) -> str:
+    """Fetch `url` to `dest` atomically and return the SHA-256 hex digest."""
+    part = dest + ".part"
+    os.makedirs(os.path.dirname(dest) or ".", exist_ok=True)
+    delay = backoff
+    last_err: Exception | None = None
+    for attempt in range(1, attempts + 1):
+        digest = hashlib.sha256()
+        offset = _hash_prefix(part, digest) if os.path.isfile(part) else 0
+        headers = {"User-Agent": user_agent}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+        req = urllib.request.Request(url, headers=headers)
+        try:
+            with urllib.request.urlopen(req, timeout=timeout) as resp:
+                status = resp.status
+                if offset and status != 206:
+                    # Server ignored the Range header: start over.
+                    digest = hashlib.sha256()
+                    offset = 0
+                total = _total_from_headers(status, resp.headers, offset)
+                with open(part, "ab" if offset else "wb") as f:
+                    written = offset
+                    while True:
+                        block = resp.read(chunk_size)
+                        if not block:
+                            break
+                        f.write(block)
+                        digest.update(block)
+                        written += len(block)
+                    f.flush()
+                    os.fsync(f.fileno())
+                if total is not None and written != total:
+                    raise DownloadError(f"short body: {written} of {total} bytes")
+        except urllib.error.HTTPError as err:
+            if err.code == 416 and offset:
+                # Range past the end: the part file is already complete.
+                pass
+            elif err.code in (429, 500, 502, 503, 504) and attempt < attempts:
+                last_err = err
+                _log(quiet, f"  HTTP {err.code}, retry {attempt}/{attempts} in {delay:.1f}s")
+                time.sleep(delay)
+                delay = min(delay * 2, 60)
+                continue
+            else:
+                raise
+        except (DownloadError, HTTPException, urllib.error.URLError, OSError) as err:
+            last_err = err
+            if attempt < attempts:
+                size = os.path.getsize(part) if os.path.isfile(part) else 0
+                _log(
+                    quiet,
+                    f"  {err}; resuming at {size} bytes, retry {attempt}/{attempts} "
+                    f"in {delay:.1f}s",
+                )
+                time.sleep(delay)
+                delay = min(delay * 2, 60)
+                continue
+            raise DownloadError(f"download failed: {url}: {err}") from err
+
+        got = digest.hexdigest()
+        if sha256 and got != sha256.lower():
+            os.remove(part)
+            raise DownloadError(f"SHA-256 mismatch for {url}: got {got}, pinned {sha256}")
+        os.replace(part, dest)
+        return got
+    raise DownloadError(f"download failed: {url}: {last_err}")
+
+
+def _log(quiet: bool, message: str) -> None:
+    if not quiet:
+        print(message, file=sys.stderr)
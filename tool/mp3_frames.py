@@ -0,0 +1,150 @@
+"""MPEG audio frame walking for the recitation tools.
+
+frames() walks an MP3 file header by header: an optional leading ID3v2
+tag, then back-to-back MPEG-1/2/2.5 Layer I-III frames, then an optional
+128-byte ID3v1 tag. Anything else (a bad sync word, reserved header bits,
+a frame running past the end, trailing junk) raises ValueError, which is
+how the audio tools tell a complete recitation file from a truncated or
+non-MP3 response. Durations come from summing each frame's samples, so
+VBR files are measured exactly.
+
+Encoders put a Xing/Info (or VBRI) frame first to describe the whole
+file; is_info_frame() finds it so concatenation can drop it.
+"""
+
+from __future__ import annotations
+
+import random
+from collections.abc import Iterator
+from typing import NamedTuple
+
+ID3V1_SIZE = 128
+
+# kbps by [MPEG-1?][layer][index]; index 0 ("free") and 15 are rejected.
+_BITRATES = {
+    (True, 1): (0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448),
+    (True, 2): (0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384),
+    (True, 3): (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    (False, 1): (0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256),
+    (False, 2): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    (False, 3): (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+# Sample rates by version bits: 3 = MPEG-1, 2 = MPEG-2, 0 = MPEG-2.5.
+_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+class Frame(NamedTuple):
+    offset: int
+    length: int
+    samples: int
+    sample_rate: int
+    bitrate: int
+    mpeg1: bool
+    mono: bool
+
+
+def parse_header(data: bytes | memoryview, offset: int) -> Frame:
+    """The frame whose 4-byte header starts at `offset`."""
+    if offset + 4 > len(data):
+        raise ValueError(f"truncated frame header at byte {offset}")
+    b0, b1, b2 = data[offset], data[offset + 1], data[offset + 2]
+    if b0 != 0xFF or b1 & 0xE0 != 0xE0:
+        raise ValueError(f"no frame sync at byte {offset}")
+    version = (b1 >> 3) & 3
+    layer_bits = (b1 >> 1) & 3
+    index = b2 >> 4
+    rate_index = (b2 >> 2) & 3
+    if version == 1 or layer_bits == 0 or index in (0, 15) or rate_index == 3:
+        raise ValueError(f"invalid frame header at byte {offset}")
+    layer = 4 - layer_bits
+    mpeg1 = version == 3
+    bitrate = _BITRATES[(mpeg1, layer)][index] * 1000
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    padding = (b2 >> 1) & 1
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    else:
+        samples = 1152 if layer == 2 or mpeg1 else 576
+        length = samples // 8 * bitrate // sample_rate + padding
+    mono = data[offset + 3] >> 6 == 3
+    return Frame(offset, length, samples, sample_rate, bitrate, mpeg1, mono)
+
+
+def is_info_frame(data: bytes | memoryview, frame: Frame) -> bool:
+    """Whether the frame is a Xing/Info/VBRI metadata frame, not audio."""
+    if frame.mpeg1:
+        side_info = 17 if frame.mono else 32
+    else:
+        side_info = 9 if frame.mono else 17
+    at = frame.offset + 4 + side_info
+    if bytes(data[at : at + 4]) in (b"Xing", b"Info"):
+        return True
+    at = frame.offset + 36
+    return bytes(data[at : at + 4]) == b"VBRI"
+
+
+def id3v2_size(data: bytes | memoryview) -> int:
+    """Bytes taken by a leading ID3v2 tag (0 when there is none)."""
+    if len(data) < 10 or bytes(data[:3]) != b"ID3":
+        return 0
+    size = 0
+    for b in data[6:10]:
+        if b & 0x80:
+            raise ValueError("ID3v2 size is not syncsafe")
+        size = (size << 7) | b
+    footer = 10 if data[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def frames(data: bytes | memoryview) -> Iterator[Frame]:
+    offset = id3v2_size(data)
+    end = len(data)
+    if end - offset >= ID3V1_SIZE and bytes(data[end - ID3V1_SIZE : end - ID3V1_SIZE + 3]) == b"TAG":
+        end -= ID3V1_SIZE
+    if offset >= end:
+        raise ValueError("no MPEG audio frames")
+    while offset < end:
+        frame = parse_header(data, offset)
+        if offset + frame.length > end:
+            raise ValueError(
+                f"frame at byte {offset} needs {frame.length} bytes, {end - offset} left"
+            )
+        yield frame
+        offset += frame.length
+
+
+def audio_info(data: bytes | memoryview) -> tuple[int, float]:
+    """Audio (frame count, seconds), not counting a leading info frame.
+
+    ValueError when the data is not a clean MP3.
+    """
+    count = 0
+    seconds = 0.0
+    for k, frame in enumerate(frames(data)):
+        if k == 0 and is_info_frame(data, frame):
+            continue
+        count += 1
+        seconds += frame.samples / frame.sample_rate
+    return count, seconds
+
+
+def synthetic_mp3(
+    frame_count: int, seed: int = 0, bitrate: int = 128, id3: bool = True, info: bool = False
+) -> bytes:
+    """MPEG-1 Layer III, 44.1 kHz joint-stereo frames with random payloads, for tests."""
+    index = _BITRATES[(True, 3)].index(bitrate)
+    rng = random.Random(seed)
+    out = bytearray()
+    if id3:
+        out += b"ID3\x04\x00\x00\x00\x00\x00\x0a" + bytes(10)
+    if info:
+        header = bytes((0xFF, 0xFB, index << 4, 0x44))
+        length = parse_header(header, 0).length
+        out += (header + bytes(32) + b"Info" + bytes(length))[:length]
+    for k in range(frame_count):
+        padding = k % 3 == 1
+        header = bytes((0xFF, 0xFB, (index << 4) | (int(padding) << 1), 0x44))
+        length = parse_header(header, 0).length
+        out += header + rng.randbytes(length - 4)
+    return bytes(out)
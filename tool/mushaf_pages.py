@@ -0,0 +1,446 @@
+#!/usr/bin/env python3
+"""Precompiled QPC V2 mushaf pages: one binary blob, one seek per page.
+
+QpcV2Repository renders a page from two SQLite queries (15 layout rows from
+qpc_v2_15_lines.sqlite, then the word range from qpc_v2_words.sqlite). This
+script resolves both ahead of time into qpc_v2_pages.bin, little-endian:
+
+  header   "QPCP", u16 version, u16 page count
+  offsets  (page count + 1) x u32 absolute record offsets; page n spans
+           offsets[n-1]:offsets[n]
+  bismillah  u16 byte length + UTF-8 glyphs of words 1-4
+  page record
+    u8 line count, then per line:
+      u8 line number, u8 flags (bits 0-1 type, bit 2 centered), u16 surah
+      (0 = none; basmallah lines carry the preceding surah_name's surah,
+      as the repository resolves them)
+    ayah lines continue with
+      u32 first word id, u16 word count,
+      u8 surah, u16 ayah, u16 word of the first word,
+      u8 ayah breaks, each u8 word index, u8 surah, u16 ayah (word restarts at 1),
+      u8 glyph runs, each u16 first code point, u8 count (consecutive
+      single-character glyphs) or u8 0, u8 byte length, UTF-8 glyph text
+
+QPC V2 numbers a page's glyphs consecutively, so a line is usually one run.
+Lines of other types, and ayah lines without a word range, are dropped as
+the repository drops them.
+
+Usage:
+  python tool/mushaf_pages.py
+  python tool/mushaf_pages.py --layout L.sqlite --words W.sqlite --out P.bin
+  python tool/mushaf_pages.py --bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import mmap
+import os
+import random
+import sqlite3
+import statistics
+import struct
+import tempfile
+import time
+from collections.abc import Iterator
+from typing import NamedTuple
+
+from quran_corpus import PAGE_COUNT
+
+LAYOUT_DB = "assets/mushaf/layout/qpc_v2_15_lines.sqlite"
+WORDS_DB = "assets/mushaf/script/qpc_v2_words.sqlite"
+DEFAULT_OUT = "assets/mushaf/layout/qpc_v2_pages.bin"
+
+MAGIC = b"QPCP"
+VERSION = 1
+LINE_TYPES = ("ayah", "surah_name", "basmallah")
+CENTERED = 0x04
+# QpcV2Assets.bismillahFirstWordId .. bismillahStandaloneLastWordId
+BISMILLAH_WORDS = (1, 4)
+
+_HEADER = struct.Struct("<4sHH")
+_U8 = struct.Struct("<B")
+_U16 = struct.Struct("<H")
+_LINE = struct.Struct("<BBH")
+_RANGE = struct.Struct("<IHBHH")
+_BREAK = struct.Struct("<BBH")
+_RUN = struct.Struct("<HB")
+
+
+class Word(NamedTuple):
+    id: int
+    surah: int
+    ayah: int
+    word: int
+    glyph: str
+    location: str
+
+
+class Line(NamedTuple):
+    line_number: int
+    line_type: str
+    is_centered: bool
+    surah: int | None
+    words: tuple[Word, ...] = ()
+
+
+def _as_int(value: object) -> int | None:
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value:
+        try:
+            return int(value)
+        except ValueError:
+            return None
+    return None
+
+
+def _words(db: sqlite3.Connection, first: int, last: int) -> dict[int, Word]:
+    rows = db.execute(
+        "SELECT id, surah, ayah, word, text, location FROM words "
+        "WHERE id >= ? AND id <= ? ORDER BY id ASC",
+        (first, last),
+    )
+    return {row[0]: Word(*row) for row in rows}
+
+
+def sqlite_page(layout: sqlite3.Connection, words: sqlite3.Connection, page: int) -> list[Line]:
+    """The page as QpcV2Repository._loadPageLines builds it from SQL."""
+    rows = layout.execute(
+        "SELECT line_number, line_type, is_centered, first_word_id, last_word_id, surah_number "
+        "FROM pages WHERE page_number = ? ORDER BY line_number ASC",
+        (page,),
+    ).fetchall()
+    lines: list[Line] = []
+    ranges: list[tuple[int, bool, int, int]] = []
+    last_surah_name: int | None = None
+    for number, line_type, centered, first, last, surah_raw in rows:
+        centered = (centered or 0) == 1
+        surah = _as_int(surah_raw)
+        if line_type == "surah_name":
+            last_surah_name = surah
+            lines.append(Line(number, line_type, centered, surah))
+        elif line_type == "basmallah":
+            lines.append(Line(number, line_type, centered, last_surah_name))
+        elif line_type == "ayah":
+            first, last = _as_int(first), _as_int(last)
+            if first is not None and last is not None:
+                ranges.append((number, centered, first, last))
+    if ranges:
+        by_id = _words(words, min(r[2] for r in ranges), max(r[3] for r in ranges))
+        for number, centered, first, last in ranges:
+            found = tuple(by_id[i] for i in range(first, last + 1) if i in by_id)
+            lines.append(Line(number, "ayah", centered, None, found))
+    lines.sort(key=lambda line: line.line_number)
+    return lines
+
+
+def _glyph_runs(glyphs: list[str]) -> bytes:
+    out = bytearray()
+    runs = 0
+    i = 0
+    while i < len(glyphs):
+        glyph = glyphs[i]
+        if len(glyph) == 1 and ord(glyph) <= 0xFFFF:
+            start = ord(glyph)
+            count = 1
+            while (
+                i + count < len(glyphs)
+                and count < 255
+                and glyphs[i + count] == chr(start + count)
+            ):
+                count += 1
+            out += _RUN.pack(start, count)
+            i += count
+        else:
+            raw = glyph.encode("utf-8")
+            if len(raw) > 255:
+                raise ValueError(f"glyph {glyph!r} longer than 255 bytes")
+            out += _RUN.pack(0, 0) + _U8.pack(len(raw)) + raw
+            i += 1
+        runs += 1
+    if runs > 255:
+        raise ValueError("more than 255 glyph runs on one line")
+    return _U8.pack(runs) + bytes(out)
+
+
+def _encode_ayah_line(line: Line) -> bytes:
+    words = line.words
+    if not words:
+        raise ValueError(f"ayah line {line.line_number} has no words")
+    first_id = words[0].id
+    ids = [w.id for w in words]
+    if ids != list(range(first_id, first_id + len(words))):
+        raise ValueError(f"words {first_id}..{first_id + len(words) - 1} are not contiguous")
+    head = words[0]
+    breaks: list[bytes] = []
+    surah, ayah, number = head.surah, head.ayah, head.word
+    for k, w in enumerate(words):
+        if k:
+            if (w.surah, w.ayah) != (surah, ayah):
+                surah, ayah, number = w.surah, w.ayah, 1
+                breaks.append(_BREAK.pack(k, surah, ayah))
+            else:
+                number += 1
+        if w.word != number:
+            raise ValueError(f"word {w.id} is {w.word} in {w.surah}:{w.ayah}, expected {number}")
+        if w.location != f"{w.surah}:{w.ayah}:{w.word}":
+            raise ValueError(f"word {w.id} has location {w.location!r}")
+    if len(breaks) > 255:
+        raise ValueError(f"too many ayahs on the line starting at word {first_id}")
+    return (
+        _RANGE.pack(first_id, len(words), head.surah, head.ayah, head.word)
+        + _U8.pack(len(breaks))
+        + b"".join(breaks)
+        + _glyph_runs([w.glyph for w in words])
+    )
+
+
+def encode_page(lines: list[Line]) -> bytes:
+    out = bytearray(_U8.pack(len(lines)))
+    for line in lines:
+        if line.line_type not in LINE_TYPES:
+            raise ValueError(f"unknown line type {line.line_type!r}")
+        flags = LINE_TYPES.index(line.line_type) | (CENTERED if line.is_centered else 0)
+        out += _LINE.pack(line.line_number, flags, line.surah or 0)
+        if line.line_type == "ayah":
+            out += _encode_ayah_line(line)
+    return bytes(out)
+
+
+def compile_pages(layout_path: str, words_path: str, pages: int = PAGE_COUNT) -> bytes:
+    layout = sqlite3.connect(f"file:{layout_path}?mode=ro", uri=True)
+    words = sqlite3.connect(f"file:{words_path}?mode=ro", uri=True)
+    try:
+        records = [encode_page(sqlite_page(layout, words, page)) for page in range(1, pages + 1)]
+        first, last = BISMILLAH_WORDS
+        bismillah = "".join(w.glyph for w in _words(words, first, last).values()).encode("utf-8")
+    finally:
+        layout.close()
+        words.close()
+
+    start = _HEADER.size + 4 * (pages + 1) + _U16.size + len(bismillah)
+    offsets = [start]
+    for record in records:
+        offsets.append(offsets[-1] + len(record))
+    return b"".join(
+        [
+            _HEADER.pack(MAGIC, VERSION, pages),
+            struct.pack(f"<{pages + 1}I", *offsets),
+            _U16.pack(len(bismillah)),
+            bismillah,
+            *records,
+        ]
+    )
+
+
+def decode_page(buf: bytes | memoryview | mmap.mmap, pos: int, end: int) -> list[Line]:
+    (count,) = _U8.unpack_from(buf, pos)
+    pos += 1
+    lines: list[Line] = []
+    for _ in range(count):
+        number, flags, surah = _LINE.unpack_from(buf, pos)
+        pos += _LINE.size
+        line_type = LINE_TYPES[flags & 0x03]
+        centered = bool(flags & CENTERED)
+        if line_type != "ayah":
+            lines.append(Line(number, line_type, centered, surah or None))
+            continue
+        first_id, n, s, a, w = _RANGE.unpack_from(buf, pos)
+        pos += _RANGE.size
+        (nbreaks,) = _U8.unpack_from(buf, pos)
+        pos += 1
+        breaks: dict[int, tuple[int, int]] = {}
+        for _ in range(nbreaks):
+            k, bs, ba = _BREAK.unpack_from(buf, pos)
+            pos += _BREAK.size
+            breaks[k] = (bs, ba)
+        (nruns,) = _U8.unpack_from(buf, pos)
+        pos += 1
+        glyphs: list[str] = []
+        for _ in range(nruns):
+            start, run = _RUN.unpack_from(buf, pos)
+            pos += _RUN.size
+            if run:
+                glyphs.extend(chr(c) for c in range(start, start + run))
+            else:
+                (size,) = _U8.unpack_from(buf, pos)
+                pos += 1
+                glyphs.append(bytes(buf[pos : pos + size]).decode("utf-8"))
+                pos += size
+        words: list[Word] = []
+        for k in range(n):
+            if k in breaks:
+                (s, a), w = breaks[k], 1
+            elif k:
+                w += 1
+            words.append(Word(first_id + k, s, a, w, glyphs[k], f"{s}:{a}:{w}"))
+        lines.append(Line(number, "ayah", centered, None, tuple(words)))
+    if pos != end:
+        raise ValueError(f"page record ends at {pos}, expected {end}")
+    return lines
+
+
+class PageBlob:
+    """Memory-mapped qpc_v2_pages.bin; page(n) reads one record."""
+
+    def __init__(self, path: str = DEFAULT_OUT) -> None:
+        self._file = open(path, "rb")
+        self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.page_count = _HEADER.unpack_from(self._buf, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} page blob")
+        self._offsets = struct.unpack_from(f"<{self.page_count + 1}I", self._buf, _HEADER.size)
+        pos = _HEADER.size + 4 * (self.page_count + 1)
+        (size,) = _U16.unpack_from(self._buf, pos)
+        self.bismillah = self._buf[pos + 2 : pos + 2 + size].decode("utf-8")
+
+    def record(self, page: int) -> bytes:
+        return self._buf[self._offsets[page - 1] : self._offsets[page]]
+
+    def page(self, page: int) -> list[Line]:
+        if not 1 <= page <= self.page_count:
+            raise IndexError(page)
+        return decode_page(self._buf, self._offsets[page - 1], self._offsets[page])
+
+    def close(self) -> None:
+        self._buf.close()
+        self._file.close()
+
+    def __enter__(self) -> PageBlob:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def synthetic_sources(layout_path: str, words_path: str, pages: int = PAGE_COUNT, seed: int = 5) -> None:
+    """QUL-shaped layout and words databases: 15 lines, consecutive page glyphs."""
+    rng = random.Random(seed)
+    layout = sqlite3.connect(layout_path)
+    words = sqlite3.connect(words_path)
+    layout.execute(
+        "CREATE TABLE pages (page_number INTEGER, line_number INTEGER, line_type TEXT, "
+        "is_centered INTEGER, first_word_id INTEGER, last_word_id INTEGER, surah_number INTEGER)"
+    )
+    words.execute(
+        "CREATE TABLE words (id INTEGER PRIMARY KEY, location TEXT, surah INTEGER, "
+        "ayah INTEGER, word INTEGER, text TEXT)"
+    )
+    word_id, surah, ayah, word = 0, 0, 0, 0
+    ayah_left = 0
+    layout_rows: list[tuple] = []
+    word_rows: list[tuple] = []
+    for page in range(1, pages + 1):
+        code = 0xFC41
+        line = 1
+        while line <= 15:
+            starts = (page == 1 and line == 1) or (line in (1, 8) and surah < 114 and rng.random() < 0.1)
+            if starts:
+                surah += 1
+                ayah = 0
+                ayah_left = 0
+                layout_rows.append((page, line, "surah_name", 1, None, None, surah))
+                layout_rows.append((page, line + 1, "basmallah", 1, None, None, ""))
+                line += 2
+                continue
+            if surah == 0:
+                surah = 1
+            first = word_id + 1
+            for _ in range(rng.randint(6, 11)):
+                if ayah_left == 0:
+                    ayah += 1
+                    word = 0
+                    ayah_left = rng.randint(3, 30)
+                word_id += 1
+                word += 1
+                ayah_left -= 1
+                # A few words need two code points and fall out of the run.
+                glyph = chr(code) if rng.random() > 0.01 else chr(code) + "\u0670"
+                code += 1
+                word_rows.append((word_id, f"{surah}:{ayah}:{word}", surah, ayah, word, glyph))
+            layout_rows.append((page, line, "ayah", int(line == 15 and page < 3), first, word_id, ""))
+            line += 1
+    layout.executemany("INSERT INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)", layout_rows)
+    words.executemany("INSERT INTO words VALUES (?, ?, ?, ?, ?, ?)", word_rows)
+    for db in (layout, words):
+        db.commit()
+        db.close()
+
+
+def _percentiles(times: list[float]) -> tuple[float, float]:
+    q = statistics.quantiles(times, n=100)
+    return q[49], q[94]
+
+
+def bench(layout_path: str, words_path: str, runs: int = 2000) -> None:
+    blob = compile_pages(layout_path, words_path)
+    with tempfile.TemporaryDirectory() as tmp:
+        out = os.path.join(tmp, "pages.bin")
+        with open(out, "wb") as f:
+            f.write(blob)
+        order = [random.Random(7).randint(1, PAGE_COUNT) for _ in range(runs)]
+        layout = sqlite3.connect(f"file:{layout_path}?mode=ro", uri=True)
+        words = sqlite3.connect(f"file:{words_path}?mode=ro", uri=True)
+        sql: list[float] = []
+        for page in order:
+            t0 = time.perf_counter()
+            sqlite_page(layout, words, page)
+            sql.append(time.perf_counter() - t0)
+        layout.close()
+        words.close()
+        packed: list[float] = []
+        with PageBlob(out) as pages:
+            for page in order:
+                t0 = time.perf_counter()
+                pages.page(page)
+                packed.append(time.perf_counter() - t0)
+    sources = os.path.getsize(layout_path) + os.path.getsize(words_path)
+    print(f"sqlite  {sources / 1e6:7.2f}MB  (layout + words)")
+    print(f"blob    {len(blob) / 1e6:7.2f}MB  {len(blob) / PAGE_COUNT:7.0f}B/page")
+    for name, times in (("sqlite", sql), ("blob", packed)):
+        p50, p95 = _percentiles(times)
+        print(f"{name:<7} page fetch p50 {p50 * 1e6:8.1f}us  p95 {p95 * 1e6:8.1f}us")
+    print(f"blob fetch is {statistics.median(sql) / statistics.median(packed):.1f}x faster at p50")
+
+
+def _pages(path: str) -> Iterator[list[Line]]:
+    with PageBlob(path) as blob:
+        for page in range(1, blob.page_count + 1):
+            yield blob.page(page)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--layout", default=LAYOUT_DB)
+    parser.add_argument("--words", default=WORDS_DB)
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    parser.add_argument(
+        "--bench", action="store_true", help="time page fetches (synthetic sources if missing)"
+    )
+    args = parser.parse_args()
+
+    have_sources = os.path.isfile(args.layout) and os.path.isfile(args.words)
+    if args.bench:
+        if have_sources:
+            bench(args.layout, args.words)
+        else:
+            print(f"{args.layout} or {args.words} missing; benchmarking synthetic sources")
+            with tempfile.TemporaryDirectory() as tmp:
+                layout, words = os.path.join(tmp, "layout.sqlite"), os.path.join(tmp, "words.sqlite")
+                synthetic_sources(layout, words)
+                bench(layout, words)
+        return 0
+    if not have_sources:
+        raise SystemExit(f"missing {args.layout} or {args.words}; see DATA_SOURCES.md")
+    blob = compile_pages(args.layout, args.words)
+    with open(args.out, "wb") as f:
+        f.write(blob)
+    words = sum(len(line.words) for lines in _pages(args.out) for line in lines)
+    print(f"Wrote {args.out}: {PAGE_COUNT} pages, {words} words, {len(blob)} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
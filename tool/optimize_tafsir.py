@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""Shrink the QUL tafsir SQLite bundles without changing what the app reads.
+
+QUL stores the full tafsir text on every row of a group_ayah_key group, so
+Ibn Kathir repeats the same passage for each ayah it covers. optimize()
+rewrites a bundle as
+
+  tafsir_texts(id INTEGER PRIMARY KEY, text)   each distinct text once
+  tafsir_rows(<original columns minus text>, text_id)
+  tafsir_rows_ayah_key                         covering index for the
+                                               app's ayah_key lookup
+  VIEW tafsir                                  same columns and rows as
+                                               the original table
+
+so TafsirRepository's `SELECT ... FROM tafsir WHERE ayah_key = ?` keeps
+working unchanged. An optimized bundle can be optimized again (e.g. to
+change --compress); it is read back through its own tables, in numeric
+ayah_key order. Output goes to build/tafsir unless --out-dir or
+--in-place says otherwise. page_size is picked by building with each candidate
+and keeping the smallest file; the result is ANALYZEd and VACUUMed.
+
+--compress zlib|zstd stores texts compressed (zstd with a dictionary
+trained on the bundle; needs the zstandard package). SQLite cannot inflate
+them, so a compressed bundle has no tafsir view and must be read through
+TafsirBundle, which answers both layouts with the app's query results.
+
+Usage:
+  python tool/optimize_tafsir.py assets/tafsir/en_ibn_kathir.sqlite
+  python tool/optimize_tafsir.py assets/tafsir/*.sqlite --out-dir build/tafsir --compress zlib
+  python tool/optimize_tafsir.py assets/tafsir/*.sqlite --in-place
+  python tool/optimize_tafsir.py --bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+import zlib
+from collections.abc import Iterator, Sequence
+
+TABLE = "tafsir"
+DEFAULT_OUT = os.path.join("build", "tafsir")
+# Columns TafsirRepository._queryRow selects, in its order.
+APP_COLUMNS = ("ayah_key", "group_ayah_key", "from_ayah", "to_ayah", "ayah_keys", "text")
+PAGE_SIZES = (1024, 2048, 4096, 8192)
+CODECS = ("none", "zlib", "zstd")
+# Tables optimize() writes next to the tafsir view.
+OWN_TABLES = ("tafsir_rows", "tafsir_texts", "tafsir_meta")
+ZSTD_DICT_SIZE = 1 << 16
+
+
+def _connect_ro(path: str) -> sqlite3.Connection:
+    return sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+
+
+def _tables(db: sqlite3.Connection) -> set[str]:
+    return {r[0] for r in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+class Codec:
+    def __init__(self, name: str, samples: Sequence[str] = ()) -> None:
+        if name not in CODECS:
+            raise ValueError(f"unknown codec {name!r}")
+        self.name = name
+        self.dictionary: bytes | None = None
+        if name == "zstd":
+            zstandard = _zstandard()
+            data = [s.encode("utf-8") for s in samples if s]
+            trained = zstandard.train_dictionary(ZSTD_DICT_SIZE, data)
+            self.dictionary = trained.as_bytes()
+
+    def compressor(self):
+        if self.name == "zlib":
+            return lambda text: zlib.compress(text.encode("utf-8"), 9)
+        if self.name == "zstd":
+            zstandard = _zstandard()
+            c = zstandard.ZstdCompressor(level=19, dict_data=zstandard.ZstdCompressionDict(self.dictionary))
+            return lambda text: c.compress(text.encode("utf-8"))
+        return lambda text: text
+
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise SystemExit("--compress zstd needs the zstandard package (pip install zstandard)")
+    return zstandard
+
+
+def _decompressor(codec: str, dictionary: bytes | None):
+    if codec == "zlib":
+        return lambda blob: zlib.decompress(blob).decode("utf-8")
+    if codec == "zstd":
+        zstandard = _zstandard()
+        d = zstandard.ZstdDecompressor(dict_data=zstandard.ZstdCompressionDict(dictionary))
+        return lambda blob: d.decompress(blob).decode("utf-8")
+    return None
+
+
+class TafsirBundle:
+    """Row lookups with TafsirRepository's results on original or optimized bundles."""
+
+    def __init__(self, path: str) -> None:
+        self.db = _connect_ro(path)
+        tables = _tables(self.db)
+        self.optimized = "tafsir_rows" in tables
+        source = "tafsir_rows" if self.optimized else TABLE
+        present = {r[1] for r in self.db.execute(f"PRAGMA table_info({source})")}
+        if self.optimized:
+            present.add("text")
+        self.columns = tuple(c for c in APP_COLUMNS if c in present)
+        self._inflate = None
+        if self.optimized:
+            meta = dict(self.db.execute("SELECT key, value FROM tafsir_meta"))
+            self._inflate = _decompressor(meta.get("codec", "none"), meta.get("zstd_dict"))
+            select = ", ".join("t.text" if c == "text" else f"r.{c}" for c in self.columns)
+            self._sql = (
+                f"SELECT {select} FROM tafsir_rows r LEFT JOIN tafsir_texts t "
+                "ON t.id = r.text_id WHERE r.ayah_key = ? LIMIT 1"
+            )
+        else:
+            self._sql = f"SELECT {', '.join(self.columns)} FROM {TABLE} WHERE ayah_key = ? LIMIT 1"
+
+    def row(self, ayah_key: str) -> dict | None:
+        found = self.db.execute(self._sql, (ayah_key,)).fetchone()
+        if found is None:
+            return None
+        out = dict(zip(self.columns, found))
+        text = out.get("text")
+        if self._inflate is not None and text is not None:
+            out["text"] = self._inflate(text)
+        return out
+
+    def text(self, ayah_key: str) -> str:
+        """Tafsir HTML for one ayah, falling back to its group like the app."""
+        row = self.row(ayah_key)
+        if row is None:
+            return ""
+        html = row.get("text") or ""
+        group = row.get("group_ayah_key")
+        if not html.strip() and group and group != ayah_key:
+            html = (self.row(group) or {}).get("text") or ""
+        return html
+
+    def keys(self) -> list[str]:
+        source = "tafsir_rows" if self.optimized else TABLE
+        return [r[0] for r in self.db.execute(f"SELECT ayah_key FROM {source} ORDER BY {_key_order()}")]
+
+    def close(self) -> None:
+        self.db.close()
+
+
+def _key_order(column: str = "ayah_key") -> str:
+    """ORDER BY terms for numeric ayah order of "s:a" keys, as bundle_join uses.
+
+    QUL tables may be WITHOUT ROWID, and their insertion order is not
+    ayah order; the raw key breaks ties between non-numeric keys.
+    """
+    return (
+        f"CAST({column} AS INTEGER), "
+        f"CAST(substr({column}, instr({column}, ':') + 1) AS INTEGER), {column}"
+    )
+
+
+def _logical_rows(
+    src: str, source: sqlite3.Connection
+) -> tuple[list[tuple], list[str], Iterator[tuple]]:
+    """Column info minus text, column names and rows of the bundle's tafsir table.
+
+    An already optimized bundle is read back through tafsir_rows and
+    tafsir_texts, texts inflated, so optimizing it again rebuilds the same
+    rows. Without a tafsir view (compressed) text becomes the last column.
+    """
+    if "tafsir_rows" not in _tables(source):
+        info = list(source.execute(f"PRAGMA table_info({TABLE})"))
+        if not info:
+            raise SystemExit(f"{src}: no {TABLE} table")
+        names = [r[1] for r in info]
+        if "text" not in names or "ayah_key" not in names:
+            raise SystemExit(f"{src}: {TABLE} needs ayah_key and text columns")
+        rows = source.execute(f"SELECT {', '.join(names)} FROM {TABLE} ORDER BY {_key_order()}")
+        return [r for r in info if r[1] != "text"], names, rows
+
+    meta = dict(source.execute("SELECT key, value FROM tafsir_meta"))
+    inflate = _decompressor(meta.get("codec", "none"), meta.get("zstd_dict")) or (lambda t: t)
+    kept = [r for r in source.execute("PRAGMA table_info(tafsir_rows)") if r[1] != "text_id"]
+    view = [r[1] for r in source.execute(f"PRAGMA table_info({TABLE})")]
+    names = view or [r[1] for r in kept] + ["text"]
+    text_at = names.index("text")
+    select = ", ".join("t.text" if n == "text" else f'r."{n}"' for n in names)
+    joined = source.execute(
+        f"SELECT {select} FROM tafsir_rows r LEFT JOIN tafsir_texts t "
+        f"ON t.id = r.text_id ORDER BY {_key_order('r.ayah_key')}"
+    )
+    rows = (
+        r[:text_at] + (None if r[text_at] is None else inflate(r[text_at]),) + r[text_at + 1 :]
+        for r in joined
+    )
+    return kept, names, rows
+
+
+def _build(src: str, dest: str, page_size: int, codec: Codec) -> dict[str, int]:
+    if os.path.exists(dest):
+        os.remove(dest)
+    source = _connect_ro(src)
+    try:
+        return _write(source, src, dest, page_size, codec)
+    finally:
+        source.close()
+
+
+def _write(
+    source: sqlite3.Connection, src: str, dest: str, page_size: int, codec: Codec
+) -> dict[str, int]:
+    kept, names, records = _logical_rows(src, source)
+    text_at = names.index("text")
+
+    out = sqlite3.connect(dest)
+    out.execute(f"PRAGMA page_size = {page_size}")
+    # Scratch file until optimize() moves it into place: skip the journal.
+    out.execute("PRAGMA journal_mode = OFF")
+    out.execute("PRAGMA synchronous = OFF")
+    text_type = "TEXT" if codec.name == "none" else "BLOB"
+    out.execute(f"CREATE TABLE tafsir_texts (id INTEGER PRIMARY KEY, text {text_type})")
+    defs = ", ".join(f'"{r[1]}" {r[2]}'.rstrip() for r in kept)
+    out.execute(f"CREATE TABLE tafsir_rows ({defs}, text_id INTEGER)")
+    out.execute("CREATE TABLE tafsir_meta (key TEXT PRIMARY KEY, value)")
+    out.executemany(
+        "INSERT INTO tafsir_meta VALUES (?, ?)",
+        [("codec", codec.name)] + ([("zstd_dict", codec.dictionary)] if codec.dictionary else []),
+    )
+
+    compress = codec.compressor()
+    ids: dict[str, int] = {}
+    rows = 0
+    placeholders = ", ".join("?" for _ in range(len(kept) + 1))
+    for record in records:
+        text = record[text_at]
+        text_id = None
+        if text is not None:
+            text_id = ids.get(text)
+            if text_id is None:
+                text_id = ids[text] = len(ids) + 1
+                out.execute("INSERT INTO tafsir_texts VALUES (?, ?)", (text_id, compress(text)))
+        values = record[:text_at] + record[text_at + 1 :] + (text_id,)
+        out.execute(f"INSERT INTO tafsir_rows VALUES ({placeholders})", values)
+        rows += 1
+
+    covering = ["ayah_key"] + [c for c in APP_COLUMNS[1:-1] if c in names] + ["text_id"]
+    out.execute(f"CREATE INDEX tafsir_rows_ayah_key ON tafsir_rows ({', '.join(covering)})")
+    if codec.name == "none":
+        select = ", ".join("t.text AS text" if n == "text" else f'r."{n}"' for n in names)
+        out.execute(
+            f"CREATE VIEW {TABLE} AS SELECT {select} FROM tafsir_rows r "
+            "LEFT JOIN tafsir_texts t ON t.id = r.text_id"
+        )
+
+    # Carry over any other tables (metadata) as they were, but not the
+    # tables an earlier run of this script wrote.
+    skip = (TABLE,) + OWN_TABLES
+    for name, sql in source.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'table' "
+        f"AND name NOT IN ({', '.join('?' * len(skip))}) AND name NOT LIKE 'sqlite_%'",
+        skip,
+    ):
+        out.execute(sql)
+        cols = len(list(source.execute(f'PRAGMA table_info("{name}")')))
+        marks = ", ".join("?" for _ in range(cols))
+        out.executemany(f'INSERT INTO "{name}" VALUES ({marks})', source.execute(f'SELECT * FROM "{name}"'))
+    out.commit()
+    out.execute("ANALYZE")
+    out.commit()
+    out.execute("VACUUM")
+    out.close()
+    return {"rows": rows, "texts": len(ids)}
+
+
+def optimize(
+    src: str, dest: str, *, compress: str = "none", page_sizes: Sequence[int] = PAGE_SIZES
+) -> dict[str, int]:
+    """Write the optimized bundle to `dest`; return its stats."""
+    samples: list[str] = []
+    if compress == "zstd":
+        db = _connect_ro(src)
+        try:
+            _, names, rows = _logical_rows(src, db)
+            text_at = names.index("text")
+            samples = list(dict.fromkeys(r[text_at] for r in rows if r[text_at]))
+        finally:
+            db.close()
+    codec = Codec(compress, samples)
+    best: tuple[int, int, str] | None = None
+    stats: dict[str, int] = {}
+    folder = os.path.dirname(os.path.abspath(dest))
+    trials: list[str] = []
+    try:
+        for page_size in page_sizes:
+            fd, trial = tempfile.mkstemp(suffix=".sqlite", dir=folder)
+            os.close(fd)
+            trials.append(trial)
+            stats = _build(src, trial, page_size, codec)
+            size = os.path.getsize(trial)
+            if best is None or size < best[0]:
+                best = (size, page_size, trial)
+        assert best is not None
+        os.replace(best[2], dest)
+    finally:
+        for trial in trials:
+            if os.path.exists(trial):
+                os.remove(trial)
+    return dict(stats, page_size=best[1], before=os.path.getsize(src), after=best[0])
+
+
+def check_equivalent(original: str, optimized: str) -> list[str]:
+    """Ayah keys whose lookup result differs between the two bundles."""
+    a, b = TafsirBundle(original), TafsirBundle(optimized)
+    try:
+        keys = a.keys()
+        if keys != b.keys():
+            return ["ayah_key lists differ"]
+        return [k for k in keys if a.row(k) != b.row(k)]
+    finally:
+        a.close()
+        b.close()
+
+
+def lookup_latency(path: str, count: int = 2000, seed: int = 7) -> list[float]:
+    """Seconds per TafsirBundle.text() for `count` random ayah keys."""
+    bundle = TafsirBundle(path)
+    keys = bundle.keys()
+    rng = random.Random(seed)
+    sample = [rng.choice(keys) for _ in range(count)]
+    times: list[float] = []
+    for key in sample:
+        t0 = time.perf_counter()
+        bundle.text(key)
+        times.append(time.perf_counter() - t0)
+    bundle.close()
+    return times
+
+
+def _latency_line(label: str, times: list[float]) -> str:
+    q = statistics.quantiles(times, n=100)
+    return (
+        f"  {label:<10} p50 {q[49] * 1e6:7.1f}us  p95 {q[94] * 1e6:7.1f}us  "
+        f"p99 {q[98] * 1e6:7.1f}us"
+    )
+
+
+def report(src: str, dest: str, stats: dict[str, int]) -> list[str]:
+    return [
+        f"{os.path.basename(src)}: {stats['rows']} rows, {stats['texts']} distinct texts, "
+        f"page_size {stats['page_size']}",
+        f"  size       {stats['before'] / 1e6:.2f} MB -> {stats['after'] / 1e6:.2f} MB "
+        f"({stats['after'] / stats['before']:.0%})",
+        _latency_line("before", lookup_latency(src)),
+        _latency_line("after", lookup_latency(dest)),
+    ]
+
+
+def synthetic_bundle(path: str, ayahs: int = 6236, seed: int = 3) -> None:
+    """Ibn Kathir-shaped bundle: one passage repeated across each ayah group."""
+    rng = random.Random(seed)
+    words = "the of and Allah said those who believe verse narrated mercy Lord".split()
+    db = sqlite3.connect(path)
+    db.execute(
+        "CREATE TABLE tafsir (ayah_key TEXT, group_ayah_key TEXT, from_ayah TEXT, "
+        "to_ayah TEXT, ayah_keys TEXT, text TEXT)"
+    )
+    n = 0
+    s = a = 1
+    while n < ayahs:
+        size = min(rng.choice((1, 1, 2, 3, 5, 8)), ayahs - n)
+        keys = [f"{s}:{a + i}" for i in range(size)]
+        body = " ".join(rng.choice(words) for _ in range(rng.randint(80, 1200)))
+        text = f"<p>{body}</p>"
+        for key in keys:
+            db.execute(
+                "INSERT INTO tafsir VALUES (?, ?, ?, ?, ?, ?)",
+                (key, keys[0], keys[0], keys[-1], ",".join(keys), text),
+            )
+        n += size
+        a += size
+        if a > 200:
+            s, a = s + 1, 1
+    db.commit()
+    db.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("bundles", nargs="*")
+    parser.add_argument("--out-dir", default=DEFAULT_OUT)
+    parser.add_argument(
+        "--in-place",
+        action="store_true",
+        help="replace each bundle with its optimized copy instead of writing to --out-dir",
+    )
+    parser.add_argument("--compress", choices=CODECS, default="none")
+    parser.add_argument("--page-size", type=int, action="append", help="candidate page size")
+    parser.add_argument("--bench", action="store_true", help="run on a synthetic bundle")
+    args = parser.parse_args()
+    page_sizes = tuple(args.page_size or PAGE_SIZES)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bundles = list(args.bundles)
+        out_dir = None if args.in_place else args.out_dir
+        if args.bench:
+            bundles = [os.path.join(tmp, "synthetic_ibn_kathir.sqlite")]
+            synthetic_bundle(bundles[0])
+            out_dir = os.path.join(tmp, "out")
+        if not bundles:
+            parser.error("no bundles given")
+        failed = 0
+        for src in bundles:
+            dest = os.path.join(out_dir, os.path.basename(src)) if out_dir else src + ".opt"
+            os.makedirs(os.path.dirname(os.path.abspath(dest)), exist_ok=True)
+            stats = optimize(src, dest, compress=args.compress, page_sizes=page_sizes)
+            diffs = check_equivalent(src, dest)
+            if diffs:
+                failed += 1
+                print(f"{src}: {len(diffs)} lookups differ, first {diffs[0]}; keeping original")
+                os.remove(dest)
+                continue
+            print("\n".join(report(src, dest, stats)))
+            if not out_dir:
+                os.replace(dest, src)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
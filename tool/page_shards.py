@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Mushaf page shards (and optional juz shards) for one-read page rendering.
+
+generate_quran_json.py --page-shards writes pages/p001.json .. p604.json,
+each a JSON array of exactly that page's verses in reading order, in the
+same {s, a, ar, tr, m} shape as sNNN.json. --juz-shards adds
+juz/j01.json .. j30.json. A page view then parses one file instead of
+every surah file its index_pages.json ranges touch.
+
+check_shards() re-derives the page/juz ranges from the shard contents with
+quran_corpus.build_indexes and compares them to the index files, and checks
+that the shards concatenate back to the whole corpus in reading order.
+
+--bench compares bytes parsed per page view with and without page shards
+(synthetic verses unless --dir is given).
+
+Usage:
+  python tool/page_shards.py --bench
+  python tool/page_shards.py --bench --dir assets/quran
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import time
+from collections.abc import Sequence
+
+from quran_corpus import JUZ_COUNT, PAGE_COUNT, Corpus, build_indexes
+from verify_dataset import encode_json
+
+PAGE_PATTERN = "pages/p{page:03d}.json"
+JUZ_PATTERN = "juz/j{juz:02d}.json"
+
+
+def group_by(verses: Sequence[dict], field: str) -> dict[int, list[dict]]:
+    groups: dict[int, list[dict]] = {}
+    for v in verses:
+        groups.setdefault(v["m"][field], []).append(v)
+    return groups
+
+
+def shard_outputs(
+    verses: Sequence[dict], pages: bool = True, juz: bool = False
+) -> dict[str, object]:
+    """Relative path -> verse list for every page and/or juz shard."""
+    out: dict[str, object] = {}
+    if pages:
+        for page, group in sorted(group_by(verses, "page").items()):
+            out[PAGE_PATTERN.format(page=page)] = group
+    if juz:
+        for number, group in sorted(group_by(verses, "juz").items()):
+            out[JUZ_PATTERN.format(juz=number)] = group
+    return out
+
+
+def check_shards(
+    verses: Sequence[dict],
+    outputs: dict[str, object],
+    index_juz: dict,
+    index_pages: dict,
+) -> list[str]:
+    """Problems with the page/juz shards in `outputs`; empty when consistent."""
+    problems: list[str] = []
+    order = [(v["s"], v["a"]) for v in verses]
+    for field, pattern, count, index in (
+        ("page", PAGE_PATTERN, PAGE_COUNT, index_pages),
+        ("juz", JUZ_PATTERN, JUZ_COUNT, index_juz),
+    ):
+        names = [pattern.format(**{field: n}) for n in range(1, count + 1)]
+        present = [name for name in names if name in outputs]
+        if not present:
+            continue
+        if len(present) != count:
+            missing = sorted(set(names) - set(present))
+            problems.append(f"{field}: {len(missing)} shards missing, first {missing[0]}")
+        joined: list[tuple[int, int]] = []
+        for n, name in enumerate(names, 1):
+            shard = outputs.get(name)
+            if shard is None:
+                continue
+            joined.extend((v["s"], v["a"]) for v in shard)
+            wrong = [f"{v['s']}:{v['a']}" for v in shard if v["m"][field] != n]
+            if wrong:
+                problems.append(f"{name}: verses from another {field}: {wrong[:5]}")
+            ranges = build_indexes(shard)[0 if field == "juz" else 1].get(str(n))
+            if ranges != index.get(str(n)):
+                problems.append(f"{name}: ranges {ranges} != index {index.get(str(n))}")
+        if joined != order:
+            problems.append(f"{field} shards do not concatenate to the corpus in reading order")
+    return problems
+
+
+def bench(verses: list[dict]) -> list[str]:
+    surahs: dict[int, list[dict]] = {}
+    for v in verses:
+        surahs.setdefault(v["s"], []).append(v)
+    by_surah = {s: encode_json(group) for s, group in surahs.items()}
+    pages = {
+        page: encode_json(group) for page, group in sorted(group_by(verses, "page").items())
+    }
+    _, index_pages = build_indexes(verses)
+
+    surah_bytes: list[int] = []
+    page_bytes: list[int] = []
+    t0 = time.perf_counter()
+    for page in pages:
+        touched = {r["s"] for r in index_pages[str(page)]}
+        for s in touched:
+            json.loads(by_surah[s])
+        surah_bytes.append(sum(len(by_surah[s]) for s in touched))
+    t1 = time.perf_counter()
+    for raw in pages.values():
+        json.loads(raw)
+        page_bytes.append(len(raw))
+    t2 = time.perf_counter()
+
+    n = len(pages)
+    out = [f"{n} page views over {len(verses)} verses"]
+    for name, sizes, seconds in (
+        ("per-surah files", surah_bytes, t1 - t0),
+        ("page shards", page_bytes, t2 - t1),
+    ):
+        out.append(
+            f"  {name:<16} bytes/page mean {statistics.fmean(sizes) / 1e3:8.1f}KB  "
+            f"p50 {statistics.median(sizes) / 1e3:8.1f}KB  max {max(sizes) / 1e3:8.1f}KB  "
+            f"parse {seconds / n * 1e3:6.2f}ms/page"
+        )
+    out.append(
+        f"  page shards parse {sum(page_bytes) / sum(surah_bytes):.1%} of the bytes"
+    )
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", help="combined sNNN.json corpus (default: synthetic verses)")
+    parser.add_argument("--bench", action="store_true")
+    args = parser.parse_args()
+    if args.bench:
+        if args.dir:
+            verses = [v for _, v in Corpus(args.dir)]
+        else:
+            from verse_store import synthetic_verses
+
+            verses = list(synthetic_verses(1))
+        print("\n".join(bench(verses)))
+        return 0
+    parser.print_help()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""Glyph-usage index and subset fonts for the 604 QPC V2 page fonts.
+
+The glyph-usage index is the set of code points each mushaf page renders,
+read from the layout and word-script databases exactly as the reader
+builds a page (mushaf_pages.sqlite_page). Page 1 also keeps the
+Bismillah glyphs (words 1-4): its font renders the Basmallah on every
+page.
+
+Each assets/fonts/qpc_v2/pN.ttf is subset to its page's code points
+(layout features kept, hinting dropped) into --out-dir. With
+--pack-bytes, runs of consecutive pages whose subsets are small are
+merged into one pack font, as long as their code points do not collide
+(QPC V2 pages reuse the same code points, so most pages cannot share a
+font). manifest.json maps every page to its font file and family, and
+glyph_usage.json records the index.
+
+Every output font is checked against the index: the build fails (exit
+1) when a used code point is missing from a subset, or from the source
+font it came from. The report compares total bytes and per-font parse
+time (fontTools decompiling all tables, a proxy for FontLoader cost)
+before and after.
+
+Needs fontTools (pip install fonttools).
+
+Usage:
+  python tool/qpc_font_subset.py
+  python tool/qpc_font_subset.py --out-dir build/qpc_v2_fonts --pack-bytes 16384
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import sqlite3
+import statistics
+import tempfile
+import time
+from collections.abc import Mapping, Sequence
+
+from mushaf_pages import BISMILLAH_WORDS, LAYOUT_DB, WORDS_DB, sqlite_page
+from quran_corpus import PAGE_COUNT
+
+FONTS_DIR = "assets/fonts/qpc_v2"
+DEFAULT_OUT = "build/qpc_v2_fonts"
+FAMILY_PREFIX = "QpcV2Page"
+PACK_PREFIX = "QpcV2Pack"
+
+
+def _fonttools():
+    try:
+        import fontTools.merge
+        import fontTools.subset
+        import fontTools.ttLib
+    except ImportError:
+        raise SystemExit("qpc_font_subset.py needs fontTools (pip install fonttools)")
+    return fontTools
+
+
+def glyph_usage(layout_path: str, words_path: str, pages: int = PAGE_COUNT) -> dict[int, set[int]]:
+    """page -> code points of every glyph drawn on it."""
+    layout = sqlite3.connect(f"file:{layout_path}?mode=ro", uri=True)
+    words = sqlite3.connect(f"file:{words_path}?mode=ro", uri=True)
+    try:
+        usage: dict[int, set[int]] = {}
+        for page in range(1, pages + 1):
+            usage[page] = {
+                ord(ch) for line in sqlite_page(layout, words, page) for w in line.words for ch in w.glyph
+            }
+        first, last = BISMILLAH_WORDS
+        rows = words.execute("SELECT text FROM words WHERE id >= ? AND id <= ?", (first, last))
+        usage.setdefault(1, set()).update(ord(ch) for (text,) in rows for ch in text)
+    finally:
+        layout.close()
+        words.close()
+    return usage
+
+
+def missing(used: set[int], cmap: Mapping[int, str]) -> list[int]:
+    return sorted(cp for cp in used if cp not in cmap)
+
+
+def plan_packs(
+    usage: Mapping[int, set[int]], sizes: Mapping[int, int], budget: int
+) -> list[list[int]]:
+    """Group consecutive pages into packs of at most `budget` bytes.
+
+    A page joins the current pack only when none of its code points is
+    already taken there; budget 0 keeps one font per page.
+    """
+    packs: list[list[int]] = []
+    taken: set[int] = set()
+    total = 0
+    for page in sorted(usage):
+        size = sizes[page]
+        fits = budget and packs and total + size <= budget and not (usage[page] & taken)
+        if fits:
+            packs[-1].append(page)
+            taken |= usage[page]
+            total += size
+        else:
+            packs.append([page])
+            taken = set(usage[page])
+            total = size
+    return packs
+
+
+def pack_name(pages: Sequence[int]) -> tuple[str, str]:
+    """(file name, font family) of a pack; single pages keep the app's names."""
+    if len(pages) == 1:
+        return f"p{pages[0]}.ttf", f"{FAMILY_PREFIX}{pages[0]}"
+    return f"p{pages[0]}-{pages[-1]}.ttf", f"{PACK_PREFIX}{pages[0]}_{pages[-1]}"
+
+
+def subset_font(data: bytes, codepoints: set[int]) -> bytes:
+    ft = _fonttools()
+    options = ft.subset.Options()
+    options.layout_features = ["*"]
+    options.name_IDs = ["*"]
+    options.notdef_outline = True
+    options.hinting = False
+    font = ft.ttLib.TTFont(io.BytesIO(data))
+    subsetter = ft.subset.Subsetter(options)
+    subsetter.populate(unicodes=sorted(codepoints))
+    subsetter.subset(font)
+    out = io.BytesIO()
+    font.save(out)
+    return out.getvalue()
+
+
+def merge_fonts(fonts: Sequence[bytes], family: str) -> bytes:
+    ft = _fonttools()
+    # Merger reads font files, not buffers.
+    paths: list[str] = []
+    try:
+        for data in fonts:
+            f = tempfile.NamedTemporaryFile(suffix=".ttf", delete=False)
+            f.write(data)
+            f.close()
+            paths.append(f.name)
+        font = ft.merge.Merger().merge(paths)
+    finally:
+        for path in paths:
+            os.unlink(path)
+    for record in font["name"].names:
+        if record.nameID in (1, 4, 16):
+            record.string = family
+    out = io.BytesIO()
+    font.save(out)
+    return out.getvalue()
+
+
+def cmap(data: bytes) -> dict[int, str]:
+    ft = _fonttools()
+    return ft.ttLib.TTFont(io.BytesIO(data)).getBestCmap() or {}
+
+
+def parse_seconds(data: bytes, runs: int = 5) -> float:
+    """Median time to decompile every table of a font."""
+    ft = _fonttools()
+    times = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        font = ft.ttLib.TTFont(io.BytesIO(data), lazy=False)
+        font.ensureDecompiled()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times)
+
+
+def build(
+    fonts_dir: str,
+    out_dir: str,
+    usage: Mapping[int, set[int]],
+    pack_bytes: int = 0,
+) -> tuple[list[str], list[str]]:
+    """Write subset fonts and manifests; return (report lines, problems)."""
+    problems: list[str] = []
+    sources: dict[int, bytes] = {}
+    subsets: dict[int, bytes] = {}
+    for page in sorted(usage):
+        path = os.path.join(fonts_dir, f"p{page}.ttf")
+        if not os.path.isfile(path):
+            problems.append(f"p{page}.ttf: missing from {fonts_dir}")
+            continue
+        with open(path, "rb") as f:
+            sources[page] = f.read()
+        gaps = missing(usage[page], cmap(sources[page]))
+        if gaps:
+            problems.append(f"p{page}.ttf: source lacks {_codepoints(gaps)}")
+        subsets[page] = subset_font(sources[page], usage[page])
+
+    present = {page: usage[page] for page in subsets}
+    packs = plan_packs(present, {p: len(b) for p, b in subsets.items()}, pack_bytes)
+    os.makedirs(out_dir, exist_ok=True)
+    manifest: dict[str, dict] = {}
+    outputs: dict[str, bytes] = {}
+    for pages in packs:
+        name, family = pack_name(pages)
+        data = subsets[pages[0]] if len(pages) == 1 else merge_fonts([subsets[p] for p in pages], family)
+        table = cmap(data)
+        for page in pages:
+            gaps = missing(usage[page], table)
+            if gaps:
+                problems.append(f"{name}: page {page} lost {_codepoints(gaps)}")
+            manifest[str(page)] = {"file": name, "family": family}
+        outputs[name] = data
+        with open(os.path.join(out_dir, name), "wb") as f:
+            f.write(data)
+    with open(os.path.join(out_dir, "manifest.json"), "w", encoding="utf-8") as f:
+        json.dump({"pages": manifest}, f, indent=2)
+        f.write("\n")
+    with open(os.path.join(out_dir, "glyph_usage.json"), "w", encoding="utf-8") as f:
+        json.dump({str(p): sorted(cps) for p, cps in sorted(usage.items())}, f)
+        f.write("\n")
+
+    before = sum(len(b) for b in sources.values())
+    after = sum(len(b) for b in outputs.values())
+    load_before = [parse_seconds(b) for b in sources.values()]
+    load_after = [parse_seconds(b) for b in outputs.values()]
+    lines = [
+        f"fonts    {len(sources)} -> {len(outputs)} files ({len(packs)} packs)",
+        f"bytes    {before:,} -> {after:,} ({after / before:.0%})" if before else "bytes    0",
+    ]
+    if load_before and load_after:
+        lines.append(
+            f"parse    p50 {statistics.median(load_before) * 1e3:.2f}ms -> "
+            f"{statistics.median(load_after) * 1e3:.2f}ms per font, "
+            f"total {sum(load_before):.2f}s -> {sum(load_after):.2f}s"
+        )
+    return lines, problems
+
+
+def _codepoints(cps: Sequence[int]) -> str:
+    shown = ", ".join(f"U+{cp:04X}" for cp in cps[:8])
+    return shown + (f" and {len(cps) - 8} more" if len(cps) > 8 else "")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--layout", default=LAYOUT_DB)
+    parser.add_argument("--words", default=WORDS_DB)
+    parser.add_argument("--fonts-dir", default=FONTS_DIR)
+    parser.add_argument("--out-dir", default=DEFAULT_OUT)
+    parser.add_argument(
+        "--pack-bytes", type=int, default=0, help="merge consecutive small pages up to this size"
+    )
+    args = parser.parse_args()
+    for path in (args.layout, args.words):
+        if not os.path.isfile(path):
+            raise SystemExit(f"missing {path}; see DATA_SOURCES.md")
+    _fonttools()
+    usage = glyph_usage(args.layout, args.words)
+    lines, problems = build(args.fonts_dir, args.out_dir, usage, args.pack_bytes)
+    print("\n".join(lines))
+    for problem in problems:
+        print(problem)
+    if problems:
+        print(f"{len(problems)} fonts are missing glyphs their pages use")
+        return 1
+    print(f"Wrote {args.out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
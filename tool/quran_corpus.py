@@ -0,0 +1,162 @@
+"""Load bundled verse shards once and drive analyzers over them in one pass.
+
+Each sNNN.json is a JSON array of verse objects. Tools subclass Analyzer,
+implement visit(), and return their report section from report(); scan()
+feeds every verse of the corpus to every analyzer in reading order.
+"""
+
+from __future__ import annotations
+
+import bisect
+import glob
+import itertools
+import json
+import os
+import re
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from collections.abc import Iterable, Iterator, Sequence
+
+DEFAULT_DIR = os.path.join("assets", "quran")
+SHARD_PATTERN = "s[0-9][0-9][0-9].json"
+EXPECTED_AYAHS = (
+    7, 286, 200, 176, 120, 165, 206, 75, 129, 109, 123, 111, 43, 52, 99,
+    128, 111, 110, 98, 135, 112, 78, 118, 64, 77, 227, 93, 88, 69, 60, 34,
+    30, 73, 54, 45, 83, 182, 88, 75, 85, 54, 53, 89, 59, 37, 35, 38, 29,
+    18, 45, 60, 49, 62, 55, 78, 96, 29, 22, 24, 13, 14, 11, 11, 18, 12,
+    12, 30, 52, 52, 44, 28, 28, 20, 56, 40, 31, 50, 40, 46, 42, 29, 19,
+    36, 25, 22, 17, 19, 26, 30, 20, 15, 21, 11, 8, 8, 19, 5, 8, 8, 11, 11,
+    8, 3, 9, 5, 4, 7, 3, 6, 3, 5, 4, 5, 6,
+)
+SURAH_COUNT = 114
+AYAH_TOTAL = 6236
+JUZ_COUNT = 30
+PAGE_COUNT = 604
+# Ordinal of each surah's first ayah; SURAH_STARTS[114] == AYAH_TOTAL.
+SURAH_STARTS = tuple(itertools.accumulate(EXPECTED_AYAHS, initial=0))
+
+
+def ayah_ordinal(surah: int, ayah: int) -> int:
+    """0-based position of surah:ayah in reading order (0..6235)."""
+    if not 1 <= surah <= SURAH_COUNT or not 1 <= ayah <= EXPECTED_AYAHS[surah - 1]:
+        raise ValueError(f"no ayah {surah}:{ayah}")
+    return SURAH_STARTS[surah - 1] + ayah - 1
+
+
+def ayah_at(ordinal: int) -> tuple[int, int]:
+    """(surah, ayah) at a 0-based ordinal; inverse of ayah_ordinal."""
+    if not 0 <= ordinal < AYAH_TOTAL:
+        raise ValueError(f"ordinal {ordinal} out of range")
+    surah = bisect.bisect_right(SURAH_STARTS, ordinal)
+    return surah, ordinal - SURAH_STARTS[surah - 1] + 1
+
+
+# Waqf marks U+06D6-U+06DC, rub el hizb U+06DE and the sajdah sign U+06E9
+# sit between words in text_uthmani; they separate words, they are not words.
+PAUSE_MARKS = "\u06d6-\u06dc\u06de\u06e9"
+WORD_RE = re.compile(f"[^\\s{PAUSE_MARKS}]+")
+
+
+def ar_words(text: str) -> list[str]:
+    """Words of an `ar` string: whitespace- and pause-mark-separated runs."""
+    return WORD_RE.findall(text)
+
+
+def shard_paths(root: str = DEFAULT_DIR) -> list[str]:
+    return sorted(glob.glob(os.path.join(root, SHARD_PATTERN)))
+
+
+def load_verses(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        verses = data.get("verses")
+        if isinstance(verses, list):
+            return verses
+    raise SystemExit(f"unexpected JSON shape in {path}: {type(data).__name__}")
+
+
+def build_indexes(all_verses: Iterable[dict]) -> tuple[dict, dict]:
+    """index_juz.json and index_pages.json: number -> {s, a1, a2} ranges."""
+    return index_ranges((v["s"], v["a"], v["m"]["juz"], v["m"]["page"]) for v in all_verses)
+
+
+def index_ranges(keys: Iterable[tuple[int, int, int, int]]) -> tuple[dict, dict]:
+    """build_indexes from (s, a, juz, page) tuples in reading order."""
+    juz_map: dict[int, list[tuple[int, int]]] = defaultdict(list)
+    page_map: dict[int, list[tuple[int, int]]] = defaultdict(list)
+    for s, a, juz, page in keys:
+        juz_map[juz].append((s, a))
+        page_map[page].append((s, a))
+
+    def ranges(groups: dict[int, list[tuple[int, int]]]) -> dict[str, list]:
+        out: dict[str, list] = {}
+        for num in sorted(groups):
+            items = groups[num]
+            packed: list[dict] = []
+            cur_s, start, prev = items[0][0], items[0][1], items[0][1]
+            for s, a in items[1:]:
+                if s == cur_s and a == prev + 1:
+                    prev = a
+                    continue
+                packed.append({"s": cur_s, "a1": start, "a2": prev})
+                cur_s, start, prev = s, a, a
+            packed.append({"s": cur_s, "a1": start, "a2": prev})
+            out[str(num)] = packed
+        return out
+
+    return ranges(juz_map), ranges(page_map)
+
+
+class Corpus:
+    """All verse shards under one directory, decoded once."""
+
+    def __init__(self, root: str = DEFAULT_DIR) -> None:
+        self.root = root
+        self.paths = shard_paths(root)
+        if not self.paths:
+            raise SystemExit(f"no {os.path.join(root, 's*.json')} files found")
+        self.shards: list[tuple[str, list]] = [
+            (path, load_verses(path)) for path in self.paths
+        ]
+
+    def __iter__(self) -> Iterator[tuple[str, dict]]:
+        for path, verses in self.shards:
+            for v in verses:
+                yield path, v
+
+    def verse_count(self) -> int:
+        return sum(len(verses) for _, verses in self.shards)
+
+
+class Analyzer(ABC):
+    """One report section computed from a single pass over the corpus."""
+
+    title = ""
+
+    def begin(self, corpus: Corpus) -> None:
+        pass
+
+    @abstractmethod
+    def visit(self, path: str, verse: dict) -> None:
+        """Take one verse of the scan."""
+
+    def finish(self) -> None:
+        pass
+
+    @abstractmethod
+    def report(self) -> list[str]:
+        """This analyzer's report section, one line per item."""
+
+
+def scan(corpus: Corpus, analyzers: Sequence[Analyzer]) -> None:
+    for analyzer in analyzers:
+        analyzer.begin(corpus)
+    visitors = [analyzer.visit for analyzer in analyzers]
+    for path, verse in corpus:
+        for visit in visitors:
+            visit(path, verse)
+    for analyzer in analyzers:
+        analyzer.finish()
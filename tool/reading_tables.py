@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""Cumulative reading-length tables for O(1) progress and time estimates.
+
+For every metric the table holds a prefix-sum array over the 6236 ayahs
+in reading order (quran_corpus.ayah_ordinal): cumulative[m][k] is the
+amount of metric m in ordinals 0..k-1, so any range of ayahs costs one
+subtraction. Metrics:
+
+  words     ayah words (quran_corpus.ar_words: pause marks are not words)
+  letters   Arabic letters in `ar` (Unicode category Lo; harakat, small
+            high signs and tatweel are not counted)
+  tr.<code> characters of each translation, after cleaning
+
+surahStarts/juzStarts/pageStarts hold the first ordinal of every surah,
+juz and mushaf page plus a final AYAH_TOTAL, and totals holds each unit's
+amount per metric. generate_quran_json.py --reading-tables writes the
+table as reading_tables.json; ReadingTables answers "how far through the
+Quran, surah, juz or page is surah:ayah" and how much is left.
+
+Usage:
+  python tool/reading_tables.py
+  python tool/reading_tables.py --dir assets/quran --out build/reading_tables.json
+  python tool/generate_quran_json.py --reading-tables
+"""
+
+from __future__ import annotations
+
+import argparse
+import bisect
+import json
+import os
+import unicodedata
+from array import array
+from collections.abc import Iterable, Mapping, Sequence
+
+from quran_corpus import (
+    AYAH_TOTAL,
+    DEFAULT_DIR,
+    JUZ_COUNT,
+    PAGE_COUNT,
+    SURAH_STARTS,
+    Corpus,
+    ar_words,
+    ayah_at,
+    ayah_ordinal,
+)
+
+FILE_NAME = "reading_tables.json"
+DEFAULT_OUT = os.path.join("build", FILE_NAME)
+VERSION = 1
+
+
+def letter_count(text: str) -> int:
+    return sum(1 for ch in text if unicodedata.category(ch) == "Lo")
+
+
+def verse_amounts(verse: Mapping) -> dict[str, int]:
+    """Per-metric amounts of one verse."""
+    ar = verse.get("ar") or ""
+    amounts = {"words": len(ar_words(ar)), "letters": letter_count(ar)}
+    for code, text in sorted((verse.get("tr") or {}).items()):
+        amounts["tr." + code] = len(text or "")
+    return amounts
+
+
+def _starts(values: Sequence[int], count: int, name: str) -> list[int]:
+    """First ordinal of units 1..count from a per-ordinal unit number."""
+    starts: list[int] = []
+    for k, value in enumerate(values):
+        if value == len(starts) + 1:
+            starts.append(k)
+        elif value != len(starts):
+            raise ValueError(f"{name} {value} at ordinal {k} is out of reading order")
+    if len(starts) != count:
+        raise ValueError(f"expected {count} {name}s, found {len(starts)}")
+    return starts + [len(values)]
+
+
+class ReadingTables:
+    def __init__(
+        self,
+        cumulative: Mapping[str, Sequence[int]],
+        juz_starts: Sequence[int],
+        page_starts: Sequence[int],
+    ) -> None:
+        self.cumulative = {m: array("I", values) for m, values in cumulative.items()}
+        for metric, values in self.cumulative.items():
+            if len(values) != AYAH_TOTAL + 1:
+                raise ValueError(f"{metric}: {len(values)} entries, expected {AYAH_TOTAL + 1}")
+        self.starts = {
+            "quran": (0, AYAH_TOTAL),
+            "surah": SURAH_STARTS,
+            "juz": tuple(juz_starts),
+            "page": tuple(page_starts),
+        }
+
+    @classmethod
+    def from_verses(cls, verses: Iterable[Mapping]) -> ReadingTables:
+        """Build from all 6236 verses in reading order."""
+        sums: dict[str, list[int]] = {}
+        juz: list[int] = []
+        page: list[int] = []
+        k = 0
+        for k, verse in enumerate(verses):
+            if ayah_ordinal(verse["s"], verse["a"]) != k:
+                raise ValueError(f"{verse['s']}:{verse['a']} is not ayah number {k + 1}")
+            for metric, amount in verse_amounts(verse).items():
+                column = sums.get(metric)
+                if column is None:
+                    if k:
+                        raise ValueError(f"{metric} starts at {verse['s']}:{verse['a']}")
+                    column = sums[metric] = [0]
+                column.append(column[-1] + amount)
+            juz.append(verse["m"]["juz"])
+            page.append(verse["m"]["page"])
+        if k + 1 != AYAH_TOTAL:
+            raise ValueError(f"expected {AYAH_TOTAL} verses, got {k + 1}")
+        short = [m for m, column in sums.items() if len(column) != AYAH_TOTAL + 1]
+        if short:
+            raise ValueError(f"{', '.join(short)} missing from some verses")
+        return cls(sums, _starts(juz, JUZ_COUNT, "juz"), _starts(page, PAGE_COUNT, "page"))
+
+    @classmethod
+    def from_json(cls, data: Mapping) -> ReadingTables:
+        if data.get("version") != VERSION:
+            raise ValueError(f"not a version {VERSION} reading table")
+        return cls(data["cumulative"], data["juzStarts"], data["pageStarts"])
+
+    @classmethod
+    def load(cls, path: str) -> ReadingTables:
+        with open(path, encoding="utf-8") as f:
+            return cls.from_json(json.load(f))
+
+    def to_json(self) -> dict:
+        totals: dict[str, dict[str, list[int]]] = {}
+        for scope in ("surah", "juz", "page"):
+            starts = self.starts[scope]
+            totals[scope] = {
+                m: [values[end] - values[start] for start, end in zip(starts, starts[1:])]
+                for m, values in self.cumulative.items()
+            }
+        return {
+            "version": VERSION,
+            "ayahTotal": AYAH_TOTAL,
+            "metrics": list(self.cumulative),
+            "cumulative": {m: list(values) for m, values in self.cumulative.items()},
+            "surahStarts": list(SURAH_STARTS),
+            "juzStarts": list(self.starts["juz"]),
+            "pageStarts": list(self.starts["page"]),
+            "totals": totals,
+        }
+
+    def span(self, scope: str, number: int = 1) -> tuple[int, int]:
+        """[first, end) ordinals of surah/juz/page `number` (quran: the whole text)."""
+        starts = self.starts[scope]
+        if not 1 <= number < len(starts):
+            raise ValueError(f"no {scope} {number}")
+        return starts[number - 1], starts[number]
+
+    def unit_of(self, scope: str, ordinal: int) -> int:
+        """Surah, juz or page number containing an ordinal."""
+        if scope == "quran":
+            return 1
+        if scope == "surah":
+            return ayah_at(ordinal)[0]
+        if not 0 <= ordinal < AYAH_TOTAL:
+            raise ValueError(f"ordinal {ordinal} out of range")
+        return bisect.bisect_right(self.starts[scope], ordinal)
+
+    def total(self, metric: str, start: int, end: int) -> int:
+        """Amount of a metric in ordinals [start, end)."""
+        values = self.cumulative[metric]
+        return values[end] - values[start]
+
+    def progress(self, surah: int, ayah: int, scope: str = "quran", metric: str = "words") -> tuple[int, int]:
+        """(amount read through surah:ayah inclusive, amount in its scope unit)."""
+        ordinal = ayah_ordinal(surah, ayah)
+        start, end = self.span(scope, self.unit_of(scope, ordinal))
+        return self.total(metric, start, ordinal + 1), self.total(metric, start, end)
+
+    def fraction(self, surah: int, ayah: int, scope: str = "quran", metric: str = "words") -> float:
+        done, total = self.progress(surah, ayah, scope, metric)
+        return done / total if total else 1.0
+
+    def remaining(self, surah: int, ayah: int, scope: str = "quran", metric: str = "words") -> int:
+        """Amount left in the scope unit after surah:ayah."""
+        done, total = self.progress(surah, ayah, scope, metric)
+        return total - done
+
+    def minutes_left(
+        self, surah: int, ayah: int, per_minute: float, scope: str = "quran", metric: str = "words"
+    ) -> float:
+        """Reading time left in the scope unit at `per_minute` units a minute."""
+        return self.remaining(surah, ayah, scope, metric) / per_minute
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", default=DEFAULT_DIR, help="verse shards")
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    args = parser.parse_args()
+
+    corpus = Corpus(args.dir)
+    tables = ReadingTables.from_verses(v for _, v in corpus)
+    out = args.out
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(tables.to_json(), f, separators=(",", ":"))
+        f.write("\n")
+    for metric in tables.cumulative:
+        print(f"{metric:<8} {tables.total(metric, 0, AYAH_TOTAL):>10,}")
+    print(f"Wrote {out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
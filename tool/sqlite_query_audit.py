@@ -0,0 +1,307 @@
+#!/usr/bin/env python3
+"""Query-plan audit for the bundled SQLite assets.
+
+BUNDLES declares, per asset, the lookups the app runs on it (copied from
+the repositories under lib/core/) and the indexes that serve them. For
+every asset present the audit runs EXPLAIN QUERY PLAN on each hot query,
+flags any step that scans a whole table or index, and times the query
+with random parameters (p50/p95/p99/max).
+
+--fix creates the declared indexes that are missing (on tables only; the
+optimized tafsir bundles are a view over already-indexed tables), runs
+ANALYZE, and audits again. Exit status is 1 when a query still scans, so
+CI fails when a bundle regresses. Missing assets are reported and skipped.
+
+Usage:
+  python tool/sqlite_query_audit.py
+  python tool/sqlite_query_audit.py --fix
+  python tool/sqlite_query_audit.py --bundle tafsir --runs 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import random
+import sqlite3
+import statistics
+import time
+from collections.abc import Callable, Sequence
+from typing import NamedTuple
+
+from optimize_tafsir import APP_COLUMNS as TAFSIR_COLUMNS
+from quran_corpus import EXPECTED_AYAHS, PAGE_COUNT, SURAH_COUNT
+
+# Last word id of the QPC V2 word table, for sampling ranges.
+QPC_V2_WORDS = 83668
+
+
+class HotQuery(NamedTuple):
+    name: str
+    sql: str
+    # random parameters for one execution
+    params: Callable[[random.Random], tuple]
+
+
+class Index(NamedTuple):
+    name: str
+    table: str
+    columns: tuple[str, ...]
+
+    def sql(self) -> str:
+        return f'CREATE INDEX IF NOT EXISTS "{self.name}" ON "{self.table}" ({", ".join(self.columns)})'
+
+
+class Bundle(NamedTuple):
+    name: str
+    patterns: tuple[str, ...]
+    queries: tuple[HotQuery, ...]
+    indexes: tuple[Index, ...] = ()
+
+
+def _ayah_key(rng: random.Random) -> tuple:
+    s = rng.randint(1, SURAH_COUNT)
+    return (f"{s}:{rng.randint(1, EXPECTED_AYAHS[s - 1])}",)
+
+
+def _page(rng: random.Random) -> int:
+    return rng.randint(1, PAGE_COUNT)
+
+
+def _word_range(rng: random.Random) -> tuple[int, int]:
+    first = rng.randint(1, QPC_V2_WORDS - 200)
+    return first, first + rng.randint(5, 150)
+
+
+BUNDLES: tuple[Bundle, ...] = (
+    Bundle(
+        "surah_info",
+        ("assets/quran/surah_info/*.sqlite",),
+        (
+            HotQuery(
+                "getForSurah",
+                "SELECT text, short_text FROM surah_infos WHERE surah_number = ? LIMIT 1",
+                lambda rng: (rng.randint(1, SURAH_COUNT),),
+            ),
+        ),
+        (Index("surah_infos_surah_number", "surah_infos", ("surah_number",)),),
+    ),
+    Bundle(
+        "transliteration",
+        ("assets/quran/transliteration/*.db",),
+        (
+            HotQuery(
+                "getForAyah",
+                "SELECT text FROM transliterations WHERE ayah_key = ? LIMIT 1",
+                _ayah_key,
+            ),
+        ),
+        (Index("transliterations_ayah_key", "transliterations", ("ayah_key",)),),
+    ),
+    Bundle(
+        "tafsir",
+        ("assets/tafsir/*.sqlite",),
+        (
+            HotQuery(
+                "getForAyah",
+                f"SELECT {', '.join(TAFSIR_COLUMNS)} FROM tafsir WHERE ayah_key = ? LIMIT 1",
+                _ayah_key,
+            ),
+        ),
+        (Index("tafsir_ayah_key", "tafsir", ("ayah_key",)),),
+    ),
+    Bundle(
+        "mushaf_layout",
+        ("assets/mushaf/layout/qpc_v2_15_lines.sqlite",),
+        (
+            HotQuery(
+                "loadPageLines",
+                "SELECT * FROM pages WHERE page_number = ? ORDER BY line_number ASC",
+                lambda rng: (_page(rng),),
+            ),
+            HotQuery(
+                "isPageCacheValid",
+                "SELECT line_type FROM pages WHERE page_number = ?",
+                lambda rng: (_page(rng),),
+            ),
+            HotQuery(
+                "pageAyahLines",
+                "SELECT first_word_id, last_word_id FROM pages "
+                "WHERE page_number = ? AND line_type = ?",
+                lambda rng: (_page(rng), "ayah"),
+            ),
+            HotQuery(
+                "pageSurahNames",
+                "SELECT surah_number, line_number FROM pages "
+                "WHERE page_number = ? AND line_type = ? ORDER BY line_number ASC",
+                lambda rng: (_page(rng), "surah_name"),
+            ),
+            HotQuery(
+                "basmallahAfterName",
+                "SELECT * FROM pages WHERE page_number = ? AND line_type = ? "
+                "AND line_number > ? AND line_number < ? LIMIT 1",
+                lambda rng: (_page(rng), "basmallah", 1, 5),
+            ),
+        ),
+        (Index("pages_page_type_line", "pages", ("page_number", "line_type", "line_number")),),
+    ),
+    Bundle(
+        "mushaf_words",
+        ("assets/mushaf/script/qpc_v2_words.sqlite",),
+        (
+            HotQuery(
+                "pageWords",
+                "SELECT * FROM words WHERE id >= ? AND id <= ? ORDER BY id ASC",
+                _word_range,
+            ),
+            HotQuery(
+                "pageContainsRecitation",
+                "SELECT 1 FROM words WHERE id >= ? AND id <= ? AND surah = ? AND ayah = ? LIMIT 1",
+                lambda rng: (*_word_range(rng), rng.randint(1, SURAH_COUNT), 1),
+            ),
+            HotQuery(
+                "surahIdsForPage",
+                "SELECT DISTINCT surah FROM words WHERE id >= ? AND id <= ? ORDER BY surah ASC",
+                _word_range,
+            ),
+        ),
+        (Index("words_id", "words", ("id",)),),
+    ),
+)
+
+
+def is_scan(detail: str) -> bool:
+    """EXPLAIN QUERY PLAN step that visits every row of a table or index."""
+    return detail.startswith("SCAN ") and not detail.startswith("SCAN CONSTANT ROW")
+
+
+def plan(db: sqlite3.Connection, query: HotQuery, rng: random.Random) -> list[str]:
+    return [row[3] for row in db.execute("EXPLAIN QUERY PLAN " + query.sql, query.params(rng))]
+
+
+def latencies(db: sqlite3.Connection, query: HotQuery, runs: int, rng: random.Random) -> list[float]:
+    times: list[float] = []
+    for _ in range(runs):
+        params = query.params(rng)
+        t0 = time.perf_counter()
+        db.execute(query.sql, params).fetchall()
+        times.append(time.perf_counter() - t0)
+    return times
+
+
+def _tables(db: sqlite3.Connection) -> set[str]:
+    return {r[0] for r in db.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+def fix(path: str, bundle: Bundle) -> list[str]:
+    """Create the bundle's missing indexes and ANALYZE; return what was created."""
+    created: list[str] = []
+    db = sqlite3.connect(path)
+    try:
+        tables = _tables(db)
+        existing = {r[0] for r in db.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        for index in bundle.indexes:
+            if index.table in tables and index.name not in existing:
+                db.execute(index.sql())
+                created.append(index.name)
+        db.execute("ANALYZE")
+        db.commit()
+    finally:
+        db.close()
+    return created
+
+
+class QueryReport(NamedTuple):
+    bundle: str
+    path: str
+    query: str
+    plan: list[str]
+    times: list[float]
+
+    @property
+    def scans(self) -> list[str]:
+        return [step for step in self.plan if is_scan(step)]
+
+
+def audit_file(path: str, bundle: Bundle, runs: int, seed: int = 1) -> list[QueryReport]:
+    rng = random.Random(seed)
+    db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        return [
+            QueryReport(bundle.name, path, q.name, plan(db, q, rng), latencies(db, q, runs, rng))
+            for q in bundle.queries
+        ]
+    finally:
+        db.close()
+
+
+def format_report(report: QueryReport) -> list[str]:
+    times = sorted(report.times)
+    if len(times) >= 2:
+        q = statistics.quantiles(times, n=100)
+        p50, p95, p99 = q[49], q[94], q[98]
+    else:
+        p50 = p95 = p99 = times[0] if times else 0.0
+    flag = "SCAN" if report.scans else "ok  "
+    out = [
+        f"  {flag} {report.query:<24} p50 {p50 * 1e6:8.1f}us  p95 {p95 * 1e6:8.1f}us  "
+        f"p99 {p99 * 1e6:8.1f}us  max {(times[-1] if times else 0) * 1e6:8.1f}us"
+    ]
+    out.extend(f"       {step}" for step in report.plan)
+    return out
+
+
+def bundle_files(bundle: Bundle, root: str = ".") -> list[str]:
+    paths: list[str] = []
+    for pattern in bundle.patterns:
+        paths.extend(sorted(glob.glob(os.path.join(root, pattern))))
+    return paths
+
+
+def run(
+    bundles: Sequence[Bundle],
+    root: str = ".",
+    runs: int = 200,
+    apply_fix: bool = False,
+) -> tuple[list[str], int]:
+    """Report lines and the number of queries that still scan."""
+    lines: list[str] = []
+    scanning = 0
+    for bundle in bundles:
+        files = bundle_files(bundle, root)
+        if not files:
+            lines.append(f"{bundle.name}: missing ({', '.join(bundle.patterns)}), skipped")
+            continue
+        for path in files:
+            if apply_fix:
+                created = fix(path, bundle)
+                note = f"created {', '.join(created)}; " if created else ""
+                lines.append(f"{path}: {note}ANALYZE done")
+            lines.append(f"{path} ({bundle.name})")
+            for report in audit_file(path, bundle, runs):
+                lines.extend(format_report(report))
+                scanning += bool(report.scans)
+    return lines, scanning
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--root", default=".", help="directory holding assets/")
+    parser.add_argument(
+        "--bundle", action="append", choices=[b.name for b in BUNDLES], help="only these bundles"
+    )
+    parser.add_argument("--fix", action="store_true", help="add missing indexes and ANALYZE")
+    parser.add_argument("--runs", type=int, default=200, help="timed executions per query")
+    args = parser.parse_args()
+    bundles = [b for b in BUNDLES if not args.bundle or b.name in args.bundle]
+    lines, scanning = run(bundles, args.root, args.runs, args.fix)
+    print("\n".join(lines))
+    if scanning:
+        print(f"{scanning} hot queries scan a full table or index")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+"""One MP3 per surah from an offline audio pack, plus a seek index.
+
+Reads a pack written by audio_packs.py and, for every surah, joins the
+ayah files in the order the player queues them (logicalAyahSequence in
+sparse_playlist.dart: the Bismillah clip SSS000.mp3 first for surahs
+other than 1 and 9, then ayahs 1..N) into `<out-dir>/<reciterId>/SSS.mp3`.
+Pieces are cut at frame boundaries: ID3 tags and each file's leading
+Xing/Info frame are dropped, so the result is one continuous MPEG stream.
+All pieces of a surah must share a sample rate.
+
+seek_index.bin, little-endian:
+
+  header   "QSIX", u16 version, u16 surah count (114)
+  table    (surah count + 1) x u32 entry ordinals; surah s owns entries
+           table[s-1]:table[s]
+  entry    u16 ayah (0 = Bismillah, 0xFFFF = end of surah), u32 byte
+           offset, u32 frame offset, u32 start ms
+
+The end entry carries the file size, frame count and duration, so
+an ayah's span is its entry to the next one. Surahs without audio have
+no entries. The build re-walks every written file's frame headers
+(verify_surah) and fails unless each entry lands exactly on a frame
+boundary with the expected frame count and time.
+
+Usage:
+  python tool/surah_audio.py build/audio/Alafasy_128kbps
+  python tool/surah_audio.py build/audio/Alafasy_128kbps --out-dir build/surah_audio --surahs 1,2
+  python tool/surah_audio.py --verify build/surah_audio/Alafasy_128kbps
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import struct
+import sys
+from collections.abc import Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from audio_packs import BISMILLAH_AYAH, file_name, has_bismillah_audio
+from mp3_frames import frames, is_info_frame
+from quran_corpus import EXPECTED_AYAHS, SURAH_COUNT
+
+DEFAULT_OUT = "build/surah_audio"
+INDEX = "seek_index.bin"
+MAGIC = b"QSIX"
+VERSION = 1
+END = 0xFFFF
+
+_HEADER = struct.Struct("<4sHH")
+_ENTRY = struct.Struct("<HIII")
+
+
+class Entry(NamedTuple):
+    ayah: int
+    byte: int
+    frame: int
+    ms: int
+
+
+def logical_ayahs(surah: int) -> list[int]:
+    """logicalAyahSequence(hasBismillah, ayahCount) for a surah."""
+    first = [BISMILLAH_AYAH] if has_bismillah_audio(surah) else []
+    return first + list(range(1, EXPECTED_AYAHS[surah - 1] + 1))
+
+
+def surah_file(surah: int) -> str:
+    return f"{surah:03d}.mp3"
+
+
+def audio_frames(data: bytes) -> tuple[list[tuple[int, int, int]], int]:
+    """(offset, length, samples) of each audio frame and the sample rate."""
+    spans: list[tuple[int, int, int]] = []
+    rate = 0
+    for k, frame in enumerate(frames(data)):
+        if k == 0 and is_info_frame(data, frame):
+            continue
+        if rate and frame.sample_rate != rate:
+            raise ValueError(f"sample rate changes at byte {frame.offset}")
+        rate = frame.sample_rate
+        spans.append((frame.offset, frame.length, frame.samples))
+    if not spans:
+        raise ValueError("no audio frames")
+    return spans, rate
+
+
+def join_surah(pack: str, surah: int) -> tuple[bytes, list[Entry], int]:
+    """Concatenated audio, its entries (with the end entry) and sample rate."""
+    out = bytearray()
+    entries: list[Entry] = []
+    frame_count = 0
+    samples = 0
+    rate = 0
+    for ayah in logical_ayahs(surah):
+        name = file_name(surah, ayah)
+        with open(os.path.join(pack, name), "rb") as f:
+            data = f.read()
+        try:
+            spans, piece_rate = audio_frames(data)
+        except ValueError as err:
+            raise ValueError(f"{name}: {err}") from None
+        if rate and piece_rate != rate:
+            raise ValueError(f"{name}: {piece_rate} Hz in a {rate} Hz surah")
+        rate = piece_rate
+        entries.append(Entry(ayah, len(out), frame_count, samples * 1000 // rate))
+        for offset, length, count in spans:
+            out += data[offset : offset + length]
+            samples += count
+        frame_count += len(spans)
+    entries.append(Entry(END, len(out), frame_count, samples * 1000 // rate))
+    return bytes(out), entries, rate
+
+
+def verify_surah(data: bytes, entries: Sequence[Entry], surah: int) -> list[str]:
+    """Problems with one surah file against its index entries."""
+    problems: list[str] = []
+    starts: dict[int, tuple[int, int]] = {}
+    samples = 0
+    rate = 0
+    count = 0
+    try:
+        for k, frame in enumerate(frames(data)):
+            if k == 0 and is_info_frame(data, frame):
+                problems.append(f"{surah_file(surah)}: starts with an info frame")
+            rate = rate or frame.sample_rate
+            starts[frame.offset] = (k, samples)
+            samples += frame.samples
+            count = k + 1
+    except ValueError as err:
+        return [f"{surah_file(surah)}: {err}"]
+    starts[len(data)] = (count, samples)
+    expected = logical_ayahs(surah) + [END]
+    if [e.ayah for e in entries] != expected:
+        problems.append(f"{surah_file(surah)}: index lists {len(entries)} entries, expected {len(expected)}")
+    for entry in entries:
+        hit = starts.get(entry.byte)
+        if hit is None:
+            problems.append(f"{surah_file(surah)}: ayah {entry.ayah} at byte {entry.byte} is not a frame start")
+            continue
+        frame, at = hit[0], hit[1] * 1000 // rate
+        if (frame, at) != (entry.frame, entry.ms):
+            problems.append(
+                f"{surah_file(surah)}: ayah {entry.ayah} indexed at frame {entry.frame}/{entry.ms}ms, "
+                f"stream has frame {frame}/{at}ms"
+            )
+    return problems
+
+
+def encode_index(by_surah: dict[int, list[Entry]]) -> bytes:
+    table = [0]
+    body = bytearray()
+    for surah in range(1, SURAH_COUNT + 1):
+        for entry in by_surah.get(surah, ()):
+            body += _ENTRY.pack(*entry)
+        table.append(len(body) // _ENTRY.size)
+    return (
+        _HEADER.pack(MAGIC, VERSION, SURAH_COUNT)
+        + struct.pack(f"<{SURAH_COUNT + 1}I", *table)
+        + bytes(body)
+    )
+
+
+class SeekIndex:
+    """seek_index.bin in memory; seek(surah, ayah) -> Entry."""
+
+    def __init__(self, data: bytes) -> None:
+        magic, version, count = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"not a version {VERSION} seek index")
+        self._table = struct.unpack_from(f"<{count + 1}I", data, _HEADER.size)
+        self._base = _HEADER.size + 4 * (count + 1)
+        self._data = data
+
+    @classmethod
+    def load(cls, path: str) -> SeekIndex:
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    def entries(self, surah: int) -> list[Entry]:
+        start, end = self._table[surah - 1], self._table[surah]
+        return [
+            Entry(*_ENTRY.unpack_from(self._data, self._base + i * _ENTRY.size))
+            for i in range(start, end)
+        ]
+
+    def seek(self, surah: int, ayah: int) -> Entry:
+        for entry in self.entries(surah):
+            if entry.ayah == ayah:
+                return entry
+        raise KeyError(f"{surah}:{ayah}")
+
+
+def build(pack: str, out: str, surahs: Iterable[int], jobs: int | None = None) -> list[str]:
+    """Write surah files and the index; return problems (empty on success)."""
+    os.makedirs(out, exist_ok=True)
+    index_path = os.path.join(out, INDEX)
+    by_surah: dict[int, list[Entry]] = {}
+    if os.path.isfile(index_path):
+        index = SeekIndex.load(index_path)
+        by_surah = {s: index.entries(s) for s in range(1, SURAH_COUNT + 1) if index.entries(s)}
+
+    def one(surah: int) -> tuple[int, list[Entry] | None, list[str]]:
+        try:
+            data, entries, _ = join_surah(pack, surah)
+        except (OSError, ValueError) as err:
+            return surah, None, [f"surah {surah}: {err}"]
+        problems = verify_surah(data, entries, surah)
+        if not problems:
+            path = os.path.join(out, surah_file(surah))
+            with open(path + ".tmp", "wb") as f:
+                f.write(data)
+            os.replace(path + ".tmp", path)
+        return surah, entries, problems
+
+    problems: list[str] = []
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        for surah, entries, found in pool.map(one, surahs):
+            problems.extend(found)
+            if entries is not None and not found:
+                by_surah[surah] = entries
+    with open(index_path, "wb") as f:
+        f.write(encode_index(by_surah))
+    return problems
+
+
+def verify(out: str) -> list[str]:
+    index = SeekIndex.load(os.path.join(out, INDEX))
+    problems: list[str] = []
+    for surah in range(1, SURAH_COUNT + 1):
+        entries = index.entries(surah)
+        if not entries:
+            continue
+        path = os.path.join(out, surah_file(surah))
+        if not os.path.isfile(path):
+            problems.append(f"{surah_file(surah)}: indexed but missing")
+            continue
+        with open(path, "rb") as f:
+            data = f.read()
+        if entries[-1].byte != len(data):
+            problems.append(f"{surah_file(surah)}: {len(data)} bytes, index says {entries[-1].byte}")
+        problems.extend(verify_surah(data, entries, surah))
+    return problems
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pack", help="reciter folder from audio_packs.py, or an output folder with --verify")
+    parser.add_argument("--out-dir", default=DEFAULT_OUT)
+    parser.add_argument("--surahs", help="comma-separated surah numbers (default: all)")
+    parser.add_argument("--jobs", type=int, default=None)
+    parser.add_argument("--verify", action="store_true", help="check an existing output folder")
+    args = parser.parse_args()
+
+    if args.verify:
+        problems = verify(args.pack)
+        done = f"ok: {args.pack}"
+    else:
+        surahs = [int(s) for s in args.surahs.split(",")] if args.surahs else range(1, SURAH_COUNT + 1)
+        out = os.path.join(args.out_dir, os.path.basename(os.path.normpath(args.pack)))
+        problems = build(args.pack, out, surahs, args.jobs)
+        done = f"Wrote {out}"
+    for problem in problems:
+        print(problem)
+    if problems:
+        print(f"{len(problems)} problems", file=sys.stderr)
+        return 1
+    print(done)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
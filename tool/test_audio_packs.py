@@ -0,0 +1,161 @@
+import json
+import os
+import re
+import tempfile
+import threading
+import unittest
+from concurrent.futures import as_completed
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+import audio_packs
+from audio_packs import RECITERS, build_pack, pack_files
+from mp3_frames import synthetic_mp3
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SURAHS = (1, 9, 108)
+
+
+class _EveryAyah(BaseHTTPRequestHandler):
+    """Serves /<reciter>/SSSAAA.mp3 as synthetic frames; honours Range."""
+
+    bodies = {}
+    corrupt = set()
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        cls = type(self)
+        name = self.path.rsplit("/", 1)[-1]
+        cls.requests.append((name, self.headers.get("Range")))
+        if name not in cls.bodies:
+            self.send_response(404)
+            self.end_headers()
+            return
+        body = b"<html>busy</html>" if name in cls.corrupt else cls.bodies[name]
+        start = 0
+        rng = self.headers.get("Range")
+        if rng:
+            start = int(rng.split("=")[1].rstrip("-"))
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{len(body) - 1}/{len(body)}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Length", str(len(body) - start))
+        self.end_headers()
+        self.wfile.write(body[start:])
+
+
+class AudioPacksTest(unittest.TestCase):
+    def setUp(self):
+        self.names = pack_files(SURAHS)
+        bodies = {name: synthetic_mp3(5 + k % 7, seed=k) for k, name in enumerate(self.names)}
+        self.handler = type("Handler", (_EveryAyah,), {"bodies": bodies, "corrupt": set(), "requests": []})
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.handler)
+        threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True).start()
+        self.base = f"http://127.0.0.1:{self.server.server_port}/Alafasy_128kbps"
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = os.path.join(self.tmp.name, "Alafasy_128kbps")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def _build(self):
+        return build_pack("Alafasy_128kbps", self.base, self.tmp.name, self.names, jobs=4, attempts=1)
+
+    def _manifest(self):
+        with open(os.path.join(self.folder, "manifest.json"), encoding="utf-8") as f:
+            return json.load(f)
+
+    def test_pack_files_follow_the_player(self):
+        self.assertEqual(self.names[:2], ["001001.mp3", "001002.mp3"])
+        self.assertNotIn("001000.mp3", self.names)
+        self.assertNotIn("009000.mp3", self.names)
+        self.assertIn("108000.mp3", self.names)
+        self.assertEqual(len(self.names), 7 + 129 + 1 + 3)
+        self.assertEqual(len(pack_files()), 6236 + 112)
+
+    def test_build_then_rerun_refetches_only_damage(self):
+        results = self._build()
+        self.assertEqual({r.status for r in results}, {"downloaded"})
+        manifest = self._manifest()
+        self.assertTrue(manifest["complete"])
+        entry = manifest["files"]["001001.mp3"]
+        self.assertEqual(entry["frames"], 5)
+        self.assertAlmostEqual(entry["seconds"], 5 * 1152 / 44100, places=3)
+        self.assertEqual(manifest["totalBytes"], sum(len(b) for b in self.handler.bodies.values()))
+
+        os.remove(os.path.join(self.folder, "009010.mp3"))
+        with open(os.path.join(self.folder, "009011.mp3"), "r+b") as f:
+            f.truncate(100)
+        body = self.handler.bodies["108002.mp3"]
+        with open(os.path.join(self.folder, "108002.mp3.part"), "wb") as f:
+            f.write(body[:300])
+        os.remove(os.path.join(self.folder, "108002.mp3"))
+        self.handler.requests.clear()
+
+        results = self._build()
+        fetched = sorted(r.name for r in results if r.status == "downloaded")
+        self.assertEqual(fetched, ["009010.mp3", "009011.mp3", "108002.mp3"])
+        self.assertIn(("108002.mp3", "bytes=300-"), self.handler.requests)
+        with open(os.path.join(self.folder, "108002.mp3"), "rb") as f:
+            self.assertEqual(f.read(), body)
+        self.assertEqual(self._manifest(), manifest)
+
+    def test_interrupt_cancels_queued_downloads_and_writes_manifest(self):
+        def interrupted(futures):
+            for n, future in enumerate(as_completed(futures)):
+                if n == 3:
+                    raise KeyboardInterrupt
+                yield future
+
+        with mock.patch.object(audio_packs, "as_completed", interrupted):
+            with self.assertRaises(KeyboardInterrupt):
+                build_pack("Alafasy_128kbps", self.base, self.tmp.name, self.names, jobs=2, attempts=1)
+        fetched = len(self.handler.requests)
+        self.assertLess(fetched, 10)
+        manifest = self._manifest()
+        self.assertFalse(manifest["complete"])
+        self.assertGreaterEqual(len(manifest["files"]), 3)
+        self.assertEqual(len(manifest["files"]), fetched)
+        mp3s = [n for n in os.listdir(self.folder) if n.endswith(".mp3")]
+        self.assertEqual(sorted(mp3s), sorted(manifest["files"]))
+
+        results = self._build()
+        self.assertEqual(sum(r.status == "kept" for r in results), fetched)
+        self.assertTrue(self._manifest()["complete"])
+
+    def test_corrupt_bodies_fail_and_leave_no_file(self):
+        self.handler.corrupt = {"001003.mp3"}
+        results = self._build()
+        failed = [r for r in results if r.status == "failed"]
+        self.assertEqual([r.name for r in failed], ["001003.mp3"])
+        self.assertFalse(os.path.exists(os.path.join(self.folder, "001003.mp3")))
+        self.assertFalse(self._manifest()["complete"])
+
+        self.handler.corrupt = set()
+        results = self._build()
+        self.assertEqual([r.name for r in results if r.status == "downloaded"], ["001003.mp3"])
+        self.assertTrue(self._manifest()["complete"])
+
+    def test_unlisted_files_are_adopted(self):
+        os.makedirs(self.folder)
+        with open(os.path.join(self.folder, "001001.mp3"), "wb") as f:
+            f.write(self.handler.bodies["001001.mp3"])
+        results = self._build()
+        self.assertEqual(results[0].status, "adopted")
+        self.assertNotIn(("001001.mp3", None), self.handler.requests)
+
+    def test_reciters_match_the_app_catalog(self):
+        with open(os.path.join(ROOT, "lib/core/models/reciter.dart"), encoding="utf-8") as f:
+            dart = f.read()
+        pairs = re.findall(r"id: '([^']+)',.*?baseUrl: '([^']+)'", dart, re.S)
+        self.assertEqual(dict(pairs), RECITERS)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import unittest
+
+from audit_tj_ar import (
+    TAGS,
+    TajweedText,
+    _legacy_visit,
+    _tokenized_visit,
+    common_prefix_len,
+    synthetic_tajweed,
+)
+
+
+class TajweedTextTest(unittest.TestCase):
+    def test_strips_tags_and_tatweel_like_regex(self):
+        cases = [
+            "<tajweed class=ham_wasl>ٱ</tajweed>لْحَمْـدُ <span class=end>٢</span>",
+            "a<>b<c",
+            "<<x>y</x>",
+            "xــy<br/>z",
+            "",
+            "<b>",
+        ]
+        for raw in cases:
+            with self.subTest(raw=raw):
+                self.assertEqual(
+                    TajweedText(raw).plain, TAGS.sub("", raw).replace("ـ", "")
+                )
+
+    def test_body_drops_trailing_verse_number(self):
+        self.assertEqual(TajweedText("ab <span>١٢</span> ").body, "ab")
+        self.assertEqual(TajweedText("١٢ ٣").body, "١٢")
+        self.assertEqual(TajweedText("ab  ").body, "ab")
+
+    def test_offsets_and_tag_span_point_into_raw(self):
+        raw = "ab<t class=x>cـd</t>e"
+        text = TajweedText(raw)
+        self.assertEqual(text.plain, "abcde")
+        for i, ch in enumerate(text.plain):
+            self.assertEqual(raw[text.raw_index(i)], ch)
+        self.assertIsNone(text.tag_span(1))
+        start, end = text.tag_span(3)
+        self.assertEqual(raw[start:end], "<t class=x>cـd</t>")
+        self.assertIsNone(text.tag_span(4))
+
+    def test_common_prefix_len(self):
+        self.assertEqual(common_prefix_len("abcdef", "abcxef"), 3)
+        self.assertEqual(common_prefix_len("abc", "abcdef"), 3)
+        self.assertEqual(common_prefix_len("", "a"), 0)
+        self.assertEqual(common_prefix_len("xa", "ya"), 0)
+
+    def test_matches_legacy_audit_path(self):
+        for v in synthetic_tajweed(400):
+            self.assertEqual(_tokenized_visit(v), _legacy_visit(v))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,155 @@
+import ast
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+from build_datasets import FETCH_VERSES, PYTHON, STEPS, Builder, Step, dependencies, steps_for
+
+TOOL_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _local_imports(module, seen=None):
+    """Tool modules `module` imports at load time, itself included, transitively."""
+    seen = set() if seen is None else seen
+    seen.add(module)
+    with open(os.path.join(TOOL_DIR, f"{module}.py"), encoding="utf-8") as f:
+        body = ast.parse(f.read()).body
+    for node in body:
+        if isinstance(node, ast.Import):
+            names = [a.name for a in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            if name not in seen and os.path.isfile(os.path.join(TOOL_DIR, f"{name}.py")):
+                _local_imports(name, seen)
+    return seen
+
+# Appends the step name to runs.log, then writes argv[2] from argv[1] uppercased.
+COPY_UPPER = (
+    "import sys; open('runs.log', 'a').write(sys.argv[3] + '\\n');"
+    "open(sys.argv[2], 'w').write(open(sys.argv[1]).read().upper())"
+)
+
+
+def _copy(name, src, dst):
+    return Step(name, outputs=(dst,), inputs=(src,), command=(PYTHON, "-c", COPY_UPPER, src, dst, name))
+
+
+class BuildDatasetsTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.steps = [
+            Step("raw", outputs=("raw/*.txt",)),
+            _copy("upper", "raw/a.txt", "out/a.txt"),
+            _copy("again", "out/a.txt", "out/b.txt"),
+            _copy("side", "raw/c.txt", "out/c.txt"),
+        ]
+        os.makedirs(os.path.join(self.root, "raw"))
+        os.makedirs(os.path.join(self.root, "out"))
+        self._write("raw/a.txt", "a")
+        self._write("raw/c.txt", "c")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, name, text):
+        with open(os.path.join(self.root, name), "w") as f:
+            f.write(text)
+
+    def _build(self, **kwargs):
+        builder = Builder(self.steps, root=self.root, jobs=2, quiet=True)
+        return {r.name: r.status for r in builder.build(**kwargs)}
+
+    def _runs(self):
+        path = os.path.join(self.root, "runs.log")
+        if not os.path.exists(path):
+            return []
+        with open(path) as f:
+            runs = f.read().split()
+        os.remove(path)
+        return sorted(runs)
+
+    def test_dependencies_follow_declared_files(self):
+        deps = dependencies(self.steps)
+        self.assertEqual(deps["upper"], ["raw"])
+        self.assertEqual(deps["again"], ["upper"])
+        self.assertEqual(deps["side"], ["raw"])
+
+    def test_second_build_is_a_no_op(self):
+        self.assertEqual(
+            self._build(),
+            {"raw": "source", "upper": "ran", "again": "ran", "side": "ran"},
+        )
+        self.assertEqual(self._runs(), ["again", "side", "upper"])
+        with open(os.path.join(self.root, "out", "b.txt")) as f:
+            self.assertEqual(f.read(), "A")
+        self.assertEqual(
+            self._build(),
+            {"raw": "source", "upper": "skipped", "again": "skipped", "side": "skipped"},
+        )
+        self.assertEqual(self._runs(), [])
+        with open(os.path.join(self.root, ".dataset_build", "timings.json")) as f:
+            self.assertEqual(len(json.load(f)["steps"]), 4)
+
+    def test_reruns_only_what_a_change_reaches(self):
+        self._build()
+        self._runs()
+        self._write("raw/c.txt", "cc")
+        self.assertEqual(self._build()["side"], "ran")
+        self.assertEqual(self._runs(), ["side"])
+        # Same content rewritten: hashes match, nothing runs.
+        self._write("raw/a.txt", "a")
+        self._build()
+        self.assertEqual(self._runs(), [])
+        # A deleted output is rebuilt.
+        os.remove(os.path.join(self.root, "out", "b.txt"))
+        self._build(targets=["again"])
+        self.assertEqual(self._runs(), ["again"])
+        self._build(force=["upper"])
+        self.assertEqual(self._runs(), ["upper"])
+
+    def test_missing_source_skips_readers(self):
+        os.remove(os.path.join(self.root, "raw", "a.txt"))
+        os.remove(os.path.join(self.root, "raw", "c.txt"))
+        builder = Builder(self.steps, root=self.root, jobs=2, quiet=True)
+        results = {r.name: r for r in builder.build()}
+        self.assertEqual(results["raw"].status, "missing")
+        self.assertEqual({results[n].status for n in ("upper", "again", "side")}, {"skipped"})
+        self.assertEqual(results["upper"].detail, "source missing: raw")
+        self.assertEqual(results["again"].detail, "source missing: upper")
+        self.assertEqual(self._runs(), [])
+
+    def test_failed_step_blocks_dependents_and_is_retried(self):
+        self.steps[1] = Step("upper", outputs=("out/a.txt",), inputs=("raw/a.txt",),
+                             command=(sys.executable, "-c", "raise SystemExit(3)"))
+        status = self._build()
+        self.assertEqual((status["upper"], status["again"], status["side"]), ("failed", "blocked", "ran"))
+        self.assertEqual(self._build()["upper"], "failed")
+
+
+class StepsTest(unittest.TestCase):
+    def test_tool_steps_list_every_module_they_import(self):
+        for step in (*STEPS, FETCH_VERSES):
+            if step.command is None or not step.command[1].startswith("tool/"):
+                continue
+            script = os.path.basename(step.command[1])[:-3]
+            with self.subTest(step=step.name):
+                missing = sorted(
+                    m for m in _local_imports(script) if f"tool/{m}.py" not in step.inputs
+                )
+                self.assertEqual(missing, [])
+
+    def test_only_fetch_reaches_the_network(self):
+        self.assertIsNone(next(s for s in STEPS if s.name == "verses").command)
+        fetching = [s for s in steps_for(fetch=True) if s.command and "generate_quran_json" in s.command[1]]
+        self.assertEqual(fetching, [FETCH_VERSES])
+        self.assertEqual([s.name for s in steps_for(fetch=True)], [s.name for s in STEPS])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,206 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+
+import bundle_join
+from bundle_join import Report, join, sources
+from quran_corpus import AYAH_TOTAL, ayah_at, build_indexes
+from verse_shards import write_split
+from verse_store import synthetic_verses
+
+
+def _db(path, schema, rows):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    db = sqlite3.connect(path)
+    db.execute(schema)
+    table = schema.split()[2]
+    marks = ", ".join("?" * len(rows[0]))
+    db.executemany(f"INSERT INTO {table} VALUES ({marks})", rows)
+    db.commit()
+    db.close()
+
+
+class JoinTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.verses = list(synthetic_verses(1))
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _path(self, rel):
+        return os.path.join(self.root, rel)
+
+    def _write(self, verses=None, transliteration=None, tafsir=None, qpc_pages=None, split=False):
+        verses = self.verses if verses is None else verses
+        quran = self._path("assets/quran")
+        os.makedirs(quran, exist_ok=True)
+        by_surah = {}
+        for v in verses:
+            by_surah.setdefault(v["s"], []).append(v)
+        if split:
+            write_split(by_surah, ("en",), quran)
+        for s, items in by_surah.items():
+            if split:
+                continue
+            with open(os.path.join(quran, f"s{s:03d}.json"), "w") as f:
+                json.dump(items, f)
+        with open(os.path.join(quran, "index_pages.json"), "w") as f:
+            json.dump(build_indexes(self.verses)[1], f)
+        keys = [ayah_at(k) for k in range(AYAH_TOTAL)]
+        _db(
+            self._path(bundle_join.TRANSLITERATION),
+            "CREATE TABLE transliterations (sura INTEGER, ayah INTEGER, ayah_key TEXT, text TEXT)",
+            transliteration or [(s, a, f"{s}:{a}", "x") for s, a in keys],
+        )
+        if tafsir is None:
+            # Rows inserted out of key order on purpose.
+            tafsir = [(f"{s}:{a}",) * 5 + ("t",) for s, a in reversed(keys)]
+        _db(
+            self._path("assets/tafsir/en_test.sqlite"),
+            "CREATE TABLE tafsir (ayah_key TEXT, group_ayah_key TEXT, from_ayah TEXT, "
+            "to_ayah TEXT, ayah_keys TEXT, text TEXT)",
+            tafsir,
+        )
+        # Two words per ayah; each ayah line holds the words of one ayah.
+        pages = qpc_pages or [v["m"]["page"] for v in self.verses]
+        _db(
+            self._path(bundle_join.WORDS_DB),
+            "CREATE TABLE words (id INTEGER PRIMARY KEY, surah INTEGER, ayah INTEGER, word INTEGER, text TEXT, location TEXT)",
+            [(2 * k + w, s, a, w, "g", "") for k, (s, a) in enumerate(keys) for w in (1, 2)],
+        )
+        lines = []
+        for k, page in enumerate(pages):
+            if isinstance(page, tuple):
+                lines.append((page[0], 2 * k, "ayah", 0, 2 * k + 1, 2 * k + 1, None))
+                lines.append((page[1], 2 * k, "ayah", 0, 2 * k + 2, 2 * k + 2, None))
+            else:
+                lines.append((page, 2 * k, "ayah", 0, 2 * k + 1, 2 * k + 2, None))
+        lines.append((1, 0, "surah_name", 1, None, None, 1))
+        _db(
+            self._path(bundle_join.LAYOUT_DB),
+            "CREATE TABLE pages (page_number INTEGER, line_number INTEGER, line_type TEXT, "
+            "is_centered INTEGER, first_word_id INTEGER, last_word_id INTEGER, surah_number INTEGER)",
+            lines,
+        )
+
+    def _run(self):
+        report = Report(limit=1000)
+        found, skipped = sources(self.root, report)
+        checked = join(found, report)
+        return found, skipped, checked, report
+
+    def test_consistent_bundles(self):
+        self._write()
+        found, skipped, checked, report = self._run()
+        self.assertEqual(skipped, [])
+        self.assertEqual(
+            [s.name for s in found], ["verses", "index_pages", "transliteration", "tafsir:en_test", "qpc"]
+        )
+        self.assertEqual(checked, AYAH_TOTAL)
+        self.assertEqual(report.lines, [])
+
+    def test_missing_and_extra_keys(self):
+        verses = [v for v in self.verses if (v["s"], v["a"]) != (2, 255)]
+        verses.append(dict(self.verses[0], s=1, a=8))
+        rows = [(s, a, f"{s}:{a}", "x") for s, a in map(ayah_at, range(AYAH_TOTAL))]
+        rows[3] = (1, 4, "1:5", "x")
+        self._write(verses=verses, transliteration=rows)
+        _, _, checked, report = self._run()
+        self.assertEqual(checked, AYAH_TOTAL)
+        self.assertIn("2:255: missing from verses", report.lines)
+        self.assertIn("transliteration: 1:4 has ayah_key '1:5'", report.lines)
+        self.assertTrue(any("1:8" in line and "not an ayah" in line for line in report.lines))
+        self.assertEqual(report.counts["missing"], 1)
+
+    def test_page_boundary_disagreements(self):
+        pages = [v["m"]["page"] for v in self.verses]
+        first, second = [k for k in range(1, AYAH_TOTAL) if pages[k] != pages[k - 1]][:2]
+        spans = list(pages)
+        # The first ayah of a page starting on the page before is fine.
+        spans[first] = (pages[first - 1], pages[first])
+        # The last ayah of a page laid out on the next one is not.
+        spans[second - 1] = pages[second]
+        self._write(qpc_pages=spans)
+        _, _, _, report = self._run()
+        key = "%d:%d" % ayah_at(second - 1)
+        page = pages[second - 1]
+        self.assertEqual(
+            report.lines, [f"{key}: page disagrees: verses {page}, index_pages {page}, qpc {page + 1}"]
+        )
+
+    def test_verse_without_a_page_is_reported(self):
+        verses = [dict(v) for v in self.verses]
+        verses[7] = dict(verses[7], m={})
+        verses[8] = dict(verses[8], m={"page": "2"})
+        self._write(verses=verses)
+        with open(self._path(bundle_join.INDEX_PAGES)) as f:
+            index = json.load(f)
+        index["two"] = index["1"]
+        with open(self._path(bundle_join.INDEX_PAGES), "w") as f:
+            json.dump(index, f)
+        _, _, checked, report = self._run()
+        self.assertEqual(checked, AYAH_TOTAL)
+        self.assertEqual(report.counts["page"], 3)
+        self.assertEqual(report.counts.get("missing", 0), 0)
+        self.assertTrue(any("2:1 in" in line and "has page None" in line for line in report.lines))
+        self.assertTrue(any("2:2 in" in line and "has page '2'" in line for line in report.lines))
+        self.assertIn("index_pages: page 'two' is not a page number", report.lines)
+
+    def test_tafsir_groups_pointing_at_nonexistent_ayahs(self):
+        rows = [(f"{s}:{a}", f"{s}:{a}", f"{s}:{a}", f"{s}:{a}", f"{s}:{a}", "t")
+                for s, a in map(ayah_at, range(AYAH_TOTAL))]
+        rows[1] = ("1:2", "1:9", "1:2", "1:2", "1:2", "t")
+        rows[2] = ("1:3", "2:1", "1:3", "1:4", "1:3,1:99", "t")
+        rows[10] = ("2:4", "2:3", "2:3", "2:3", "", "t")
+        del rows[8]  # 2:2 now missing too
+        rows.append(("2:3", "2:3", "2:3", "2:3", "", "t"))  # repeated
+        self._write(tafsir=rows)
+        _, _, _, report = self._run()
+        self.assertEqual(report.counts["repeat"], 1)
+        self.assertIn("2:2: missing from tafsir:en_test", report.lines)
+        self.assertIn("tafsir:en_test: 1:2 group_ayah_key '1:9' is not an ayah", report.lines)
+        self.assertIn("tafsir:en_test: 1:3 ayah_keys names '1:99', not an ayah", report.lines)
+        self.assertIn("tafsir:en_test: 2:4 is outside its range 2:3..2:3", report.lines)
+        self.assertNotIn("group head 2:1", " ".join(report.lines))
+
+    def test_group_head_without_a_row(self):
+        rows = [(f"{s}:{a}", f"{s}:{a}", "", "", "", "t") for s, a in map(ayah_at, range(AYAH_TOTAL))]
+        rows[7] = ("2:1", "1:2", "", "", "", "t")
+        del rows[1]
+        self._write(tafsir=rows)
+        _, _, _, report = self._run()
+        self.assertIn("tafsir:en_test: group head 1:2 has no row", report.lines)
+
+    def test_split_layout_verses_are_joined(self):
+        verses = [v for v in self.verses if (v["s"], v["a"]) != (3, 7)]
+        self._write(verses=verses, split=True)
+        found, skipped, checked, report = self._run()
+        self.assertEqual(skipped, [])
+        self.assertEqual(found[0].name, "verses")
+        self.assertEqual(checked, AYAH_TOTAL)
+        self.assertEqual(report.lines, ["3:7: missing from verses"])
+
+    def test_missing_verses_and_index_pages_fail(self):
+        report = Report()
+        found, skipped = sources(self.root, report)
+        self.assertEqual(found, [])
+        self.assertEqual(len(skipped), 3)
+        self.assertEqual(report.counts["source"], 2)
+        self.assertTrue(report.lines[0].startswith("verses: no sNNN.json or split-layout"))
+
+    def test_report_keeps_counting_past_the_limit(self):
+        report = Report(limit=2)
+        for n in range(5):
+            report("missing", f"line {n}")
+        self.assertEqual((report.total, report.lines), (5, ["line 0", "line 1"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
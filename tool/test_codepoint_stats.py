@@ -0,0 +1,67 @@
+import unittest
+from collections import Counter
+
+from codepoint_stats import (
+    CodepointCorpus,
+    _encode_pair,
+    _engine_stats,
+    _naive_stats,
+    shared_alphabet,
+    synthetic_pair,
+)
+
+
+class CodepointCorpusTest(unittest.TestCase):
+    def test_histograms_and_offsets(self):
+        corpus = CodepointCorpus(["بِسْمِ", "ٱللَّهِ"])
+        self.assertEqual(len(corpus), 2)
+        self.assertEqual(list(corpus.offsets), [0, 6, 13])
+        self.assertEqual(corpus.decode(corpus.verse(1)), "ٱللَّهِ")
+        self.assertEqual(corpus.histogram(0), Counter("بِسْمِ"))
+        self.assertEqual(corpus.histogram(), Counter("بِسْمِٱللَّهِ"))
+        self.assertEqual(list(corpus.codepoints[:2]), [0x0628, 0x0650])
+
+    def test_combining_mask_and_stripped_lengths(self):
+        corpus = CodepointCorpus(["بِسْمِ", "صِرَٰطَ ۖ"])
+        combining = corpus.combining_ids()
+        self.assertEqual(corpus.mask(combining, 0), bytes([0, 1, 0, 1, 0, 1]))
+        self.assertEqual(list(corpus.stripped_lengths(combining)), [3, 4])
+        signs = bytes(sorted(set(combining) | set(corpus.symbol_ids("ۖ "))))
+        self.assertEqual(list(corpus.stripped_lengths(signs)), [3, 3])
+
+    def test_difference_counts_match_set_difference(self):
+        alphabet = shared_alphabet(["ab a"], ["b"])
+        a = CodepointCorpus(["ab a"], alphabet)
+        b = CodepointCorpus(["b"], alphabet)
+        self.assertEqual(a.difference_counts(b, [(0, 0)]), Counter({"a": 2, " ": 1}))
+        self.assertEqual(b.difference_counts(a, [(0, 0)]), Counter())
+
+    def test_whole_stream_counts_keep_verse_boundaries(self):
+        alphabet = shared_alphabet(["ab", "", "ba a"], ["b", "x", "a"])
+        a = CodepointCorpus(["ab", "", "ba a"], alphabet)
+        b = CodepointCorpus(["b", "x", "a"], alphabet)
+        self.assertEqual(a.verses(), [a.verse(0), b"", a.verse(2)])
+        self.assertEqual(list(a.stripped_lengths(a.symbol_ids("a"))), [1, 0, 2])
+        self.assertEqual(
+            a.difference_counts(b, [(0, 0), (1, 1), (2, 1), (2, 2)]),
+            Counter({"a": 3, "b": 2, " ": 2}),
+        )
+        self.assertEqual(a.difference_counts(b, []), Counter())
+        empty = CodepointCorpus([], alphabet)
+        self.assertEqual(list(empty.stripped_lengths(b"")), [])
+        with self.assertRaises(ValueError):
+            CodepointCorpus(["a\uffff"])
+
+    def test_rejects_codepoints_outside_alphabet(self):
+        with self.assertRaises(ValueError):
+            CodepointCorpus(["abc"], alphabet="ab")
+
+    def test_engine_matches_per_character_loops(self):
+        ours, theirs = synthetic_pair(300)
+        a, b = _encode_pair(ours, theirs)
+        rows = [(i, i) for i in range(len(ours)) if ours[i] != theirs[i]]
+        self.assertEqual(_engine_stats(a, b, rows), _naive_stats(ours, theirs))
+
+
+if __name__ == "__main__":
+    unittest.main()
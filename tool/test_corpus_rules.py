@@ -0,0 +1,95 @@
+import unittest
+
+from corpus_rules import (
+    AyahCounts,
+    Coverage,
+    ForbidCodepoints,
+    KeySet,
+    RequireCodepoints,
+    Validator,
+    VerseContains,
+    default_rules,
+)
+from quran_corpus import EXPECTED_AYAHS
+from verse_store import VerseStore
+
+
+def _corpus():
+    verses = []
+    n = 0
+    for s, count in enumerate(EXPECTED_AYAHS, 1):
+        for a in range(1, count + 1):
+            verses.append(
+                {
+                    "s": s,
+                    "a": a,
+                    "ar": "صِرَٰطَ ـ ۖ ۚ",
+                    "tr": {"en": "e", "id": "i", "zh": "z", "ja": "j"},
+                    "m": {"juz": n * 30 // 6236 + 1, "page": n * 604 // 6236 + 1, "hizb": 1, "ruku": 1},
+                }
+            )
+            n += 1
+    return verses
+
+
+class ValidatorTest(unittest.TestCase):
+    def test_valid_corpus_passes_default_rules(self):
+        violations = Validator(default_rules()).check(("", v) for v in _corpus())
+        self.assertEqual(violations, [])
+
+    def test_reports_every_violation(self):
+        verses = _corpus()
+        verses[0]["tj"] = "<x>"
+        verses[1]["ar"] = "ٲ◌"
+        verses[2]["tr"].pop("ja")
+        verses[5]["ar"] = "صِرَطَ"  # 1:6 without U+0670
+        del verses[10]
+        violations = Validator(default_rules()).check(("s001.json", v) for v in verses)
+        rules = [v.rule for v in violations]
+        self.assertIn("verse-keys", rules)
+        self.assertIn("no-wavy-hamza-alef", rules)
+        self.assertIn("no-dotted-circle", rules)
+        self.assertIn("translation-keys", rules)
+        self.assertIn("dagger-alef-1:6", rules)
+        self.assertEqual(rules.count("ayah-counts"), 3)  # gap, surah 2 count, total
+
+    def test_verse_store_rows_pass_like_dicts(self):
+        verses = _corpus()
+        verses[0]["tj"] = "<x>"
+        verses[2]["tr"].pop("ja")
+        expected = Validator(default_rules()).check(("", v) for v in verses)
+        store = VerseStore.from_verses(verses)
+        self.assertEqual(Validator(default_rules()).check(store), expected)
+        self.assertEqual(
+            sorted({v.rule for v in expected}), ["translation-keys", "verse-keys"]
+        )
+
+    def test_custom_rules_compile_into_one_scan(self):
+        rules = [
+            KeySet("keys", "", ("s", "a", "ar", "m")),
+            ForbidCodepoints("no-x", "ar", "xy"),
+            RequireCodepoints("has-z", "ar", "zq"),
+            VerseContains("1:2-has-b", (1, 2), "ar", "b"),
+            AyahCounts("counts", (2,), 2),
+            Coverage("pages", "page", 3),
+        ]
+        verses = [
+            {"s": 1, "a": 1, "ar": "azx", "m": {"page": 1}},
+            {"s": 1, "a": 2, "ar": "ay", "m": {"page": 4}},
+        ]
+        violations = Validator(rules).check(("", v) for v in verses)
+        self.assertEqual(
+            [str(v) for v in violations],
+            [
+                "[no-x] 1:1: ar contains U+0078",
+                "[no-x] 1:2: ar contains U+0079",
+                "[1:2-has-b] 1:2: ar missing U+0062",
+                "[has-z] corpus: ar never contains U+0071",
+                "[pages] corpus: page values missing: 2-3",
+                "[pages] corpus: page values out of range: 4",
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,138 @@
+import json
+import unittest
+
+from explore_catalogs import SCHEMAS, compile_bundle, read_segment, report, validate
+from quran_corpus import EXPECTED_AYAHS, ayah_ordinal
+
+KEYS = {(s, a) for s, n in enumerate(EXPECTED_AYAHS, 1) for a in range(1, n + 1)}
+ALLAH = "\u0627\u0644\u0644\u0647"
+SCHEMA = {schema.name: schema for schema in SCHEMAS}
+
+
+def _text(word):
+    return {"id": f"{word} ID", "en": f"{word} EN", "zh": f"{word} ZH", "ja": f"{word} JA"}
+
+
+def _catalogs():
+    refs = [{"surah": 2, "from": 255}]
+    duas = [
+        {"id": "d1", "category": "daily", "theme": "morning", "title": _text("Morning"),
+         "summary": _text("Dua"), "ayahRefs": refs},
+        {"id": "d2", "category": "prophetic", "prophet": "ibrahim", "title": _text("Ibrahim"),
+         "summary": _text("Dua"), "ayahRefs": [{"surah": 14, "from": 40, "to": 41}]},
+    ]
+    science = [
+        {"id": "s1", "category": "cosmos", "title": _text("Sky"), "summary": _text("Sum"),
+         "scienceNote": _text("Note"), "ayahRefs": [{"surah": 21, "from": 30}]},
+    ]
+    themes = [
+        {"id": "t1", "category": "patience", "title": _text("Sabr"), "summary": _text("Sum"),
+         "reflection": _text("Reflect"), "ayahRefs": refs},
+    ]
+    lens = [
+        {"id": "l1", "title": _text("Friday"), "summary": _text("Sum"), "reflection": _text("R"),
+         "ayahRefs": [{"surah": 62, "from": 9, "to": 10}], "trigger": {"type": "weekday", "weekday": 5}},
+    ]
+    asma = [
+        {"id": f"a{n}", "number": n, "arabic": ALLAH, "transliteration": f"Name {n}",
+         "title": _text(f"Name {n}"), "summary": _text("Sum"), "reflection": _text("R"), "ayahRefs": refs}
+        for n in range(1, 100)
+    ]
+    return {
+        "duas": {"version": 3, "entries": duas},
+        "science": {"version": 1, "entries": science},
+        "themes": {"version": 1, "entries": themes},
+        "calendar_lenses": {"version": 1, "entries": lens},
+        "weekly_rotation": {"version": 1, "entries": lens},
+        "asma": {"version": 2, "entries": asma},
+    }
+
+
+class ValidateTest(unittest.TestCase):
+    def test_clean_catalogs(self):
+        catalogs = _catalogs()
+        for schema in SCHEMAS:
+            self.assertEqual(validate(schema, catalogs[schema.name], KEYS), [], schema.name)
+
+    def test_schema_errors(self):
+        catalogs = _catalogs()
+        duas = catalogs["duas"]["entries"]
+        del duas[0]["theme"]
+        duas[1]["title"]["zh"] = ""
+        duas.append(dict(duas[1]))
+        errors = validate(SCHEMA["duas"], catalogs["duas"], KEYS)
+        self.assertIn("duas/d2: title.zh must be a non-empty string", errors)
+        self.assertIn("duas/d2: duplicate id", errors)
+        self.assertTrue(any("duplicate ayah range 14:40:41" in e for e in errors))
+        # Cross-entry checks only run on catalogs whose entries are well formed.
+        self.assertFalse(any("daily dua" in e for e in errors))
+        catalogs = _catalogs()
+        del catalogs["duas"]["entries"][0]["theme"]
+        self.assertEqual(
+            validate(SCHEMA["duas"], catalogs["duas"], KEYS), ["duas: d1: daily dua without a theme"]
+        )
+
+    def test_reference_errors(self):
+        catalogs = _catalogs()
+        entries = catalogs["science"]["entries"]
+        entries[0]["ayahRefs"] = [{"surah": 1, "from": 8}]
+        self.assertEqual(
+            validate(SCHEMA["science"], catalogs["science"], KEYS),
+            ["science/s1: ayahRefs: 1:8 is not in the verse corpus"],
+        )
+        entries[0]["ayahRefs"] = [{"surah": 2, "from": 5, "to": 3}]
+        self.assertIn("ends before it starts", validate(SCHEMA["science"], catalogs["science"], KEYS)[0])
+        # An ayah absent from the shards on disk fails even though it exists in the Quran.
+        entries[0]["ayahRefs"] = [{"surah": 2, "from": 255}]
+        self.assertEqual(len(validate(SCHEMA["science"], catalogs["science"], KEYS - {(2, 255)})), 1)
+
+    def test_asma_and_trigger_rules(self):
+        catalogs = _catalogs()
+        catalogs["asma"]["entries"][5]["number"] = 1
+        self.assertEqual(validate(SCHEMA["asma"], catalogs["asma"], KEYS), ["asma: a6: duplicate number 1"])
+        catalogs["asma"]["entries"].pop()
+        self.assertIn("asma: expected 99 entries, got 98", validate(SCHEMA["asma"], catalogs["asma"], KEYS))
+        catalogs["calendar_lenses"]["entries"][0]["trigger"] = {"type": "hijri_day", "month": 9}
+        self.assertEqual(
+            validate(SCHEMA["calendar_lenses"], catalogs["calendar_lenses"], KEYS),
+            ["calendar_lenses/l1: trigger hijri_day needs day"],
+        )
+
+
+class BundleTest(unittest.TestCase):
+    def test_segments_round_trip_with_ordinals(self):
+        catalogs = _catalogs()
+        bundle = compile_bundle(catalogs)
+        header = json.loads(bundle[: bundle.index(b"\n")])
+        self.assertEqual(header["segments"]["duas"]["version"], 3)
+        self.assertEqual(header["segments"]["asma"]["entries"], 99)
+        duas = read_segment(bundle, "duas")
+        self.assertEqual(duas["entries"][0]["ayahRefs"][0]["o"], [ayah_ordinal(2, 255)] * 2)
+        self.assertEqual(duas["entries"][1]["ayahRefs"][0]["o"], [ayah_ordinal(14, 40), ayah_ordinal(14, 41)])
+        for entry in duas["entries"]:
+            for ref in entry["ayahRefs"]:
+                del ref["o"]
+        self.assertEqual(duas["entries"], catalogs["duas"]["entries"])
+        asma = read_segment(bundle, "asma")
+        self.assertEqual(asma["entries"][0]["arabic"], ALLAH)
+
+    def test_search_keys_match_explore_search_fields(self):
+        search = read_segment(compile_bundle(_catalogs()), "search")
+        self.assertEqual(set(search), {"duas", "science", "themes", "asma"})
+        key = search["science"][0]
+        for word in ("sky en", "sum zh", "note ja"):
+            self.assertIn(word, key)
+        self.assertNotIn("reflect", search["duas"][0])
+        self.assertIn("reflect id", search["themes"][0])
+        self.assertEqual(search["asma"][6].split("\n")[-3:], ["name 7", ALLAH, "7"])
+
+    def test_report_counts_header_only_at_startup(self):
+        catalogs = _catalogs()
+        bundle = compile_bundle(catalogs)
+        sizes = {name: len(json.dumps(c)) for name, c in catalogs.items()}
+        header = bundle.index(b"\n") + 1
+        self.assertIn(f"parsed at startup once the app reads the bundle: {sum(sizes.values()):,} -> {header:,} bytes", report(sizes, bundle)[-1])
+
+
+if __name__ == "__main__":
+    unittest.main()
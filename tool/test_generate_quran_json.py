@@ -1,6 +1,55 @@
+import argparse
+import json
+import os
+import tempfile
 import unittest
+from pathlib import Path
+from unittest import mock
 
-from generate_quran_json import build_indexes, map_verse
+import generate_quran_json
+from generate_quran_json import (
+    VERSION,
+    Writer,
+    build_indexes,
+    build_variant,
+    default_variant,
+    load_variants,
+    map_verse,
+    resource_ids,
+    validate_corpus,
+)
+from verse_store import synthetic_verses
+
+LANGUAGES = ((20, "en"), (33, "id"), (109, "zh"), (35, "ja"), (97, "ur"))
+
+
+def _api_corpus():
+    """Raw API verses by chapter, as fetched with all of LANGUAGES."""
+    raw = {}
+    for v in synthetic_verses(1):
+        m = v["m"]
+        raw.setdefault(v["s"], []).append({
+            "verse_key": f"{v['s']}:{v['a']}",
+            "text_uthmani": v["ar"] + " \u0670\u0640\u06d6\u06da",
+            "juz_number": m["juz"],
+            "page_number": m["page"],
+            "hizb_number": m["hizb"],
+            "ruku_number": m["ruku"],
+            "translations": [
+                {"resource_id": rid, "text": f"{code} {v['s']}:{v['a']}"} for rid, code in LANGUAGES
+            ],
+        })
+    return raw
+
+
+def _args(**overrides):
+    args = argparse.Namespace(
+        out_dir="assets/quran", also_bundled=None, layout="combined", raw_translations=False,
+        footnotes=False, page_shards=False, juz_shards=False, reading_tables=False,
+        word_index=False,
+    )
+    vars(args).update(overrides)
+    return args
 
 
 class MapVerseTest(unittest.TestCase):
@@ -59,6 +108,115 @@ class MapVerseTest(unittest.TestCase):
         self.assertEqual(pages["1"], [{"s": 1, "a1": 1, "a2": 2}])
         self.assertEqual(pages["2"], [{"s": 2, "a1": 1, "a2": 1}])
 
+    def test_validate_corpus_blocks_write(self):
+        verse = {"s": 1, "a": 1, "ar": "x", "tr": {}, "m": {}}
+        with self.assertRaises(SystemExit):
+            validate_corpus({1: [verse]})
+
+
+class VariantsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.raw = _api_corpus()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _config(self, variants):
+        path = self.root / "variants.json"
+        path.write_text(json.dumps({"variants": variants}), encoding="utf-8")
+        return str(path)
+
+    def _variants(self):
+        urdu = {"code": "ur", "id": 97, "name": "Jalandhari", "language": "urdu"}
+        return load_variants(self._config([
+            {"name": "full", "out_dir": str(self.root / "full")},
+            {"name": "id-ur", "out_dir": str(self.root / "id-ur"), "translations": ["id", urdu],
+             "layout": "split"},
+        ]), _args(word_index=True))
+
+    def test_map_verse_with_another_translation_set(self):
+        api = self.raw[1][0]
+        out = map_verse(api, {97: "ur", 33: "id"})
+        self.assertEqual(out["tr"], {"ur": "ur 1:1", "id": "id 1:1"})
+        with self.assertRaises(ValueError):
+            map_verse(api, {999: "xx"})
+
+    def test_load_variants(self):
+        full, small = self._variants()
+        self.assertEqual(full.translations, generate_quran_json.TRANSLATION_META)
+        self.assertEqual((full.layout, full.word_index), ("combined", True))
+        self.assertEqual(small.codes, {33: "id", 97: "ur"})
+        self.assertEqual(small.layout, "split")
+        self.assertEqual(resource_ids([full, small]), (20, 33, 109, 35, 97))
+        bad = [
+            [{"name": "x", "out_dir": "a", "translations": ["xx"]}],
+            [{"name": "x", "out_dir": "a"}, {"name": "x", "out_dir": "b"}],
+            [{"name": "x", "out_dir": "a"}, {"name": "y", "out_dir": "./b/../a/"}],
+            [{"name": "x"}],
+            [{"name": "x", "out_dir": "a", "translations": ["en", {"code": "e2", "id": 20}]}],
+            [],
+        ]
+        for variants in bad:
+            with self.subTest(variants=variants), self.assertRaises(SystemExit):
+                load_variants(self._config(variants), _args())
+
+    def test_default_variant_keeps_the_single_build_manifest(self):
+        encoded, manifest = build_variant(default_variant(_args()), self.raw, "2026-01-01")
+        self.assertEqual(manifest["version"], VERSION)
+        self.assertEqual(manifest["translationIds"], [20, 33, 109, 35])
+        self.assertNotIn("variant", manifest)
+        self.assertEqual(len(encoded), 114 + 3)
+        self.assertEqual(json.loads(encoded["s001.json"])[0]["tr"]["ja"], "ja 1:1")
+
+    def test_variants_share_identical_files_by_hardlink(self):
+        full, small = self._variants()
+        writer = Writer(link=True)
+        for variant in (full, small):
+            encoded, manifest = build_variant(variant, self.raw, "2026-01-01")
+            writer.write_all(Path(variant.out_dir), encoded)
+        a, b = self.root / "full", self.root / "id-ur"
+        self.assertTrue(os.path.samefile(a / "index_juz.json", b / "index_juz.json"))
+        self.assertTrue(os.path.samefile(a / "word_index.bin", b / "word_index.bin"))
+        self.assertFalse(os.path.samefile(a / "manifest_multi.json", b / "manifest_multi.json"))
+        self.assertEqual((writer.linked, writer.written), (3, 114 + 4 + 114 * 3 + 1))
+        manifest = json.loads((b / "manifest_multi.json").read_text(encoding="utf-8"))
+        self.assertEqual(manifest["variant"], "id-ur")
+        self.assertEqual(manifest["translationIds"], [33, 97])
+        self.assertEqual(manifest["version"], "v10-uthmani+ID(33)+UR(97)-no-tajweed-in-json-no-tl")
+        self.assertEqual(json.loads((b / "tr/ur/s002.json").read_text(encoding="utf-8"))[0], "ur 2:1")
+
+        # A later write to one variant replaces its file instead of editing the shared inode.
+        Writer().write(a / "index_juz.json", b"{}\n")
+        self.assertNotEqual((b / "index_juz.json").read_bytes(), b"{}\n")
+
+    def test_main_fetches_once_for_all_variants(self):
+        config = self._config([
+            {"name": "en", "out_dir": str(self.root / "en"), "translations": ["en"]},
+            {"name": "ja", "out_dir": str(self.root / "ja"), "translations": ["ja"]},
+        ])
+        calls = []
+
+        def fetch(chapter, ids):
+            calls.append((chapter, tuple(ids)))
+            return self.raw[chapter]
+
+        argv = ["generate_quran_json.py", "--variants", config, "--jobs", "2"]
+        with mock.patch.object(generate_quran_json, "fetch_chapter", fetch), \
+                mock.patch.object(generate_quran_json.time, "sleep"), \
+                mock.patch("sys.argv", argv), mock.patch("sys.stdout"):
+            self.assertEqual(generate_quran_json.main(), 0)
+        self.assertEqual(calls, [(chapter, (20, 35)) for chapter in range(1, 115)])
+        for code, rid in (("en", "20"), ("ja", "35")):
+            manifest = json.loads((self.root / code / "manifest_multi.json").read_text(encoding="utf-8"))
+            self.assertEqual(manifest["query"]["translations"], rid)
+            self.assertEqual(list(manifest["translations"]), [code])
+        self.assertTrue(os.path.samefile(self.root / "en/index_pages.json", self.root / "ja/index_pages.json"))
+
 
 if __name__ == "__main__":
     unittest.main()
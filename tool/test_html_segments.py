@@ -0,0 +1,139 @@
+import json
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+from html_segments import (
+    SegmentStore,
+    build,
+    bundle_language,
+    check,
+    parse_surah_info,
+    parse_tafsir,
+    polish_plain_text,
+    sidecar_path,
+    to_plain_text,
+    write_sidecar,
+)
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "html_segments_cases.json")
+
+
+class ParityTest(unittest.TestCase):
+    def test_matches_dart_parser_fixture(self):
+        # Same cases as test/surah_info_html_test.dart and tafsir_content_parser_test.dart.
+        with open(FIXTURE, encoding="utf-8") as f:
+            cases = json.load(f)
+        self.assertEqual({c["kind"] for c in cases}, {"surah_info", "tafsir"})
+        for case in cases:
+            with self.subTest(case["name"]):
+                if case["kind"] == "surah_info":
+                    got = parse_surah_info(case["html"], case["shortText"], case["language"])
+                else:
+                    got = parse_tafsir(case["html"], case["language"])
+                self.assertEqual(got, case["expected"])
+
+    def test_tafsir_html_rules(self):
+        plain = to_plain_text('<p lang="en">Hello &amp; <b>world</b><br/>Line two</p>')
+        self.assertEqual(plain, "Hello & world\nLine two")
+        self.assertEqual(to_plain_text(None), "")
+        self.assertEqual(to_plain_text("   "), "")
+        self.assertEqual(polish_plain_text("me-\n                  nafkahkan sebagian"), "menafkahkan sebagian")
+
+    def test_dart_trim_semantics(self):
+        # Dart's trim() strips U+FEFF, which str.strip() keeps.
+        self.assertEqual(to_plain_text("\ufeff<p>x</p>\ufeff"), "x")
+        self.assertEqual(parse_surah_info("", "\ufeff", "id"), {"short": "", "sections": []})
+
+
+class SidecarTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.out = os.path.join(self.tmp.name, "out")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _tafsir(self, rows):
+        path = os.path.join(self.tmp.name, "en_ibn_kathir.sqlite")
+        db = sqlite3.connect(path)
+        db.execute(
+            "CREATE TABLE tafsir (ayah_key TEXT, group_ayah_key TEXT, from_ayah TEXT, "
+            "to_ayah TEXT, ayah_keys TEXT, text TEXT)"
+        )
+        db.executemany("INSERT INTO tafsir VALUES (?, ?, ?, ?, ?, ?)", rows)
+        db.commit()
+        db.close()
+        return path
+
+    def test_tafsir_sidecar_follows_group_fallback_and_dedupes(self):
+        html = '<p lang="en">(1) Commentary.</p>'
+        src = self._tafsir(
+            [
+                ("1:1", "1:1", "1:1", "1:2", "1:1,1:2", html),
+                ("1:2", "1:1", "1:1", "1:2", "1:1,1:2", ""),
+                ("1:3", "1:3", "1:3", "1:3", "1:3", '<p lang="en">Other.</p>'),
+            ]
+        )
+        stats = build(src, self.out)
+        self.assertEqual((stats["kind"], stats["language"]), ("tafsir", "en"))
+        self.assertEqual((stats["entries"], stats["distinct"]), (3, 2))
+        store = SegmentStore(sidecar_path(self.out, src))
+        expected = {"sections": [{"paragraphs": [{"label": "(1)", "text": "Commentary."}]}]}
+        self.assertEqual(store.get("1:2"), expected)
+        self.assertEqual(store.get("1:2"), parse_tafsir(html, "en"))
+        self.assertIsNone(store.get("9:9"))
+        store.close()
+        self.assertEqual(check(src, sidecar_path(self.out, src)), [])
+
+    def test_check_reports_stale_entries(self):
+        src = self._tafsir([("1:1", "1:1", "1:1", "1:1", "1:1", '<p lang="en">Old.</p>')])
+        build(src, self.out)
+        db = sqlite3.connect(src)
+        db.execute("UPDATE tafsir SET text = '<p lang=\"en\">New.</p>'")
+        db.commit()
+        db.close()
+        self.assertEqual(check(src, sidecar_path(self.out, src)), ["1:1"])
+
+    def test_failed_rebuild_keeps_the_old_sidecar(self):
+        dest = os.path.join(self.tmp.name, "x.segments.sqlite")
+        with open(dest + ".tmp", "wb") as f:
+            f.write(b"left by a crashed run")
+        write_sidecar(dest, "tafsir", "en", [("1:1", {"sections": []})])
+        self.assertFalse(os.path.exists(dest + ".tmp"))
+        with mock.patch("html_segments._minify", side_effect=RuntimeError("boom")):
+            with self.assertRaises(RuntimeError):
+                write_sidecar(dest, "tafsir", "en", [("1:2", {"sections": []})])
+        self.assertFalse(os.path.exists(dest + ".tmp"))
+        store = SegmentStore(dest)
+        self.assertEqual(store.keys(), ["1:1"])
+        store.close()
+
+    def test_surah_info_sidecar(self):
+        src = os.path.join(self.tmp.name, "id_surah_info.sqlite")
+        db = sqlite3.connect(src)
+        db.execute("CREATE TABLE surah_infos (surah_number INTEGER, text TEXT, short_text TEXT)")
+        db.execute(
+            "INSERT INTO surah_infos VALUES (1, ?, '')",
+            ("<p>Pembuka.</p><p>**Pokok-Pokok isi:**</p><p>1. **Keimanan:**</p><p>Tauhid.</p>",),
+        )
+        db.commit()
+        db.close()
+        build(src, self.out)
+        store = SegmentStore(sidecar_path(self.out, src))
+        self.assertEqual(
+            store.get("1"),
+            {"short": "Pembuka.", "sections": [{"title": "1. Keimanan:", "body": "Tauhid."}]},
+        )
+        store.close()
+
+    def test_language_comes_from_the_asset_name(self):
+        self.assertEqual(bundle_language("assets/tafsir/zh_mokhtasar.sqlite", "tafsir"), "zh")
+        with self.assertRaises(SystemExit):
+            bundle_language("assets/quran/surah_info/zh_surah_info.sqlite", "surah_info")
+
+
+if __name__ == "__main__":
+    unittest.main()
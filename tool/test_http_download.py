@@ -0,0 +1,181 @@
+import gzip
+import hashlib
+import io
+import lzma
+import os
+import tempfile
+import threading
+import unittest
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from http_download import DownloadError, download
+from verify_ar_vs_tanzil import ensure_tanzil, load_tanzil
+
+TANZIL_TEXT = "1|1|بِسْمِ ٱللَّهِ\n1|2|ٱلْحَمْدُ لِلَّهِ\n\n# comment\n"
+
+
+class _StandIn(BaseHTTPRequestHandler):
+    """Serves `payload`, honours Range, and drops the first N connections."""
+
+    payload = b""
+    drops = 0
+    drop_after = 0
+    honour_range = True
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        cls = type(self)
+        cls.requests.append(self.headers.get("Range"))
+        start = 0
+        rng = self.headers.get("Range")
+        if rng and cls.honour_range:
+            start = int(rng.split("=")[1].rstrip("-"))
+            if start >= len(cls.payload):
+                self.send_response(416)
+                self.end_headers()
+                return
+            self.send_response(206)
+            self.send_header(
+                "Content-Range", f"bytes {start}-{len(cls.payload) - 1}/{len(cls.payload)}"
+            )
+        else:
+            self.send_response(200)
+        body = cls.payload[start:]
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if cls.drops > 0:
+            cls.drops -= 1
+            self.wfile.write(body[: cls.drop_after])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+class DownloadTest(unittest.TestCase):
+    def setUp(self):
+        self.handler = type("Handler", (_StandIn,), {"requests": []})
+        self.handler.payload = os.urandom(300_000)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self.handler)
+        threading.Thread(
+            target=self.server.serve_forever, args=(0.05,), daemon=True
+        ).start()
+        self.url = f"http://127.0.0.1:{self.server.server_port}/quran.txt"
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dest = os.path.join(self.tmp.name, "sub", "quran.txt")
+        self.digest = hashlib.sha256(self.handler.payload).hexdigest()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.tmp.cleanup()
+
+    def _download(self, **kwargs):
+        kwargs.setdefault("sha256", self.digest)
+        return download(
+            self.url, self.dest, chunk_size=4096, backoff=0, quiet=True, **kwargs
+        )
+
+    def test_resumes_after_dropped_connections(self):
+        self.handler.drops = 3
+        self.handler.drop_after = 50_000
+        self.assertEqual(self._download(), self.digest)
+        with open(self.dest, "rb") as f:
+            self.assertEqual(f.read(), self.handler.payload)
+        self.assertEqual(
+            self.handler.requests,
+            [None, "bytes=50000-", "bytes=100000-", "bytes=150000-"],
+        )
+        self.assertFalse(os.path.exists(self.dest + ".part"))
+
+    def test_resumes_part_file_from_previous_run(self):
+        os.makedirs(os.path.dirname(self.dest))
+        with open(self.dest + ".part", "wb") as f:
+            f.write(self.handler.payload[:1234])
+        self.assertEqual(self._download(), self.digest)
+        self.assertEqual(self.handler.requests, ["bytes=1234-"])
+
+    def test_restarts_when_range_is_ignored(self):
+        self.handler.honour_range = False
+        os.makedirs(os.path.dirname(self.dest))
+        with open(self.dest + ".part", "wb") as f:
+            f.write(b"stale")
+        self.assertEqual(self._download(), self.digest)
+
+    def test_complete_part_file_is_accepted_on_416(self):
+        os.makedirs(os.path.dirname(self.dest))
+        with open(self.dest + ".part", "wb") as f:
+            f.write(self.handler.payload)
+        self.assertEqual(self._download(), self.digest)
+
+    def test_digest_mismatch_leaves_no_file(self):
+        with self.assertRaises(DownloadError):
+            self._download(sha256="0" * 64)
+        self.assertFalse(os.path.exists(self.dest))
+        self.assertFalse(os.path.exists(self.dest + ".part"))
+
+    def test_ensure_tanzil_downloads_once(self):
+        self.handler.payload = TANZIL_TEXT.encode("utf-8")
+        digest = hashlib.sha256(self.handler.payload).hexdigest()
+        self.assertEqual(ensure_tanzil(self.dest, digest, self.url), digest)
+        self.assertEqual(ensure_tanzil(self.dest, digest, self.url), digest)
+        self.assertEqual(len(self.handler.requests), 1)
+        self.assertEqual(len(load_tanzil(self.dest)), 2)
+
+    def test_ensure_tanzil_without_a_pin_warns_with_the_digest(self):
+        self.handler.payload = TANZIL_TEXT.encode("utf-8")
+        digest = hashlib.sha256(self.handler.payload).hexdigest()
+        with mock.patch("sys.stderr", new_callable=io.StringIO) as err:
+            self.assertEqual(ensure_tanzil(self.dest, None, self.url), digest)
+        self.assertIn(f"warning: {self.dest}: no pinned SHA-256", err.getvalue())
+        self.assertIn(digest, err.getvalue())
+        with self.assertRaises(SystemExit) as raised:
+            ensure_tanzil(self.dest, None, self.url, require_pin=True)
+        self.assertIn(digest, str(raised.exception))
+        with self.assertRaises(SystemExit):
+            ensure_tanzil(self.dest, "0" * 64, self.url)
+        self.assertEqual(len(self.handler.requests), 1)
+
+    def test_ensure_tanzil_never_downloads_text_to_an_archive_name(self):
+        for suffix in (".xz", ".gz", ".zip"):
+            with self.subTest(suffix=suffix), self.assertRaises(SystemExit):
+                ensure_tanzil(self.dest + suffix, None, self.url)
+        self.assertEqual(self.handler.requests, [])
+
+
+def _write_zip(path, data):
+    with zipfile.ZipFile(path, "w") as zf:
+        zf.writestr("quran-uthmani.txt", data)
+
+
+def _write_bytes(path, data):
+    with open(path, "wb") as f:
+        f.write(data)
+
+
+class TanzilArchiveTest(unittest.TestCase):
+    def test_reads_compressed_archives_without_extracting(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            data = TANZIL_TEXT.encode("utf-8")
+            paths = {
+                "q.txt.gz": lambda p: _write_bytes(p, gzip.compress(data)),
+                "q.txt.xz": lambda p: _write_bytes(p, lzma.compress(data)),
+                "q.zip": lambda p: _write_zip(p, data),
+            }
+            for name, write in paths.items():
+                path = os.path.join(tmp, name)
+                write(path)
+                with self.subTest(name=name):
+                    tanzil = load_tanzil(path)
+                    self.assertEqual(tanzil[(1, 2)], "ٱلْحَمْدُ لِلَّهِ")
+                    self.assertEqual(len(tanzil), 2)
+            self.assertEqual(sorted(os.listdir(tmp)), sorted(paths))
+
+
+if __name__ == "__main__":
+    unittest.main()
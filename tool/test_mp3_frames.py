@@ -0,0 +1,33 @@
+import unittest
+
+from mp3_frames import audio_info, frames, parse_header, synthetic_mp3
+
+
+class Mp3FramesTest(unittest.TestCase):
+    def test_layer3_header(self):
+        frame = parse_header(bytes((0xFF, 0xFB, 0x90, 0x44)), 0)
+        self.assertEqual((frame.length, frame.samples, frame.sample_rate, frame.bitrate), (417, 1152, 44100, 128000))
+        padded = parse_header(bytes((0xFF, 0xFB, 0x92, 0x44)), 0)
+        self.assertEqual(padded.length, 418)
+        # MPEG-2 Layer III, 64 kbps, 22.05 kHz: 576 samples per frame.
+        mpeg2 = parse_header(bytes((0xFF, 0xF3, 0x80, 0x44)), 0)
+        self.assertEqual((mpeg2.length, mpeg2.samples), (208, 576))
+
+    def test_synthetic_file_walks_cleanly(self):
+        data = synthetic_mp3(38, seed=4)
+        count, seconds = audio_info(data)
+        self.assertEqual(count, 38)
+        self.assertAlmostEqual(seconds, 38 * 1152 / 44100)
+        offsets = [f.offset for f in frames(data)]
+        self.assertEqual(offsets[0], 20)
+        self.assertEqual(audio_info(data + b"TAG" + bytes(125))[0], 38)
+
+    def test_damage_is_rejected(self):
+        data = synthetic_mp3(10, id3=False)
+        for bad in (data[:-100], data + b"junk", b"<html>not found</html>", b"", data[:2] + b"\x00" + data[3:]):
+            with self.subTest(size=len(bad)), self.assertRaises(ValueError):
+                audio_info(bad)
+
+
+if __name__ == "__main__":
+    unittest.main()
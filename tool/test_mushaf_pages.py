@@ -0,0 +1,73 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from mushaf_pages import Line, PageBlob, compile_pages, encode_page, sqlite_page, synthetic_sources
+
+PAGES = 40
+
+
+class MushafPagesTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.layout = os.path.join(self.tmp.name, "layout.sqlite")
+        self.words = os.path.join(self.tmp.name, "words.sqlite")
+        synthetic_sources(self.layout, self.words, pages=PAGES)
+        self.out = os.path.join(self.tmp.name, "pages.bin")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self):
+        with open(self.out, "wb") as f:
+            f.write(compile_pages(self.layout, self.words, pages=PAGES))
+
+    def test_round_trip_matches_sqlite(self):
+        with sqlite3.connect(self.layout) as db:
+            # Ayah lines without a range are dropped, unknown types are skipped.
+            db.execute("UPDATE pages SET first_word_id = NULL WHERE page_number = 3 AND line_number = 4")
+            db.execute("UPDATE pages SET line_type = 'page_header' WHERE page_number = 3 AND line_number = 5")
+        self._write()
+        layout, words = sqlite3.connect(self.layout), sqlite3.connect(self.words)
+        try:
+            with PageBlob(self.out) as blob:
+                self.assertEqual(blob.page_count, PAGES)
+                expected = "".join(r[0] for r in words.execute("SELECT text FROM words WHERE id <= 4"))
+                self.assertEqual(blob.bismillah, expected)
+                for page in range(1, PAGES + 1):
+                    self.assertEqual(blob.page(page), sqlite_page(layout, words, page), page)
+                with self.assertRaises(IndexError):
+                    blob.page(PAGES + 1)
+                first = blob.page(1)
+                numbers = [line.line_number for line in blob.page(3)]
+        finally:
+            layout.close()
+            words.close()
+        self.assertEqual([line.line_type for line in first[:3]], ["surah_name", "basmallah", "ayah"])
+        self.assertEqual(first[1].surah, 1)
+        self.assertEqual(first[2].words[0].location, "1:1:1")
+        self.assertNotIn(4, numbers)
+        self.assertNotIn(5, numbers)
+
+    def test_multi_codepoint_glyphs_survive(self):
+        with sqlite3.connect(self.words) as db:
+            db.execute("UPDATE words SET text = text || ? WHERE id IN (7, 8)", ("\u0670",))
+            db.execute("UPDATE words SET text = char(0x1F000) WHERE id = 9")
+        self._write()
+        with PageBlob(self.out) as blob:
+            glyphs = [w.glyph for line in blob.page(1) for w in line.words if w.id in (7, 8, 9)]
+        self.assertEqual(glyphs[0][1:], "\u0670")
+        self.assertEqual(glyphs[2], "\U0001f000")
+
+    def test_inconsistent_sources_fail_the_build(self):
+        with sqlite3.connect(self.words) as db:
+            db.execute("UPDATE words SET word = 9 WHERE id = 6")
+        with self.assertRaises(ValueError):
+            compile_pages(self.layout, self.words, pages=PAGES)
+        with self.assertRaises(ValueError):
+            encode_page([Line(1, "page_header", False, None)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,133 @@
+import glob
+import os
+import sqlite3
+import tempfile
+import unittest
+from unittest import mock
+
+import optimize_tafsir
+from optimize_tafsir import TafsirBundle, check_equivalent, optimize, synthetic_bundle
+
+APP_QUERY = (
+    "SELECT ayah_key, group_ayah_key, from_ayah, to_ayah, ayah_keys, text "
+    "FROM tafsir WHERE ayah_key = ? LIMIT 1"
+)
+
+
+class OptimizeTafsirTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.src = os.path.join(self.tmp.name, "en_ibn_kathir.sqlite")
+        synthetic_bundle(self.src, ayahs=120)
+        with sqlite3.connect(self.src) as db:
+            # An empty row that relies on its group, and an extra metadata table.
+            db.execute("UPDATE tafsir SET text = '' WHERE ayah_key = '1:3'")
+            db.execute("CREATE TABLE info (name TEXT, value TEXT)")
+            db.execute("INSERT INTO info VALUES ('source', 'qul')")
+        self.dest = os.path.join(self.tmp.name, "out.sqlite")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_view_answers_the_app_query_unchanged(self):
+        stats = optimize(self.src, self.dest, page_sizes=(1024, 4096))
+        self.assertLess(stats["texts"], stats["rows"])
+        self.assertLess(stats["after"], stats["before"])
+        with sqlite3.connect(self.src) as a, sqlite3.connect(self.dest) as b:
+            keys = [r[0] for r in a.execute("SELECT ayah_key FROM tafsir")]
+            for key in keys:
+                self.assertEqual(a.execute(APP_QUERY, (key,)).fetchall(), b.execute(APP_QUERY, (key,)).fetchall())
+            self.assertEqual(a.execute("SELECT * FROM tafsir").fetchall(), b.execute("SELECT * FROM tafsir").fetchall())
+            plan = " ".join(r[3] for r in b.execute("EXPLAIN QUERY PLAN " + APP_QUERY, ("1:1",)))
+            self.assertIn("COVERING INDEX tafsir_rows_ayah_key", plan)
+            self.assertEqual(b.execute("SELECT * FROM info").fetchall(), [("source", "qul")])
+        self.assertEqual(check_equivalent(self.src, self.dest), [])
+
+    def test_compressed_bundle_reads_through_lookup_api(self):
+        optimize(self.src, self.dest, compress="zlib", page_sizes=(4096,))
+        self.assertEqual(check_equivalent(self.src, self.dest), [])
+        original, packed = TafsirBundle(self.src), TafsirBundle(self.dest)
+        try:
+            self.assertTrue(packed.optimized)
+            self.assertEqual(packed.text("1:3"), original.text("1:3"))
+            self.assertEqual(packed.text("1:3"), packed.row("1:2")["text"])
+            self.assertEqual(packed.row("1:3")["text"], "")
+            self.assertIsNone(packed.row("999:1"))
+        finally:
+            original.close()
+            packed.close()
+        with sqlite3.connect(self.dest) as db:
+            views = db.execute("SELECT name FROM sqlite_master WHERE type = 'view'").fetchall()
+        self.assertEqual(views, [])
+
+    def _rows(self, path):
+        with sqlite3.connect(path) as db:
+            rows = db.execute("SELECT * FROM tafsir").fetchall()
+            return rows, db.execute("SELECT * FROM info").fetchall()
+
+    def test_rerun_in_place_rebuilds_from_the_optimized_bundle(self):
+        before = self._rows(self.src)
+        argv = ["optimize_tafsir.py", self.src, "--in-place", "--page-size", "1024", "--page-size", "4096"]
+        for _ in range(2):
+            with mock.patch("sys.argv", argv), mock.patch("sys.stdout"):
+                self.assertEqual(optimize_tafsir.main(), 0)
+            self.assertEqual(self._rows(self.src), before)
+            self.assertEqual(os.listdir(self.tmp.name), ["en_ibn_kathir.sqlite"])
+
+    def test_writes_to_build_unless_in_place(self):
+        before = os.path.getmtime(self.src)
+        argv = ["optimize_tafsir.py", self.src, "--page-size", "4096"]
+        cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        try:
+            with mock.patch("sys.argv", argv), mock.patch("sys.stdout"):
+                self.assertEqual(optimize_tafsir.main(), 0)
+        finally:
+            os.chdir(cwd)
+        out = os.path.join(self.tmp.name, "build", "tafsir", "en_ibn_kathir.sqlite")
+        self.assertEqual(check_equivalent(self.src, out), [])
+        self.assertEqual(os.path.getmtime(self.src), before)
+
+    def test_without_rowid_table_is_read_in_ayah_order(self):
+        src = os.path.join(self.tmp.name, "ja_mokhtasar.sqlite")
+        with sqlite3.connect(src) as db:
+            db.execute(
+                "CREATE TABLE tafsir (ayah_key TEXT PRIMARY KEY, group_ayah_key TEXT, from_ayah TEXT, "
+                "to_ayah TEXT, ayah_keys TEXT, text TEXT) WITHOUT ROWID"
+            )
+            for key in ("2:1", "1:10", "1:2", "10:1", "1:1"):
+                db.execute("INSERT INTO tafsir VALUES (?, ?, ?, ?, ?, ?)", (key, key, key, key, key, f"t {key}"))
+        optimize(src, self.dest, page_sizes=(4096,))
+        self.assertEqual(check_equivalent(src, self.dest), [])
+        order = ["1:1", "1:2", "1:10", "2:1", "10:1"]
+        for path in (src, self.dest):
+            bundle = TafsirBundle(path)
+            try:
+                self.assertEqual(bundle.keys(), order)
+            finally:
+                bundle.close()
+        with sqlite3.connect(self.dest) as db:
+            self.assertEqual([r[0] for r in db.execute("SELECT ayah_key FROM tafsir")], order)
+
+    def test_compressed_bundle_can_be_optimized_again(self):
+        packed = os.path.join(self.tmp.name, "packed.sqlite")
+        optimize(self.src, packed, compress="zlib", page_sizes=(4096,))
+        optimize(packed, self.dest, page_sizes=(4096,))
+        self.assertEqual(check_equivalent(self.src, self.dest), [])
+        with sqlite3.connect(self.dest) as db:
+            cols = [r[1] for r in db.execute("PRAGMA table_info(tafsir)")]
+            self.assertEqual(db.execute("SELECT * FROM info").fetchall(), [("source", "qul")])
+        self.assertEqual(cols[-1], "text")
+
+    def test_failed_build_leaves_no_trial_files(self):
+        bad = os.path.join(self.tmp.name, "bad.sqlite")
+        sqlite3.connect(bad).close()
+        out = os.path.join(self.tmp.name, "out")
+        os.mkdir(out)
+        with self.assertRaises(SystemExit):
+            optimize(bad, os.path.join(out, "bad.sqlite"), page_sizes=(1024, 4096))
+        self.assertEqual(glob.glob(os.path.join(out, "*")), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
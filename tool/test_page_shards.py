@@ -0,0 +1,62 @@
+import unittest
+from unittest import mock
+
+import page_shards
+from page_shards import check_shards, shard_outputs
+from quran_corpus import build_indexes
+
+
+def _verses():
+    # Page 2 spans the end of surah 1 and the start of surah 2.
+    layout = [(1, 1, 1, 1), (1, 2, 2, 1), (2, 1, 2, 1), (2, 2, 3, 2), (2, 3, 3, 2)]
+    return [
+        {"s": s, "a": a, "ar": f"{s}:{a}", "tr": {}, "m": {"page": p, "juz": j}}
+        for s, a, p, j in layout
+    ]
+
+
+class PageShardsTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.multiple(page_shards, PAGE_COUNT=3, JUZ_COUNT=2)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.verses = _verses()
+        self.index_juz, self.index_pages = build_indexes(self.verses)
+
+    def test_each_shard_holds_exactly_its_verses_in_order(self):
+        out = shard_outputs(self.verses, juz=True)
+        self.assertEqual(
+            sorted(out),
+            ["juz/j01.json", "juz/j02.json", "pages/p001.json", "pages/p002.json",
+             "pages/p003.json"],
+        )
+        self.assertEqual([v["ar"] for v in out["pages/p002.json"]], ["1:2", "2:1"])
+        self.assertEqual([v["ar"] for v in out["juz/j02.json"]], ["2:2", "2:3"])
+        self.assertEqual(check_shards(self.verses, out, self.index_juz, self.index_pages), [])
+
+    def test_juz_shards_are_optional(self):
+        out = shard_outputs(self.verses)
+        self.assertFalse(any(name.startswith("juz/") for name in out))
+        self.assertEqual(check_shards(self.verses, out, self.index_juz, self.index_pages), [])
+
+    def test_reports_mismatch_with_build_indexes(self):
+        out = shard_outputs(self.verses)
+        moved = out["pages/p002.json"].pop()
+        out["pages/p003.json"].insert(0, moved)
+        problems = check_shards(self.verses, out, self.index_juz, self.index_pages)
+        self.assertTrue(any(p.startswith("pages/p002.json: ranges") for p in problems))
+        self.assertTrue(any("verses from another page" in p for p in problems))
+
+        del out["pages/p001.json"]
+        problems = check_shards(self.verses, out, self.index_juz, self.index_pages)
+        self.assertIn("page: 1 shards missing, first pages/p001.json", problems)
+        self.assertIn("page shards do not concatenate to the corpus in reading order", problems)
+
+    def test_bench_runs_on_given_verses(self):
+        lines = page_shards.bench(self.verses)
+        self.assertEqual(lines[0], "3 page views over 5 verses")
+        self.assertTrue(lines[-1].startswith("  page shards parse "))
+
+
+if __name__ == "__main__":
+    unittest.main()
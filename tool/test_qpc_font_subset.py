@@ -0,0 +1,158 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import qpc_font_subset
+from mushaf_pages import synthetic_sources
+from qpc_font_subset import (
+    build,
+    cmap,
+    glyph_usage,
+    merge_fonts,
+    missing,
+    pack_name,
+    plan_packs,
+    subset_font,
+)
+
+try:
+    import fontTools
+except ImportError:
+    fontTools = None
+
+
+def _font(codepoints, family="QpcV2Test"):
+    """A TrueType font with one square glyph per code point."""
+    from fontTools.fontBuilder import FontBuilder
+    from fontTools.pens.ttGlyphPen import TTGlyphPen
+
+    names = {cp: f"g{cp:04X}" for cp in sorted(codepoints)}
+    order = [".notdef", *names.values()]
+    glyphs = {}
+    for name in order:
+        pen = TTGlyphPen(None)
+        pen.moveTo((100, 0))
+        pen.lineTo((100, 500))
+        pen.lineTo((500, 500))
+        pen.lineTo((500, 0))
+        pen.closePath()
+        glyphs[name] = pen.glyph()
+    fb = FontBuilder(1000, isTTF=True)
+    fb.setupGlyphOrder(order)
+    fb.setupCharacterMap(names)
+    fb.setupGlyf(glyphs)
+    fb.setupHorizontalMetrics({name: (600, 100) for name in order})
+    fb.setupHorizontalHeader(ascent=800, descent=-200)
+    fb.setupNameTable({"familyName": family, "styleName": "Regular"})
+    fb.setupOS2()
+    fb.setupPost()
+    out = io.BytesIO()
+    fb.save(out)
+    return out.getvalue()
+
+
+class QpcFontSubsetTest(unittest.TestCase):
+    def test_glyph_usage_follows_page_words(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            layout, words = os.path.join(tmp, "l.sqlite"), os.path.join(tmp, "w.sqlite")
+            synthetic_sources(layout, words, pages=6)
+            usage = glyph_usage(layout, words, pages=6)
+        self.assertEqual(sorted(usage), [1, 2, 3, 4, 5, 6])
+        # Synthetic pages number their glyphs from U+FC41, like QPC V2.
+        for cps in usage.values():
+            self.assertIn(0xFC41, cps)
+        self.assertIn(0x0670, set().union(*usage.values()))
+
+    def test_missing(self):
+        self.assertEqual(missing({1, 2, 3}, {1: "a", 3: "c"}), [2])
+        self.assertEqual(missing(set(), {}), [])
+
+    def test_packs_need_disjoint_codepoints_and_budget(self):
+        usage = {1: {10, 11}, 2: {12}, 3: {12, 13}, 4: {20}, 5: {21}}
+        sizes = {1: 400, 2: 300, 3: 300, 4: 900, 5: 200}
+        self.assertEqual(plan_packs(usage, sizes, 0), [[1], [2], [3], [4], [5]])
+        # 3 collides with 2 on U+000C; 4 alone exceeds what is left of the budget.
+        self.assertEqual(plan_packs(usage, sizes, 1000), [[1, 2], [3], [4], [5]])
+        self.assertEqual(plan_packs(usage, sizes, 1200), [[1, 2], [3, 4], [5]])
+
+    def test_pack_names_keep_page_families(self):
+        self.assertEqual(pack_name([7]), ("p7.ttf", "QpcV2Page7"))
+        self.assertEqual(pack_name([7, 8, 9]), ("p7-9.ttf", "QpcV2Pack7_9"))
+
+
+@unittest.skipUnless(fontTools, "needs fontTools")
+class FontBuildTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.fonts = os.path.join(self.tmp.name, "fonts")
+        self.out = os.path.join(self.tmp.name, "out")
+        os.makedirs(self.fonts)
+        # QPC V2 pages reuse code points: pages 1 and 3 both use U+FC42.
+        self.cps = {1: range(0xFC41, 0xFC51), 2: range(0xFC41, 0xFC49), 3: range(0xFC41, 0xFC70)}
+        for page, cps in self.cps.items():
+            with open(os.path.join(self.fonts, f"p{page}.ttf"), "wb") as f:
+                f.write(_font(cps, f"QpcV2Page{page}"))
+        self.usage = {1: {0xFC41, 0xFC42}, 2: {0xFC43}, 3: {0xFC42, 0xFC61}}
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _source(self, page):
+        with open(os.path.join(self.fonts, f"p{page}.ttf"), "rb") as f:
+            return f.read()
+
+    def test_subset_keeps_exactly_the_used_codepoints(self):
+        source = self._source(1)
+        subset = subset_font(source, {0xFC41, 0xFC45})
+        self.assertEqual(set(cmap(subset)), {0xFC41, 0xFC45})
+        self.assertLess(len(subset), len(source))
+
+    def test_merge_keeps_every_page_and_renames_the_family(self):
+        a = subset_font(self._source(2), self.usage[2])
+        b = subset_font(self._source(3), self.usage[3])
+        merged = merge_fonts([a, b], "QpcV2Pack2_3")
+        self.assertEqual(set(cmap(merged)), self.usage[2] | self.usage[3])
+        from fontTools.ttLib import TTFont
+
+        self.assertEqual(TTFont(io.BytesIO(merged))["name"].getDebugName(1), "QpcV2Pack2_3")
+
+    def test_build_writes_packs_and_manifest(self):
+        lines, problems = build(self.fonts, self.out, self.usage, pack_bytes=1 << 20)
+        self.assertEqual(problems, [])
+        with open(os.path.join(self.out, "manifest.json"), encoding="utf-8") as f:
+            pages = json.load(f)["pages"]
+        self.assertEqual(pages["1"], {"file": "p1-2.ttf", "family": "QpcV2Pack1_2"})
+        self.assertEqual(pages["3"], {"file": "p3.ttf", "family": "QpcV2Page3"})
+        with open(os.path.join(self.out, "p1-2.ttf"), "rb") as f:
+            self.assertEqual(set(cmap(f.read())), self.usage[1] | self.usage[2])
+        self.assertTrue(lines[0].startswith("fonts    3 -> 2 files"))
+
+    def test_codepoints_lost_by_subsetting_or_absent_are_problems(self):
+        real = subset_font
+
+        def lossy(data, codepoints):
+            return real(data, set(codepoints) - {0xFC61})
+
+        usage = {**self.usage, 2: {0xFC43, 0xFCFF}}
+        with mock.patch.object(qpc_font_subset, "subset_font", lossy):
+            _, problems = build(self.fonts, self.out, usage)
+        self.assertEqual(
+            problems,
+            [
+                "p2.ttf: source lacks U+FCFF",
+                "p2.ttf: page 2 lost U+FCFF",
+                "p3.ttf: page 3 lost U+FC61",
+            ],
+        )
+
+    def test_missing_source_font_is_a_problem(self):
+        os.remove(os.path.join(self.fonts, "p3.ttf"))
+        _, problems = build(self.fonts, self.out, self.usage)
+        self.assertEqual(problems, [f"p3.ttf: missing from {self.fonts}"])
+
+
+if __name__ == "__main__":
+    unittest.main()
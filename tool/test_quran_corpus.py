@@ -0,0 +1,77 @@
+import json
+import os
+import tempfile
+import unittest
+
+from audit_tj_ar import TajweedAudit
+from quran_corpus import AYAH_TOTAL, EXPECTED_AYAHS, Analyzer, Corpus, ayah_at, ayah_ordinal, scan
+
+
+class _Keys(Analyzer):
+    def begin(self, corpus):
+        self.keys = []
+
+    def visit(self, path, verse):
+        self.keys.append((verse["s"], verse["a"]))
+
+    def report(self):
+        return [str(len(self.keys))]
+
+
+class CorpusScanTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        shards = {
+            "s001.json": [
+                {"s": 1, "a": 1, "ar": "بِسْمِ", "tj": "<span class=x>بِسْمِ</span>"},
+                {"s": 1, "a": 2, "ar": "ٱلْحَمْدُ", "tj": "ٱلْحَمْدُ ٢"},
+            ],
+            "s002.json": {"verses": [{"s": 2, "a": 1, "ar": "الٓمٓ"}]},
+        }
+        for name, data in shards.items():
+            with open(os.path.join(self.tmp.name, name), "w", encoding="utf-8") as f:
+                json.dump(data, f, ensure_ascii=False)
+        with open(os.path.join(self.tmp.name, "index_juz.json"), "w") as f:
+            f.write("{}")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_single_pass_feeds_every_analyzer(self):
+        corpus = Corpus(self.tmp.name)
+        self.assertEqual(len(corpus.paths), 2)
+        self.assertEqual(corpus.verse_count(), 3)
+        keys, audit = _Keys(), TajweedAudit()
+        scan(corpus, [keys, audit])
+        self.assertEqual(keys.keys, [(1, 1), (1, 2), (2, 1)])
+        self.assertEqual(audit.total, 3)
+        self.assertEqual(audit.with_tj, 2)
+        self.assertEqual(audit.bad, [(1, 2)])
+        self.assertEqual(audit.body_bad, 0)
+
+    def test_missing_directory_exits(self):
+        with self.assertRaises(SystemExit):
+            Corpus(os.path.join(self.tmp.name, "missing"))
+
+
+class OrdinalTest(unittest.TestCase):
+    def test_round_trip_over_every_ayah(self):
+        k = 0
+        for surah, count in enumerate(EXPECTED_AYAHS, 1):
+            for ayah in range(1, count + 1):
+                self.assertEqual(ayah_ordinal(surah, ayah), k)
+                self.assertEqual(ayah_at(k), (surah, ayah))
+                k += 1
+        self.assertEqual(k, AYAH_TOTAL)
+
+    def test_out_of_range(self):
+        for surah, ayah in ((0, 1), (115, 1), (1, 0), (1, 8)):
+            with self.assertRaises(ValueError):
+                ayah_ordinal(surah, ayah)
+        for ordinal in (-1, AYAH_TOTAL):
+            with self.assertRaises(ValueError):
+                ayah_at(ordinal)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from quran_corpus import AYAH_TOTAL, EXPECTED_AYAHS, ar_words, ayah_ordinal
+from reading_tables import ReadingTables, letter_count, verse_amounts
+from verse_store import synthetic_verses
+
+
+class AmountsTest(unittest.TestCase):
+    def test_pause_marks_and_signs_are_not_words_or_letters(self):
+        # "la rayba", a waqf mark, "fihi" with an attached waqf mark, a rub el hizb
+        # sign, then a word carrying the sajdah sign.
+        ar = "\u0644\u064e\u0627 \u0631\u064e\u064a\u0652\u0628\u064e \u06db \u0641\u0650\u064a\u0647\u0650\u06d6 \u06de \u0633\u0652\u062c\u064f\u062f\u0627\u06e9"
+        self.assertEqual(len(ar_words(ar)), 4)
+        # Harakat (Mn) and marks are skipped: 2 + 3 + 3 + 4 letters.
+        self.assertEqual(letter_count(ar), 12)
+        amounts = verse_amounts({"ar": ar, "tr": {"id": "Tidak ada", "en": "No doubt"}})
+        self.assertEqual(amounts, {"words": 4, "letters": 12, "tr.en": 8, "tr.id": 9})
+
+
+class ReadingTablesTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.verses = list(synthetic_verses(1))
+        cls.tables = ReadingTables.from_verses(cls.verses)
+        cls.amounts = [verse_amounts(v) for v in cls.verses]
+
+    def _brute(self, metric, keep):
+        return sum(a[metric] for v, a in zip(self.verses, self.amounts) if keep(v))
+
+    def test_progress_matches_brute_force_sums(self):
+        rng = random.Random(4)
+        metrics = ["words", "letters", "tr.en", "tr.ja"]
+        for _ in range(60):
+            k = rng.randrange(AYAH_TOTAL)
+            verse = self.verses[k]
+            s, a, m = verse["s"], verse["a"], verse["m"]
+            metric = rng.choice(metrics)
+            scopes = {
+                "quran": lambda v: True,
+                "surah": lambda v: v["s"] == s,
+                "juz": lambda v: v["m"]["juz"] == m["juz"],
+                "page": lambda v: v["m"]["page"] == m["page"],
+            }
+            for scope, in_unit in scopes.items():
+                with self.subTest(key=f"{s}:{a}", scope=scope, metric=metric):
+                    done = sum(
+                        self.amounts[j][metric] for j in range(k + 1) if in_unit(self.verses[j])
+                    )
+                    total = self._brute(metric, in_unit)
+                    self.assertEqual(self.tables.progress(s, a, scope, metric), (done, total))
+                    self.assertEqual(self.tables.remaining(s, a, scope, metric), total - done)
+
+    def test_last_ayah_of_a_unit_is_complete(self):
+        last = EXPECTED_AYAHS[1]
+        self.assertEqual(self.tables.fraction(2, last, "surah"), 1.0)
+        self.assertEqual(self.tables.remaining(114, 6), 0)
+        self.assertEqual(self.tables.minutes_left(114, 5, per_minute=2, metric="words"),
+                         self.amounts[-1]["words"] / 2)
+
+    def test_totals_and_json_round_trip(self):
+        data = json.loads(json.dumps(self.tables.to_json()))
+        self.assertEqual(len(data["pageStarts"]), 605)
+        self.assertEqual(data["totals"]["juz"]["words"][0], self._brute("words", lambda v: v["m"]["juz"] == 1))
+        self.assertEqual(sum(data["totals"]["page"]["letters"]), data["cumulative"]["letters"][-1])
+        self.assertEqual(
+            data["totals"]["surah"]["tr.id"][112], self._brute("tr.id", lambda v: v["s"] == 113)
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "reading_tables.json")
+            with open(path, "w") as f:
+                json.dump(data, f)
+            loaded = ReadingTables.load(path)
+        self.assertEqual(loaded.progress(36, 12, "page"), self.tables.progress(36, 12, "page"))
+
+    def test_rejects_out_of_order_or_incomplete_corpora(self):
+        swapped = self.verses[:]
+        swapped[0], swapped[1] = swapped[1], swapped[0]
+        with self.assertRaises(ValueError):
+            ReadingTables.from_verses(swapped)
+        with self.assertRaises(ValueError):
+            ReadingTables.from_verses(self.verses[:-1])
+        with self.assertRaises(ValueError):
+            self.tables.progress(1, 8)
+        self.assertEqual(ayah_ordinal(114, 6), AYAH_TOTAL - 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
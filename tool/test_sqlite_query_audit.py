@@ -0,0 +1,89 @@
+import os
+import sqlite3
+import tempfile
+import unittest
+
+from optimize_tafsir import optimize, synthetic_bundle
+from sqlite_query_audit import BUNDLES, audit_file, fix, format_report, is_scan, run
+
+BY_NAME = {bundle.name: bundle for bundle in BUNDLES}
+
+
+class SqliteQueryAuditTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _layout_db(self):
+        folder = os.path.join(self.root, "assets", "mushaf", "layout")
+        os.makedirs(folder)
+        path = os.path.join(folder, "qpc_v2_15_lines.sqlite")
+        with sqlite3.connect(path) as db:
+            db.execute(
+                "CREATE TABLE pages (page_number INTEGER, line_number INTEGER, line_type TEXT, "
+                "is_centered INTEGER, first_word_id INTEGER, last_word_id INTEGER, surah_number INTEGER)"
+            )
+            db.executemany(
+                "INSERT INTO pages VALUES (?, ?, ?, 0, ?, ?, NULL)",
+                [(p, l, "ayah", p * 100 + l, p * 100 + l + 8) for p in range(1, 605) for l in range(1, 16)],
+            )
+        db.close()
+        return path
+
+    def test_is_scan(self):
+        self.assertTrue(is_scan("SCAN pages"))
+        self.assertTrue(is_scan("SCAN pages USING INDEX pages_page_type_line"))
+        self.assertFalse(is_scan("SEARCH pages USING INDEX pages_page_type_line (page_number=?)"))
+        self.assertFalse(is_scan("SEARCH words USING INTEGER PRIMARY KEY (rowid>? AND rowid<?)"))
+        self.assertFalse(is_scan("USE TEMP B-TREE FOR ORDER BY"))
+        self.assertFalse(is_scan("SCAN CONSTANT ROW"))
+
+    def test_fix_turns_scans_into_searches(self):
+        path = self._layout_db()
+        bundle = BY_NAME["mushaf_layout"]
+        before = audit_file(path, bundle, runs=3)
+        self.assertTrue(all(report.scans for report in before))
+
+        lines, scanning = run([bundle], self.root, runs=3)
+        self.assertEqual(scanning, len(bundle.queries))
+        self.assertIn("  SCAN loadPageLines", "\n".join(lines))
+
+        self.assertEqual(fix(path, bundle), ["pages_page_type_line"])
+        self.assertEqual(fix(path, bundle), [])
+        with sqlite3.connect(path) as db:
+            self.assertTrue(db.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0])
+        db.close()
+        after = audit_file(path, bundle, runs=3)
+        self.assertEqual([report.scans for report in after], [[]] * len(bundle.queries))
+        self.assertEqual(run([bundle], self.root, runs=3)[1], 0)
+
+    def test_optimized_tafsir_view_passes_without_fix(self):
+        folder = os.path.join(self.root, "assets", "tafsir")
+        os.makedirs(folder)
+        src = os.path.join(self.root, "raw.sqlite")
+        synthetic_bundle(src, ayahs=200)
+        dest = os.path.join(folder, "en_ibn_kathir.sqlite")
+        optimize(src, dest, page_sizes=(4096,))
+        bundle = BY_NAME["tafsir"]
+        self.assertEqual(run([bundle], self.root, runs=3)[1], 0)
+        # The index belongs on a table; the view is left alone.
+        self.assertEqual(fix(dest, bundle), [])
+
+        report = audit_file(dest, bundle, runs=5)[0]
+        lines = format_report(report)
+        self.assertTrue(lines[0].startswith("  ok   getForAyah"))
+        self.assertIn("p99", lines[0])
+        self.assertEqual(len(lines), 1 + len(report.plan))
+
+    def test_missing_assets_are_skipped(self):
+        lines, scanning = run(BUNDLES, self.root, runs=1)
+        self.assertEqual(scanning, 0)
+        self.assertEqual(len(lines), len(BUNDLES))
+        self.assertTrue(all("skipped" in line for line in lines))
+
+
+if __name__ == "__main__":
+    unittest.main()
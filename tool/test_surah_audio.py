@@ -0,0 +1,82 @@
+import os
+import tempfile
+import unittest
+
+from audio_packs import file_name
+from mp3_frames import audio_info, frames, synthetic_mp3
+from surah_audio import END, INDEX, SeekIndex, build, logical_ayahs, surah_file, verify, verify_surah
+
+SURAHS = (1, 9, 112)
+
+
+class SurahAudioTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.pack = os.path.join(self.tmp.name, "pack", "Alafasy_128kbps")
+        self.out = os.path.join(self.tmp.name, "out")
+        os.makedirs(self.pack)
+        self.sizes = {}
+        for surah in SURAHS:
+            for ayah in logical_ayahs(surah):
+                frames_ = 3 + (surah + ayah) % 5
+                data = synthetic_mp3(frames_, seed=surah * 1000 + ayah, info=ayah % 2 == 0)
+                self.sizes[(surah, ayah)] = frames_
+                with open(os.path.join(self.pack, file_name(surah, ayah)), "wb") as f:
+                    f.write(data)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_sequence_follows_the_player(self):
+        self.assertEqual(logical_ayahs(1), [1, 2, 3, 4, 5, 6, 7])
+        self.assertEqual(logical_ayahs(9)[0], 1)
+        self.assertEqual(logical_ayahs(112), [0, 1, 2, 3, 4])
+
+    def test_build_indexes_every_ayah_at_a_frame_boundary(self):
+        self.assertEqual(build(self.pack, self.out, SURAHS), [])
+        self.assertEqual(verify(self.out), [])
+        index = SeekIndex.load(os.path.join(self.out, INDEX))
+        self.assertEqual(index.entries(2), [])
+
+        entries = index.entries(112)
+        self.assertEqual([e.ayah for e in entries], [0, 1, 2, 3, 4, END])
+        with open(os.path.join(self.out, surah_file(112)), "rb") as f:
+            data = f.read()
+        # Tags and info frames are gone: one clean stream, frames back to back.
+        self.assertEqual(audio_info(data)[0], sum(self.sizes[(112, a)] for a in logical_ayahs(112)))
+        offsets = [fr.offset for fr in frames(data)]
+        self.assertEqual(offsets[0], 0)
+        ayah2 = index.seek(112, 2)
+        self.assertEqual(offsets[ayah2.frame], ayah2.byte)
+        self.assertEqual(ayah2.frame, sum(self.sizes[(112, a)] for a in (0, 1)))
+        self.assertEqual(ayah2.ms, ayah2.frame * 1152 * 1000 // 44100)
+        self.assertEqual(entries[-1].byte, len(data))
+        with self.assertRaises(KeyError):
+            index.seek(112, 9)
+
+    def test_verification_catches_shifted_entries(self):
+        build(self.pack, self.out, SURAHS)
+        index = SeekIndex.load(os.path.join(self.out, INDEX))
+        with open(os.path.join(self.out, surah_file(1)), "rb") as f:
+            data = f.read()
+        entries = index.entries(1)
+        shifted = [entries[0], entries[1]._replace(byte=entries[1].byte + 1), *entries[2:]]
+        self.assertEqual(len(verify_surah(data, shifted, 1)), 1)
+        late = [entries[0], entries[1]._replace(frame=entries[1].frame + 1), *entries[2:]]
+        self.assertIn("stream has frame", verify_surah(data, late, 1)[0])
+
+    def test_damaged_piece_skips_the_surah_only(self):
+        with open(os.path.join(self.pack, file_name(9, 5)), "r+b") as f:
+            f.truncate(500)
+        os.remove(os.path.join(self.pack, file_name(112, 0)))
+        problems = build(self.pack, self.out, SURAHS)
+        self.assertEqual(len(problems), 2)
+        self.assertTrue(problems[0].startswith("surah 9: 009005.mp3"))
+        index = SeekIndex.load(os.path.join(self.out, INDEX))
+        self.assertTrue(index.entries(1))
+        self.assertEqual(index.entries(9), [])
+        self.assertFalse(os.path.exists(os.path.join(self.out, surah_file(112))))
+
+
+if __name__ == "__main__":
+    unittest.main()
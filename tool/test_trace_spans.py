@@ -0,0 +1,117 @@
+import argparse
+import json
+import os
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+import trace_spans
+from trace_spans import OFF, Tracer, span
+
+
+class TraceSpansTest(unittest.TestCase):
+    def tearDown(self):
+        trace_spans.disable()
+
+    def test_off_by_default_is_one_shared_no_op(self):
+        self.assertIs(span("fetch", url="x"), OFF)
+        with span("fetch") as s:
+            self.assertIs(s, OFF)
+
+    def test_complete_events_on_per_thread_tracks(self):
+        tracer = Tracer("gen")
+        with tracer.span("map", chapter=1):
+            with tracer.span("decode"):
+                pass
+
+        def work(n):
+            with tracer.span("fetch", chapter=n):
+                return threading.get_native_id()
+
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix="fetch") as pool:
+            tids = set(pool.map(work, range(12)))
+        doc = tracer.trace()
+        events = [e for e in doc["traceEvents"] if e["ph"] == "X"]
+        meta = [e for e in doc["traceEvents"] if e["ph"] == "M"]
+        self.assertEqual(len(events), 14)
+        outer, inner = events[0], events[1]
+        self.assertEqual((outer["name"], outer["args"]), ("map", {"chapter": 1}))
+        self.assertNotIn("args", inner)
+        self.assertLessEqual(outer["ts"], inner["ts"])
+        self.assertGreaterEqual(outer["ts"] + outer["dur"], inner["ts"] + inner["dur"])
+        self.assertEqual({e["tid"] for e in events[2:]}, tids)
+        names = {e["tid"]: e["args"]["name"] for e in meta if e["name"] == "thread_name"}
+        self.assertEqual(set(names), tids | {threading.get_native_id()})
+        self.assertTrue(all(names[t].startswith("fetch") for t in tids))
+        self.assertEqual(meta[0]["args"], {"name": "gen"})
+
+    def test_errors_are_recorded_and_propagate(self):
+        tracer = Tracer("gen")
+        with self.assertRaises(ValueError):
+            with tracer.span("map", chapter=2):
+                raise ValueError("bad verse_key")
+        self.assertEqual(tracer.events[0]["args"], {"chapter": 2, "error": "ValueError"})
+
+    def test_save_to_file_or_directory(self):
+        tracer = Tracer("audit_tj_ar")
+        with tracer.span("diff"):
+            pass
+        with tempfile.TemporaryDirectory() as tmp:
+            path = tracer.save(os.path.join(tmp, "out", "trace.json"))
+            with open(path, encoding="utf-8") as f:
+                self.assertEqual(json.load(f), tracer.trace())
+            path = tracer.save(tmp)
+            self.assertEqual(path.name, f"audit_tj_ar.{os.getpid()}.json")
+
+    def test_flag_defaults_to_environment(self):
+        with mock.patch.dict(os.environ, {trace_spans.ENV: "build/t.json"}):
+            parser = argparse.ArgumentParser()
+            trace_spans.add_argument(parser)
+            self.assertEqual(parser.parse_args([]).trace, "build/t.json")
+            self.assertEqual(parser.parse_args(["--trace", "x.json"]).trace, "x.json")
+        with mock.patch.dict(os.environ, {trace_spans.ENV: ""}):
+            parser = argparse.ArgumentParser()
+            trace_spans.add_argument(parser)
+            self.assertIsNone(parser.parse_args([]).trace)
+
+    def test_enable_routes_module_spans(self):
+        with mock.patch("atexit.register") as register:
+            trace_spans.start(None)
+            self.assertIs(span("x"), OFF)
+            trace_spans.start("unused.json")
+        register.assert_called_once()
+        with span("validate"):
+            pass
+        self.assertEqual(trace_spans._tracer.events[0]["name"], "validate")
+
+    def test_worker_events_merge_into_the_parent_trace(self):
+        with mock.patch("atexit.register"):
+            parent = trace_spans.enable("unused.json", process="gen")
+        origin = trace_spans.origin()
+        with span("fetch"):
+            pass
+        trace_spans.start_worker(origin)
+        worker = trace_spans._tracer
+        self.assertEqual(worker.origin, origin)
+        with span("map", variant="en"):
+            pass
+        events = trace_spans.take_events()
+        self.assertEqual(trace_spans.take_events()[-1]["ph"], "M")
+        trace_spans._tracer = parent
+        for e in events:
+            e["pid"] += 1  # as if from another process
+        trace_spans.add_events(events)
+        trace_spans.add_events(events)
+        doc = parent.trace()["traceEvents"]
+        self.assertEqual([e["name"] for e in doc if e["ph"] == "X"], ["fetch", "map", "map"])
+        processes = [e["pid"] for e in doc if e["name"] == "process_name"]
+        self.assertEqual(processes, [parent.pid, parent.pid + 1])
+        trace_spans.start_worker(None)
+        self.assertIs(span("map"), OFF)
+        self.assertEqual(trace_spans.take_events(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+import json
+import os
+import unittest
+
+from generate_quran_json import clean_translations
+from translation_clean import Footnote, clean, clean_with_footnotes
+
+FIXTURE = os.path.join(os.path.dirname(__file__), "fixtures", "translation_cleaner_cases.json")
+
+
+class TranslationCleanTest(unittest.TestCase):
+    def test_matches_dart_cleaner_fixture(self):
+        with open(FIXTURE, encoding="utf-8") as f:
+            cases = json.load(f)
+        self.assertTrue(cases)
+        for case in cases:
+            with self.subTest(input=case["input"]):
+                self.assertEqual(clean(case["input"]), case["output"])
+                self.assertEqual(clean_with_footnotes(case["input"])[0], case["output"])
+
+    def test_footnote_offsets_point_into_cleaned_text(self):
+        text, notes = clean_with_footnotes(
+            "2. Lord<sup foot_note=195933>1</sup> of the worlds<sup foot_note=\"7\">2</sup>"
+        )
+        self.assertEqual(text, "Lord of the worlds")
+        self.assertEqual(notes, [Footnote(195933, "1", 4), Footnote(7, "2", 18)])
+
+    def test_generator_stage_cleans_in_place_and_collects_footnotes(self):
+        verse = {
+            "s": 1,
+            "a": 1,
+            "tr": {"en": "In<sup foot_note=5>1</sup> the name", "id": "1. Dengan"},
+        }
+        sidecar = clean_translations({1: [verse]}, footnotes=True)
+        self.assertEqual(verse["tr"], {"en": "In the name", "id": "Dengan"})
+        self.assertEqual(sidecar, {"1:1": {"en": [{"id": 5, "mark": "1", "at": 2}]}})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+import json
+import os
+import tempfile
+import unittest
+
+from verify_dataset import MANIFEST, encode_json, file_entry, fingerprint, merkle_root, verify
+
+
+class VerifyDatasetTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        outputs = {
+            "s001.json": [{"s": 1, "a": 1, "ar": "بِسْمِ"}],
+            "s002.json": [{"s": 2, "a": 1, "ar": "الٓمٓ"}],
+            "pages/p001.json": [],
+            "index_pages.json": {"1": [{"s": 1, "a1": 1, "a2": 1}]},
+        }
+        encoded = {name: encode_json(data) for name, data in outputs.items()}
+        self.manifest = {"version": "test", "surahCount": 2}
+        self.manifest["fingerprint"] = fingerprint(
+            {name: file_entry(raw) for name, raw in encoded.items()}, self.manifest
+        )
+        encoded[MANIFEST] = encode_json(self.manifest)
+        for name, raw in encoded.items():
+            path = os.path.join(self.root, name)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "wb") as f:
+                f.write(raw)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, name, text):
+        with open(os.path.join(self.root, name), "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def test_clean_dataset_matches_recorded_root(self):
+        drift, root = verify(self.root, jobs=2)
+        self.assertEqual(drift, [])
+        self.assertEqual(root, self.manifest["fingerprint"]["root"])
+        self.assertIn(MANIFEST, self.manifest["fingerprint"]["files"])
+
+    def test_reports_changed_missing_and_untracked_files(self):
+        self._write("s001.json", "[]\n")
+        os.remove(os.path.join(self.root, "pages", "p001.json"))
+        self._write("s003.json", "[]\n")
+        drift, root = verify(self.root)
+        self.assertTrue(drift[0].startswith("missing  pages/p001.json"))
+        self.assertTrue(drift[1].startswith("changed  s001.json: "))
+        self.assertEqual(drift[2], "untracked s003.json")
+        self.assertIsNone(root)
+
+    def test_untracked_files_of_any_type_are_drift(self):
+        self._write("word_index.bin", "QWIX")
+        self._write("pages/notes.txt", "x")
+        os.makedirs(os.path.join(self.root, "pages", "extra"))
+        drift, _ = verify(self.root)
+        self.assertEqual(drift, ["untracked word_index.bin", "untracked pages/notes.txt"])
+
+    def test_manifest_edits_are_drift(self):
+        manifest = dict(self.manifest, version="edited")
+        self._write(MANIFEST, json.dumps(manifest, ensure_ascii=False, indent=2) + "\n")
+        drift, root = verify(self.root)
+        self.assertEqual(len(drift), 1)
+        self.assertTrue(drift[0].startswith(f"changed  {MANIFEST}"))
+        self.assertNotEqual(root, self.manifest["fingerprint"]["root"])
+
+    def test_manifest_whitespace_and_key_order_are_drift(self):
+        body = {k: v for k, v in self.manifest.items() if k != "fingerprint"}
+        edits = [
+            json.dumps(self.manifest, ensure_ascii=False, indent=4) + "\n",
+            json.dumps(dict(reversed(body.items()), fingerprint=self.manifest["fingerprint"]),
+                       ensure_ascii=False, indent=2) + "\n",
+            json.dumps(self.manifest, ensure_ascii=False, indent=2),
+        ]
+        for text in edits:
+            with self.subTest(text=text[:40]):
+                self._write(MANIFEST, text)
+                self.assertEqual(json.loads(text), self.manifest)
+                drift, root = verify(self.root)
+                self.assertEqual(len(drift), 1)
+                self.assertTrue(drift[0].startswith(f"changed  {MANIFEST}"))
+
+    def test_merkle_root_depends_on_names_and_hashes(self):
+        a = {"x": file_entry(b"1"), "y": file_entry(b"2"), "z": file_entry(b"3")}
+        self.assertEqual(merkle_root(a), merkle_root(dict(reversed(a.items()))))
+        self.assertNotEqual(merkle_root(a), merkle_root(dict(a, z=file_entry(b"4"))))
+        self.assertNotEqual(merkle_root(a), merkle_root({"w": a["x"], "y": a["y"], "z": a["z"]}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import verse_shards
+from verse_shards import ShardLoader, shard_manifest, split_outputs, write_split
+
+
+def _verse(s, a):
+    return {
+        "s": s,
+        "a": a,
+        "ar": f"ar {s}:{a}",
+        "tr": {code: f"{code} {s}:{a}" for code in ("en", "id", "zh", "ja")},
+        "m": {"juz": 1, "page": s, "hizb": 1, "ruku": 1},
+    }
+
+
+class SplitLayoutTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.by_surah = {1: [_verse(1, 1), _verse(1, 2)], 2: [_verse(2, 1)]}
+        write_split(self.by_surah, ("en", "id", "zh", "ja"), self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_outputs_keep_arabic_and_meta_apart_from_translations(self):
+        out = split_outputs(self.by_surah, ("en", "id"))
+        self.assertEqual(
+            sorted(out),
+            ["ar/s001.json", "ar/s002.json", "tr/en/s001.json", "tr/en/s002.json",
+             "tr/id/s001.json", "tr/id/s002.json"],
+        )
+        self.assertEqual(out["ar/s001.json"][1], {"s": 1, "a": 2, "ar": "ar 1:2", "m": _verse(1, 2)["m"]})
+        self.assertEqual(out["tr/id/s001.json"], ["id 1:1", "id 1:2"])
+        self.assertEqual(shard_manifest(("en",))["translations"], {"en": "tr/en/s{surah:03d}.json"})
+
+    def test_loader_parses_only_requested_languages(self):
+        loader = ShardLoader(self.tmp.name)
+        verses = loader.surah(1, ["id"])
+        self.assertEqual([v["tr"] for v in verses], [{"id": "id 1:1"}, {"id": "id 1:2"}])
+        self.assertEqual(verses[0]["ar"], "ar 1:1")
+        expected = sum(
+            os.path.getsize(os.path.join(self.tmp.name, p))
+            for p in ("ar/s001.json", "tr/id/s001.json")
+        )
+        self.assertEqual(loader.bytes_read, expected)
+
+    def test_round_trips_the_combined_shape(self):
+        loader = ShardLoader(self.tmp.name)
+        with mock.patch.object(verse_shards, "SURAH_COUNT", 2):
+            verses = list(loader.verses(["en", "id", "zh", "ja"]))
+        self.assertEqual(verses, self.by_surah[1] + self.by_surah[2])
+
+    def test_rejects_misaligned_translation_shard(self):
+        with open(os.path.join(self.tmp.name, "tr/ja/s001.json"), "w") as f:
+            json.dump(["only one"], f)
+        with self.assertRaises(ValueError):
+            ShardLoader(self.tmp.name).surah(1, ["ja"])
+        with self.assertRaises(KeyError):
+            ShardLoader(self.tmp.name).surah(1, ["fr"])
+
+
+if __name__ == "__main__":
+    unittest.main()
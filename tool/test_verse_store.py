@@ -0,0 +1,75 @@
+import json
+import os
+import tempfile
+import unittest
+
+from audit_tj_ar import TajweedAudit
+from quran_corpus import Corpus, build_indexes, scan
+from verse_store import VerseStore
+
+
+def _verse(s, a, page, **extra):
+    verse = {
+        "s": s,
+        "a": a,
+        "ar": f"ar {s}:{a}",
+        "tr": {"en": f"en {s}:{a}", "id": "sama"},
+        "m": {"juz": 1, "page": page, "hizb": 1, "ruku": s},
+    }
+    verse.update(extra)
+    return verse
+
+
+class VerseStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.verses = [
+            _verse(1, 1, 1),
+            _verse(1, 2, 2, tj="<span class=x>ar</span> 1:2 x"),
+            _verse(2, 1, 2),
+        ]
+        self.store = VerseStore.from_verses(self.verses)
+
+    def test_rows_round_trip_and_answer_like_dicts(self):
+        self.assertEqual(len(self.store), 3)
+        self.assertEqual([self.store.to_dict(i) for i in range(3)], self.verses)
+        row = self.store[1]
+        self.assertEqual((row["s"], row["a"], row["ar"]), (1, 2, "ar 1:2"))
+        self.assertEqual(row["m"]["page"], 2)
+        self.assertEqual(row["tr"], {"en": "en 1:2", "id": "sama"})
+        self.assertIsNone(self.store[0].get("tj"))
+        self.assertNotIn("tj", self.store[2])
+        with self.assertRaises(KeyError):
+            self.store[0]["tj"]
+        self.assertEqual(dict(row), self.verses[1])
+        self.assertEqual(list(row), list(self.store.to_dict(1)))
+        self.assertEqual(len(self.store[0]), 5)
+
+    def test_columns_and_string_pools(self):
+        self.assertEqual(self.store.ints["page"].typecode, "H")
+        self.assertEqual(list(self.store.ints["page"]), [1, 2, 2])
+        pool, index = self.store.texts["tr.id"]
+        self.assertEqual(len(pool), 1)
+        self.assertEqual(list(index), [1, 1, 1])
+        self.assertEqual(self.store.column("tj"), [None, "<span class=x>ar</span> 1:2 x", None])
+
+    def test_build_indexes_reads_the_columns(self):
+        self.assertEqual(self.store.build_indexes(), build_indexes(self.verses))
+        self.assertEqual(build_indexes(self.store.rows()), build_indexes(self.verses))
+
+    def test_scans_like_corpus(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for s in (1, 2):
+                with open(os.path.join(tmp, f"s{s:03d}.json"), "w", encoding="utf-8") as f:
+                    json.dump([v for v in self.verses if v["s"] == s], f)
+            store = VerseStore.from_shards(tmp)
+            self.assertEqual(store.paths, Corpus(tmp).paths)
+            self.assertEqual([store.shard_length(0), store.shard_length(1)], [2, 1])
+            via_store, via_dicts = TajweedAudit(), TajweedAudit()
+            scan(store, [via_store])
+            scan(Corpus(tmp), [via_dicts])
+        self.assertEqual(via_store.report(), via_dicts.report())
+        self.assertEqual(via_store.bad, [(1, 2)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+import os
+import random
+import tempfile
+import unittest
+
+from quran_corpus import AYAH_TOTAL, ar_words
+from verse_store import synthetic_verses
+from word_index import WordIndex, build_index, normalize_for_search, tokenize
+
+# "la rayba" with a waqf mark between, "fihi" with an attached waqf mark,
+# then a rub el hizb sign and a word carrying the sajdah sign.
+AYAH = "\u0644\u064e\u0627 \u0631\u064e\u064a\u0652\u0628\u064e \u06db \u0641\u0650\u064a\u0647\u0650\u06d6 \u06de \u0633\u0652\u062c\u064f\u062f\u0627\u06e9"
+
+
+def _verses(first_ar):
+    verses = list(synthetic_verses(1))
+    verses[0] = dict(verses[0], ar=first_ar)
+    return verses
+
+
+class TokenizeTest(unittest.TestCase):
+    def test_pause_marks_are_not_words(self):
+        words = [w for w, _ in tokenize(AYAH)]
+        self.assertEqual(words, ar_words(AYAH))
+        self.assertEqual(len(words), 4)
+
+    def test_offsets_slice_the_word_in_both_encodings(self):
+        ar = "\U0001d400 " + AYAH
+        utf16 = ar.encode("utf-16-le")
+        utf8 = ar.encode("utf-8")
+        for word, span in tokenize(ar):
+            self.assertEqual(utf16[2 * span.utf16_start:2 * span.utf16_end].decode("utf-16-le"), word)
+            self.assertEqual(utf8[span.utf8_start:span.utf8_end].decode("utf-8"), word)
+        # The astral character is two UTF-16 units and four UTF-8 bytes.
+        self.assertEqual(tokenize(ar)[1][1][::2], (3, 5))
+
+    def test_normalizer_matches_the_app(self):
+        self.assertEqual(normalize_for_search("\u0641\u0650\u064a\u0647\u0650\u06d6"), "\u0641\u064a\u0647")
+        self.assertEqual(normalize_for_search("\u0671\u0644\u0652\u062d\u064e\u0640\u0645\u0652\u062f\u064f"), "\u0627\u0644\u062d\u0645\u062f")
+        self.assertEqual(normalize_for_search("<b>\u0639\u0644\u0649</b>\ufeff"), "\u0639\u0644\u064a")
+        self.assertEqual(normalize_for_search("\u06df"), "")
+
+
+class WordIndexTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.verses = _verses(AYAH)
+        cls.index = WordIndex(build_index(cls.verses))
+        cls.scan = [
+            (normalize_for_search(word), (v["s"], v["a"], n))
+            for v in cls.verses
+            for n, (word, _) in enumerate(tokenize(v["ar"]), 1)
+        ]
+
+    def test_word_offsets_match_tokenizing(self):
+        rng = random.Random(2)
+        for verse in [self.verses[0]] + rng.sample(self.verses, 200):
+            expected = [span for _, span in tokenize(verse["ar"])]
+            self.assertEqual(self.index.words(verse["s"], verse["a"]), expected)
+            self.assertEqual(self.index.count(verse["s"], verse["a"]), len(expected))
+            n = rng.randint(1, len(expected))
+            self.assertEqual(self.index.word(verse["s"], verse["a"], n), expected[n - 1])
+        with self.assertRaises(ValueError):
+            self.index.word(1, 1, 5)
+
+    def test_find_matches_a_full_scan(self):
+        rng = random.Random(6)
+        sample = [w for v in rng.sample(self.verses, 30) for w, _ in tokenize(v["ar"])]
+        for query in rng.sample(sample, 15) + ["\u0641\u064a\u0647"]:
+            key = normalize_for_search(query)
+            expected = [hit for term, hit in self.scan if term == key]
+            with self.subTest(query=query):
+                self.assertTrue(expected)
+                self.assertEqual(self.index.find(query), expected)
+        self.assertIn((1, 1, 3), self.index.find("\u0641\u0650\u064a\u0647\u0650"))
+        self.assertEqual(self.index.find("\u06db"), [])
+        self.assertEqual(self.index.find("zzz"), [])
+
+    def test_terms_are_sorted_and_distinct(self):
+        terms = self.index.terms()
+        self.assertEqual(len(terms), self.index.term_total)
+        encoded = [t.encode("utf-8") for t in terms]
+        self.assertEqual(encoded, sorted(set(encoded)))
+
+    def test_load_and_reject(self):
+        data = build_index(self.verses)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "word_index.bin")
+            with open(path, "wb") as f:
+                f.write(data)
+            self.assertEqual(WordIndex.load(path).word_total, self.index.word_total)
+        with self.assertRaises(ValueError):
+            WordIndex(data[:-2])
+        with self.assertRaises(ValueError):
+            WordIndex(b"XXXX" + data[4:])
+        with self.assertRaises(ValueError):
+            build_index(self.verses[1:])
+        with self.assertRaises(ValueError):
+            build_index(self.verses[:AYAH_TOTAL - 1])
+
+
+if __name__ == "__main__":
+    unittest.main()
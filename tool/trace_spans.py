@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""Span tracing for the dataset tools, written as Chrome trace-event JSON.
+
+generate_quran_json.py, verify_ar_vs_tanzil.py and audit_tj_ar.py wrap
+their stages (fetch, decode, map, validate, index, encode, write, diff) in
+`span(...)`. Tracing is off unless QURAN_TRACE names an output file or the
+tool gets --trace PATH; when off, `span` hands back one shared no-op
+context manager, so an instrumented stage costs a function call.
+
+When on, every span is a complete ("X") event with microsecond start and
+duration, on a track per OS thread (named after the Python thread), and
+the file is written at exit. Open it in https://ui.perfetto.dev or
+chrome://tracing. If the path is an existing directory, each process
+writes <tool>.<pid>.json there, so build_datasets.py steps that inherit
+QURAN_TRACE do not overwrite each other. Process-pool workers trace with
+start_worker / take_events and the parent merges their spans (add_events)
+into its own file, each worker on its own process track.
+
+Usage:
+  QURAN_TRACE=build/trace.json python tool/generate_quran_json.py
+  python tool/verify_ar_vs_tanzil.py --trace build/trace.json
+  python tool/trace_spans.py --bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+
+ENV = "QURAN_TRACE"
+
+
+class _Off:
+    """What `span` returns while tracing is off."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> _Off:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        return None
+
+
+OFF = _Off()
+
+
+class Span:
+    __slots__ = ("tracer", "name", "args", "start")
+
+    def __init__(self, tracer: Tracer, name: str, args: dict) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self) -> Span:
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type: type | None, exc: object, tb: object) -> None:
+        end = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.record(self.name, self.start, end, self.args)
+
+
+class Tracer:
+    """Collects complete events from any thread of this process."""
+
+    def __init__(self, process: str = "") -> None:
+        self.process = process or Path(sys.argv[0]).stem or "python"
+        self.pid = os.getpid()
+        self.origin = time.perf_counter_ns()
+        self.events: list[dict] = []
+        self.threads: dict[int, str] = {}
+        # Events from pool workers (their own pid), merged by add_events.
+        self.imported: list[dict] = []
+        self.lock = threading.Lock()
+
+    def span(self, name: str, **args: object) -> Span:
+        return Span(self, name, args)
+
+    def record(self, name: str, start: int, end: int, args: dict) -> None:
+        tid = threading.get_native_id()
+        event = {
+            "name": name,
+            "ph": "X",
+            "ts": (start - self.origin) / 1000,
+            "dur": (end - start) / 1000,
+            "pid": self.pid,
+            "tid": tid,
+        }
+        if args:
+            event["args"] = args
+        with self.lock:
+            if tid not in self.threads:
+                self.threads[tid] = threading.current_thread().name
+            self.events.append(event)
+
+    def trace(self) -> dict:
+        """The trace-event document: metadata for tracks, then spans by start."""
+        with self.lock:
+            events = self.events + [e for e in self.imported if e["ph"] != "M"]
+            imported_meta = [e for e in self.imported if e["ph"] == "M"]
+            threads = dict(self.threads)
+        events.sort(key=lambda e: e["ts"])
+        meta = [
+            {"name": "process_name", "ph": "M", "pid": self.pid, "tid": 0,
+             "args": {"name": self.process}},
+        ]
+        for tid, name in threads.items():
+            meta.append({"name": "thread_name", "ph": "M", "pid": self.pid, "tid": tid,
+                         "args": {"name": name}})
+        seen = {(e["name"], e["pid"], e["tid"]) for e in meta}
+        for e in imported_meta:
+            if (e["name"], e["pid"], e["tid"]) not in seen:
+                seen.add((e["name"], e["pid"], e["tid"]))
+                meta.append(e)
+        return {"traceEvents": meta + events, "displayTimeUnit": "ms"}
+
+    def save(self, path: str | os.PathLike) -> Path:
+        out = Path(path)
+        if out.is_dir():
+            out = out / f"{self.process}.{self.pid}.json"
+        out.parent.mkdir(parents=True, exist_ok=True)
+        out.write_text(json.dumps(self.trace(), default=str) + "\n", encoding="utf-8")
+        return out
+
+
+_tracer: Tracer | None = None
+
+
+def span(name: str, **args: object) -> Span | _Off:
+    """Context manager timing one stage; a shared no-op while tracing is off."""
+    if _tracer is None:
+        return OFF
+    return _tracer.span(name, **args)
+
+
+def enable(path: str | os.PathLike, process: str = "") -> Tracer:
+    """Start tracing this process; the trace is written to `path` at exit."""
+    global _tracer
+    tracer = _tracer = Tracer(process)
+
+    def _save() -> None:
+        out = tracer.save(path)
+        spans = len(tracer.events) + sum(e["ph"] != "M" for e in tracer.imported)
+        print(f"Trace: {out} ({spans} spans)", file=sys.stderr)
+
+    atexit.register(_save)
+    return tracer
+
+
+def disable() -> None:
+    global _tracer
+    _tracer = None
+
+
+def origin() -> int | None:
+    """Clock origin of this process's tracer (None when off), for start_worker."""
+    return None if _tracer is None else _tracer.origin
+
+
+def start_worker(parent_origin: int | None) -> None:
+    """Process-pool initializer: trace when the parent does, on its time base.
+
+    perf_counter_ns reads the system-wide monotonic clock, so worker spans
+    line up with the parent's once they share its origin.
+    """
+    global _tracer
+    _tracer = None
+    if parent_origin is not None:
+        _tracer = Tracer(f"{Path(sys.argv[0]).stem or 'python'} worker")
+        _tracer.origin = parent_origin
+
+
+def take_events() -> list[dict]:
+    """This worker's spans (and track names) so far, handed to the parent."""
+    if _tracer is None:
+        return []
+    events = _tracer.trace()["traceEvents"]
+    with _tracer.lock:
+        _tracer.events.clear()
+    return events
+
+
+def add_events(events: list[dict]) -> None:
+    """Merge a worker's take_events() into this process's trace."""
+    if _tracer is not None and events:
+        with _tracer.lock:
+            _tracer.imported.extend(events)
+
+
+def add_argument(parser: argparse.ArgumentParser) -> None:
+    """--trace PATH, defaulting to $QURAN_TRACE."""
+    parser.add_argument(
+        "--trace",
+        metavar="PATH",
+        default=os.environ.get(ENV) or None,
+        help=f"write Chrome trace-event JSON of the build stages (or set {ENV})",
+    )
+
+
+def start(path: str | None) -> None:
+    """enable(path) when a --trace path was given; otherwise stay off."""
+    if path and _tracer is None:
+        enable(path)
+
+
+def bench(n: int) -> None:
+    def timed(make) -> float:
+        t0 = time.perf_counter()
+        for _ in range(n):
+            with make("stage"):
+                pass
+        return (time.perf_counter() - t0) / n * 1e9
+
+    disable()
+    off = timed(span)
+    tracer = Tracer("bench")
+    on = timed(tracer.span)
+    print(f"{n} spans")
+    print(f"  off: {off:7.0f} ns/span")
+    print(f"  on:  {on:7.0f} ns/span ({len(tracer.events)} events)")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("-n", type=int, default=200_000)
+    args = parser.parse_args()
+    if args.bench:
+        bench(args.n)
+        return 0
+    parser.print_help()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Build-time port of lib/core/utils/translation_cleaner.dart.
+
+clean() gives the same result as TranslationCleaner.clean: drop
+<sup ...>...</sup> footnote markers, drop a leading "N. " verse number,
+trim. Patterns are compiled once and spelled out to follow Dart/JS regex
+semantics (ASCII \\b and \\d, JS \\s, `.` stopping at line terminators,
+Dart String.trim whitespace). clean_with_footnotes() also returns the
+removed markers with their offsets in the cleaned text, for the optional
+footnotes sidecar.
+
+Parity cases live in tool/fixtures/translation_cleaner_cases.json and are
+checked by both tool/test_translation_clean.py and
+test/translation_cleaner_test.dart.
+
+Usage:
+  python tool/translation_clean.py --bench
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import re
+import time
+from typing import NamedTuple
+
+from dart_regex import DART_TRIM, JS_DOT, JS_SPACE
+
+SUP = re.compile(r"<sup\b[^>]*>(.*?)</sup>", re.IGNORECASE | re.DOTALL | re.ASCII)
+FOOT_NOTE_ID = re.compile(r"\bfoot_?note\s*=\s*[\"']?(\d+)", re.IGNORECASE | re.ASCII)
+LEADING_NUMBER = re.compile(
+    rf"\A(\d+)\.[{JS_SPACE}]+({JS_DOT}*)\Z", re.ASCII
+)
+LEADING_NUMBER_LOOSE = re.compile(rf"\A\d+\.[{JS_SPACE}]*", re.ASCII)
+
+
+class Footnote(NamedTuple):
+    id: int | None
+    mark: str
+    at: int
+
+
+def _strip_leading_number(text: str) -> tuple[str, int]:
+    """Text after the leading "N. " and how many leading chars were dropped."""
+    match = LEADING_NUMBER.match(text)
+    if match is not None:
+        return match.group(2), match.start(2)
+    match = LEADING_NUMBER_LOOSE.match(text)
+    if match is not None:
+        return text[match.end() :], match.end()
+    return text, 0
+
+
+def clean(text: str | None) -> str:
+    if not text:
+        return text or ""
+    cleaned = SUP.sub("", text) if "<" in text else text
+    cleaned, _ = _strip_leading_number(cleaned)
+    return cleaned.strip(DART_TRIM)
+
+
+def clean_with_footnotes(text: str | None) -> tuple[str, list[Footnote]]:
+    """clean() plus each removed footnote marker and its offset in the result."""
+    if not text:
+        return text or "", []
+    parts: list[str] = []
+    found: list[tuple[int | None, str, int]] = []
+    pos = 0
+    length = 0
+    for match in SUP.finditer(text):
+        head = text[pos : match.start()]
+        parts.append(head)
+        length += len(head)
+        ref = FOOT_NOTE_ID.search(match.group(0), 0, match.start(1) - match.start())
+        found.append((int(ref.group(1)) if ref else None, match.group(1), length))
+        pos = match.end()
+    parts.append(text[pos:])
+    joined = "".join(parts)
+    body, dropped = _strip_leading_number(joined)
+    lead = len(body) - len(body.lstrip(DART_TRIM))
+    cleaned = body.strip(DART_TRIM)
+    notes = [
+        Footnote(fid, mark, min(max(at - dropped - lead, 0), len(cleaned)))
+        for fid, mark, at in found
+    ]
+    return cleaned, notes
+
+
+def _synthetic_translations(n: int, seed: int = 5) -> list[str]:
+    rng = random.Random(seed)
+    words = "the of and to in Allah those who believe Lord day mercy guidance".split()
+    out: list[str] = []
+    for i in range(n):
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(8, 60)))
+        if rng.random() < 0.4:
+            k = text.find(" ", rng.randrange(len(text)))
+            if k > 0:
+                text = f"{text[:k]}<sup foot_note={190000 + i}>{rng.randint(1, 3)}</sup>{text[k:]}"
+        if rng.random() < 0.1:
+            text = f"{rng.randint(1, 286)}. {text}"
+        out.append(text + ".")
+    return out
+
+
+def bench(count: int) -> None:
+    texts = _synthetic_translations(count)
+    size = sum(len(t.encode("utf-8")) for t in texts)
+    t0 = time.perf_counter()
+    for t in texts:
+        clean(t)
+    t1 = time.perf_counter()
+    for t in texts:
+        clean_with_footnotes(t)
+    t2 = time.perf_counter()
+    mb = size / 1e6
+    print(f"{count} translation strings, {mb:.1f} MB")
+    print(f"  clean():                {t1 - t0:7.3f}s  {mb / (t1 - t0):7.1f} MB/s")
+    print(f"  clean_with_footnotes(): {t2 - t1:7.3f}s  {mb / (t2 - t1):7.1f} MB/s")
+    per_corpus = (t1 - t0) / count * 6236 * 4
+    print(f"  one 6236 x 4 corpus:    {per_corpus:7.3f}s at build time, 0 at import")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--count", type=int, default=6236 * 4 * 10)
+    args = parser.parse_args()
+    if args.bench:
+        bench(args.count)
+        return 0
+    parser.print_help()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
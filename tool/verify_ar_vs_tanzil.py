@@ -8,36 +8,84 @@ Tanzil source (Uthmani, text with aya numbers, surah|ayah|text):
 
 JSON: assets/quran/s[0-9][0-9][0-9].json as a JSON ARRAY of verse objects
 with keys s, a, ar. No NFC, fold, or letter rewriting. Report only.
+
+The Tanzil file may also be a .gz, .xz or .zip archive; it is read through
+streaming decompression, never extracted. A missing plain-text file is
+downloaded with resume and an atomic rename (http_download.py); Tanzil
+serves text, so an archive path is never downloaded to. The file's SHA-256
+must match --sha256 or the pinned TANZIL_SHA256. With neither, the run
+warns with the digest to review and pin, then compares anyway;
+--require-pin makes that an error instead.
+
+--trace PATH (or QURAN_TRACE=PATH) writes a Chrome trace-event file of the
+fetch, decode, load and diff stages (see trace_spans.py).
+
+Usage:
+  python tool/verify_ar_vs_tanzil.py
+  python tool/verify_ar_vs_tanzil.py data/tanzil/quran-uthmani.txt.xz
+  python tool/verify_ar_vs_tanzil.py --sha256 <hex>
+  python tool/verify_ar_vs_tanzil.py --require-pin
+  python tool/verify_ar_vs_tanzil.py --trace build/trace.json
 """
 
 from __future__ import annotations
 
-import glob
-import json
+import argparse
+import gzip
+import io
+import lzma
 import os
 import sys
 import unicodedata
-import urllib.request
+import zipfile
 from collections import Counter
+from collections.abc import Iterator
+from contextlib import contextmanager
+from typing import TextIO
+
+import trace_spans
+from codepoint_stats import CodepointCorpus, shared_alphabet
+from http_download import download, sha256_file
+from quran_corpus import Analyzer, Corpus, scan
+from trace_spans import span
+from verse_store import VerseStore
 
 TANZIL_URL = (
     "https://tanzil.net/pub/download/index.php?quranType=uthmani&outType=txt-2"
 )
 TANZIL_DOWNLOADED = "2026-08-16"
 DEFAULT_TANZIL_PATH = os.path.join("data", "tanzil", "quran-uthmani.txt")
-
-
-def load_verses(path: str) -> list:
-    with open(path, encoding="utf-8") as f:
-        data = json.load(f)
-    if isinstance(data, list):
-        return data
-    raise SystemExit(f"unexpected JSON shape in {path}: {type(data).__name__}")
+# SHA-256 of the reviewed Tanzil download. Unset until a maintainer pins it
+# from a checked copy; until then a run warns with the digest to pin.
+TANZIL_SHA256: str | None = None
+ARCHIVE_SUFFIXES = (".gz", ".xz", ".zip")
+
+
+@contextmanager
+def open_tanzil(path: str) -> Iterator[TextIO]:
+    """Text stream over a plain, .gz, .xz or single-text .zip Tanzil file."""
+    lower = path.lower()
+    if lower.endswith(".gz"):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            yield f
+    elif lower.endswith(".xz"):
+        with lzma.open(path, "rt", encoding="utf-8") as f:
+            yield f
+    elif lower.endswith(".zip"):
+        with zipfile.ZipFile(path) as zf:
+            names = [n for n in zf.namelist() if n.lower().endswith(".txt")]
+            if len(names) != 1:
+                raise SystemExit(f"{path}: expected one .txt member, found {names}")
+            with zf.open(names[0]) as raw:
+                yield io.TextIOWrapper(raw, encoding="utf-8")
+    else:
+        with open(path, encoding="utf-8") as f:
+            yield f
 
 
 def load_tanzil(path: str) -> dict[tuple[int, int], str]:
     out: dict[tuple[int, int], str] = {}
-    with open(path, encoding="utf-8") as f:
+    with open_tanzil(path) as f:
         for line in f:
             line = line.rstrip("\n")
             if not line or line.startswith("#"):
@@ -50,15 +98,35 @@ def load_tanzil(path: str) -> dict[tuple[int, int], str]:
     return out
 
 
-def ensure_tanzil(path: str) -> None:
+def ensure_tanzil(
+    path: str,
+    sha256: str | None = TANZIL_SHA256,
+    url: str = TANZIL_URL,
+    require_pin: bool = False,
+) -> str:
+    """Download Tanzil to `path` if missing; return the file's checked SHA-256."""
     if os.path.isfile(path):
-        return
-    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
-    req = urllib.request.Request(TANZIL_URL, headers={"User-Agent": "quran-offline-verify"})
-    with urllib.request.urlopen(req) as resp:
-        data = resp.read()
-    with open(path, "wb") as f:
-        f.write(data)
+        got = sha256_file(path)
+        if sha256 and got != sha256.lower():
+            raise SystemExit(f"{path}: SHA-256 {got} does not match pinned {sha256}")
+    else:
+        if path.lower().endswith(ARCHIVE_SUFFIXES):
+            raise SystemExit(
+                f"{path}: {url} serves plain text; download to a .txt path "
+                "or put the archive there yourself"
+            )
+        print(f"Downloading {url} -> {path}", file=sys.stderr)
+        got = download(url, path, sha256=sha256, user_agent="quran-offline-verify")
+        print(f"SHA-256 {got}", file=sys.stderr)
+    if not sha256:
+        message = (
+            f"{path}: no pinned SHA-256. Review the file, then pin {got} in "
+            "TANZIL_SHA256 or pass --sha256"
+        )
+        if require_pin:
+            raise SystemExit(message)
+        print(f"warning: {message}", file=sys.stderr)
+    return got
 
 
 def cp_name(ch: str) -> str:
@@ -96,9 +164,9 @@ def local_diffs(ar: str, tz: str) -> list[tuple[str, str]]:
             continue
         i0, j0 = i, j
         found = False
-        for span in range(1, 24):
-            for di in range(0, span + 1):
-                dj = span - di
+        for skip in range(1, 24):
+            for di in range(0, skip + 1):
+                dj = skip - di
                 ni, nj = i + di, j + dj
                 if ni <= n and nj <= m:
                     if ni < n and nj < m and ar[ni] == tz[nj]:
@@ -162,127 +230,174 @@ def first_mismatch_index(a: str, b: str) -> int:
     return i
 
 
+class TanzilDiff(Analyzer):
+    title = "Tanzil vs JSON ar"
+
+    def __init__(self, tanzil: dict[tuple[int, int], str], tanzil_path: str) -> None:
+        self.tanzil = tanzil
+        self.tanzil_path = tanzil_path
+
+    def begin(self, corpus: Corpus) -> None:
+        self.files = len(corpus.paths)
+        self.compared = 0
+        self.identical = 0
+        self.missing_tanzil = 0
+        self.json_keys: set[tuple[int, int]] = set()
+        self.differing_keys: list[str] = []
+        self.differing_ar: list[str] = []
+        self.differing_tz: list[str] = []
+        self.pattern_counts: Counter[tuple[str, str]] = Counter()
+        self.pattern_example: dict[tuple[str, str], tuple[str, str, str]] = {}
+
+    def visit(self, path: str, v: dict) -> None:
+        s = int(v["s"])
+        a = int(v["a"])
+        ar = v["ar"]
+        key = (s, a)
+        self.json_keys.add(key)
+        tz = self.tanzil.get(key)
+        if tz is None:
+            self.missing_tanzil += 1
+            return
+        self.compared += 1
+        if ar == tz:
+            self.identical += 1
+            return
+        vk = f"{s}:{a}"
+        self.differing_keys.append(vk)
+        self.differing_ar.append(ar)
+        self.differing_tz.append(tz)
+        for ar_part, tz_part in local_diffs(ar, tz):
+            pk = (ar_part, tz_part)
+            self.pattern_counts[pk] += 1
+            if pk not in self.pattern_example:
+                mi = first_mismatch_index(ar, tz)
+                self.pattern_example[pk] = (vk, snippet(ar, mi), snippet(tz, mi))
+
+    def finish(self) -> None:
+        with span("diff_counts", verses=len(self.differing_keys)):
+            self._count()
+
+    def _count(self) -> None:
+        alphabet = shared_alphabet(self.differing_ar, self.differing_tz)
+        ar_corpus = CodepointCorpus(self.differing_ar, alphabet)
+        tz_corpus = CodepointCorpus(self.differing_tz, alphabet)
+        rows = [(i, i) for i in range(len(self.differing_keys))]
+        self.extra_in_ar = ar_corpus.difference_counts(tz_corpus, rows)
+        self.extra_in_tz = tz_corpus.difference_counts(ar_corpus, rows)
+        combining = ar_corpus.combining_ids()
+        core = bytes(
+            sorted(
+                set(combining)
+                | set(ar_corpus.symbol_ids(PAUSE_OR_SIGN | {"\u0640"}))
+            )
+        )
+        ar_letters = ar_corpus.stripped_lengths(combining)
+        tz_letters = tz_corpus.stripped_lengths(combining)
+        ar_core = ar_corpus.stripped_lengths(core)
+        tz_core = tz_corpus.stripped_lengths(core)
+        self.letter_count_diff: list[str] = []
+        self.letter_count_diff_core: list[str] = []
+        for i, vk in enumerate(self.differing_keys):
+            if ar_letters[i] != tz_letters[i]:
+                self.letter_count_diff.append(vk)
+            if ar_core[i] != tz_core[i]:
+                self.letter_count_diff_core.append(vk)
+        self.missing_ar = sum(1 for k in self.tanzil if k not in self.json_keys)
+
+    def report(self) -> list[str]:
+        out = [
+            "Tanzil vs JSON ar (raw codepoints, no NFC/fold)",
+            f"Tanzil URL: {TANZIL_URL}",
+            f"Downloaded: {TANZIL_DOWNLOADED}",
+            f"Local: {self.tanzil_path}",
+            f"JSON files: {self.files}",
+            f"Tanzil verses: {len(self.tanzil)}",
+            f"verses compared: {self.compared}",
+            f"identical: {self.identical}",
+            f"differing: {len(self.differing_keys)}",
+            f"JSON verses with no Tanzil row: {self.missing_tanzil}",
+            f"Tanzil rows with no JSON verse: {self.missing_ar}",
+        ]
+
+        out.append("\ncodepoints in ar not in Tanzil that verse:")
+        for c, n in self.extra_in_ar.most_common():
+            out.append(f"  U+{ord(c):04X} {cp_name(c)} x{n}")
+        if not self.extra_in_ar:
+            out.append("  (none)")
+
+        out.append("\ncodepoints in Tanzil not in ar that verse:")
+        for c, n in self.extra_in_tz.most_common():
+            out.append(f"  U+{ord(c):04X} {cp_name(c)} x{n}")
+        if not self.extra_in_tz:
+            out.append("  (none)")
+
+        out.append("\n10 most frequent difference patterns:")
+        labels = {
+            "A": "encoding variant",
+            "B": "different-meaning mark 06DF/06E0",
+            "C": "letter added/missing",
+        }
+        for i, ((ar_part, tz_part), n) in enumerate(
+            self.pattern_counts.most_common(10), 1
+        ):
+            vk, ar_snip, tz_snip = self.pattern_example[(ar_part, tz_part)]
+            kind = classify(ar_part, tz_part)
+            out.append(f"  {i}. x{n} class {kind} ({labels[kind]})")
+            out.append(f"     verse_key: {vk}")
+            out.append(f"     ar_substr: {ar_part!r}  [{cps(ar_part)}]")
+            out.append(f"     tz_substr: {tz_part!r}  [{cps(tz_part)}]")
+            out.append(f"     ar snippet: {ar_snip}")
+            out.append(f"     tz snippet: {tz_snip}")
+
+        out.append(
+            "\nverses where letter count differs after removing combining marks "
+            f"(serious): {len(self.letter_count_diff)}"
+        )
+        out.extend(_examples(self.letter_count_diff))
+        out.append(
+            "after also removing tatweel U+0640 and pause/sajdah/hizb signs "
+            f"(core letter count): {len(self.letter_count_diff_core)}"
+        )
+        out.extend(_examples(self.letter_count_diff_core))
+        return out
+
+
+def _examples(keys: list[str]) -> list[str]:
+    if not keys:
+        return []
+    out = ["  examples: " + ", ".join(keys[:40])]
+    if len(keys) > 40:
+        out.append(f"  ... +{len(keys) - 40} more")
+    return out
+
+
 def main() -> None:
-    sys.stdout.reconfigure(encoding="utf-8")
-    tanzil_path = sys.argv[1] if len(sys.argv) > 1 else DEFAULT_TANZIL_PATH
-    ensure_tanzil(tanzil_path)
-    tanzil = load_tanzil(tanzil_path)
-
-    files = sorted(glob.glob("assets/quran/s[0-9][0-9][0-9].json"))
-    if not files:
-        raise SystemExit("no assets/quran/s*.json files found")
-
-    compared = 0
-    identical = 0
-    differing = 0
-    missing_tanzil = 0
-    missing_ar = 0
-    extra_in_ar: Counter[str] = Counter()
-    extra_in_tz: Counter[str] = Counter()
-    pattern_counts: Counter[tuple[str, str]] = Counter()
-    pattern_example: dict[tuple[str, str], tuple[str, str, str]] = {}
-    letter_count_diff: list[str] = []
-    letter_count_diff_core: list[str] = []
-
-    for path in files:
-        verses = load_verses(path)
-        for v in verses:
-            s = int(v["s"])
-            a = int(v["a"])
-            ar = v["ar"]
-            key = (s, a)
-            if key not in tanzil:
-                missing_tanzil += 1
-                continue
-            tz = tanzil[key]
-            compared += 1
-            if ar == tz:
-                identical += 1
-                continue
-            differing += 1
-            vk = f"{s}:{a}"
-            for c in set(ar) - set(tz):
-                extra_in_ar[c] += ar.count(c)
-            for c in set(tz) - set(ar):
-                extra_in_tz[c] += tz.count(c)
-            if len(strip_combining(ar)) != len(strip_combining(tz)):
-                letter_count_diff.append(vk)
-            ar_core = strip_combining(strip_layout_signs(ar))
-            tz_core = strip_combining(strip_layout_signs(tz))
-            if len(ar_core) != len(tz_core):
-                letter_count_diff_core.append(vk)
-            diffs = local_diffs(ar, tz)
-            for ar_part, tz_part in diffs:
-                pk = (ar_part, tz_part)
-                pattern_counts[pk] += 1
-                if pk not in pattern_example:
-                    mi = first_mismatch_index(ar, tz)
-                    pattern_example[pk] = (
-                        vk,
-                        snippet(ar, mi),
-                        snippet(tz, mi),
-                    )
-
-    json_keys = set()
-    for path in files:
-        for v in load_verses(path):
-            json_keys.add((int(v["s"]), int(v["a"])))
-    missing_ar = sum(1 for k in tanzil if k not in json_keys)
-
-    print("Tanzil vs JSON ar (raw codepoints, no NFC/fold)")
-    print(f"Tanzil URL: {TANZIL_URL}")
-    print(f"Downloaded: {TANZIL_DOWNLOADED}")
-    print(f"Local: {tanzil_path}")
-    print(f"JSON files: {len(files)}")
-    print(f"Tanzil verses: {len(tanzil)}")
-    print(f"verses compared: {compared}")
-    print(f"identical: {identical}")
-    print(f"differing: {differing}")
-    print(f"JSON verses with no Tanzil row: {missing_tanzil}")
-    print(f"Tanzil rows with no JSON verse: {missing_ar}")
-
-    print("\ncodepoints in ar not in Tanzil that verse:")
-    for c, n in extra_in_ar.most_common():
-        print(f"  U+{ord(c):04X} {cp_name(c)} x{n}")
-    if not extra_in_ar:
-        print("  (none)")
-
-    print("\ncodepoints in Tanzil not in ar that verse:")
-    for c, n in extra_in_tz.most_common():
-        print(f"  U+{ord(c):04X} {cp_name(c)} x{n}")
-    if not extra_in_tz:
-        print("  (none)")
-
-    print("\n10 most frequent difference patterns:")
-    for i, ((ar_part, tz_part), n) in enumerate(pattern_counts.most_common(10), 1):
-        vk, ar_snip, tz_snip = pattern_example[(ar_part, tz_part)]
-        kind = classify(ar_part, tz_part)
-        label = {"A": "encoding variant", "B": "different-meaning mark 06DF/06E0", "C": "letter added/missing"}[kind]
-        print(f"  {i}. x{n} class {kind} ({label})")
-        print(f"     verse_key: {vk}")
-        print(f"     ar_substr: {ar_part!r}  [{cps(ar_part)}]")
-        print(f"     tz_substr: {tz_part!r}  [{cps(tz_part)}]")
-        print(f"     ar snippet: {ar_snip}")
-        print(f"     tz snippet: {tz_snip}")
-
-    print(
-        "\nverses where letter count differs after removing combining marks "
-        f"(serious): {len(letter_count_diff)}"
-    )
-    if letter_count_diff:
-        show = letter_count_diff[:40]
-        print("  examples:", ", ".join(show))
-        if len(letter_count_diff) > 40:
-            print(f"  ... +{len(letter_count_diff) - 40} more")
-    print(
-        "after also removing tatweel U+0640 and pause/sajdah/hizb signs "
-        f"(core letter count): {len(letter_count_diff_core)}"
+    parser = argparse.ArgumentParser()
+    parser.add_argument("tanzil", nargs="?", default=DEFAULT_TANZIL_PATH)
+    parser.add_argument("--sha256", default=TANZIL_SHA256)
+    parser.add_argument("--url", default=TANZIL_URL)
+    parser.add_argument(
+        "--require-pin",
+        action="store_true",
+        help="fail instead of warning when no SHA-256 is pinned for the Tanzil file",
     )
-    if letter_count_diff_core:
-        show = letter_count_diff_core[:40]
-        print("  examples:", ", ".join(show))
-        if len(letter_count_diff_core) > 40:
-            print(f"  ... +{len(letter_count_diff_core) - 40} more")
+    trace_spans.add_argument(parser)
+    args = parser.parse_args()
+    trace_spans.start(args.trace)
+    sys.stdout.reconfigure(encoding="utf-8")
+    tanzil_path = args.tanzil
+    with span("fetch", path=tanzil_path):
+        ensure_tanzil(tanzil_path, args.sha256, args.url, args.require_pin)
+    with span("decode", path=tanzil_path):
+        tanzil = load_tanzil(tanzil_path)
+    diff = TanzilDiff(tanzil, tanzil_path)
+    with span("load"):
+        store = VerseStore.from_shards()
+    with span("diff"):
+        scan(store, [diff])
+    with span("report"):
+        print("\n".join(diff.report()))
 
 
 if __name__ == "__main__":
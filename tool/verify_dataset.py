@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Content fingerprints for the generated dataset, and the drift check.
+
+generate_quran_json.py records, under "fingerprint" in manifest_multi.json,
+the SHA-256 and byte size of every file it writes plus a Merkle root over
+them. The manifest itself is covered by hashing its bytes as written with
+"fingerprint" left out, so one root hash changes whenever any file does and
+the per-file hashes say which shards to re-import.
+
+This script re-hashes a dataset directory in parallel (mmap per file,
+hashlib releases the GIL on large buffers) and reports drift: changed,
+missing and untracked files, and whether the root still matches.
+
+Usage:
+  python tool/verify_dataset.py
+  python tool/verify_dataset.py --dir data/bundled/quran --jobs 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import sys
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+
+from quran_corpus import DEFAULT_DIR
+
+MANIFEST = "manifest_multi.json"
+ALGORITHM = "sha256"
+
+
+def encode_json(data: object) -> bytes:
+    """The bytes generate_quran_json.py writes for one JSON output."""
+    return (json.dumps(data, ensure_ascii=False, indent=2) + "\n").encode("utf-8")
+
+
+def file_entry(data: bytes) -> dict:
+    return {"sha256": hashlib.sha256(data).hexdigest(), "size": len(data)}
+
+
+def manifest_entry(manifest: Mapping) -> dict:
+    """Entry for the manifest itself: its bytes without the fingerprint."""
+    body = {k: v for k, v in manifest.items() if k != "fingerprint"}
+    return file_entry(encode_json(body))
+
+
+def manifest_file_entry(raw: bytes, manifest: Mapping) -> dict:
+    """Entry for manifest bytes on disk: the file with its self-entry cut out.
+
+    The fingerprint is the manifest's last member. Cutting it from a file
+    encode_json wrote leaves exactly the bytes manifest_entry hashes; any
+    other file, even one differing only in whitespace or key order, hashes
+    differently and shows up as drift.
+    """
+    fp = json.dumps(manifest.get("fingerprint"), ensure_ascii=False, indent=2)
+    member = (',\n  "fingerprint": ' + fp.replace("\n", "\n  ") + "\n}\n").encode("utf-8")
+    if raw.endswith(member):
+        return file_entry(raw[: -len(member)] + b"\n}\n")
+    return file_entry(raw)
+
+
+def merkle_root(files: Mapping[str, Mapping]) -> str:
+    """Binary Merkle tree over (name, sha256) leaves sorted by name."""
+    level = [
+        hashlib.sha256(
+            b"\x00" + name.encode("utf-8") + b"\x00" + bytes.fromhex(files[name]["sha256"])
+        ).digest()
+        for name in sorted(files)
+    ]
+    if not level:
+        return hashlib.sha256(b"").hexdigest()
+    while len(level) > 1:
+        paired = [
+            hashlib.sha256(b"\x01" + level[i] + level[i + 1]).digest()
+            for i in range(0, len(level) - 1, 2)
+        ]
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+    return level[0].hex()
+
+
+def fingerprint(files: Mapping[str, dict], manifest: Mapping) -> dict:
+    """The manifest "fingerprint" entry for files written next to it."""
+    entries = dict(files)
+    entries[MANIFEST] = manifest_entry(manifest)
+    entries = {name: entries[name] for name in sorted(entries)}
+    return {"algorithm": ALGORITHM, "root": merkle_root(entries), "files": entries}
+
+
+def hash_path(path: str) -> dict:
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return file_entry(b"")
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            return {"sha256": hashlib.sha256(view).hexdigest(), "size": size}
+
+
+def verify(root: str, jobs: int | None = None) -> tuple[list[str], str | None]:
+    """Drift lines (empty when the directory matches) and the recomputed root."""
+    path = os.path.join(root, MANIFEST)
+    if not os.path.isfile(path):
+        return [f"missing {path}"], None
+    with open(path, "rb") as f:
+        raw = f.read()
+    manifest = json.loads(raw)
+    recorded = manifest.get("fingerprint")
+    if not isinstance(recorded, dict) or recorded.get("algorithm") != ALGORITHM:
+        return [f"{path} has no {ALGORITHM} fingerprint"], None
+    expected: dict[str, dict] = recorded["files"]
+
+    names = [name for name in expected if name != MANIFEST]
+    present = [name for name in names if os.path.isfile(os.path.join(root, name))]
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        paths = (os.path.join(root, name) for name in present)
+        actual = dict(zip(present, pool.map(hash_path, paths)))
+    actual[MANIFEST] = manifest_file_entry(raw, manifest)
+
+    drift: list[str] = []
+    for name in sorted(expected):
+        got = actual.get(name)
+        want = expected[name]
+        if got is None:
+            drift.append(f"missing  {name}")
+        elif got != want:
+            drift.append(
+                f"changed  {name}: {want['size']} -> {got['size']} bytes, "
+                f"sha256 {want['sha256'][:12]} -> {got['sha256'][:12]}"
+            )
+    tracked_dirs = {os.path.dirname(name) for name in expected}
+    for folder in sorted(tracked_dirs):
+        directory = os.path.join(root, folder) if folder else root
+        if not os.path.isdir(directory):
+            continue
+        # Any regular file, not just JSON: word_index.bin and friends too.
+        for entry in sorted(os.listdir(directory)):
+            name = f"{folder}/{entry}" if folder else entry
+            if name not in expected and os.path.isfile(os.path.join(directory, entry)):
+                drift.append(f"untracked {name}")
+    root_hash = merkle_root(actual) if len(actual) == len(expected) else None
+    if root_hash is not None and root_hash != recorded.get("root") and not drift:
+        drift.append(f"root {recorded.get('root')} does not match the recorded files")
+    return drift, root_hash
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", default=DEFAULT_DIR)
+    parser.add_argument("--jobs", type=int, default=None, help="hashing threads")
+    args = parser.parse_args()
+    drift, root_hash = verify(args.dir, args.jobs)
+    for line in drift:
+        print(line)
+    if drift:
+        print(f"{len(drift)} files drifted from {args.dir}/{MANIFEST}", file=sys.stderr)
+        return 1
+    print(f"ok: root {root_hash}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""Per-language verse shards: Arabic and metadata apart from translations.
+
+Layout written by generate_quran_json.py --layout split:
+
+  ar/s001.json .. ar/s114.json        JSON array of {s, a, ar, m}
+  tr/<code>/s001.json .. s114.json    JSON array of translation strings,
+                                      one per verse of ar/sNNN.json
+
+with one tr/<code>/ set per TRANSLATION_META code, all listed under
+"shards" in manifest_multi.json. ShardLoader reads the Arabic set plus only
+the languages asked for and returns verses in the combined {s, a, ar, tr, m}
+shape, so a reader that shows Indonesian never parses en/zh/ja.
+
+--report compares bytes parsed and resident memory (tracemalloc) for a
+single-language reader against the combined sNNN.json layout.
+
+Usage:
+  python tool/verse_shards.py --report
+  python tool/verse_shards.py --report --dir assets/quran --language id
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import tempfile
+import tracemalloc
+from collections.abc import Iterable, Iterator, Sequence
+
+from quran_corpus import DEFAULT_DIR, SURAH_COUNT, Corpus
+
+MANIFEST = "manifest_multi.json"
+ARABIC_PATTERN = "ar/s{surah:03d}.json"
+TRANSLATION_PATTERN = "tr/{code}/s{surah:03d}.json"
+
+
+def shard_manifest(codes: Sequence[str]) -> dict:
+    """The manifest "shards" entry for a split layout with these languages."""
+    return {
+        "layout": "split",
+        "arabic": ARABIC_PATTERN,
+        "translations": {
+            code: TRANSLATION_PATTERN.replace("{code}", code) for code in codes
+        },
+    }
+
+
+def split_outputs(
+    by_surah: dict[int, list[dict]], codes: Sequence[str]
+) -> dict[str, object]:
+    """Relative path -> JSON data for the split layout of a combined corpus."""
+    out: dict[str, object] = {}
+    for chapter, verses in sorted(by_surah.items()):
+        out[ARABIC_PATTERN.format(surah=chapter)] = [
+            {"s": v["s"], "a": v["a"], "ar": v["ar"], "m": v["m"]} for v in verses
+        ]
+        for code in codes:
+            path = TRANSLATION_PATTERN.format(code=code, surah=chapter)
+            out[path] = [v["tr"][code] for v in verses]
+    return out
+
+
+class ShardLoader:
+    """Reads a split layout, parsing only the requested translation sets."""
+
+    def __init__(self, root: str = DEFAULT_DIR) -> None:
+        self.root = root
+        path = os.path.join(root, MANIFEST)
+        shards = None
+        if os.path.isfile(path):
+            with open(path, encoding="utf-8") as f:
+                shards = json.load(f).get("shards")
+        if not isinstance(shards, dict) or shards.get("layout") != "split":
+            raise SystemExit(f"{root}: {MANIFEST} does not describe a split layout")
+        self.arabic: str = shards["arabic"]
+        self.translations: dict[str, str] = dict(shards["translations"])
+        self.bytes_read = 0
+
+    def _load(self, relpath: str) -> list:
+        with open(os.path.join(self.root, relpath), "rb") as f:
+            raw = f.read()
+        self.bytes_read += len(raw)
+        return json.loads(raw)
+
+    def surah(self, chapter: int, languages: Iterable[str] = ()) -> list[dict]:
+        verses = self._load(self.arabic.format(surah=chapter))
+        for v in verses:
+            v["tr"] = {}
+        for code in languages:
+            pattern = self.translations.get(code)
+            if pattern is None:
+                raise KeyError(f"no {code!r} translation shards in {self.root}")
+            texts = self._load(pattern.format(surah=chapter))
+            if len(texts) != len(verses):
+                raise ValueError(
+                    f"{pattern.format(surah=chapter)}: {len(texts)} texts "
+                    f"for {len(verses)} verses"
+                )
+            for v, text in zip(verses, texts):
+                v["tr"][code] = text
+        return verses
+
+    def verses(self, languages: Iterable[str] = ()) -> Iterator[dict]:
+        languages = tuple(languages)
+        for chapter in range(1, SURAH_COUNT + 1):
+            yield from self.surah(chapter, languages)
+
+
+def write_split(by_surah: dict[int, list[dict]], codes: Sequence[str], root: str) -> None:
+    for relpath, data in split_outputs(by_surah, codes).items():
+        path = os.path.join(root, relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.write("\n")
+    with open(os.path.join(root, MANIFEST), "w", encoding="utf-8") as f:
+        json.dump({"shards": shard_manifest(codes)}, f, indent=2)
+
+
+def _measure(load) -> tuple[int, int, int]:
+    """(bytes parsed, resident bytes of the result, peak bytes while loading)."""
+    gc.collect()
+    tracemalloc.start()
+    parsed, result = load()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return parsed, current, peak
+
+
+def report(root: str, language: str) -> list[str]:
+    corpus = Corpus(root)
+    by_surah: dict[int, list[dict]] = {}
+    for _, verse in corpus:
+        by_surah.setdefault(verse["s"], []).append(verse)
+    codes = sorted({code for verses in by_surah.values() for v in verses for code in v["tr"]})
+    if language not in codes:
+        raise SystemExit(f"no {language!r} translations in {root}; have {codes}")
+    paths = corpus.paths
+    del corpus
+
+    def combined():
+        verses = []
+        parsed = 0
+        for path in paths:
+            with open(path, "rb") as f:
+                raw = f.read()
+            parsed += len(raw)
+            verses.extend(json.loads(raw))
+        return parsed, verses
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_split(by_surah, codes, tmp)
+        del by_surah
+
+        def split():
+            loader = ShardLoader(tmp)
+            verses = list(loader.verses([language]))
+            return loader.bytes_read, verses
+
+        rows = [
+            ("combined sNNN.json", _measure(combined)),
+            (f"split ar + tr/{language}", _measure(split)),
+        ]
+
+    base = rows[0][1]
+    out = [f"{'layout':<24} {'parsed':>10} {'resident':>10} {'peak':>10}"]
+    for name, (parsed, current, peak) in rows:
+        out.append(
+            f"{name:<24} {parsed / 1e6:8.2f}MB {current / 1e6:8.2f}MB {peak / 1e6:8.2f}MB"
+        )
+    parsed, current, _ = rows[1][1]
+    out.append(
+        f"single-language reader: {parsed / base[0]:.0%} of bytes parsed, "
+        f"{current / base[1]:.0%} of resident memory"
+    )
+    return out
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", default=DEFAULT_DIR, help="combined sNNN.json corpus")
+    parser.add_argument("--language", default="id")
+    parser.add_argument("--report", action="store_true")
+    args = parser.parse_args()
+    if args.report:
+        print("\n".join(report(args.dir, args.language)))
+        return 0
+    parser.print_help()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
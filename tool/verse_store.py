@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""Columnar in-memory verse corpus for the tooling.
+
+VerseStore keeps s, a and the m.juz/page/hizb/ruku metadata in array('H')
+columns and each text field ("ar", "tj", "tr.en", ...) as an index column
+into one string pool per field, so equal strings are stored once and a
+verse costs a few bytes of columns instead of three dicts. Rows are
+__slots__ views that answer row["ar"], row.get("tj"), row["m"], ... like
+the verse dicts, so Analyzers take a store unchanged; store.build_indexes()
+reads the index columns directly.
+
+VerseStore.from_shards() decodes one sNNN.json at a time and keeps only
+the columns, and the store can stand in for quran_corpus.Corpus in scan().
+
+Usage:
+  python tool/verse_store.py --bench
+  python tool/verse_store.py --bench --scales 1,10
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import random
+import tracemalloc
+from array import array
+from collections.abc import Iterable, Iterator, Mapping
+
+from quran_corpus import DEFAULT_DIR, index_ranges, load_verses, shard_paths
+
+KEY_FIELDS = ("s", "a")
+META_FIELDS = ("juz", "page", "hizb", "ruku")
+INT_FIELDS = KEY_FIELDS + META_FIELDS
+
+
+class StringPool:
+    """Distinct strings of one text field; index 0 means "absent"."""
+
+    __slots__ = ("strings", "_ids")
+
+    def __init__(self) -> None:
+        self.strings: list[str | None] = [None]
+        self._ids: dict[str, int] | None = {}
+
+    def add(self, text: str) -> int:
+        ids = self._ids
+        if ids is None:
+            raise RuntimeError("pool is sealed")
+        i = ids.get(text)
+        if i is None:
+            i = ids[text] = len(self.strings)
+            self.strings.append(text)
+        return i
+
+    def seal(self) -> None:
+        self._ids = None
+
+    def __len__(self) -> int:
+        return len(self.strings) - 1
+
+
+class VerseRow(Mapping):
+    """Read-only view of one verse; a Mapping that answers like the verse dict."""
+
+    __slots__ = ("_store", "_i")
+
+    def __init__(self, store: VerseStore, i: int) -> None:
+        self._store = store
+        self._i = i
+
+    def get(self, key: str, default=None):
+        store = self._store
+        column = store.ints.get(key)
+        if column is not None:
+            return column[self._i] if key in KEY_FIELDS else default
+        if key == "m":
+            return store.meta(self._i) or default
+        if key == "tr":
+            return store.translations(self._i) or default
+        text = store.texts.get(key)
+        if text is None:
+            return default
+        pool, index = text
+        value = pool.strings[index[self._i]]
+        return default if value is None else value
+
+    def __getitem__(self, key: str):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and self.get(key, _MISSING) is not _MISSING
+
+    def __iter__(self) -> Iterator[str]:
+        """The keys to_dict() would have, in the same order."""
+        store, i = self._store, self._i
+        yield from KEY_FIELDS
+        translated = False
+        for field, (pool, index) in store.texts.items():
+            if pool.strings[index[i]] is None:
+                continue
+            if field.startswith("tr."):
+                translated = True
+            else:
+                yield field
+        if translated:
+            yield "tr"
+        if store.meta(i):
+            yield "m"
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> dict:
+        return self._store.to_dict(self._i)
+
+    def __repr__(self) -> str:
+        return f"VerseRow({self.to_dict()!r})"
+
+
+_MISSING = object()
+
+
+class VerseStore:
+    """Verses as columns: array('H') integers plus pooled text fields."""
+
+    def __init__(self) -> None:
+        self.ints: dict[str, array] = {name: array("H") for name in INT_FIELDS}
+        # field -> (pool, per-verse pool index)
+        self.texts: dict[str, tuple[StringPool, array]] = {}
+        self.root = ""
+        self.paths: list[str] = []
+        # verse offsets of each shard in self.paths; ends[-1] == len(self)
+        self.ends = array("I")
+
+    @classmethod
+    def from_shards(cls, root: str = DEFAULT_DIR) -> VerseStore:
+        store = cls()
+        store.root = root
+        paths = shard_paths(root)
+        if not paths:
+            raise SystemExit(f"no sNNN.json files found in {root}")
+        for path in paths:
+            store.extend(load_verses(path), source=path)
+        store.seal()
+        return store
+
+    @classmethod
+    def from_verses(cls, verses: Iterable[dict]) -> VerseStore:
+        store = cls()
+        store.extend(verses)
+        store.seal()
+        return store
+
+    def _text_column(self, field: str, n: int) -> tuple[StringPool, array]:
+        column = self.texts.get(field)
+        if column is None:
+            # Back-fill "absent" for the n verses added before this field appeared.
+            column = self.texts[field] = (StringPool(), array("I", bytes(4 * n)))
+        return column
+
+    def append(self, verse: dict) -> None:
+        n = len(self)
+        ints = self.ints
+        ints["s"].append(verse["s"])
+        ints["a"].append(verse["a"])
+        meta = verse.get("m") or {}
+        for name in META_FIELDS:
+            ints[name].append(meta.get(name, 0))
+        for key, value in verse.items():
+            if isinstance(value, str):
+                pool, index = self._text_column(key, n)
+                index.append(pool.add(value))
+        for code, value in (verse.get("tr") or {}).items():
+            pool, index = self._text_column("tr." + code, n)
+            index.append(pool.add(value))
+        for _, index in self.texts.values():
+            if len(index) == n:
+                index.append(0)
+
+    def extend(self, verses: Iterable[dict], source: str = "") -> None:
+        for verse in verses:
+            self.append(verse)
+        self.paths.append(source)
+        self.ends.append(len(self))
+
+    def seal(self) -> None:
+        """Drop the string -> id maps once loading is done."""
+        for pool, _ in self.texts.values():
+            pool.seal()
+
+    def __len__(self) -> int:
+        return len(self.ints["s"])
+
+    def __getitem__(self, i: int) -> VerseRow:
+        if not -len(self) <= i < len(self):
+            raise IndexError(i)
+        return VerseRow(self, i % len(self))
+
+    def rows(self) -> Iterator[VerseRow]:
+        for i in range(len(self)):
+            yield VerseRow(self, i)
+
+    def __iter__(self) -> Iterator[tuple[str, VerseRow]]:
+        """(shard path, row) pairs, like quran_corpus.Corpus."""
+        start = 0
+        for path, end in zip(self.paths, self.ends):
+            for i in range(start, end):
+                yield path, VerseRow(self, i)
+            start = end
+
+    def verse_count(self) -> int:
+        return len(self)
+
+    def shard_length(self, k: int) -> int:
+        return self.ends[k] - (self.ends[k - 1] if k else 0)
+
+    def column(self, field: str) -> list[str | None]:
+        """Every verse's value of a text field, None where absent."""
+        pool, index = self.texts[field]
+        strings = pool.strings
+        return [strings[i] for i in index]
+
+    def index_keys(self) -> Iterator[tuple[int, int, int, int]]:
+        """(s, a, juz, page) per verse, read straight from the columns."""
+        ints = self.ints
+        return zip(ints["s"], ints["a"], ints["juz"], ints["page"])
+
+    def build_indexes(self) -> tuple[dict, dict]:
+        """quran_corpus.build_indexes of the store, without the row views."""
+        return index_ranges(self.index_keys())
+
+    def meta(self, i: int) -> dict[str, int]:
+        return {name: self.ints[name][i] for name in META_FIELDS if self.ints[name][i]}
+
+    def translations(self, i: int) -> dict[str, str]:
+        out: dict[str, str] = {}
+        for field, (pool, index) in self.texts.items():
+            if field.startswith("tr."):
+                value = pool.strings[index[i]]
+                if value is not None:
+                    out[field[3:]] = value
+        return out
+
+    def to_dict(self, i: int) -> dict:
+        verse: dict = {"s": self.ints["s"][i], "a": self.ints["a"][i]}
+        for field, (pool, index) in self.texts.items():
+            value = pool.strings[index[i]]
+            if value is not None and not field.startswith("tr."):
+                verse[field] = value
+        translations = self.translations(i)
+        if translations:
+            verse["tr"] = translations
+        meta = self.meta(i)
+        if meta:
+            verse["m"] = meta
+        return verse
+
+
+def synthetic_verses(scale: int, seed: int = 11) -> Iterator[dict]:
+    """`scale` copies of a 6236-verse corpus with distinct strings per copy."""
+    from codepoint_stats import synthetic_pair
+    from quran_corpus import EXPECTED_AYAHS
+
+    rng = random.Random(seed)
+    base, _ = synthetic_pair(6236, seed)
+    words = "the of and to in Allah those who believe Lord day mercy guidance".split()
+    tr = [" ".join(rng.choice(words) for _ in range(rng.randint(8, 40))) for _ in base]
+    for copy in range(scale):
+        k = 0
+        for s, count in enumerate(EXPECTED_AYAHS, 1):
+            for a in range(1, count + 1):
+                tag = f" {copy}"
+                yield {
+                    "s": s,
+                    "a": a,
+                    "ar": base[k] + tag,
+                    "tr": {code: tr[k] + tag for code in ("en", "id", "zh", "ja")},
+                    "m": {"juz": k * 30 // 6236 + 1, "page": k * 604 // 6236 + 1,
+                          "hizb": k * 60 // 6236 + 1, "ruku": k // 12 + 1},
+                }
+                k += 1
+
+
+def _traced(build) -> tuple[int, int]:
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current, peak
+
+
+def bench(scales: Iterable[int]) -> None:
+    print(f"{'scale':>5} {'verses':>9} {'layout':<8} {'resident':>10} {'peak':>10} {'B/verse':>8}")
+    for scale in scales:
+        n = 6236 * scale
+        rows = [
+            ("dicts", _traced(lambda: list(synthetic_verses(scale)))),
+            ("store", _traced(lambda: VerseStore.from_verses(synthetic_verses(scale)))),
+        ]
+        for name, (current, peak) in rows:
+            print(
+                f"{scale:>4}x {n:>9} {name:<8} {current / 1e6:8.1f}MB "
+                f"{peak / 1e6:8.1f}MB {current / n:8.0f}"
+            )
+        print(f"      store is {rows[1][1][0] / rows[0][1][0]:.0%} of the dict representation")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--bench", action="store_true")
+    parser.add_argument("--scales", default="1,100")
+    args = parser.parse_args()
+    if args.bench:
+        bench(int(s) for s in args.scales.split(","))
+        return 0
+    parser.print_help()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""Word-level token index over the Uthmani `ar` text.
+
+Every verse's `ar` is tokenized once with quran_corpus.WORD_RE, so pause
+marks (U+06D6..U+06DC) and the U+06DE / U+06E9 signs are never words.
+The index stores, for word n of ayah ordinal k (quran_corpus.ayah_ordinal),
+its UTF-16 and UTF-8 offsets into `ar`, and a sorted table of normalized
+words (ArabicSearchNormalizer.normalizeForSearch) mapping each one to its
+(ordinal, word number) postings for exact-word search.
+
+Layout (little-endian):
+
+  header    magic "QWIX", u16 version, u32 ayahs, u32 words, u32 terms
+  starts    (ayahs + 1) x u32: index of the first word of each ordinal
+  words     words x (u16 utf16 start, u16 utf16 end, u16 utf8 start, u16 utf8 end)
+  terms     (terms + 1) x (u32 text offset, u32 postings offset)
+  text      normalized words, UTF-8, sorted by their bytes
+  postings  u16 ordinal, u16 word number (1-based), in reading order
+
+generate_quran_json.py --word-index writes it next to the verse shards;
+--bench compares word lookups and exact-word queries with tokenizing on
+the fly (synthetic verses unless --dir is given).
+
+Usage:
+  python tool/word_index.py
+  python tool/word_index.py --dir assets/quran --out build/word_index.bin
+  python tool/word_index.py --bench
+  python tool/generate_quran_json.py --word-index
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import re
+import statistics
+import struct
+import sys
+import time
+from array import array
+from collections.abc import Iterable, Mapping
+from typing import NamedTuple
+
+from dart_regex import DART_TRIM
+from quran_corpus import AYAH_TOTAL, DEFAULT_DIR, WORD_RE, Corpus, ayah_at, ayah_ordinal
+
+FILE_NAME = "word_index.bin"
+DEFAULT_OUT = os.path.join("build", FILE_NAME)
+MAGIC = b"QWIX"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHIII")
+_SPAN = struct.Struct("<HHHH")
+_TERM = struct.Struct("<II")
+_POSTING = struct.Struct("<HH")
+_U16_MAX = 0xFFFF
+
+# lib/core/utils/arabic_search_normalizer.dart
+_TAGS = re.compile(r"<[^>]+>")
+_TASHKEEL = re.compile("[\u064b-\u065f\u0670\u06d6-\u06ed]")
+_ALEF = re.compile("[\u0622\u0623\u0625\u0671]")
+
+
+def normalize_for_search(text: str) -> str:
+    """ArabicSearchNormalizer.normalizeForSearch, rule for rule."""
+    s = _TAGS.sub("", text)
+    s = _TASHKEEL.sub("", s)
+    s = s.replace("\u0640", "")  # tatweel
+    s = _ALEF.sub("\u0627", s)
+    s = s.replace("\u0649", "\u064a")  # alif maqsura -> yaa
+    s = s.replace("\u06df", "").replace("\u06dd", "")
+    return s.strip(DART_TRIM)
+
+
+class WordSpan(NamedTuple):
+    utf16_start: int
+    utf16_end: int
+    utf8_start: int
+    utf8_end: int
+
+
+def _utf16_len(text: str) -> int:
+    return len(text) + sum(1 for ch in text if ord(ch) > 0xFFFF)
+
+
+def tokenize(ar: str) -> list[tuple[str, WordSpan]]:
+    """Words of one verse with their UTF-16 and UTF-8 offsets."""
+    out: list[tuple[str, WordSpan]] = []
+    pos = u16 = u8 = 0
+    for match in WORD_RE.finditer(ar):
+        gap = ar[pos:match.start()]
+        u16 += _utf16_len(gap)
+        u8 += len(gap.encode("utf-8"))
+        word = match.group()
+        span = WordSpan(u16, u16 + _utf16_len(word), u8, u8 + len(word.encode("utf-8")))
+        out.append((word, span))
+        pos, u16, u8 = match.end(), span.utf16_end, span.utf8_end
+    return out
+
+
+def build_index(verses: Iterable[Mapping]) -> bytes:
+    """The index for all 6236 verses in reading order."""
+    starts = array("I", [0])
+    spans = bytearray()
+    postings: dict[str, list[tuple[int, int]]] = {}
+    k = -1
+    for k, verse in enumerate(verses):
+        if ayah_ordinal(verse["s"], verse["a"]) != k:
+            raise ValueError(f"{verse['s']}:{verse['a']} is not ayah number {k + 1}")
+        words = tokenize(verse.get("ar") or "")
+        if words and max(words[-1][1]) > _U16_MAX:
+            raise ValueError(f"{verse['s']}:{verse['a']}: ar is too long for 16-bit offsets")
+        for n, (word, span) in enumerate(words, 1):
+            spans += _SPAN.pack(*span)
+            term = normalize_for_search(word)
+            if term:
+                postings.setdefault(term, []).append((k, n))
+        starts.append(starts[-1] + len(words))
+    if k + 1 != AYAH_TOTAL:
+        raise ValueError(f"expected {AYAH_TOTAL} verses, got {k + 1}")
+
+    terms = sorted(postings, key=lambda t: t.encode("utf-8"))
+    table = bytearray()
+    text = bytearray()
+    body = bytearray()
+    for term in terms:
+        table += _TERM.pack(len(text), len(body) // _POSTING.size)
+        text += term.encode("utf-8")
+        for posting in postings[term]:
+            body += _POSTING.pack(*posting)
+    table += _TERM.pack(len(text), len(body) // _POSTING.size)
+    header = _HEADER.pack(MAGIC, VERSION, AYAH_TOTAL, starts[-1], len(terms))
+    if sys.byteorder == "big":
+        starts.byteswap()
+    return header + starts.tobytes() + bytes(spans) + bytes(table) + bytes(text) + bytes(body)
+
+
+class WordIndex:
+    """Reads a word_index.bin without decoding it up front."""
+
+    def __init__(self, data: bytes) -> None:
+        magic, version, ayahs, words, terms = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"not a version {VERSION} word index")
+        if ayahs != AYAH_TOTAL:
+            raise ValueError(f"word index has {ayahs} ayahs, expected {AYAH_TOTAL}")
+        self.data = memoryview(data)
+        self.word_total = words
+        self.term_total = terms
+        offset = _HEADER.size
+        self.starts = array("I")
+        self.starts.frombytes(data[offset:offset + 4 * (ayahs + 1)])
+        if sys.byteorder == "big":
+            self.starts.byteswap()
+        self._spans = offset + 4 * (ayahs + 1)
+        self._terms = self._spans + _SPAN.size * words
+        self._text = self._terms + _TERM.size * (terms + 1)
+        self._postings = self._text + self._term(terms)[0]
+        end = self._postings + _POSTING.size * self._term(terms)[1]
+        if end != len(data):
+            raise ValueError(f"word index is {len(data)} bytes, expected {end}")
+
+    @classmethod
+    def load(cls, path: str) -> WordIndex:
+        with open(path, "rb") as f:
+            return cls(f.read())
+
+    def _term(self, i: int) -> tuple[int, int]:
+        return _TERM.unpack_from(self.data, self._terms + _TERM.size * i)
+
+    def _term_text(self, i: int) -> bytes:
+        start, end = self._term(i)[0], self._term(i + 1)[0]
+        return bytes(self.data[self._text + start:self._text + end])
+
+    def count(self, surah: int, ayah: int) -> int:
+        """Number of words in surah:ayah."""
+        k = ayah_ordinal(surah, ayah)
+        return self.starts[k + 1] - self.starts[k]
+
+    def word(self, surah: int, ayah: int, n: int) -> WordSpan:
+        """Offsets of word n (1-based) of surah:ayah."""
+        k = ayah_ordinal(surah, ayah)
+        first, end = self.starts[k], self.starts[k + 1]
+        if not 1 <= n <= end - first:
+            raise ValueError(f"{surah}:{ayah} has no word {n}")
+        return WordSpan(*_SPAN.unpack_from(self.data, self._spans + _SPAN.size * (first + n - 1)))
+
+    def words(self, surah: int, ayah: int) -> list[WordSpan]:
+        k = ayah_ordinal(surah, ayah)
+        first, end = self.starts[k], self.starts[k + 1]
+        return [
+            WordSpan(*_SPAN.unpack_from(self.data, self._spans + _SPAN.size * i))
+            for i in range(first, end)
+        ]
+
+    def terms(self) -> list[str]:
+        return [self._term_text(i).decode("utf-8") for i in range(self.term_total)]
+
+    def find(self, query: str) -> list[tuple[int, int, int]]:
+        """(surah, ayah, word number) of every word equal to `query` once normalized."""
+        key = normalize_for_search(query).encode("utf-8")
+        lo, hi = 0, self.term_total
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term_text(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == self.term_total or self._term_text(lo) != key:
+            return []
+        first, end = self._term(lo)[1], self._term(lo + 1)[1]
+        out = []
+        for i in range(first, end):
+            k, n = _POSTING.unpack_from(self.data, self._postings + _POSTING.size * i)
+            out.append((*ayah_at(k), n))
+        return out
+
+
+def bench(verses: list[dict], index: WordIndex, count: int = 2000, seed: int = 3) -> list[str]:
+    """Word lookups and exact-word queries: index versus tokenizing `ar`."""
+    rng = random.Random(seed)
+    lookups = []
+    while len(lookups) < count:
+        verse = rng.choice(verses)
+        n = index.count(verse["s"], verse["a"])
+        if n:
+            lookups.append((verse, rng.randint(1, n)))
+    words = [w for v in rng.sample(verses, 50) for w, _ in tokenize(v["ar"])]
+    queries = [rng.choice(words) for _ in range(20)]
+
+    def timed(fn, args) -> list[float]:
+        times = []
+        for arg in args:
+            t0 = time.perf_counter()
+            fn(*arg)
+            times.append(time.perf_counter() - t0)
+        return times
+
+    def scan(query: str) -> list[tuple[int, int, int]]:
+        key = normalize_for_search(query)
+        return [
+            (v["s"], v["a"], n)
+            for v in verses
+            for n, (word, _) in enumerate(tokenize(v["ar"]), 1)
+            if normalize_for_search(word) == key
+        ]
+
+    def line(label: str, times: list[float]) -> str:
+        q = statistics.quantiles(times, n=100)
+        return f"  {label:<18} p50 {q[49] * 1e6:10.1f}us  p95 {q[94] * 1e6:10.1f}us"
+
+    return [
+        f"{len(verses)} verses, {index.word_total:,} words, {index.term_total:,} distinct normalized words",
+        line("word: tokenize", timed(lambda v, n: tokenize(v["ar"])[n - 1][1], lookups)),
+        line("word: index", timed(lambda v, n: index.word(v["s"], v["a"], n), lookups)),
+        line("find: scan", timed(scan, [(q,) for q in queries])),
+        line("find: index", timed(index.find, [(q,) for q in queries])),
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dir", help=f"verse shards (default {DEFAULT_DIR})")
+    parser.add_argument("--out", default=DEFAULT_OUT)
+    parser.add_argument("--bench", action="store_true", help="time lookups against on-the-fly tokenizing")
+    args = parser.parse_args()
+
+    if args.bench and not args.dir:
+        from verse_store import synthetic_verses
+
+        verses = list(synthetic_verses(1))
+    else:
+        verses = [v for _, v in Corpus(args.dir or DEFAULT_DIR)]
+    data = build_index(verses)
+    index = WordIndex(data)
+    if args.bench:
+        print("\n".join(bench(verses, index)))
+        return 0
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "wb") as f:
+        f.write(data)
+    print(f"{index.word_total:,} words, {index.term_total:,} distinct, {len(data):,} B -> {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,592 @@
+#!/usr/bin/env python3
+"""Xcode project.pbxproj (OpenStep plist) parser, editor and serializer.
+
+loads() parses the whole file into dicts, lists and strings in one pass;
+Project.dumps() writes it back in Xcode's layout (objects grouped into
+sorted isa sections, PBXBuildFile and PBXFileReference on one line,
+/* comments */ derived from the object graph the way Xcode derives them).
+An unedited project round-trips byte for byte.
+
+Edits are data: AddObject, InsertRef and SetValue each know how to apply
+themselves and whether they hold, so apply() is idempotent and verify()
+can confirm every intended edit landed and every reference resolves
+before anything is written. extension_edits() builds the edits for an
+app extension target embedded in a host app; see
+patch_ios_widget_pbxproj.py.
+
+Usage:
+  python tools/pbxproj.py ios/Runner.xcodeproj/project.pbxproj
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import hashlib
+import os
+import re
+from collections.abc import Iterator, Mapping, Sequence
+from typing import NamedTuple, Union
+
+Value = Union[str, list, dict]
+
+HEADER = "// !$*UTF8*$!\n"
+# Objects Xcode writes on a single line.
+INLINE_ISA = frozenset({"PBXBuildFile", "PBXFileReference"})
+PHASE_NAMES = {
+    "PBXSourcesBuildPhase": "Sources",
+    "PBXFrameworksBuildPhase": "Frameworks",
+    "PBXResourcesBuildPhase": "Resources",
+    "PBXHeadersBuildPhase": "Headers",
+    "PBXCopyFilesBuildPhase": "CopyFiles",
+    "PBXShellScriptBuildPhase": "ShellScript",
+}
+# Attributes holding one object id, and lists of object ids.
+REF_KEYS = frozenset({
+    "baseConfigurationReference", "buildConfigurationList", "containerPortal", "fileRef",
+    "mainGroup", "package", "productRef", "productRefGroup", "productReference",
+    "remoteGlobalIDString", "target", "targetProxy",
+})
+REF_LISTS = frozenset({
+    "buildConfigurations", "buildPhases", "children", "dependencies", "files",
+    "packageProductDependencies", "packageReferences", "targets",
+})
+# Id-valued attributes Xcode writes without a comment.
+PLAIN_KEYS = frozenset({"remoteGlobalIDString", "TestTargetID"})
+FILE_TYPES = {
+    ".swift": "sourcecode.swift",
+    ".h": "sourcecode.c.h",
+    ".m": "sourcecode.c.objc",
+    ".plist": "text.plist.xml",
+    ".strings": "text.plist.strings",
+    ".entitlements": "text.plist.entitlements",
+    ".xcassets": "folder.assetcatalog",
+    ".intentdefinition": "file.intentdefinition",
+    ".framework": "wrapper.framework",
+}
+
+_TOKEN = re.compile(
+    r'\s+|//[^\n]*|/\*.*?\*/'
+    r'|(?P<quoted>"(?:[^"\\]|\\.)*")'
+    r'|(?P<bare>(?:[^\s{}()=;,"/]|/(?![/*]))+)'
+    r'|(?P<punct>[{}()=;,])',
+    re.S,
+)
+_BARE = re.compile(r"[A-Za-z0-9_$./]+")
+_ESCAPE = re.compile(r"\\(U[0-9A-Fa-f]{4}|.)", re.S)
+_UNESCAPE = {"n": "\n", "t": "\t", "r": "\r"}
+
+
+class PbxprojError(ValueError):
+    pass
+
+
+def _tokens(text: str) -> Iterator[tuple[str, str, int]]:
+    pos = 0
+    while pos < len(text):
+        match = _TOKEN.match(text, pos)
+        if match is None:
+            raise PbxprojError(f"unexpected {text[pos:pos + 20]!r} at offset {pos}")
+        pos = match.end()
+        kind = match.lastgroup
+        if kind == "quoted":
+            raw = match.group(kind)[1:-1]
+            yield "str", _ESCAPE.sub(_unescape, raw), match.start()
+        elif kind == "bare":
+            yield "str", match.group(kind), match.start()
+        elif kind == "punct":
+            yield match.group(kind), match.group(kind), match.start()
+
+
+def _unescape(match: re.Match) -> str:
+    code = match.group(1)
+    if code[0] == "U" and len(code) == 5:
+        return chr(int(code[1:], 16))
+    return _UNESCAPE.get(code, code)
+
+
+class _Parser:
+    def __init__(self, text: str) -> None:
+        self.tokens = _tokens(text)
+        self.kind, self.text, self.pos = next(self.tokens, ("eof", "", len(text)))
+
+    def _next(self) -> None:
+        self.kind, self.text, self.pos = next(self.tokens, ("eof", "", self.pos))
+
+    def _expect(self, kind: str) -> None:
+        if self.kind != kind:
+            raise PbxprojError(f"expected {kind!r}, found {self.text!r} at offset {self.pos}")
+        self._next()
+
+    def value(self) -> Value:
+        if self.kind == "str":
+            out = self.text
+            self._next()
+            return out
+        if self.kind == "{":
+            self._next()
+            out: dict = {}
+            while self.kind != "}":
+                if self.kind != "str":
+                    raise PbxprojError(f"expected a key, found {self.text!r} at offset {self.pos}")
+                key = self.text
+                self._next()
+                self._expect("=")
+                out[key] = self.value()
+                self._expect(";")
+            self._next()
+            return out
+        if self.kind == "(":
+            self._next()
+            items: list = []
+            while self.kind != ")":
+                items.append(self.value())
+                if self.kind != ")":
+                    self._expect(",")
+            self._next()
+            return items
+        raise PbxprojError(f"unexpected {self.text!r} at offset {self.pos}")
+
+
+def loads(text: str, name: str = "Project") -> Project:
+    """Parse project.pbxproj text; `name` is the .xcodeproj name Xcode shows."""
+    parser = _Parser(text)
+    data = parser.value()
+    if parser.kind != "eof":
+        raise PbxprojError(f"trailing {parser.text!r} at offset {parser.pos}")
+    if not isinstance(data, dict) or not isinstance(data.get("objects"), dict):
+        raise PbxprojError("not a project.pbxproj: no objects dictionary")
+    return Project(data, name)
+
+
+def _quote(text: str) -> str:
+    if _BARE.fullmatch(text) and "//" not in text:
+        return text
+    escaped = text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n").replace("\t", "\\t")
+    return f'"{escaped}"'
+
+
+def object_id(*parts: str) -> str:
+    """A stable 24-digit object id, so re-running an edit picks the same ids."""
+    return hashlib.sha1("\0".join(parts).encode("utf-8")).hexdigest()[:24].upper()
+
+
+class Project:
+    def __init__(self, data: dict, name: str = "Project") -> None:
+        self.data = data
+        self.name = name
+
+    @classmethod
+    def load(cls, path: str) -> Project:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        bundle = os.path.basename(os.path.dirname(os.path.abspath(path)))
+        return loads(text, os.path.splitext(bundle)[0])
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.dumps())
+
+    @property
+    def objects(self) -> dict[str, dict]:
+        return self.data["objects"]
+
+    @property
+    def root_id(self) -> str:
+        return self.data["rootObject"]
+
+    @property
+    def root(self) -> dict:
+        return self.objects[self.root_id]
+
+    def ids(self, isa: str) -> list[str]:
+        return [oid for oid, obj in self.objects.items() if obj.get("isa") == isa]
+
+    def target(self, name: str) -> str:
+        for oid in self.root.get("targets", []):
+            if self.objects[oid].get("name") == name:
+                return oid
+        raise PbxprojError(f"no target named {name!r}")
+
+    def child(self, group: str, name: str) -> str | None:
+        """Child of a group whose path or name is `name`."""
+        for oid in self.objects[group].get("children", []):
+            obj = self.objects.get(oid, {})
+            if name in (obj.get("path"), obj.get("name")):
+                return oid
+        return None
+
+    def _phases(self) -> dict[str, str]:
+        """Build file id -> comment of the phase that lists it."""
+        out: dict[str, str] = {}
+        for oid, obj in self.objects.items():
+            if obj.get("isa") in PHASE_NAMES:
+                for build_file in obj.get("files", []):
+                    out.setdefault(build_file, self.comment(oid))
+        return out
+
+    def comment(self, oid: str, phases: Mapping[str, str] | None = None) -> str | None:
+        """The /* comment */ Xcode writes after an object id."""
+        obj = self.objects.get(oid)
+        if obj is None:
+            return None
+        isa = obj.get("isa", "")
+        if isa == "PBXProject":
+            return "Project object"
+        if isa in PHASE_NAMES:
+            return obj.get("name") or PHASE_NAMES[isa]
+        if isa == "PBXBuildFile":
+            phases = self._phases() if phases is None else phases
+            ref = obj.get("fileRef") or obj.get("productRef")
+            return f"{self.comment(ref) if ref else None} in {phases.get(oid, 'Unknown')}"
+        if isa == "XCConfigurationList":
+            for owner_id, owner in self.objects.items():
+                if owner.get("buildConfigurationList") == oid:
+                    owner_name = self.name if owner["isa"] == "PBXProject" else owner.get("name")
+                    return f'Build configuration list for {owner["isa"]} "{owner_name}"'
+            return None
+        if isa in ("PBXContainerItemProxy", "PBXTargetDependency"):
+            return isa
+        if isa == "XCRemoteSwiftPackageReference":
+            repo = os.path.basename(obj.get("repositoryURL", "")).removesuffix(".git")
+            return f'{isa} "{repo}"'
+        if isa == "XCSwiftPackageProductDependency":
+            return obj.get("productName")
+        return obj.get("name") or obj.get("path")
+
+    def dumps(self) -> str:
+        phases = self._phases()
+        comments = {oid: self.comment(oid, phases) for oid in self.objects}
+
+        def ref(text: str, key: str | None) -> str:
+            quoted = _quote(text)
+            note = comments.get(text) if key not in PLAIN_KEYS else None
+            return f"{quoted} /* {note} */" if note is not None else quoted
+
+        def inline(value: Value, key: str | None) -> str:
+            if isinstance(value, str):
+                return ref(value, key)
+            if isinstance(value, list):
+                return "(" + "".join(f"{inline(v, key)}, " for v in value) + ")"
+            return "{" + "".join(f"{_quote(k)} = {inline(v, k)}; " for k, v in value.items()) + "}"
+
+        def block(value: Value, depth: int, key: str | None) -> str:
+            if isinstance(value, str):
+                return ref(value, key)
+            pad = "\t" * (depth + 1)
+            if isinstance(value, list):
+                body = "".join(f"{pad}{block(v, depth + 1, key)},\n" for v in value)
+                return "(\n" + body + "\t" * depth + ")"
+            body = "".join(f"{pad}{_quote(k)} = {block(v, depth + 1, k)};\n" for k, v in value.items())
+            return "{\n" + body + "\t" * depth + "}"
+
+        def objects() -> str:
+            sections: dict[str, list[str]] = {}
+            for oid, obj in self.objects.items():
+                isa = obj.get("isa", "")
+                body = inline(obj, None) if isa in INLINE_ISA else block(obj, 2, None)
+                sections.setdefault(isa, []).append(f"\t\t{ref(oid, None)} = {body};\n")
+            out = ["{\n"]
+            for isa in sorted(sections):
+                out.append(f"\n/* Begin {isa} section */\n")
+                out.extend(sections[isa])
+                out.append(f"/* End {isa} section */\n")
+            out.append("\t}")
+            return "".join(out)
+
+        lines = [HEADER, "{\n"]
+        for key, value in self.data.items():
+            body = objects() if key == "objects" else block(value, 1, key)
+            lines.append(f"\t{_quote(key)} = {body};\n")
+        lines.append("}\n")
+        return "".join(lines)
+
+    def dangling(self) -> list[str]:
+        """References to objects that do not exist."""
+        out = []
+        if self.data.get("rootObject") not in self.objects:
+            out.append(f"rootObject -> {self.data.get('rootObject')}")
+        for oid, obj in self.objects.items():
+            for key, value in obj.items():
+                if key in REF_KEYS and isinstance(value, str) and value not in self.objects:
+                    out.append(f"{oid}.{key} -> {value}")
+                elif key in REF_LISTS and isinstance(value, list):
+                    out.extend(f"{oid}.{key} -> {v}" for v in value if v not in self.objects)
+        return out
+
+
+class AddObject(NamedTuple):
+    """An object that must exist; one already present with the same isa is kept as is."""
+
+    oid: str
+    fields: dict
+
+    def holds(self, project: Project) -> bool:
+        return project.objects.get(self.oid, {}).get("isa") == self.fields["isa"]
+
+    def apply(self, project: Project) -> bool:
+        found = project.objects.get(self.oid)
+        if found is None:
+            project.objects[self.oid] = copy.deepcopy(self.fields)
+            return True
+        if found.get("isa") != self.fields["isa"]:
+            raise PbxprojError(f"{self.oid} is a {found.get('isa')}, expected {self.fields['isa']}")
+        return False
+
+    def describe(self) -> str:
+        return f"add {self.fields['isa']} {self.oid}"
+
+
+class InsertRef(NamedTuple):
+    """An id that must be in a list attribute, placed after the first `after` present."""
+
+    owner: str
+    key: str
+    ref: str
+    after: tuple[str, ...] = ()
+
+    def holds(self, project: Project) -> bool:
+        return self.ref in project.objects.get(self.owner, {}).get(self.key, [])
+
+    def apply(self, project: Project) -> bool:
+        owner = project.objects.get(self.owner)
+        if owner is None:
+            raise PbxprojError(f"no object {self.owner} to add {self.key} to")
+        items = owner.setdefault(self.key, [])
+        if self.ref in items:
+            return False
+        anchor = next((a for a in self.after if a in items), None)
+        items.insert(items.index(anchor) + 1 if anchor else len(items), self.ref)
+        return True
+
+    def describe(self) -> str:
+        return f"list {self.ref} in {self.owner}.{self.key}"
+
+
+class SetValue(NamedTuple):
+    """A value at a dict path under an object; inserted after `after`, else in key order."""
+
+    owner: str
+    path: tuple[str, ...]
+    value: Value
+    after: str | None = None
+
+    def _parent(self, project: Project, create: bool) -> dict | None:
+        node = project.objects.get(self.owner)
+        for key in self.path[:-1]:
+            if node is None:
+                return None
+            if key not in node and create:
+                node[key] = {}
+            node = node.get(key)
+        return node if isinstance(node, dict) else None
+
+    def holds(self, project: Project) -> bool:
+        parent = self._parent(project, create=False)
+        return parent is not None and parent.get(self.path[-1]) == self.value
+
+    def apply(self, project: Project) -> bool:
+        if self.owner not in project.objects:
+            raise PbxprojError(f"no object {self.owner} to set {'.'.join(self.path)} on")
+        parent = self._parent(project, create=True)
+        key = self.path[-1]
+        if parent is None:
+            raise PbxprojError(f"{self.owner}.{'.'.join(self.path[:-1])} is not a dictionary")
+        if key in parent:
+            if parent[key] != self.value:
+                raise PbxprojError(f"{self.describe()}: already set to {parent[key]!r}")
+            return False
+        items = list(parent.items())
+        keys = [k for k, _ in items]
+        if self.after in keys:
+            at = keys.index(self.after) + 1
+        else:
+            at = next((i for i, k in enumerate(keys) if k != "isa" and k > key), len(keys))
+        items.insert(at, (key, copy.deepcopy(self.value)))
+        parent.clear()
+        parent.update(items)
+        return True
+
+    def describe(self) -> str:
+        return f"set {self.owner}.{'.'.join(self.path)} = {self.value!r}"
+
+
+Edit = Union[AddObject, InsertRef, SetValue]
+
+
+def apply(project: Project, edits: Sequence[Edit]) -> list[str]:
+    """Apply edits in order; returns the ones that changed the project."""
+    return [edit.describe() for edit in edits if edit.apply(project)]
+
+
+def verify(project: Project, edits: Sequence[Edit]) -> list[str]:
+    """Edits that do not hold, and references that do not resolve."""
+    problems = [f"not applied: {edit.describe()}" for edit in edits if not edit.holds(project)]
+    return problems + [f"dangling reference: {d}" for d in project.dangling()]
+
+
+class Extension(NamedTuple):
+    """An app extension target built from one group and embedded in a host app."""
+
+    name: str
+    # Group (folder) holding the extension's files.
+    group: str
+    host: str = "Runner"
+    sources: tuple[str, ...] = ()
+    # Files in the group that are in no build phase, like Info.plist.
+    files: tuple[str, ...] = ()
+    resources: tuple[str, ...] = ()
+    # System frameworks to link.
+    frameworks: tuple[str, ...] = ()
+    # Extension entitlements, listed in the main group.
+    entitlements: str | None = None
+    # Host entitlements file in the host group, set as the host's CODE_SIGN_ENTITLEMENTS.
+    host_entitlements: str | None = None
+    # Build settings of every extension configuration.
+    settings: Mapping[str, Value] | None = None
+    tools_version: str = "15.0"
+    product_type: str = "com.apple.product-type.app-extension"
+    # Role -> object id for projects that already carry the target; others
+    # get object_id(name, role).
+    ids: Mapping[str, str] | None = None
+
+
+def _file_type(name: str) -> str:
+    return FILE_TYPES.get(os.path.splitext(name)[1], "text")
+
+
+def extension_edits(project: Project, ext: Extension) -> list[Edit]:
+    """Objects, list entries and settings that add `ext` to the project."""
+    ids = ext.ids or {}
+
+    def rid(role: str) -> str:
+        return ids.get(role) or object_id(ext.name, role)
+
+    objects = project.objects
+    root = project.root
+    host = project.target(ext.host)
+    host_obj = objects[host]
+    host_group = project.child(root["mainGroup"], ext.host)
+    host_list = objects[host_obj["buildConfigurationList"]]
+    host_configs = host_list["buildConfigurations"]
+    phase = {"isa": "", "buildActionMask": "2147483647", "files": [], "runOnlyForDeploymentPostprocessing": "0"}
+    group_files = (*ext.sources, *ext.files, *ext.resources)
+    edits: list[Edit] = []
+
+    def add(role: str, fields: dict) -> str:
+        edits.append(AddObject(rid(role), fields))
+        return rid(role)
+
+    product = add("product", {
+        "isa": "PBXFileReference", "explicitFileType": "wrapper.app-extension", "includeInIndex": "0",
+        "path": f"{ext.name}.appex", "sourceTree": "BUILT_PRODUCTS_DIR",
+    })
+    for name in group_files:
+        add(f"file:{name}", {
+            "isa": "PBXFileReference", "lastKnownFileType": _file_type(name), "path": name, "sourceTree": "<group>",
+        })
+    for name in (ext.entitlements, ext.host_entitlements):
+        if name:
+            role = "entitlements" if name == ext.entitlements else "host_entitlements"
+            add(role, {
+                "isa": "PBXFileReference", "lastKnownFileType": _file_type(name), "path": name,
+                "sourceTree": "<group>",
+            })
+    for name in ext.frameworks:
+        add(f"framework:{name}", {
+            "isa": "PBXFileReference", "lastKnownFileType": "wrapper.framework", "name": name,
+            "path": f"System/Library/Frameworks/{name}", "sourceTree": "SDKROOT",
+        })
+    for name in ext.sources + ext.resources:
+        add(f"build:{name}", {"isa": "PBXBuildFile", "fileRef": rid(f"file:{name}")})
+    for name in ext.frameworks:
+        add(f"build:{name}", {"isa": "PBXBuildFile", "fileRef": rid(f"framework:{name}")})
+    embed_file = add("embed:file", {
+        "isa": "PBXBuildFile", "fileRef": product, "settings": {"ATTRIBUTES": ["RemoveHeadersOnCopy"]},
+    })
+    group = add("group", {
+        "isa": "PBXGroup", "children": [rid(f"file:{n}") for n in group_files], "path": ext.group,
+        "sourceTree": "<group>",
+    })
+    phases = [
+        add(role, dict(phase, isa=isa, files=[rid(f"build:{n}") for n in names]))
+        for role, isa, names in (
+            ("sources", "PBXSourcesBuildPhase", ext.sources),
+            ("frameworks", "PBXFrameworksBuildPhase", ext.frameworks),
+            ("resources", "PBXResourcesBuildPhase", ext.resources),
+        )
+    ]
+    embed = add("embed", {
+        "isa": "PBXCopyFilesBuildPhase", "buildActionMask": "2147483647", "dstPath": "",
+        "dstSubfolderSpec": "13", "files": [embed_file], "name": "Embed Foundation Extensions",
+        "runOnlyForDeploymentPostprocessing": "0",
+    })
+    configs = [
+        add(f"config:{objects[c]['name']}", {
+            "isa": "XCBuildConfiguration", "buildSettings": dict(ext.settings or {}), "name": objects[c]["name"],
+        })
+        for c in host_configs
+    ]
+    config_list = add("configs", {
+        "isa": "XCConfigurationList", "buildConfigurations": configs,
+        "defaultConfigurationIsVisible": "0",
+        "defaultConfigurationName": host_list.get("defaultConfigurationName", "Release"),
+    })
+    target = add("target", {
+        "isa": "PBXNativeTarget", "buildConfigurationList": config_list, "buildPhases": phases,
+        "buildRules": [], "dependencies": [], "name": ext.name, "productName": ext.name,
+        "productReference": product, "productType": ext.product_type,
+    })
+    proxy = add("proxy", {
+        "isa": "PBXContainerItemProxy", "containerPortal": project.root_id, "proxyType": "1",
+        "remoteGlobalIDString": target, "remoteInfo": ext.name,
+    })
+    dependency = add("dependency", {"isa": "PBXTargetDependency", "target": target, "targetProxy": proxy})
+
+    main = root["mainGroup"]
+    edits.append(InsertRef(main, "children", group, after=(host_group,) if host_group else ()))
+    if ext.entitlements:
+        edits.append(InsertRef(main, "children", rid("entitlements"), after=(group,)))
+    edits.append(InsertRef(root["productRefGroup"], "children", product, after=(host_obj["productReference"],)))
+    copy_phases = [
+        p for p in host_obj.get("buildPhases", [])
+        if objects[p].get("isa") == "PBXCopyFilesBuildPhase" and p != embed
+    ]
+    edits.append(InsertRef(host, "buildPhases", embed, after=tuple(copy_phases[-1:])))
+    edits.append(InsertRef(host, "dependencies", dependency))
+    edits.append(InsertRef(project.root_id, "targets", target, after=(host,)))
+    edits.append(SetValue(
+        project.root_id, ("attributes", "TargetAttributes", target, "CreatedOnToolsVersion"), ext.tools_version
+    ))
+    if ext.host_entitlements:
+        if host_group is None:
+            raise PbxprojError(f"no {ext.host} group for {ext.host_entitlements}")
+        info = project.child(host_group, "Info.plist")
+        edits.append(InsertRef(host_group, "children", rid("host_entitlements"), after=(info,) if info else ()))
+        path = f"{objects[host_group].get('path') or ext.host}/{ext.host_entitlements}"
+        for config in host_configs:
+            edits.append(SetValue(config, ("buildSettings", "CODE_SIGN_ENTITLEMENTS"), path, after="INFOPLIST_FILE"))
+    return edits
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("pbxproj")
+    args = parser.parse_args()
+    with open(args.pbxproj, encoding="utf-8") as f:
+        text = f.read()
+    project = Project.load(args.pbxproj)
+    counts: dict[str, int] = {}
+    for obj in project.objects.values():
+        counts[obj.get("isa", "?")] = counts.get(obj.get("isa", "?"), 0) + 1
+    for isa, n in sorted(counts.items()):
+        print(f"{isa:<32} {n:>4}")
+    for ref in project.dangling():
+        print(f"dangling reference: {ref}")
+    same = project.dumps() == text
+    print("round-trips byte for byte" if same else "re-serializes differently (not Xcode's layout)")
+    return 0 if same and not project.dangling() else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,124 @@
+import unittest
+
+from patch_ios_widget_pbxproj import PBX, WIDGET
+from pbxproj import (
+    AddObject,
+    Extension,
+    PbxprojError,
+    Project,
+    SetValue,
+    apply,
+    extension_edits,
+    loads,
+    object_id,
+    verify,
+)
+
+
+def _strip_widget(project):
+    """The project as it was before the widget patch."""
+    ids = set(WIDGET.ids.values())
+    for oid in ids:
+        project.objects.pop(oid, None)
+    for obj in project.objects.values():
+        for key, value in obj.items():
+            if isinstance(value, list):
+                value[:] = [v for v in value if v not in ids]
+        obj.get("buildSettings", {}).pop("CODE_SIGN_ENTITLEMENTS", None)
+    project.root["attributes"]["TargetAttributes"].pop(WIDGET.ids["target"], None)
+    return project
+
+
+class RoundTripTest(unittest.TestCase):
+    def setUp(self):
+        with open(PBX, encoding="utf-8") as f:
+            self.text = f.read()
+
+    def test_checked_in_project_round_trips(self):
+        project = Project.load(str(PBX))
+        self.assertEqual(project.name, "Runner")
+        self.assertEqual(project.dumps(), self.text)
+        self.assertEqual(project.dangling(), [])
+
+    def test_strings_comments_and_escapes(self):
+        text = (
+            '// !$*UTF8*$!\n{\n\tobjects = {\n\t};\n\trootObject = X; /* tail */\n'
+            '\tshell = "echo \\"$A\\"\\n\\tok";\n\tlist = (a, "b c", );\n}\n'
+        )
+        project = loads(text)
+        self.assertEqual(project.data["shell"], 'echo "$A"\n\tok')
+        self.assertEqual(project.data["list"], ["a", "b c"])
+        self.assertEqual(loads(project.dumps()).data, project.data)
+        with self.assertRaises(PbxprojError):
+            loads("{ a = ; }")
+        with self.assertRaises(PbxprojError):
+            loads("{ a = b; } }")
+
+
+class PatchTest(unittest.TestCase):
+    def setUp(self):
+        with open(PBX, encoding="utf-8") as f:
+            self.text = f.read()
+        self.bare = _strip_widget(loads(self.text, "Runner"))
+
+    def test_patch_rebuilds_the_checked_in_project(self):
+        edits = extension_edits(self.bare, WIDGET)
+        changed = apply(self.bare, edits)
+        self.assertEqual(len(changed), len(edits))
+        self.assertEqual(verify(self.bare, edits), [])
+        self.assertEqual(self.bare.dumps(), self.text)
+        self.assertEqual(apply(self.bare, extension_edits(self.bare, WIDGET)), [])
+
+    def test_formatting_changes_do_not_stop_edits(self):
+        # The old text.replace patch silently skipped snippets indented differently.
+        reformatted = self.bare.dumps().replace("\t", "  ").replace(" = ", "=")
+        project = loads(reformatted, "Runner")
+        apply(project, extension_edits(project, WIDGET))
+        self.assertEqual(project.dumps(), self.text)
+
+    def test_other_extension_targets_get_stable_ids(self):
+        share = Extension(
+            name="ShareExtension", group="ShareExtension", sources=("ShareViewController.swift",),
+            files=("Info.plist",), settings={"PRODUCT_NAME": "$(TARGET_NAME)"},
+        )
+        edits = extension_edits(self.bare, share)
+        apply(self.bare, edits)
+        self.assertEqual(verify(self.bare, edits), [])
+        target = self.bare.target("ShareExtension")
+        self.assertEqual(target, object_id("ShareExtension", "target"))
+        self.assertEqual(len(target), 24)
+        text = self.bare.dumps()
+        self.assertIn(f"{target} /* ShareExtension */,", text)
+        self.assertIn("/* ShareViewController.swift in Sources */", text)
+        self.assertIn('/* Build configuration list for PBXNativeTarget "ShareExtension" */', text)
+        self.assertEqual(loads(text, "Runner").dumps(), text)
+
+    def test_conflicts_stop_the_patch(self):
+        project = loads(self.text, "Runner")
+        runner_debug = project.objects["97C147061CF9000F007C117D"]
+        runner_debug["buildSettings"]["CODE_SIGN_ENTITLEMENTS"] = "Other.entitlements"
+        with self.assertRaises(PbxprojError):
+            apply(project, extension_edits(project, WIDGET))
+        with self.assertRaises(PbxprojError):
+            AddObject(WIDGET.ids["target"], {"isa": "PBXGroup"}).apply(project)
+
+    def test_verify_reports_edits_that_did_not_land(self):
+        edit = SetValue(WIDGET.ids["config:Debug"], ("buildSettings", "SWIFT_VERSION"), "6.0")
+        project = loads(self.text, "Runner")
+        self.assertEqual(verify(project, [edit]), [f"not applied: {edit.describe()}"])
+        del project.objects[WIDGET.ids["proxy"]]
+        self.assertIn(
+            f"dangling reference: {WIDGET.ids['dependency']}.targetProxy -> {WIDGET.ids['proxy']}",
+            verify(project, []),
+        )
+
+    def test_settings_insert_in_key_order(self):
+        project = loads(self.text, "Runner")
+        config = WIDGET.ids["config:Debug"]
+        SetValue(config, ("buildSettings", "DEVELOPMENT_TEAM"), "ABC").apply(project)
+        keys = list(project.objects[config]["buildSettings"])
+        self.assertEqual(keys[keys.index("DEVELOPMENT_TEAM") - 1], "CURRENT_PROJECT_VERSION")
+
+
+if __name__ == "__main__":
+    unittest.main()